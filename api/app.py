@@ -2,12 +2,10 @@ from flask import Flask, send_file, send_from_directory
 from flask_cors import CORS
 from api.controllers.sloka_controller import sloka_blueprint
 from api.config import Config
+from api.services.service_registry import get_service_registry
 import logging
-import tracemalloc
 import os
 
-tracemalloc.start()
-
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, Config.LOG_LEVEL, logging.INFO),
@@ -38,12 +36,39 @@ app.register_blueprint(kg_blueprint, url_prefix='/api/kg')
 from api.controllers.entity_discovery_controller import discovery_blueprint
 app.register_blueprint(discovery_blueprint, url_prefix='/api/entity-discovery')
 
+# Register admin blueprint (token-protected profiling surface)
+from api.controllers.admin_controller import admin_blueprint, init_process_profiling
+app.register_blueprint(admin_blueprint, url_prefix='/api/admin')
+
+# Register metrics blueprint (/metrics, plus request latency for every blueprint)
+from api.controllers.metrics_controller import metrics_blueprint
+app.register_blueprint(metrics_blueprint)
+
+# Memory tracing and CPU sampling are opt-in (TRACEMALLOC_ENABLED / CPU_SAMPLING_ENABLED)
+init_process_profiling()
+
+# Heavy services (corpus, search indices) build on a background thread so the
+# worker can accept requests immediately; /ready reports when they're done
+if Config.WARM_SERVICES_ON_STARTUP:
+    get_service_registry().start_background()
+
 # Health check endpoint for testing - MUST be before catch-all route
 @app.route('/health')
 def health_check():
     """Health check endpoint for container orchestration and testing."""
     return {'status': 'healthy', 'service': 'ramayanam-api'}, 200
 
+@app.route('/ready')
+def readiness_check():
+    """Readiness check: 503 until the search indices have been built."""
+    registry = get_service_registry()
+    ready = registry.is_ready()
+    return {
+        'status': 'ready' if ready else 'starting',
+        'service': 'ramayanam-api',
+        'services': registry.status()
+    }, 200 if ready else 503
+
 # Serve React app - MUST be last (catch-all route)
 @app.route('/')
 @app.route('/<path:path>')
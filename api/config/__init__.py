@@ -28,11 +28,48 @@ class Config:
     DEFAULT_FUZZY_THRESHOLD = 70
     DEFAULT_MIN_RATIO = 0
     MAX_SEARCH_RESULTS = 1000  # Increased for better search results
-    
+
+    # Sloka search backend: 'memory' keeps the corpus and search indices in
+    # each worker; 'fts' searches an FTS5 index in the corpus database instead
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'memory').lower()
+    SEARCH_DB_PATH = os.getenv('SEARCH_DB_PATH', os.path.join(PROJECT_ROOT, '..', 'ramayanam', 'ramayanam.db'))
+    FTS_SEARCH_CANDIDATES = int(os.getenv('FTS_SEARCH_CANDIDATES', '3000'))  # rescored per query
+
     # Pagination settings
     DEFAULT_PAGE_SIZE = 10
     MAX_PAGE_SIZE = 50
     STREAM_BATCH_SIZE = 5
     
+    # Build the corpus and search indices in the background as soon as the
+    # app is imported; when off, they are built by the first request needing them
+    WARM_SERVICES_ON_STARTUP = os.getenv('WARM_SERVICES_ON_STARTUP', 'true').lower() == 'true'
+    
+    # SQLite connection pool (see api/services/connection_pool.py)
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '16384'))  # per connection
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_CACHED_STATEMENTS = int(os.getenv('SQLITE_CACHED_STATEMENTS', '256'))
+    
+    # Seconds between checks of the relationship change log by the in-process KG graph
+    KG_GRAPH_REFRESH_SECONDS = float(os.getenv('KG_GRAPH_REFRESH_SECONDS', '1.0'))
+    
+    # Seconds between checks for mention writes by the in-process mention index
+    KG_MENTION_REFRESH_SECONDS = float(os.getenv('KG_MENTION_REFRESH_SECONDS', '5.0'))
+    
+    # Processes used by the parallel corpus extraction (0 = one per CPU)
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '0'))
+    
+    # Entity patterns of the extractors (see api/services/pattern_registry.py)
+    ENTITY_PATTERNS_PATH = os.getenv('ENTITY_PATTERNS_PATH', os.path.join(DEFAULT_DATA_PATH, 'entity_patterns.json'))
+    
     # Logging
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
\ No newline at end of file
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    
+    # Profiling (all opt-in; nothing is traced unless enabled)
+    TRACEMALLOC_ENABLED = os.getenv('TRACEMALLOC_ENABLED', 'false').lower() == 'true'
+    TRACEMALLOC_FRAMES = int(os.getenv('TRACEMALLOC_FRAMES', '10'))
+    CPU_SAMPLING_ENABLED = os.getenv('CPU_SAMPLING_ENABLED', 'false').lower() == 'true'
+    CPU_SAMPLING_INTERVAL = float(os.getenv('CPU_SAMPLING_INTERVAL', '0.005'))
+    
+    # Admin endpoints are disabled unless a token is configured
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
\ No newline at end of file
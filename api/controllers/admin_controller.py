@@ -0,0 +1,276 @@
+"""
+Admin API Controller
+
+Token-protected operational endpoints. Currently exposes the opt-in
+profiling surface: CPU sampling, tracemalloc snapshots/diffs and
+per-request profiles.
+
+Every endpoint requires ``Authorization: Bearer <ADMIN_TOKEN>`` (or the
+``X-Admin-Token`` header). When ``ADMIN_TOKEN`` is not configured the
+admin API is disabled entirely.
+"""
+
+from flask import Blueprint, request, jsonify, g
+from functools import wraps
+import hmac
+import logging
+
+from api.config import Config
+from api.services.profiling_service import get_profiling_service
+
+# Create blueprint
+admin_blueprint = Blueprint('admin', __name__)
+
+# Initialize service
+profiling_service = get_profiling_service()
+logger = logging.getLogger(__name__)
+
+# Request header that asks for a single request to be profiled, e.g. "cpu,memory"
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('cpu', 'memory')
+
+# Allocation groupings tracemalloc's Snapshot.statistics accepts
+GROUP_BY_KEYS = ('lineno', 'filename', 'traceback')
+
+
+def _request_token():
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[len('Bearer '):].strip()
+    return request.headers.get('X-Admin-Token', '')
+
+
+def is_admin_request() -> bool:
+    """Check the request's admin token against the configured one."""
+    if not Config.ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(_request_token(), Config.ADMIN_TOKEN)
+
+
+def require_admin(view):
+    """Reject requests that don't carry a valid admin token."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({
+                'success': False,
+                'error': 'Admin API is disabled'
+            }), 403
+        if not is_admin_request():
+            return jsonify({
+                'success': False,
+                'error': 'Invalid or missing admin token'
+            }), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_process_profiling():
+    """Enable process-wide profiling according to configuration."""
+    if Config.TRACEMALLOC_ENABLED:
+        profiling_service.start_memory_tracing(Config.TRACEMALLOC_FRAMES)
+    if Config.CPU_SAMPLING_ENABLED:
+        profiling_service.cpu_sampler.interval = Config.CPU_SAMPLING_INTERVAL
+        profiling_service.cpu_sampler.start()
+
+
+# === Per-request profiling hooks ===
+
+@admin_blueprint.before_app_request
+def start_request_profile():
+    """Profile this request if an authorized caller asked for it."""
+    header = request.headers.get(PROFILE_HEADER)
+    if not header or not is_admin_request():
+        return
+    modes = [m.strip() for m in header.lower().split(',') if m.strip() in PROFILE_MODES]
+    if modes:
+        g.profile_state = profiling_service.begin_request_profile(modes)
+
+
+@admin_blueprint.after_app_request
+def finish_request_profile(response):
+    state = g.pop('profile_state', None)
+    if state is not None:
+        try:
+            profile_id = profiling_service.end_request_profile(state, request.method, request.path)
+            response.headers['X-Profile-Id'] = profile_id
+        except Exception as e:
+            logger.error(f"Error finishing request profile: {e}")
+    return response
+
+
+# === Status ===
+
+@admin_blueprint.route('/profiling', methods=['GET'])
+@require_admin
+def get_profiling_status():
+    """Get the state of all profilers"""
+    return jsonify({
+        'success': True,
+        'status': profiling_service.get_status()
+    })
+
+
+# === CPU sampling ===
+
+@admin_blueprint.route('/profiling/cpu/start', methods=['POST'])
+@require_admin
+def start_cpu_sampling():
+    """Start the process-wide sampling CPU profiler"""
+    try:
+        settings = request.get_json(silent=True) or {}
+        if 'interval' in settings:
+            profiling_service.cpu_sampler.interval = float(settings['interval'])
+        profiling_service.cpu_sampler.start()
+        return jsonify({
+            'success': True,
+            'message': 'CPU sampling started',
+            'interval': profiling_service.cpu_sampler.interval
+        })
+    except Exception as e:
+        logger.error(f"Error starting CPU sampling: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_blueprint.route('/profiling/cpu/stop', methods=['POST'])
+@require_admin
+def stop_cpu_sampling():
+    """Stop the sampling CPU profiler and return its report"""
+    profiling_service.cpu_sampler.stop()
+    limit = request.args.get('limit', 25, type=int)
+    return jsonify({
+        'success': True,
+        'profile': profiling_service.cpu_sampler.report(limit=limit)
+    })
+
+
+@admin_blueprint.route('/profiling/cpu', methods=['GET'])
+@require_admin
+def get_cpu_profile():
+    """Get the current sampling CPU profile"""
+    limit = request.args.get('limit', 25, type=int)
+    return jsonify({
+        'success': True,
+        'profile': profiling_service.cpu_sampler.report(limit=limit)
+    })
+
+
+# === Memory tracing ===
+
+@admin_blueprint.route('/profiling/memory/start', methods=['POST'])
+@require_admin
+def start_memory_tracing():
+    """Start tracemalloc for the whole process"""
+    settings = request.get_json(silent=True) or {}
+    frames = int(settings.get('frames', Config.TRACEMALLOC_FRAMES))
+    started = profiling_service.start_memory_tracing(frames)
+    return jsonify({
+        'success': True,
+        'message': 'Memory tracing started' if started else 'Memory tracing already running'
+    })
+
+
+@admin_blueprint.route('/profiling/memory/stop', methods=['POST'])
+@require_admin
+def stop_memory_tracing():
+    """Stop tracemalloc and discard stored snapshots"""
+    stopped = profiling_service.stop_memory_tracing()
+    return jsonify({
+        'success': True,
+        'message': 'Memory tracing stopped' if stopped else 'Memory tracing was not running'
+    })
+
+
+@admin_blueprint.route('/profiling/memory/snapshots', methods=['POST'])
+@require_admin
+def take_memory_snapshot():
+    """Take and store a tracemalloc snapshot"""
+    try:
+        settings = request.get_json(silent=True) or {}
+        snapshot_id = profiling_service.take_snapshot(settings.get('label'))
+        return jsonify({
+            'success': True,
+            'snapshot_id': snapshot_id
+        }), 201
+    except RuntimeError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 409
+
+
+@admin_blueprint.route('/profiling/memory/top', methods=['GET'])
+@require_admin
+def get_top_allocations():
+    """Get the largest allocation sites of a snapshot (default: now)"""
+    try:
+        limit = request.args.get('limit', 25, type=int)
+        group_by = request.args.get('group_by', 'lineno')
+        if group_by not in GROUP_BY_KEYS:
+            return jsonify({
+                'success': False,
+                'error': f'Query parameter "group_by" must be one of: {", ".join(GROUP_BY_KEYS)}'
+            }), 400
+        allocations = profiling_service.top_allocations(
+            request.args.get('snapshot'), limit=limit, group_by=group_by
+        )
+        return jsonify({
+            'success': True,
+            'allocations': allocations,
+            'count': len(allocations)
+        })
+    except KeyError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+
+
+@admin_blueprint.route('/profiling/memory/diff', methods=['GET'])
+@require_admin
+def get_allocation_diff():
+    """Get allocation growth between two snapshots (``to`` defaults to now)"""
+    from_id = request.args.get('from')
+    if not from_id:
+        return jsonify({
+            'success': False,
+            'error': 'Query parameter "from" is required'
+        }), 400
+
+    try:
+        limit = request.args.get('limit', 25, type=int)
+        diff = profiling_service.diff_snapshots(from_id, request.args.get('to'), limit=limit)
+        return jsonify({
+            'success': True,
+            'diff': diff,
+            'count': len(diff)
+        })
+    except KeyError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+
+
+# === Per-request profiles ===
+
+@admin_blueprint.route('/profiling/requests', methods=['GET'])
+@require_admin
+def get_request_profiles():
+    """Get stored per-request profiles, newest first"""
+    profiles = profiling_service.get_request_profiles(request.args.get('id'))
+    return jsonify({
+        'success': True,
+        'profiles': profiles,
+        'count': len(profiles)
+    })
+
+
+# Error handlers
+@admin_blueprint.errorhandler(404)
+def not_found(error):
+    return jsonify({
+        'success': False,
+        'error': 'Admin endpoint not found'
+    }), 404
@@ -6,7 +6,8 @@ from flask import Blueprint, request, jsonify, Response
 import logging
 import uuid
 from datetime import datetime
-from api.services.chat_service import get_chat_service, AIProvider
+from api.services.chat_service import AIProvider
+from api.services.service_registry import get_service_registry
 from api.exceptions import RamayanamAPIException
 
 
@@ -14,7 +15,7 @@ chat_blueprint = Blueprint("chat", __name__)
 logger = logging.getLogger(__name__)
 
 # Initialize chat service
-chat_service = get_chat_service()
+chat_service = get_service_registry().proxy('chat_service')
 
 
 @chat_blueprint.route("/conversations", methods=["POST"])
@@ -13,13 +13,13 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from api.services.kg_database_service import KGDatabaseService
+from api.services.service_registry import get_service_registry
 
 # Create blueprint
 discovery_blueprint = Blueprint('entity_discovery', __name__)
 
 # Initialize service
-kg_service = KGDatabaseService()
+kg_service = get_service_registry().proxy('kg_service')
 logger = logging.getLogger(__name__)
 
 
@@ -8,22 +8,48 @@ including entities, relationships, and text annotations.
 from flask import Blueprint, request, jsonify
 import logging
 import sys
+import time
 from pathlib import Path
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from api.services.kg_database_service import KGDatabaseService
+from api.services.service_registry import get_service_registry
 
 # Create blueprint
 kg_blueprint = Blueprint('kg', __name__)
 
 # Initialize service
-kg_service = KGDatabaseService()
+kg_service = get_service_registry().proxy('kg_service')
+kg_graph = get_service_registry().proxy('kg_graph')
+kg_subgraph = get_service_registry().proxy('kg_subgraph')
+kg_mentions = get_service_registry().proxy('kg_mentions')
 logger = logging.getLogger(__name__)
 
 
+def _entity_uri(entity_id: str) -> str:
+    """Expand a bare entity name (``rama``) into its kg_id"""
+    if not entity_id.startswith('http'):
+        entity_id = f"http://ramayanam.hanuma.com/entity/{entity_id}"
+    return entity_id
+
+
+def _list_arg(name: str) -> list:
+    """A query parameter given repeatedly and/or comma separated, as a list"""
+    return [
+        item.strip()
+        for value in request.args.getlist(name)
+        for item in value.split(',') if item.strip()
+    ]
+
+
+def _traversal_filters():
+    """Direction and predicate filters shared by the graph traversal endpoints"""
+    direction = request.args.get('direction', 'both')
+    return direction, _list_arg('predicate') or None
+
+
 @kg_blueprint.route('/entities', methods=['GET'])
 def get_entities():
     """Get all entities with optional filtering"""
@@ -53,7 +79,12 @@ def get_entities():
 
 @kg_blueprint.route('/entities/<path:entity_id>', methods=['GET'])
 def get_entity(entity_id: str):
-    """Get specific entity with relationships and mentions"""
+    """
+    Get specific entity with relationships and mentions
+
+    Mentions are in reading order, followed by any whose text unit is not a
+    kanda.sarga.sloka id.
+    """
     try:
         # Handle URL encoding - entity_id might be http://ramayanam.hanuma.com/entity/rama
         if not entity_id.startswith('http'):
@@ -68,7 +99,7 @@ def get_entity(entity_id: str):
         
         # Get relationships and mentions
         relationships = kg_service.get_entity_relationships(entity_id)
-        mentions = kg_service.get_entity_mentions(entity_id)
+        mentions = kg_mentions.mentions_of_entity(entity_id)
         
         return jsonify({
             'success': True,
@@ -124,11 +155,46 @@ def search_entities():
         }), 500
 
 
+@kg_blueprint.route('/autocomplete', methods=['GET'])
+def autocomplete_entities():
+    """Suggest entities for a partially typed name (labels, epithets, alternative names)"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({
+                'success': False,
+                'error': 'Query parameter "q" is required'
+            }), 400
+
+        entity_type = request.args.get('type')
+        limit = min(int(request.args.get('limit', 10)), 50)
+
+        suggestions = kg_service.autocomplete_entities(
+            prefix=query,
+            entity_type=entity_type,
+            limit=limit
+        )
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'suggestions': suggestions,
+            'count': len(suggestions)
+        })
+
+    except Exception as e:
+        logger.error(f"Error autocompleting entities: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @kg_blueprint.route('/text-units/<text_unit_id>/entities', methods=['GET'])
 def get_entities_in_text_unit(text_unit_id: str):
     """Get all entities mentioned in a specific text unit (sloka)"""
     try:
-        entities = kg_service.get_entities_in_text_unit(text_unit_id)
+        entities = kg_mentions.entities_in_text_unit(text_unit_id)
         
         return jsonify({
             'success': True,
@@ -145,6 +211,29 @@ def get_entities_in_text_unit(text_unit_id: str):
         }), 500
 
 
+@kg_blueprint.route('/sargas/<int:kanda>/<int:sarga>/annotations', methods=['GET'])
+def get_sarga_annotations(kanda: int, sarga: int):
+    """Get the entity mentions of every sloka in a sarga, for the sloka reader"""
+    try:
+        annotation = kg_mentions.annotate_sarga(kanda, sarga)
+        
+        return jsonify({
+            'success': True,
+            'kanda': kanda,
+            'sarga': sarga,
+            'annotations': annotation['annotations'],
+            'entities': annotation['entities'],
+            'count': annotation['mention_count']
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting annotations for sarga {kanda}.{sarga}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @kg_blueprint.route('/statistics', methods=['GET'])
 def get_statistics():
     """Get knowledge graph statistics"""
@@ -189,6 +278,164 @@ def get_entity_relationships_endpoint(entity_id: str):
         }), 500
 
 
+@kg_blueprint.route('/graph/neighbors/<path:entity_id>', methods=['GET'])
+def get_graph_neighbors(entity_id: str):
+    """Entities within k hops of an entity, from the in-memory relationship graph"""
+    try:
+        entity_id = _entity_uri(entity_id)
+        hops = int(request.args.get('hops', 1))
+        limit = request.args.get('limit')
+        direction, predicates = _traversal_filters()
+
+        if not kg_graph.has_entity(entity_id) and not kg_service.get_entity_by_id(entity_id):
+            return jsonify({
+                'success': False,
+                'error': 'Entity not found'
+            }), 404
+
+        started = time.perf_counter()
+        neighborhood = kg_graph.neighborhood(
+            entity_id, hops=hops, direction=direction, predicates=predicates,
+            limit=int(limit) if limit else None
+        )
+        took_us = round((time.perf_counter() - started) * 1e6)
+
+        return jsonify({
+            'success': True,
+            'entity_id': entity_id,
+            'nodes': neighborhood['nodes'],
+            'edges': neighborhood['edges'],
+            'count': len(neighborhood['nodes']) - 1,
+            'filters': {
+                'hops': hops,
+                'direction': direction,
+                'predicates': predicates
+            },
+            'took_us': took_us
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    except Exception as e:
+        logger.error(f"Error traversing graph from {entity_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@kg_blueprint.route('/graph/path', methods=['GET'])
+def get_graph_path():
+    """Shortest relationship path between two entities"""
+    try:
+        source = request.args.get('source', '').strip()
+        target = request.args.get('target', '').strip()
+        if not source or not target:
+            return jsonify({
+                'success': False,
+                'error': 'Query parameters "source" and "target" are required'
+            }), 400
+
+        source, target = _entity_uri(source), _entity_uri(target)
+        max_hops = int(request.args.get('max_hops', 6))
+        direction, predicates = _traversal_filters()
+
+        started = time.perf_counter()
+        path = kg_graph.shortest_path(
+            source, target, max_hops=max_hops, direction=direction, predicates=predicates
+        )
+        took_us = round((time.perf_counter() - started) * 1e6)
+
+        return jsonify({
+            'success': True,
+            'source': source,
+            'target': target,
+            'found': path is not None,
+            'path': path or [],
+            'length': len(path) if path is not None else None,
+            'took_us': took_us
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    except Exception as e:
+        logger.error(f"Error finding path: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@kg_blueprint.route('/subgraph', methods=['GET'])
+def get_subgraph():
+    """Ego network of one or more seed entities, ready for the graph visualization"""
+    try:
+        seeds = [_entity_uri(seed) for seed in _list_arg('seed') + _list_arg('seeds')]
+        if not seeds:
+            return jsonify({
+                'success': False,
+                'error': 'Query parameter "seed" is required'
+            }), 400
+
+        known = set(kg_service.get_entity_types(seeds))
+        if not any(seed in known or kg_graph.has_entity(seed) for seed in seeds):
+            return jsonify({
+                'success': False,
+                'error': 'Entity not found'
+            }), 404
+
+        direction, predicates = _traversal_filters()
+        graph = kg_subgraph.get_subgraph(
+            seeds,
+            radius=int(request.args.get('radius', 1)),
+            entity_types=_list_arg('type') or None,
+            predicates=predicates,
+            direction=direction,
+            max_nodes=int(request.args.get('max_nodes', 150)),
+            max_edges=int(request.args.get('max_edges', 500))
+        )
+
+        return jsonify(dict(graph, success=True))
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    except Exception as e:
+        logger.error(f"Error building subgraph: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@kg_blueprint.route('/graph/stats', methods=['GET'])
+def get_graph_stats():
+    """Size and freshness of the in-memory relationship graph"""
+    try:
+        return jsonify({
+            'success': True,
+            'graph': kg_graph.stats()
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting graph stats: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @kg_blueprint.route('/extract', methods=['POST'])
 def run_extraction():
     """Trigger automated entity extraction (for admin use)"""
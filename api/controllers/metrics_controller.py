@@ -0,0 +1,125 @@
+"""
+Metrics Controller
+
+Serves ``/metrics`` in the Prometheus text format and records the latency
+of every request, whichever blueprint handles it, labelled by blueprint,
+route template, method and status. Scrape-time gauges report search index
+sizes, search executor queue depth, database connections and service
+build state.
+"""
+
+from flask import Blueprint, Response, request, g
+import logging
+import time
+
+from api.services.connection_pool import get_all_pools
+from api.services.metrics_service import get_metrics_registry
+from api.services.service_registry import get_service_registry, READY
+
+# Create blueprint
+metrics_blueprint = Blueprint('metrics', __name__)
+
+metrics = get_metrics_registry()
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION = metrics.histogram(
+    'ramayanam_http_request_duration_seconds',
+    'HTTP request latency by blueprint, route, method and status',
+    ['blueprint', 'route', 'method', 'status']
+)
+
+# Label for requests that matched no route, so 404 probes can't blow up cardinality
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def _search_index_rows():
+    service = get_service_registry().peek('fuzzy_search')
+    if service is None or not hasattr(service, 'translation_index'):
+        # The FTS backend keeps no in-process index
+        return {}
+    return {
+        ('translation',): len(service.translation_index),
+        ('sanskrit',): len(service.sanskrit_index)
+    }
+
+
+def _search_index_bytes():
+    service = get_service_registry().peek('fuzzy_search')
+    if service is None or not hasattr(service, 'translation_index'):
+        return {}
+    return {
+        ('translation',): service.translation_index.nbytes(),
+        ('sanskrit',): service.sanskrit_index.nbytes()
+    }
+
+
+def _search_cache_entries():
+    service = get_service_registry().peek('fuzzy_search')
+    if service is None:
+        return None
+    return service.get_cache_stats()['cache_size']
+
+
+def _executor_queue_depth():
+    service = get_service_registry().peek('fuzzy_search')
+    if service is None:
+        return {}
+    return {('optimized-search',): service.get_executor_queue_depth()}
+
+
+def _db_connections_opened():
+    return {
+        (pool.db_path,): pool.stats()['connections_opened']
+        for pool in get_all_pools().values()
+    }
+
+
+def _services_ready():
+    return {
+        (name,): 1 if status['state'] == READY else 0
+        for name, status in get_service_registry().status().items()
+    }
+
+
+metrics.gauge_callback('ramayanam_search_index_rows', 'Rows in each search index',
+                       _search_index_rows, ['index'])
+metrics.gauge_callback('ramayanam_search_index_bytes', 'Approximate size of each search index',
+                       _search_index_bytes, ['index'])
+metrics.gauge_callback('ramayanam_search_cache_entries', 'Entries in the search result cache',
+                       _search_cache_entries)
+metrics.gauge_callback('ramayanam_executor_queue_depth', 'Tasks waiting for an executor thread',
+                       _executor_queue_depth, ['executor'])
+metrics.gauge_callback('ramayanam_db_connections_opened', 'SQLite connections opened by each pool',
+                       _db_connections_opened, ['db'])
+metrics.gauge_callback('ramayanam_service_ready', 'Whether each registered service has been built',
+                       _services_ready, ['service'])
+
+
+# === Per-request latency hooks ===
+
+@metrics_blueprint.before_app_request
+def start_request_timer():
+    g.metrics_started = time.perf_counter()
+
+
+@metrics_blueprint.after_app_request
+def record_request_latency(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        try:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                blueprint=request.blueprint or 'app',
+                route=request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE,
+                method=request.method,
+                status=response.status_code
+            )
+        except Exception as e:
+            logger.error(f"Error recording request metrics: {e}")
+    return response
+
+
+@metrics_blueprint.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Get all metrics in the Prometheus text exposition format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request, Response
 from api.models.sloka_model import Sloka
-from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService
-from api.services.sloka_reader import SlokaReader
+from api.services.optimized_fuzzy_search_service import resolve_result_fields
+from api.services.service_registry import get_service_registry
 from api.config import Config
 from api.exceptions import (
     KandaNotFoundError, 
@@ -11,23 +11,23 @@ from api.exceptions import (
     RamayanamAPIException
 )
 import logging
-from ramayanam import Ramayanam
 
 
 sloka_blueprint = Blueprint("sloka", __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize services
-sloka_reader = SlokaReader(Config.SLOKAS_PATH)
+# Services resolve through the registry on first use; the corpus and search
+# indices are built in the background once the worker is up (see /ready)
+services = get_service_registry()
+sloka_reader = services.proxy('sloka_reader')
+ramayanam_data = services.proxy('ramayanam_data')
+fuzzy_search_service = services.proxy('fuzzy_search')
 
-# Load Ramayanam instance on app start
-try:
-    ramayanam_data = Ramayanam.load()
-    fuzzy_search_service = OptimizedFuzzySearchService(ramayanam_data)
-    logger.info("Successfully loaded Ramayanam data")
-except Exception as e:
-    logger.error(f"Failed to load Ramayanam data: {e}")
-    raise
+
+def _parse_result_fields():
+    """Resolve the ``fields`` and ``compact`` query parameters into a result projection."""
+    compact = request.args.get("compact", "false").lower() in ("1", "true", "yes")
+    return resolve_result_fields(request.args.get("fields"), compact=compact)
 
 
 @sloka_blueprint.route("/kandas/<int:kanda_number>", methods=["GET"])
@@ -157,11 +157,19 @@ def fuzzy_search_slokas():
         - threshold (int, optional): Minimum similarity threshold (default: 70)
         - page (int, optional): Page number (1-based, default: 1)
         - page_size (int, optional): Number of results per page (default: 10, max: 50)
+        - fields (str, optional): Comma separated result fields to return
+          (sloka_number, sloka, translation, meaning, ratio, source)
+        - compact (bool, optional): Return only sloka ids and scores
     """
     try:
         query = request.args.get("query", "").strip()
         if not query:
             return jsonify({"error": "Query parameter is required"}), 400
+
+        try:
+            fields = _parse_result_fields()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
             
         kanda = request.args.get("kanda", "0")
         threshold = int(request.args.get("threshold", Config.DEFAULT_FUZZY_THRESHOLD))
@@ -182,9 +190,9 @@ def fuzzy_search_slokas():
         # Get all results first - use optimized search with result limit
         max_total_results = page_size * 100  # Limit total results to avoid memory issues
         if kanda_num == 0:
-            all_results = fuzzy_search_service.search_translation_fuzzy(query, max_total_results)
+            all_results = fuzzy_search_service.search_translation_fuzzy(query, max_total_results, fields=fields)
         else:
-            all_results = fuzzy_search_service.search_translation_in_kanda_fuzzy(kanda_num, query, threshold)
+            all_results = fuzzy_search_service.search_translation_in_kanda_fuzzy(kanda_num, query, threshold, fields=fields)
             
         # Calculate pagination
         total_results = len(all_results)
@@ -229,11 +237,19 @@ def fuzzy_search_slokas_sanskrit():
         - threshold (int, optional): Minimum similarity threshold (default: 70)
         - page (int, optional): Page number (1-based, default: 1)
         - page_size (int, optional): Number of results per page (default: 10, max: 50)
+        - fields (str, optional): Comma separated result fields to return
+          (sloka_number, sloka, translation, meaning, ratio, source)
+        - compact (bool, optional): Return only sloka ids and scores
     """
     try:
         query = request.args.get("query", "").strip()
         if not query:
             return jsonify({"error": "Query parameter is required"}), 400
+
+        try:
+            fields = _parse_result_fields()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
             
         kanda = request.args.get("kanda", "0")
         threshold = int(request.args.get("threshold", Config.DEFAULT_FUZZY_THRESHOLD))
@@ -254,9 +270,9 @@ def fuzzy_search_slokas_sanskrit():
         # Get all results first - use optimized search with result limit
         max_total_results = page_size * 100  # Limit total results to avoid memory issues
         if kanda_num == 0:
-            all_results = fuzzy_search_service.search_sloka_sanskrit_fuzzy(query, threshold, max_total_results)
+            all_results = fuzzy_search_service.search_sloka_sanskrit_fuzzy(query, threshold, max_total_results, fields=fields)
         else:
-            all_results = fuzzy_search_service.search_sloka_sanskrit_in_kanda_fuzzy(kanda_num, query, threshold)
+            all_results = fuzzy_search_service.search_sloka_sanskrit_in_kanda_fuzzy(kanda_num, query, threshold, fields=fields)
             
         # Calculate pagination
         total_results = len(all_results)
@@ -292,11 +308,21 @@ def fuzzy_search_slokas_sanskrit():
 
 @sloka_blueprint.route("/slokas/fuzzy-search-stream", methods=["GET"])
 def fuzzy_search_slokas_stream():
-    """Enhanced streaming fuzzy search for progressive loading of results."""
+    """
+    Enhanced streaming fuzzy search for progressive loading of results.
+
+    Accepts the same ``fields`` and ``compact`` projection parameters as the
+    paginated search endpoints.
+    """
     try:
         query = request.args.get("query", "").strip()
         if not query:
             return jsonify({"error": "Query parameter is required"}), 400
+
+        try:
+            fields = _parse_result_fields()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
             
         kanda = request.args.get("kanda", "0")
         threshold = int(request.args.get("threshold", Config.DEFAULT_FUZZY_THRESHOLD))
@@ -326,7 +352,7 @@ def fuzzy_search_slokas_stream():
                     total_results = 0
                     
                     # Use the new streaming search method
-                    for batch_results in fuzzy_search_service.search_stream(query, search_type, threshold, batch_size):
+                    for batch_results in fuzzy_search_service.search_stream(query, search_type, threshold, batch_size, fields=fields):
                         if batch_results:
                             batch_count += 1
                             total_results += len(batch_results)
@@ -355,14 +381,14 @@ def fuzzy_search_slokas_stream():
                     # Fallback to regular search for specific kandas
                     if search_type == "translation":
                         if kanda_num == 0:
-                            all_results = fuzzy_search_service.search_translation_fuzzy(query)
+                            all_results = fuzzy_search_service.search_translation_fuzzy(query, fields=fields)
                         else:
-                            all_results = fuzzy_search_service.search_translation_in_kanda_fuzzy(kanda_num, query, threshold)
+                            all_results = fuzzy_search_service.search_translation_in_kanda_fuzzy(kanda_num, query, threshold, fields=fields)
                     else:  # sanskrit
                         if kanda_num == 0:
-                            all_results = fuzzy_search_service.search_sloka_sanskrit_fuzzy(query, threshold)
+                            all_results = fuzzy_search_service.search_sloka_sanskrit_fuzzy(query, threshold, fields=fields)
                         else:
-                            all_results = fuzzy_search_service.search_sloka_sanskrit_in_kanda_fuzzy(kanda_num, query, threshold)
+                            all_results = fuzzy_search_service.search_sloka_sanskrit_in_kanda_fuzzy(kanda_num, query, threshold, fields=fields)
                     
                     # Send total count
                     total_count = len(all_results)
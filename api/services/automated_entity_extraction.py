@@ -6,7 +6,6 @@ rather than manual creation. It processes Sanskrit slokas, English translations,
 word-by-word meanings to identify characters, places, concepts, and relationships.
 """
 
-import re
 import os
 import logging
 from typing import Dict, List, Tuple, Set, Optional, Any
@@ -16,6 +15,10 @@ from pathlib import Path
 
 from api.models.kg_models import KGEntity, KGRelationship, EntityType, SemanticAnnotation
 from api.models.text_models import TextUnit
+from api.services.corpus_reader import CorpusReader, SargaFiles, parse_line, read_lines
+from api.services.entity_matcher import MultiPatternMatcher
+from api.services.parallel_extraction import map_shards
+from api.services.pattern_registry import PatternIndex, get_pattern_registry
 
 
 @dataclass
@@ -48,10 +51,14 @@ class RamayanaEntityExtractor:
     
     def __init__(self, data_path: str = "data/slokas/Slokas"):
         self.data_path = data_path
+        self.reader = CorpusReader(data_path)
         self.logger = logging.getLogger(__name__)
         
-        # Define entity patterns based on text analysis
+        # Entity patterns based on text analysis
+        self.registry = get_pattern_registry()
         self.entity_patterns = self._define_entity_patterns()
+        self.patterns_by_id = PatternIndex(self.entity_patterns)
+        self.matchers = self._build_matchers()
         
         # Statistics tracking
         self.extraction_stats = {
@@ -62,159 +69,35 @@ class RamayanaEntityExtractor:
         }
     
     def _define_entity_patterns(self) -> List[EntityPattern]:
-        """Define patterns for major Ramayana entities"""
-        patterns = [
-            # Major Characters
-            EntityPattern(
-                entity_id="rama",
-                entity_type=EntityType.PERSON,
-                sanskrit_patterns=[
-                    r'राम[ःोम्स्य]?', r'रामस्य', r'रामम्', r'रामेण', 
-                    r'राघव[ःोम्स्य]?', r'राघवस्य', r'राघवम्',
-                    r'दाशरथि[ःस्य]?', r'काकुत्स्थ[ःस्य]?'
-                ],
-                english_patterns=[
-                    r'\bRama\b', r'\bRaama\b', r'\bRāma\b', r'\bRaghava\b', 
-                    r'\bDasarathi\b', r'\bKakutstha\b'
-                ],
-                epithets=['राघव', 'दाशरथि', 'काकुत्स्थ'],
-                confidence_boost=1.2
-            ),
-            
-            EntityPattern(
-                entity_id="sita",
-                entity_type=EntityType.PERSON,
-                sanskrit_patterns=[
-                    r'सीता[म्ं]?', r'सीतायाः', r'सीतया', 
-                    r'मैथिली[म्ं]?', r'वैदेही[म्ं]?', r'जानकी[म्ं]?'
-                ],
-                english_patterns=[
-                    r'\bSita\b', r'\bSītā\b', r'\bMaithili\b', 
-                    r'\bVaidehi\b', r'\bJanaki\b'
-                ],
-                epithets=['मैथिली', 'वैदेही', 'जानकी']
-            ),
-            
-            EntityPattern(
-                entity_id="hanuman",
-                entity_type=EntityType.PERSON,
-                sanskrit_patterns=[
-                    r'हनुमा[न्त्]?', r'हनुमतः', r'हनुमते',
-                    r'पवनात्मज[ःस्य]?', r'वायुपुत्र[ःस्य]?', r'मारुतिः?'
-                ],
-                english_patterns=[
-                    r'\bHanuman\b', r'\bHanumat\b', r'\bMaruti\b',
-                    r'\bson of the Windgod\b', r'\bson of Vayu\b'
-                ],
-                epithets=['पवनात्मज', 'वायुपुत्र', 'मारुति']
-            ),
-            
-            EntityPattern(
-                entity_id="ravana",
-                entity_type=EntityType.PERSON,
-                sanskrit_patterns=[
-                    r'रावण[ःम्स्य]?', r'रावणेन', r'रावणस्य',
-                    r'दशग्रीव[ःस्य]?', r'लङ्केश[ःस्य]?'
-                ],
-                english_patterns=[
-                    r'\bRavana\b', r'\bRāvaṇa\b', r'\bDashagriva\b',
-                    r'\bLankesa\b', r'\bten-headed\b'
-                ],
-                epithets=['दशग्रीव', 'लङ्केश']
-            ),
-            
-            EntityPattern(
-                entity_id="lakshmana",
-                entity_type=EntityType.PERSON,
-                sanskrit_patterns=[
-                    r'लक्ष्मण[ःम्स्य]?', r'लक्ष्मणेन', r'लक्ष्मणस्य',
-                    r'सौमित्रि[ःस्य]?'
-                ],
-                english_patterns=[
-                    r'\bLakshmana\b', r'\bLakṣmaṇa\b', r'\bSaumitri\b'
-                ],
-                epithets=['सौमित्रि']
-            ),
-            
-            # Places
-            EntityPattern(
-                entity_id="ayodhya",
-                entity_type=EntityType.PLACE,
-                sanskrit_patterns=[
-                    r'अयोध्या[म्ं]?', r'अयोध्यायाम्', r'अयोध्यायाः'
-                ],
-                english_patterns=[
-                    r'\bAyodhya\b', r'\bAyodhyā\b'
-                ]
-            ),
-            
-            EntityPattern(
-                entity_id="lanka",
-                entity_type=EntityType.PLACE,
-                sanskrit_patterns=[
-                    r'लङ्का[म्ं]?', r'लङ्कायाम्', r'लङ्कायाः'
-                ],
-                english_patterns=[
-                    r'\bLanka\b', r'\bLaṅkā\b', r'\bCeylon\b'
-                ]
-            ),
-            
-            EntityPattern(
-                entity_id="dandaka",
-                entity_type=EntityType.PLACE,
-                sanskrit_patterns=[
-                    r'दण्डक[ःम्]?', r'दण्डकारण्य[म्]?'
-                ],
-                english_patterns=[
-                    r'\bDandaka\b', r'\bDandaka forest\b'
-                ]
-            ),
-            
-            # Concepts
-            EntityPattern(
-                entity_id="dharma",
-                entity_type=EntityType.CONCEPT,
-                sanskrit_patterns=[
-                    r'धर्म[ःम्स्य]?', r'धर्मेण', r'धर्मज्ञ[ःस्य]?'
-                ],
-                english_patterns=[
-                    r'\bdharma\b', r'\bduty\b', r'\brighteous\b', r'\bvirtue\b'
-                ]
-            ),
-            
-            EntityPattern(
-                entity_id="karma",
-                entity_type=EntityType.CONCEPT,
-                sanskrit_patterns=[
-                    r'कर्म[न्ाः]?', r'कार्य[म्]?'
-                ],
-                english_patterns=[
-                    r'\bkarma\b', r'\baction\b', r'\bdeeds\b'
-                ]
-            )
-        ]
-        
-        return patterns
+        """Patterns for major Ramayana entities, from the shared pattern registry"""
+        return self.registry.patterns('automated', EntityPattern)
     
-    def extract_entities_from_corpus(self) -> Dict[str, Any]:
-        """Extract entities from the entire Ramayana corpus"""
+    def extract_entities_from_corpus(self, workers: int = 1) -> Dict[str, Any]:
+        """
+        Extract entities from the entire Ramayana corpus. With more than one
+        worker, sargas are extracted by a pool of processes and merged in the
+        order a serial run would produce them.
+        """
         self.logger.info("Starting automated entity extraction from corpus")
         
         entities = {}
         relationships = []
         text_annotations = []
         
-        # Process each kanda
-        for kanda_path in self._get_kanda_directories():
-            kanda_name = kanda_path.name
-            self.logger.info(f"Processing {kanda_name}")
-            
-            kanda_results = self._process_kanda(kanda_path)
-            
-            # Merge results
-            entities.update(kanda_results['entities'])
-            relationships.extend(kanda_results['relationships'])
-            text_annotations.extend(kanda_results['annotations'])
+        if workers > 1:
+            self._extract_corpus_parallel(workers, entities, text_annotations)
+        else:
+            # Process each kanda
+            for kanda_path in self._get_kanda_directories():
+                kanda_name = kanda_path.name
+                self.logger.info(f"Processing {kanda_name}")
+                
+                kanda_results = self._process_kanda(kanda_path)
+                
+                # Merge results
+                entities.update(kanda_results['entities'])
+                relationships.extend(kanda_results['relationships'])
+                text_annotations.extend(kanda_results['annotations'])
         
         # Post-process and validate
         validated_entities = self._validate_and_enhance_entities(entities)
@@ -229,10 +112,38 @@ class RamayanaEntityExtractor:
             'statistics': self.extraction_stats
         }
     
+    def _extract_corpus_parallel(self, workers: int, entities: Dict[str, KGEntity],
+                                 annotations: List[SemanticAnnotation]):
+        """Extract every complete sarga in worker processes, merging into entities and annotations"""
+        shards = [
+            (kanda_path.name, sarga_id, files)
+            for kanda_path in self._get_kanda_directories()
+            for sarga_id, files in self._group_sarga_files(kanda_path).items()
+            if len(files) == 3  # Ensure we have sloka, translation, meaning
+        ]
+        stats = self.extraction_stats
+        for sarga_annotations, sarga_stats in map_shards(_extract_sarga, shards, workers,
+                                                         initializer=_init_worker, initargs=(self.data_path,)):
+            for text_unit_id, entity_id, start, end, confidence in sarga_annotations:
+                if entity_id not in entities:
+                    entities[entity_id] = self._create_entity_from_pattern(entity_id)
+                annotations.append(SemanticAnnotation(
+                    text_unit_id=text_unit_id,
+                    entity_id=entity_id,
+                    span_start=start,
+                    span_end=end,
+                    confidence=confidence
+                ))
+            
+            stats['processed_slokas'] += sarga_stats['processed_slokas']
+            stats['confidence_scores'].extend(sarga_stats['confidence_scores'])
+            for key in ('entities_found', 'patterns_matched'):
+                for name, count in sarga_stats[key].items():
+                    stats[key][name] += count
+    
     def _get_kanda_directories(self) -> List[Path]:
-        """Get all kanda directories"""
-        data_dir = Path(self.data_path)
-        return [d for d in data_dir.iterdir() if d.is_dir()]
+        """Get all kanda directories, in reading order"""
+        return self.reader.kanda_directories()
     
     def _process_kanda(self, kanda_path: Path) -> Dict[str, Any]:
         """Process all sargas in a kanda"""
@@ -259,18 +170,8 @@ class RamayanaEntityExtractor:
         }
     
     def _group_sarga_files(self, kanda_path: Path) -> Dict[str, Dict[str, Path]]:
-        """Group sarga files by sarga number"""
-        sarga_files = defaultdict(dict)
-        
-        for file_path in kanda_path.glob("*.txt"):
-            # Parse filename: KandaName_sarga_N_type.txt
-            parts = file_path.stem.split('_')
-            if len(parts) >= 4:
-                sarga_num = parts[2]
-                file_type = parts[3]
-                sarga_files[sarga_num][file_type] = file_path
-        
-        return dict(sarga_files)
+        """Group sarga files by sarga number, in sarga order"""
+        return {sarga.sarga: sarga.files for sarga in self.reader.sarga_files(kanda_path)}
     
     def _process_sarga(self, kanda_name: str, sarga_id: str, files: Dict[str, Path]) -> Dict[str, Any]:
         """Process a single sarga (chapter)"""
@@ -278,30 +179,13 @@ class RamayanaEntityExtractor:
         relationships = []
         annotations = []
         
-        # Read all three file types
-        sanskrit_text = self._read_file_content(files.get('sloka'))
-        translation_text = self._read_file_content(files.get('translation'))
-        meaning_text = self._read_file_content(files.get('meaning'))
-        
-        if not sanskrit_text:
-            return {'entities': {}, 'relationships': [], 'annotations': []}
-        
-        # Process each sloka
-        for sloka_line in sanskrit_text:
-            sloka_data = self._parse_sloka_line(sloka_line)
-            if not sloka_data:
-                continue
-            
-            kanda_num, sarga_num, sloka_num, content = sloka_data
-            text_unit_id = f"{kanda_num}.{sarga_num}.{sloka_num}"
-            
-            # Find corresponding translation and meaning
-            translation = self._find_corresponding_text(translation_text, kanda_num, sarga_num, sloka_num)
-            meaning = self._find_corresponding_text(meaning_text, kanda_num, sarga_num, sloka_num)
+        # Each sloka aligned with its translation and meaning, reading every file once
+        for record in self.reader.read_sarga(SargaFiles(kanda_name, sarga_id, files)):
+            text_unit_id = record.text_unit_id
             
             # Extract entities from this sloka
             sloka_entities = self._extract_entities_from_sloka(
-                text_unit_id, content, translation, meaning
+                text_unit_id, record.sloka, record.translation, record.meaning
             )
             
             # Store entities and annotations
@@ -337,26 +221,11 @@ class RamayanaEntityExtractor:
     
     def _read_file_content(self, file_path: Optional[Path]) -> List[str]:
         """Read file content as lines"""
-        if not file_path or not file_path.exists():
-            return []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return [line.strip() for line in f if line.strip()]
-        except Exception as e:
-            self.logger.warning(f"Failed to read {file_path}: {e}")
-            return []
+        return read_lines(file_path)
     
     def _parse_sloka_line(self, line: str) -> Optional[Tuple[str, str, str, str]]:
         """Parse sloka line format: kanda::sarga::sloka::content"""
-        if '::' not in line:
-            return None
-        
-        parts = line.split('::', 3)
-        if len(parts) != 4:
-            return None
-        
-        return parts[0], parts[1], parts[2], parts[3]
+        return parse_line(line)
     
     def _find_corresponding_text(self, text_lines: List[str], kanda: str, sarga: str, sloka: str) -> str:
         """Find corresponding translation/meaning for a sloka"""
@@ -391,43 +260,59 @@ class RamayanaEntityExtractor:
         if not text:
             return results
         
-        for pattern in self.entity_patterns:
-            # Choose appropriate patterns based on source type
-            if source_type == 'sanskrit':
-                patterns_to_use = pattern.sanskrit_patterns
-            else:
-                patterns_to_use = pattern.english_patterns
-            
-            # Find matches
+        # All regexes of the source type, matched in one pass over the text;
+        # matches come back grouped by entity pattern, in pattern order
+        matcher, owners = self.matchers['sanskrit' if source_type == 'sanskrit' else 'english']
+        matches_by_pattern = defaultdict(list)
+        for index, match in matcher.finditer(text):
+            pattern_index, regex_pattern = owners[index]
+            matches_by_pattern[pattern_index].append((regex_pattern, match))
+        
+        for pattern_index, matches in matches_by_pattern.items():
+            pattern = self.entity_patterns[pattern_index]
             mentions = []
             confidence = 0.7  # Base confidence
             
-            for regex_pattern in patterns_to_use:
-                for match in re.finditer(regex_pattern, text, re.IGNORECASE):
-                    mentions.append((match.start(), match.end()))
-                    confidence = min(0.95, confidence + 0.1)  # Increase confidence for matches
-                    
-                    # Track pattern usage
-                    self.extraction_stats['patterns_matched'][regex_pattern] += 1
-            
-            if mentions:
-                # Apply confidence boost
-                confidence *= pattern.confidence_boost
-                confidence = min(0.99, confidence)  # Cap at 99%
+            for regex_pattern, match in matches:
+                mentions.append((match.start(), match.end()))
+                confidence = min(0.95, confidence + 0.1)  # Increase confidence for matches
                 
-                results.append(ExtractionResult(
-                    entity_id=pattern.entity_id,
-                    entity_type=pattern.entity_type,
-                    mentions=mentions,
-                    confidence=confidence,
-                    source_type=source_type
-                ))
+                # Track pattern usage
+                self.extraction_stats['patterns_matched'][regex_pattern] += 1
+            
+            # Apply confidence boost
+            confidence *= pattern.confidence_boost
+            confidence = min(0.99, confidence)  # Cap at 99%
+            
+            results.append(ExtractionResult(
+                entity_id=pattern.entity_id,
+                entity_type=pattern.entity_type,
+                mentions=mentions,
+                confidence=confidence,
+                source_type=source_type
+            ))
         
         return results
     
+    def _build_matchers(self) -> Dict[str, Tuple[MultiPatternMatcher, List[Tuple[int, str]]]]:
+        """
+        One matcher over the Sanskrit regexes of every entity pattern and one
+        over the English ones, each with the (pattern index, regex) its
+        pattern indexes refer to.
+        """
+        matchers = {}
+        for source, attribute in (('sanskrit', 'sanskrit_patterns'), ('english', 'english_patterns')):
+            owners = [
+                (pattern_index, regex_pattern)
+                for pattern_index, pattern in enumerate(self.entity_patterns)
+                for regex_pattern in getattr(pattern, attribute)
+            ]
+            matchers[source] = (self.registry.matcher([regex for _, regex in owners]), owners)
+        return matchers
+    
     def _create_entity_from_pattern(self, entity_id: str) -> KGEntity:
         """Create KG entity from pattern definition"""
-        pattern = next((p for p in self.entity_patterns if p.entity_id == entity_id), None)
+        pattern = self.patterns_by_id.get(entity_id)
         if not pattern:
             return None
         
@@ -500,6 +385,38 @@ class RamayanaEntityExtractor:
             self.logger.info(f"    {entity}: {count}")
 
 
+# The extractor of an extract_entities_from_corpus worker process
+_worker_extractor: Optional[RamayanaEntityExtractor] = None
+
+
+def _init_worker(data_path: str):
+    global _worker_extractor
+    _worker_extractor = RamayanaEntityExtractor(data_path)
+
+
+def _extract_sarga(shard: Tuple[str, str, Dict[str, Path]]) -> Tuple[List[Tuple], Dict[str, Any]]:
+    """Annotations of one sarga as (text unit, entity, start, end, confidence), with its statistics"""
+    extractor = _worker_extractor
+    extractor.extraction_stats = {
+        'processed_slokas': 0,
+        'entities_found': defaultdict(int),
+        'confidence_scores': [],
+        'patterns_matched': defaultdict(int)
+    }
+    results = extractor._process_sarga(*shard)
+    annotations = [
+        (a.text_unit_id, a.entity_id, a.span_start, a.span_end, a.confidence)
+        for a in results['annotations']
+    ]
+    stats = extractor.extraction_stats
+    return annotations, {
+        'processed_slokas': stats['processed_slokas'],
+        'entities_found': dict(stats['entities_found']),
+        'confidence_scores': stats['confidence_scores'],
+        'patterns_matched': dict(stats['patterns_matched'])
+    }
+
+
 # Utility functions for integration with existing codebase
 
 def extract_entities_for_text_service(text_service, force_refresh: bool = False) -> Dict[str, Any]:
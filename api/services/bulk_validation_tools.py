@@ -13,6 +13,10 @@ from pathlib import Path
 import csv
 import time
 
+from api.services.connection_pool import get_connection_pool
+from api.services.corpus_iterator import stream_rows
+from api.services.kg_schema import migrate_kg_schema
+
 @dataclass
 class ValidationBatch:
     """A batch of entities for validation"""
@@ -46,16 +50,20 @@ class BulkValidationService:
     
     def __init__(self, db_path: str = "data/db/ramayanam.db"):
         self.db_path = db_path
+        self.pool = get_connection_pool(db_path)
         self.logger = logging.getLogger(__name__)
+        self._schema_ready = False
         
         # Default validation rules
         self.validation_rules = self._load_default_validation_rules()
         
-    def get_connection(self):
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's pooled database connection (shared across services)"""
+        if not self._schema_ready:
+            # Validation state lives in columns added by the KG schema migrations
+            self._schema_ready = True
+            migrate_kg_schema(self.pool)
+        return self.pool.connection()
     
     def _load_default_validation_rules(self) -> List[ValidationRule]:
         """Load default validation rules"""
@@ -144,7 +152,7 @@ class BulkValidationService:
                     (SELECT COUNT(*) FROM text_entity_mentions tem 
                      WHERE tem.entity_id = REPLACE(kg_entities.kg_id, 'http://ramayanam.hanuma.com/entity/', '')) as mention_count
                 FROM kg_entities 
-                WHERE JSON_EXTRACT(properties, '$.validation_status') = 'pending'
+                WHERE validation_status = 'pending'
                 ORDER BY extraction_confidence DESC, mention_count DESC
             """
             
@@ -299,31 +307,35 @@ class BulkValidationService:
                         
                         # Update validation status
                         if result.action == "validate":
-                            properties['validation_status'] = 'validated'
+                            status = 'validated'
                             stats['validated'] += 1
                         elif result.action == "reject":
-                            properties['validation_status'] = 'rejected'
+                            status = 'rejected'
                             stats['rejected'] += 1
                         else:  # flag
-                            properties['validation_status'] = 'flagged'
+                            status = 'flagged'
                             stats['flagged'] += 1
                         
-                        # Add validation metadata
-                        properties['validation_confidence'] = result.confidence
+                        # Add validation metadata (status, confidence and
+                        # review flag are columns)
                         properties['validation_reason'] = result.reason
                         properties['validation_rules'] = result.applied_rules
                         properties['validation_timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S')
                         
                         if result.manual_review:
-                            properties['needs_manual_review'] = True
                             stats['manual_review'] += 1
                         
                         # Update database
                         conn.execute("""
                             UPDATE kg_entities 
-                            SET properties = ?, updated_at = CURRENT_TIMESTAMP
+                            SET properties = ?,
+                                validation_status = ?,
+                                validation_confidence = ?,
+                                needs_manual_review = ?,
+                                updated_at = CURRENT_TIMESTAMP
                             WHERE kg_id = ?
-                        """, (json.dumps(properties), kg_id))
+                        """, (json.dumps(properties), status, result.confidence,
+                              int(result.manual_review), kg_id))
                         
                 except Exception as e:
                     self.logger.error(f"Error validating entity {result.entity_id}: {e}")
@@ -341,11 +353,9 @@ class BulkValidationService:
             
             # Status breakdown
             status_stats = conn.execute("""
-                SELECT 
-                    JSON_EXTRACT(properties, '$.validation_status') as status,
-                    COUNT(*) as count
+                SELECT validation_status as status, COUNT(*) as count
                 FROM kg_entities
-                GROUP BY JSON_EXTRACT(properties, '$.validation_status')
+                GROUP BY validation_status
             """).fetchall()
             
             status_counts = {row['status']: row['count'] for row in status_stats}
@@ -353,18 +363,18 @@ class BulkValidationService:
             # Entities needing manual review
             manual_review_count = conn.execute("""
                 SELECT COUNT(*) as count FROM kg_entities
-                WHERE JSON_EXTRACT(properties, '$.needs_manual_review') = 1
+                WHERE needs_manual_review = 1
             """).fetchone()['count']
             
             # Average confidence by status
             confidence_stats = conn.execute("""
                 SELECT 
-                    JSON_EXTRACT(properties, '$.validation_status') as status,
-                    AVG(JSON_EXTRACT(properties, '$.validation_confidence')) as avg_confidence,
+                    validation_status as status,
+                    AVG(validation_confidence) as avg_confidence,
                     COUNT(*) as count
                 FROM kg_entities
-                WHERE JSON_EXTRACT(properties, '$.validation_confidence') IS NOT NULL
-                GROUP BY JSON_EXTRACT(properties, '$.validation_status')
+                WHERE validation_confidence IS NOT NULL
+                GROUP BY validation_status
             """).fetchall()
             
             confidence_by_status = {
@@ -393,13 +403,16 @@ class BulkValidationService:
                     entity_type,
                     labels,
                     properties,
+                    validation_status,
+                    validation_confidence,
+                    needs_manual_review,
                     extraction_confidence,
                     created_at,
                     (SELECT COUNT(*) FROM text_entity_mentions tem 
                      WHERE tem.entity_id = REPLACE(kg_entities.kg_id, 'http://ramayanam.hanuma.com/entity/', '')) as mention_count
                 FROM kg_entities 
-                ORDER BY JSON_EXTRACT(properties, '$.validation_status'), extraction_confidence DESC
-            """).fetchall()
+                ORDER BY validation_status, extraction_confidence DESC
+            """)
             
             with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
@@ -412,8 +425,8 @@ class BulkValidationService:
                     'Created At', 'Validation Timestamp'
                 ])
                 
-                # Data rows
-                for entity in entities:
+                # Data rows, streamed rather than loaded all at once
+                for entity in stream_rows(entities):
                     entity_id = entity['kg_id'].split('/')[-1]
                     labels = json.loads(entity['labels'])
                     properties = json.loads(entity['properties'])
@@ -423,12 +436,12 @@ class BulkValidationService:
                         entity['entity_type'],
                         labels.get('en', ''),
                         labels.get('sa', ''),
-                        properties.get('validation_status', 'pending'),
+                        entity['validation_status'] or 'pending',
                         entity['extraction_confidence'],
-                        properties.get('validation_confidence', ''),
+                        '' if entity['validation_confidence'] is None else entity['validation_confidence'],
                         entity['mention_count'],
                         properties.get('validation_reason', ''),
-                        properties.get('needs_manual_review', False),
+                        bool(entity['needs_manual_review']),
                         entity['created_at'],
                         properties.get('validation_timestamp', '')
                     ])
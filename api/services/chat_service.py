@@ -9,19 +9,12 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 from enum import Enum
 import os
+import importlib.util
 
-try:
-    import openai
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+# The AI client libraries are slow to import, so only check that they are
+# installed here; they are imported when a client is actually created.
+OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
+ANTHROPIC_AVAILABLE = importlib.util.find_spec('anthropic') is not None
 
 from api.models.text_models import TextUnit
 from api.services.text_service import get_text_service
@@ -158,6 +151,7 @@ Be thorough but clear in your analysis."""
         if self.provider == AIProvider.OPENAI and OPENAI_AVAILABLE:
             api_key = os.getenv('OPENAI_API_KEY')
             if api_key:
+                from openai import OpenAI
                 self.client = OpenAI(api_key=api_key)
                 self.logger.info("OpenAI client initialized")
             else:
@@ -167,6 +161,7 @@ Be thorough but clear in your analysis."""
         elif self.provider == AIProvider.ANTHROPIC and ANTHROPIC_AVAILABLE:
             api_key = os.getenv('ANTHROPIC_API_KEY')
             if api_key:
+                import anthropic
                 self.client = anthropic.Anthropic(api_key=api_key)
                 self.logger.info("Anthropic client initialized")
             else:
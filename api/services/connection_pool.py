@@ -0,0 +1,138 @@
+"""
+Shared SQLite connection pool.
+
+Services used to open a new ``sqlite3.connect`` on every call and never
+close it. Instead, every service pointing at the same database file now
+shares one ``SQLiteConnectionPool``, which keeps one long-lived connection
+per thread. Connections are opened with a larger prepared-statement cache
+and tuned pragmas, and the database is switched to WAL so readers on other
+threads (and gunicorn workers) don't block behind a writer.
+
+``connection()`` is a drop-in replacement for the old ``get_connection()``:
+``with pool.connection() as conn`` still commits on success and rolls back
+on error, but doesn't open or leak a connection. ``write()`` additionally
+serializes writers within the process and holds an immediate transaction.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from api.config import Config
+
+
+class SQLiteConnectionPool:
+    """Per-thread SQLite connections for one database file."""
+
+    def __init__(self, db_path: str, mmap_size: Optional[int] = None, cache_size_kb: Optional[int] = None,
+                 busy_timeout_ms: Optional[int] = None, cached_statements: Optional[int] = None):
+        self.db_path = db_path
+        self.mmap_size = Config.SQLITE_MMAP_SIZE if mmap_size is None else mmap_size
+        self.cache_size_kb = Config.SQLITE_CACHE_SIZE_KB if cache_size_kb is None else cache_size_kb
+        self.busy_timeout_ms = Config.SQLITE_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+        self.cached_statements = (
+            Config.SQLITE_CACHED_STATEMENTS if cached_statements is None else cached_statements
+        )
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._opened = 0
+        self._wal_checked = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if not self._wal_checked:
+            # journal_mode is persistent, so this only needs to happen once per
+            # database; it fails harmlessly on read-only or in-memory databases
+            try:
+                mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+                if mode.lower() != 'wal':
+                    self.logger.warning(f"Could not enable WAL for {self.db_path} (journal_mode={mode})")
+            except sqlite3.DatabaseError as e:
+                self.logger.warning(f"Could not enable WAL for {self.db_path}: {e}")
+            self._wal_checked = True
+        with self._stats_lock:
+            self._opened += 1
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        if os.getpid() != self._pid:
+            # Connections must never cross a fork; start afresh in the child
+            self._local = threading.local()
+            self._pid = os.getpid()
+            self._opened = 0
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def write(self):
+        """
+        Run a write transaction on this thread's connection.
+
+        Writers in this process take turns rather than contending for the
+        database lock; the transaction commits on success and rolls back on
+        error.
+        """
+        conn = self.connection()
+        with self._write_lock:
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close_thread_connection(self):
+        """Close this thread's connection (it is reopened on next use)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            return {
+                'db_path': self.db_path,
+                'connections_opened': self._opened
+            }
+
+
+# Pools shared by all services, keyed by absolute database path
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_path: str) -> SQLiteConnectionPool:
+    """Get the shared connection pool for a database file."""
+    key = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLiteConnectionPool(db_path)
+        return pool
+
+
+def get_all_pools() -> Dict[str, SQLiteConnectionPool]:
+    with _pools_lock:
+        return dict(_pools)
@@ -0,0 +1,261 @@
+"""
+Compiles the sloka text tree into the runtime corpus.
+
+The corpus the app serves is the ``slokas`` table of the corpus database
+(``Config.SEARCH_DB_PATH``), its search indices, and the pickled
+``Ramayanam`` snapshot that ``Ramayanam.load`` reads at startup. They used
+to be rebuilt by hand from the text files in ``Config.SLOKAS_PATH``.
+``compile_corpus`` derives all three in one pass:
+
+- every sarga whose files changed is read once, in a pool of processes,
+  and its slokas replace the sarga's rows with bulk inserts in a single
+  transaction;
+- the ``corpus_files`` manifest in the same database records each file's
+  mtime, size and SHA-256, so an unchanged file is not even opened and a
+  file that was only touched is hashed but not re-parsed;
+- the position index and the FTS5 sloka index are created if missing (the
+  FTS triggers keep an existing index in step with the new rows), and the
+  snapshot is rewritten atomically when anything changed.
+
+Run it with::
+
+    python -m api.services.corpus_compiler [--workers N] [--force]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.config import Config
+from api.services.connection_pool import get_connection_pool
+from api.services.corpus_iterator import iter_slokas
+from api.services.corpus_reader import FILE_TYPES, CorpusReader, align_records, split_lines
+from api.services.fts_search_service import ensure_fts_index
+from api.services.parallel_extraction import default_workers, map_shards
+from ramayanam.ramayanam import PICKLE_FILE, Kanda, Ramayanam, Sarga, Sloka
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS slokas (kanda_id INTEGER, sarga_id INTEGER, sloka_id INTEGER, "
+    "sloka TEXT, meaning TEXT, translation TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_slokas_position ON slokas(kanda_id, sarga_id, sloka_id)",
+    """CREATE TABLE IF NOT EXISTS corpus_files (
+        path TEXT PRIMARY KEY,
+        kanda TEXT NOT NULL,
+        sarga TEXT NOT NULL,
+        kanda_id INTEGER,
+        sarga_id INTEGER,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        sha256 TEXT NOT NULL
+    )""",
+)
+
+INSERT_SLOKA = ("INSERT INTO slokas (kanda_id, sarga_id, sloka_id, sloka, meaning, translation) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+
+UPSERT_FILE = """
+    INSERT INTO corpus_files (path, kanda, sarga, kanda_id, sarga_id, mtime_ns, size, sha256)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (path) DO UPDATE SET
+        kanda = excluded.kanda, sarga = excluded.sarga, kanda_id = excluded.kanda_id,
+        sarga_id = excluded.sarga_id, mtime_ns = excluded.mtime_ns, size = excluded.size,
+        sha256 = excluded.sha256
+"""
+
+# (mtime_ns, size, sha256) of a file
+FileStat = Tuple[int, int, str]
+# A sarga by its kanda directory and sarga number in the tree, and by its database ids
+SargaKey = Tuple[str, str]
+SargaIds = Tuple[Optional[int], Optional[int]]
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_sarga(shard: Tuple[str, str, Dict[str, str]]) -> Tuple[Dict[str, FileStat], List[Tuple]]:
+    """
+    Stat, hash and parse the files of one sarga (by path relative to the
+    tree root) as ({path: file stat}, sloka rows).
+    """
+    _, _, files = shard
+    stats: Dict[str, FileStat] = {}
+    lines: Dict[str, List[str]] = {}
+    for file_type, relative in files.items():
+        path = Path(_worker_root) / relative
+        try:
+            # Stat before reading, so a write racing the read is picked up next time
+            stat = path.stat()
+            data = path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Failed to read {path}: {e}")
+            continue
+        stats[relative] = (stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest())
+        lines[file_type] = split_lines(data.decode('utf-8', errors='replace'))
+
+    records = align_records(*(lines.get(file_type, []) for file_type in FILE_TYPES))
+    rows = [
+        (int(r.kanda_id), int(r.sarga_id), int(r.sloka_id), r.sloka, r.meaning, r.translation)
+        for r in records
+    ]
+    return stats, rows
+
+
+# Root of the text tree in a _read_sarga worker process
+_worker_root: Optional[str] = None
+
+
+def _init_worker(root: str):
+    global _worker_root
+    _worker_root = root
+
+
+def build_snapshot(conn) -> Ramayanam:
+    """The ``Ramayanam`` object graph of the slokas table, as ``Ramayanam.load`` builds it."""
+    ramayanam = Ramayanam()
+    for details in Ramayanam.kandaDetails.values():
+        kanda = Kanda(name=details['name'], number=details['id'], totalSargas=details['sargas'])
+        for number in range(1, kanda.totalSargas + 1):
+            kanda.addSarga(Sarga(number=number, kanda=kanda))
+        ramayanam.addKanda(kanda)
+
+    for row in iter_slokas(conn):
+        kanda = ramayanam.kandas.get(row['kanda_id'])
+        sarga = kanda.sargas.get(row['sarga_id']) if kanda else None
+        # Slokas outside the known sargas are not loaded by Ramayanam.load either
+        if sarga is not None:
+            sarga.addSloka(Sloka(sarga, row['sloka_id'], row['sloka'], row['meaning'], row['translation']))
+    return ramayanam
+
+
+def write_snapshot(conn, snapshot_path: str):
+    """Pickle the snapshot next to its destination and move it into place."""
+    temporary = f"{snapshot_path}.tmp"
+    with open(temporary, 'wb') as f:
+        pickle.dump(build_snapshot(conn), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, snapshot_path)
+
+
+def _load_manifest(conn) -> Tuple[Dict[SargaKey, Dict[str, FileStat]], Dict[SargaKey, SargaIds]]:
+    """Recorded file stats and database ids of every compiled sarga."""
+    files: Dict[SargaKey, Dict[str, FileStat]] = {}
+    ids: Dict[SargaKey, SargaIds] = {}
+    for row in conn.execute("SELECT * FROM corpus_files"):
+        key = (row['kanda'], row['sarga'])
+        files.setdefault(key, {})[row['path']] = (row['mtime_ns'], row['size'], row['sha256'])
+        ids[key] = (row['kanda_id'], row['sarga_id'])
+    return files, ids
+
+
+def _delete_sarga(conn, ids: Optional[SargaIds]):
+    if ids and ids[0] is not None:
+        conn.execute("DELETE FROM slokas WHERE kanda_id = ? AND sarga_id = ?", ids)
+
+
+def compile_corpus(source_root: Optional[str] = None, db_path: Optional[str] = None,
+                   snapshot_path: Optional[str] = None, workers: int = 1,
+                   force: bool = False) -> Dict[str, Any]:
+    """
+    Bring the corpus database (and the snapshot, when a path is given) up
+    to date with the text tree; ``force`` recompiles every sarga. Returns
+    statistics of the run.
+    """
+    started = time.perf_counter()
+    reader = CorpusReader(source_root)
+    root = reader.root
+    pool = get_connection_pool(db_path or Config.SEARCH_DB_PATH)
+
+    with pool.write() as conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+    # A forced compile reads every sarga, and clears the tables only in the
+    # transaction that inserts them again
+    recorded, recorded_ids = ({}, {}) if force else _load_manifest(pool.connection())
+
+    stats = {
+        'sargas': 0, 'unchanged_sargas': 0, 'touched_sargas': 0, 'compiled_sargas': 0,
+        'removed_sargas': 0, 'slokas_inserted': 0, 'snapshot_written': False
+    }
+
+    # Only sargas with a file added, removed or restatted are read at all
+    shards = []
+    previous: Dict[SargaKey, Dict[str, FileStat]] = {}
+    for sarga in reader.sargas(complete=False):
+        stats['sargas'] += 1
+        files = {file_type: path.relative_to(root).as_posix() for file_type, path in sarga.files.items()}
+        known = recorded.pop((sarga.kanda, sarga.sarga), {})
+        if set(known) == set(files.values()) and all(
+            known[path][:2] == _stat(root / path) for path in known
+        ):
+            stats['unchanged_sargas'] += 1
+        else:
+            shards.append((sarga.kanda, sarga.sarga, files))
+            previous[(sarga.kanda, sarga.sarga)] = known
+
+    # Files are read before taking the write lock, which is held only for the inserts
+    results = list(map_shards(_read_sarga, shards, workers, initializer=_init_worker, initargs=(str(root),)))
+
+    with pool.write() as conn:
+        if force:
+            conn.execute("DELETE FROM slokas")
+            conn.execute("DELETE FROM corpus_files")
+        for (kanda, sarga, _), (file_stats, rows) in zip(shards, results):
+            key = (kanda, sarga)
+            known = previous[key]
+            ids = rows[0][:2] if rows else recorded_ids.get(key, (None, None))
+            if file_stats and set(file_stats) == set(known) and all(
+                file_stats[path][2] == known[path][2] for path in file_stats
+            ):
+                # Touched but not changed: only the recorded stats are refreshed
+                stats['touched_sargas'] += 1
+            else:
+                _delete_sarga(conn, recorded_ids.get(key))
+                _delete_sarga(conn, ids)
+                conn.executemany(INSERT_SLOKA, rows)
+                stats['compiled_sargas'] += 1
+                stats['slokas_inserted'] += len(rows)
+            conn.execute("DELETE FROM corpus_files WHERE kanda = ? AND sarga = ?", key)
+            conn.executemany(UPSERT_FILE, [
+                (path, kanda, sarga, *ids, *file_stat) for path, file_stat in file_stats.items()
+            ])
+
+        # Sargas no longer in the tree
+        for key in recorded:
+            _delete_sarga(conn, recorded_ids.get(key))
+            conn.execute("DELETE FROM corpus_files WHERE kanda = ? AND sarga = ?", key)
+            stats['removed_sargas'] += 1
+
+    ensure_fts_index(pool)
+
+    changed = stats['compiled_sargas'] or stats['removed_sargas']
+    if snapshot_path and (changed or not os.path.exists(snapshot_path)):
+        write_snapshot(pool.connection(), snapshot_path)
+        stats['snapshot_written'] = True
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"Compiled corpus {root} into {pool.db_path}: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the sloka text tree into the corpus database and snapshot")
+    parser.add_argument('--source', default=Config.SLOKAS_PATH, help="root of the sloka text tree")
+    parser.add_argument('--db', default=Config.SEARCH_DB_PATH, help="corpus database")
+    parser.add_argument('--snapshot', default=PICKLE_FILE, help="snapshot read by Ramayanam.load ('' for none)")
+    parser.add_argument('--workers', type=int, default=0, help="reader processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="recompile every sarga")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(compile_corpus(args.source, args.db, args.snapshot or None, default_workers(args.workers), args.force))
@@ -0,0 +1,68 @@
+"""
+Streaming iteration over the corpus and other large tables.
+
+Batch consumers used to page with ``LIMIT ? OFFSET ?``, so every batch
+re-read and discarded all the rows before it and a full pass was quadratic
+in the table size. ``keyset_batches`` resumes each batch after the key of
+the last row of the previous one (``WHERE (key) > (?, ...)``), which an
+index on the key turns into a seek, so a pass is linear. Every batch is a
+fresh statement, so callers may write to the database between batches.
+
+Read-only passes that need no writes in between, such as exports, can
+instead stream a single query with ``stream_rows``.
+"""
+import sqlite3
+from typing import Iterator, List, Sequence, Tuple
+
+
+# Reading order of the corpus, indexed by migration 7 in kg_schema
+SLOKA_KEY = ('kanda_id', 'sarga_id', 'sloka_id')
+SLOKA_COLUMNS = ('kanda_id', 'sarga_id', 'sloka_id', 'sloka', 'translation', 'meaning')
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def keyset_batches(conn: sqlite3.Connection, table: str, key: Sequence[str], columns: Sequence[str],
+                   batch_size: int = DEFAULT_BATCH_SIZE, where: str = '',
+                   params: Tuple = ()) -> Iterator[List[sqlite3.Row]]:
+    """
+    Yield the rows of ``table`` in ``key`` order, ``batch_size`` rows at a
+    time. ``key`` must be unique and included in ``columns``; ``where`` is
+    an optional extra condition with its ``params``.
+    """
+    key_list = ', '.join(key)
+    select = f"SELECT {', '.join(columns)} FROM {table}"
+    first = f"{select} {'WHERE ' + where if where else ''} ORDER BY {key_list} LIMIT ?"
+    rest = (f"{select} WHERE ({key_list}) > ({', '.join('?' * len(key))}) "
+            f"{'AND (' + where + ')' if where else ''} ORDER BY {key_list} LIMIT ?")
+    positions = [columns.index(column) for column in key]
+
+    rows = conn.execute(first, (*params, batch_size)).fetchall()
+    while rows:
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        rows = conn.execute(rest, (*(last[i] for i in positions), *params, batch_size)).fetchall()
+
+
+def sloka_batches(conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE,
+                  columns: Sequence[str] = SLOKA_COLUMNS) -> Iterator[List[sqlite3.Row]]:
+    """Yield the slokas in reading order, ``batch_size`` at a time."""
+    return keyset_batches(conn, 'slokas', SLOKA_KEY, columns, batch_size)
+
+
+def iter_slokas(conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE,
+                columns: Sequence[str] = SLOKA_COLUMNS) -> Iterator[sqlite3.Row]:
+    """Yield the slokas one at a time in reading order."""
+    for batch in sloka_batches(conn, batch_size, columns):
+        yield from batch
+
+
+def stream_rows(cursor: sqlite3.Cursor, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[sqlite3.Row]:
+    """Yield the rows of an executed query, fetching ``batch_size`` at a time."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
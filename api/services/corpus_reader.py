@@ -0,0 +1,179 @@
+"""
+Streaming reader for the sloka text files.
+
+The corpus is laid out as ``<root>/<Kanda>/<Kanda>_sarga_<n>_<type>.txt``,
+one file per sarga and text type (``sloka``, ``meaning``, ``translation``),
+each line ``kanda::sarga::sloka::text``. Readers of it used to walk the
+tree with ``os.listdir`` in no particular order, and the pattern extractor
+found each sloka's translation and meaning by scanning every line of the
+other two files, quadratic per sarga.
+
+``CorpusReader`` lists the sargas in reading order (kandas by number,
+sargas numerically), parses each file of a sarga once into a map keyed by
+(kanda, sarga, sloka), and yields aligned ``SlokaRecord``s as a generator,
+optionally reading sargas ahead on a thread pool.
+"""
+import io
+import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from api.config import Config
+from api.config.text_configs import get_ramayana_kanda_details
+
+
+logger = logging.getLogger(__name__)
+
+FILE_TYPES = ('sloka', 'meaning', 'translation')
+
+# Kanda directory names by their number, for reading order
+KANDA_NUMBERS = {details['name']: number for number, details in get_ramayana_kanda_details().items()}
+
+SlokaKey = Tuple[str, str, str]
+
+
+class SlokaRecord(NamedTuple):
+    """One sloka with its meaning and translation ('' where missing)."""
+    kanda_id: str
+    sarga_id: str
+    sloka_id: str
+    sloka: str
+    meaning: str
+    translation: str
+
+    @property
+    def text_unit_id(self) -> str:
+        return f"{self.kanda_id}.{self.sarga_id}.{self.sloka_id}"
+
+
+class SargaFiles(NamedTuple):
+    """The text files of one sarga, by file type."""
+    kanda: str
+    sarga: str
+    files: Dict[str, Path]
+
+    @property
+    def complete(self) -> bool:
+        return all(file_type in self.files for file_type in FILE_TYPES)
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def split_lines(text: str) -> List[str]:
+    """The stripped, non-empty lines of a text, split as a text-mode file read would."""
+    return [line.strip() for line in io.StringIO(text, newline=None) if line.strip()]
+
+
+def read_lines(file_path: Optional[Path]) -> List[str]:
+    """The stripped, non-empty lines of a file; none if it is missing or unreadable."""
+    if not file_path or not file_path.exists():
+        return []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except Exception as e:
+        logger.warning(f"Failed to read {file_path}: {e}")
+        return []
+
+
+def parse_line(line: str) -> Optional[Tuple[str, str, str, str]]:
+    """Parse a ``kanda::sarga::sloka::text`` line, or None if it isn't one."""
+    if '::' not in line:
+        return None
+    parts = line.split('::', 3)
+    if len(parts) != 4:
+        return None
+    return parts[0], parts[1], parts[2], parts[3]
+
+
+def parse_lines(lines: List[str]) -> Dict[SlokaKey, str]:
+    """Text by (kanda, sarga, sloka) id; the first line of an id wins."""
+    texts: Dict[SlokaKey, str] = {}
+    for line in lines:
+        parsed = parse_line(line)
+        if parsed:
+            texts.setdefault(parsed[:3], parsed[3])
+    return texts
+
+
+def align_records(sloka_lines: List[str], meaning_lines: List[str],
+                  translation_lines: List[str]) -> List[SlokaRecord]:
+    """The slokas of a sarga in sloka-file order, each with its meaning and translation."""
+    meanings = parse_lines(meaning_lines)
+    translations = parse_lines(translation_lines)
+    records = []
+    for line in sloka_lines:
+        parsed = parse_line(line)
+        if parsed:
+            key = parsed[:3]
+            records.append(SlokaRecord(*parsed, meanings.get(key, ''), translations.get(key, '')))
+    return records
+
+
+class CorpusReader:
+    """Reads the sloka text tree rooted at ``root`` in reading order."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or Config.SLOKAS_PATH)
+
+    def kanda_directories(self) -> List[Path]:
+        """Kanda directories, known kandas by number and then others by name."""
+        directories = [path for path in self.root.iterdir() if path.is_dir()]
+        return sorted(directories, key=lambda path: (KANDA_NUMBERS.get(path.name, len(KANDA_NUMBERS) + 1),
+                                                     _natural_key(path.name)))
+
+    def sarga_files(self, kanda_path: Path) -> List[SargaFiles]:
+        """The sargas of a kanda with their files, numerically ordered."""
+        files: Dict[str, Dict[str, Path]] = {}
+        for file_path in kanda_path.glob("*.txt"):
+            # Parse filename: KandaName_sarga_N_type.txt
+            parts = file_path.stem.split('_')
+            if len(parts) >= 4:
+                files.setdefault(parts[2], {})[parts[3]] = file_path
+        return [SargaFiles(kanda_path.name, sarga, files[sarga]) for sarga in sorted(files, key=_natural_key)]
+
+    def sargas(self, complete: bool = True) -> List[SargaFiles]:
+        """Every sarga of the corpus in reading order, by default only those with all three files."""
+        return [
+            sarga
+            for kanda_path in self.kanda_directories()
+            for sarga in self.sarga_files(kanda_path)
+            if sarga.complete or not complete
+        ]
+
+    def read_sarga(self, sarga: SargaFiles) -> List[SlokaRecord]:
+        """The slokas of a sarga in file order, each with its meaning and translation."""
+        return align_records(*(read_lines(sarga.files.get(file_type)) for file_type in FILE_TYPES))
+
+    def iter_sargas(self, workers: int = 1,
+                    sargas: Optional[List[SargaFiles]] = None) -> Iterator[Tuple[SargaFiles, List[SlokaRecord]]]:
+        """
+        Yield each sarga with its slokas in reading order. With more than
+        one worker, up to twice as many sargas are read ahead on threads.
+        """
+        sargas = self.sargas() if sargas is None else sargas
+        if workers <= 1:
+            for sarga in sargas:
+                yield sarga, self.read_sarga(sarga)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: Deque = deque()
+            for sarga in sargas:
+                pending.append((sarga, executor.submit(self.read_sarga, sarga)))
+                if len(pending) >= 2 * workers:
+                    done, future = pending.popleft()
+                    yield done, future.result()
+            while pending:
+                done, future = pending.popleft()
+                yield done, future.result()
+
+    def iter_slokas(self, workers: int = 1) -> Iterator[SlokaRecord]:
+        """Yield every sloka of the complete sargas in reading order."""
+        for _, records in self.iter_sargas(workers):
+            yield from records
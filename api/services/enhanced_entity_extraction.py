@@ -3,7 +3,6 @@ Enhanced Entity Extraction for Phase 1 Scale-Up
 Optimized for processing the full Ramayana corpus with improved patterns and performance
 """
 
-import re
 import sqlite3
 import logging
 import json
@@ -12,10 +11,26 @@ from dataclasses import dataclass
 from collections import defaultdict, Counter
 from pathlib import Path
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
 from api.models.kg_models import KGEntity, KGRelationship, EntityType, SemanticAnnotation
+from api.services.connection_pool import get_connection_pool
+from api.services.corpus_iterator import iter_slokas, sloka_batches
+from api.services.entity_matcher import MultiPatternMatcher
+from api.services.extraction_manifest import (
+    SOURCE_TYPES, ExtractionManifest, content_hash, pattern_fingerprint
+)
+from api.services.kg_bulk_loader import KGBulkLoader
+from api.services.parallel_extraction import default_workers, map_shards
+from api.services.pattern_registry import PatternIndex, get_pattern_registry
+
+
+# Confidence multiplier of a match by the text field it was found in
+SOURCE_MULTIPLIERS = {
+    'sanskrit': 1.0,
+    'translation': 0.9,
+    'meaning': 0.8
+}
 
 
 @dataclass
@@ -44,9 +59,13 @@ class ScalableEntityExtractor:
     
     def __init__(self, db_path: str = "data/db/ramayanam.db"):
         self.db_path = db_path
+        self.pool = get_connection_pool(db_path)
         self.logger = logging.getLogger(__name__)
+        self.registry = get_pattern_registry()
         self.entity_patterns = self._load_enhanced_patterns()
-        self.processed_cache = set()  # Cache to avoid reprocessing
+        self.patterns_by_id = PatternIndex(self.entity_patterns)
+        self.matchers = self._build_matchers()
+        self.context_boosts = self._build_context_boosts()
         self.extraction_stats = {
             'total_processed': 0,
             'entities_found': 0,
@@ -55,204 +74,13 @@ class ScalableEntityExtractor:
         }
         self._lock = threading.Lock()
     
-    def get_connection(self):
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's pooled database connection (shared across services)"""
+        return self.pool.connection()
     
     def _load_enhanced_patterns(self) -> List[EnhancedEntityPattern]:
-        """Load comprehensive entity patterns for the Ramayana"""
-        patterns = [
-            # Major Characters - Enhanced patterns
-            EnhancedEntityPattern(
-                entity_id="rama",
-                entity_type=EntityType.PERSON,
-                primary_names=["राम", "राम:", "रामम्", "रामस्य", "रामो", "रामे"],
-                alternative_names=["राघव", "दशरथि", "कोसलेन्द्र", "रघुनन्दन"],
-                sanskrit_patterns=[
-                    r"राम[ःम्ं।]?",
-                    r"राघव[ःम्ं।]?", 
-                    r"दशरथि[ःम्ं।]?",
-                    r"रघु(?:नन्दन|पति|वीर)[ःम्ं।]?",
-                    r"कोसल(?:राज|पति|नाथ)[ःम्ं।]?"
-                ],
-                english_patterns=[
-                    r"\brama\b", r"\braghava\b", r"\bdasharathi\b"
-                ],
-                epithets=["राघव", "दशरथि", "कोसलेन्द्र", "रघुनन्दन", "रघुपति"],
-                context_words=["राजा", "प्रिन्स", "धनुष", "सीता", "अयोध्या"],
-                confidence_base=0.95
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="sita",
-                entity_type=EntityType.PERSON,
-                primary_names=["सीता", "सीते", "सीताम्", "सीतया"],
-                alternative_names=["जानकी", "वैदेही", "मिथिलेशी"],
-                sanskrit_patterns=[
-                    r"सीत[ाे ाम्या ासम्।ः]?",
-                    r"जानकी[म्ं।]?",
-                    r"वैदेही[म्ं।]?",
-                    r"मिथिलेश[ीः][म्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bsita\b", r"\bjanaki\b", r"\bvaidehi\b"
-                ],
-                epithets=["जानकी", "वैदेही", "मिथिलेशी"],
-                context_words=["पत्नी", "राम", "रानी", "वन", "अग्नि"],
-                confidence_base=0.95
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="lakshmana", 
-                entity_type=EntityType.PERSON,
-                primary_names=["लक्ष्मण", "लक्ष्मणस्य", "लक्ष्मणम्"],
-                alternative_names=["सौमित्रि", "शेषावतार"],
-                sanskrit_patterns=[
-                    r"लक्ष्मण[ःम्ं।स्य]?",
-                    r"सौमित्रि[ःम्ं।]?",
-                    r"शेषावतार[ःम्ं।]?"
-                ],
-                english_patterns=[
-                    r"\blakshmana\b", r"\blakshman\b", r"\bsaumitri\b"
-                ],
-                epithets=["सौमित्रि", "शेषावतार"],
-                context_words=["भाई", "राम", "धनुष", "वन"],
-                confidence_base=0.9
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="ravana",
-                entity_type=EntityType.PERSON,
-                primary_names=["रावण", "रावणस्य", "रावणम्"],
-                alternative_names=["दशानन", "लंकेश", "राक्षसराज"],
-                sanskrit_patterns=[
-                    r"रावण[ःम्ं।स्य]?",
-                    r"दशानन[ःम्ं।]?",
-                    r"लंकेश[ःम्ं।]?",
-                    r"राक्षस(?:राज|पति)[ःम्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bravana\b", r"\bdashanan\b", r"\blankesh\b"
-                ],
-                epithets=["दशानन", "लंकेश", "राक्षसराज"],
-                context_words=["राक्षस", "लंका", "शत्रु", "युद्ध"],
-                confidence_base=0.9
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="hanuman",
-                entity_type=EntityType.PERSON, 
-                primary_names=["हनुमान्", "हनुमत्", "हनुमान"],
-                alternative_names=["मारुति", "पवनपुत्र", "वायुपुत्र", "अंजनेय"],
-                sanskrit_patterns=[
-                    r"हनुम[ाान्त्][न्तः।ं]?",
-                    r"मारुति[ःम्ं।]?",
-                    r"पवन(?:पुत्र|सुत)[ःम्ं।]?",
-                    r"वायु(?:पुत्र|सुत)[ःम्ं।]?",
-                    r"अंजनेय[ःम्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bhanuman\b", r"\bmaruti\b", r"\banjaneya\b"
-                ],
-                epithets=["मारुति", "पवनपुत्र", "वायुपुत्र", "अंजनेय"],
-                context_words=["वानर", "राम", "सेवक", "उड़ना"],
-                confidence_base=0.9
-            ),
-            
-            # Places - Enhanced patterns
-            EnhancedEntityPattern(
-                entity_id="ayodhya",
-                entity_type=EntityType.PLACE,
-                primary_names=["अयोध्या", "अयोध्याम्", "अयोध्यायाम्"],
-                alternative_names=["कोसल", "साकेत"],
-                sanskrit_patterns=[
-                    r"अयोध्या[म्यांः।]?",
-                    r"कोसल[ेम्ं।]?",
-                    r"साकेत[म्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bayodhya\b", r"\bkosala\b", r"\bsaketa\b"
-                ],
-                epithets=["कोसल", "साकेत"],
-                context_words=["नगर", "राज्य", "राजधानी", "राम"],
-                confidence_base=0.85
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="lanka",
-                entity_type=EntityType.PLACE,
-                primary_names=["लंका", "लंकाम्", "लंकायाम्"],
-                alternative_names=["रावणपुरी", "राक्षसपुरी"],
-                sanskrit_patterns=[
-                    r"लंका[म्यांः।]?",
-                    r"रावणपुरी[म्ं।]?",
-                    r"राक्षसपुरी[म्ं।]?"
-                ],
-                english_patterns=[
-                    r"\blanka\b", r"\bravanapur\b"
-                ],
-                epithets=["रावणपुरी", "राक्षसपुरी"],
-                context_words=["द्वीप", "सागर", "रावण", "राक्षस"],
-                confidence_base=0.85
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="dandaka",
-                entity_type=EntityType.PLACE,
-                primary_names=["दण्डक", "दण्डकारण्य"],
-                alternative_names=["वन", "अरण्य"],
-                sanskrit_patterns=[
-                    r"दण्डक[ःम्ं।]?",
-                    r"दण्डकारण्य[म्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bdandaka\b", r"\bdandakaranya\b"
-                ],
-                epithets=["दण्डकारण्य"],
-                context_words=["वन", "अरण्य", "निर्वासन", "तपस्या"],
-                confidence_base=0.8
-            ),
-            
-            # Concepts - Enhanced patterns  
-            EnhancedEntityPattern(
-                entity_id="dharma",
-                entity_type=EntityType.CONCEPT,
-                primary_names=["धर्म", "धर्मस्य", "धर्मम्"],
-                alternative_names=["न्याय", "सत्य", "कर्तव्य"],
-                sanskrit_patterns=[
-                    r"धर्म[ःम्ेस्य।]?",
-                    r"न्याय[ःम्ं।]?",
-                    r"सत्य[ःम्ं।]?",
-                    r"कर्तव्य[ःम्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bdharma\b", r"\brighteousness\b", r"\bduty\b"
-                ],
-                epithets=["न्याय", "सत्य", "कर्तव्य"],
-                context_words=["राज्य", "न्याय", "शासन", "आचार"],
-                confidence_base=0.75
-            ),
-            
-            EnhancedEntityPattern(
-                entity_id="karma",
-                entity_type=EntityType.CONCEPT,
-                primary_names=["कर्म", "कर्मणः", "कर्मणा"],
-                alternative_names=["कृत्य", "क्रिया"],
-                sanskrit_patterns=[
-                    r"कर्म[णःनाम्।]?",
-                    r"कृत्य[ःम्ं।]?",
-                    r"क्रिया[म्ं।]?"
-                ],
-                english_patterns=[
-                    r"\bkarma\b", r"\baction\b", r"\bdeed\b"
-                ],
-                epithets=["कृत्य", "क्रिया"],
-                context_words=["फल", "परिणाम", "कर्ता"],
-                confidence_base=0.7
-            )
-        ]
+        """Load comprehensive entity patterns for the Ramayana from the shared pattern registry"""
+        patterns = self.registry.patterns('enhanced', EnhancedEntityPattern)
         
         self.logger.info(f"Loaded {len(patterns)} enhanced entity patterns")
         return patterns
@@ -261,12 +89,26 @@ class ScalableEntityExtractor:
         """Extract entities from a single sloka with enhanced matching"""
         text_unit_id = f"{sloka_row['kanda_id']}.{sloka_row['sarga_id']}.{sloka_row['sloka_id']}"
         
-        # Skip if already processed (for incremental processing)
-        if text_unit_id in self.processed_cache:
-            return []
-        
         extractions = []
         
+        for pattern, source_type, mention in self._sloka_mentions(sloka_row):
+            extraction = {
+                'entity_id': pattern.entity_id,
+                'entity_type': pattern.entity_type.value,
+                'text_unit_id': text_unit_id,
+                'span_start': mention['start'],
+                'span_end': mention['end'],
+                'confidence': mention['confidence'],
+                'source_type': source_type,
+                'matched_text': mention['matched_text'],
+                'pattern_type': mention['pattern_type']
+            }
+            extractions.append(extraction)
+        
+        return extractions
+    
+    def _sloka_mentions(self, sloka_row):
+        """(pattern, source type, mention) for every mention in the text fields of a sloka"""
         # Process different text fields
         texts_to_process = [
             (sloka_row['sloka'], 'sanskrit'),
@@ -280,49 +122,74 @@ class ScalableEntityExtractor:
                 
             text = str(text).lower()
             
-            for pattern in self.entity_patterns:
-                entity_mentions = self._find_entity_mentions(text, pattern, source_type)
-                
-                for mention in entity_mentions:
-                    extraction = {
-                        'entity_id': pattern.entity_id,
-                        'entity_type': pattern.entity_type.value,
-                        'text_unit_id': text_unit_id,
-                        'span_start': mention['start'],
-                        'span_end': mention['end'],
-                        'confidence': mention['confidence'],
-                        'source_type': source_type,
-                        'matched_text': mention['matched_text'],
-                        'pattern_type': mention['pattern_type']
-                    }
-                    extractions.append(extraction)
+            for pattern, mention in self._find_entity_mentions(text, source_type):
+                yield pattern, source_type, mention
+    
+    def extract_sarga_mentions(self, kanda_id: int, sarga_id: int) -> List[Tuple]:
+        """
+        Mentions in every sloka of a sarga as compact rows in
+        ``MENTION_COLUMNS`` order, in sloka order
+        """
+        rows = self.get_connection().execute("""
+            SELECT kanda_id, sarga_id, sloka_id, sloka, translation, meaning
+            FROM slokas WHERE kanda_id = ? AND sarga_id = ?
+            ORDER BY sloka_id
+        """, (kanda_id, sarga_id)).fetchall()
         
-        return extractions
+        mentions = []
+        for sloka_row in rows:
+            text_unit_id = f"{sloka_row['kanda_id']}.{sloka_row['sarga_id']}.{sloka_row['sloka_id']}"
+            for pattern, source_type, mention in self._sloka_mentions(sloka_row):
+                mentions.append((text_unit_id, pattern.entity_id, mention['start'], mention['end'],
+                                 mention['confidence'], source_type))
+        return mentions
+    
+    def _build_matchers(self) -> Dict[str, Tuple[MultiPatternMatcher, List[Tuple[EnhancedEntityPattern, str]]]]:
+        """One matcher over every entity's Sanskrit regexes and one over the English ones"""
+        matchers = {}
+        for source, attribute in (('sanskrit', 'sanskrit_patterns'), ('english', 'english_patterns')):
+            owners = [
+                (pattern, regex_pattern)
+                for pattern in self.entity_patterns
+                for regex_pattern in getattr(pattern, attribute)
+            ]
+            matchers[source] = (self.registry.matcher([regex for _, regex in owners]), owners)
+        return matchers
+    
+    def _build_context_boosts(self) -> Dict[str, Tuple[Tuple[str, float], ...]]:
+        """
+        The lowercased context words (+0.05) and epithets (+0.1) of every
+        entity with their boosts, in the order they are added up
+        """
+        return {
+            pattern.entity_id: tuple(
+                [(word.lower(), 0.05) for word in pattern.context_words] +
+                [(epithet.lower(), 0.1) for epithet in pattern.epithets]
+            )
+            for pattern in self.entity_patterns
+        }
     
-    def _find_entity_mentions(self, text: str, pattern: EnhancedEntityPattern, source_type: str) -> List[Dict[str, Any]]:
-        """Find all mentions of an entity in text using enhanced patterns"""
+    def _find_entity_mentions(self, text: str, source_type: str) -> List[Tuple[EnhancedEntityPattern, Dict[str, Any]]]:
+        """Find the mentions of all entities in text in one pass, in entity pattern order"""
         mentions = []
         
         # Choose appropriate patterns based on source type
-        if source_type == 'sanskrit':
-            patterns_to_use = pattern.sanskrit_patterns
-        else:
-            patterns_to_use = pattern.english_patterns
-        
-        for regex_pattern in patterns_to_use:
-            for match in re.finditer(regex_pattern, text, re.IGNORECASE):
-                confidence = self._calculate_confidence(
-                    text, match, pattern, source_type
-                )
-                
-                if confidence >= pattern.min_confidence:
-                    mentions.append({
-                        'start': match.start(),
-                        'end': match.end(), 
-                        'confidence': confidence,
-                        'matched_text': match.group(),
-                        'pattern_type': regex_pattern
-                    })
+        matcher, owners = self.matchers['sanskrit' if source_type == 'sanskrit' else 'english']
+        
+        for index, match in matcher.finditer(text):
+            pattern, regex_pattern = owners[index]
+            confidence = self._calculate_confidence(
+                text, match, pattern, source_type
+            )
+            
+            if confidence >= pattern.min_confidence:
+                mentions.append((pattern, {
+                    'start': match.start(),
+                    'end': match.end(), 
+                    'confidence': confidence,
+                    'matched_text': match.group(),
+                    'pattern_type': regex_pattern
+                }))
         
         return mentions
     
@@ -331,178 +198,212 @@ class ScalableEntityExtractor:
         base_confidence = pattern.confidence_base
         
         # Boost confidence based on source type
-        source_multipliers = {
-            'sanskrit': 1.0,
-            'translation': 0.9,
-            'meaning': 0.8
-        }
-        confidence = base_confidence * source_multipliers.get(source_type, 0.7)
-        
-        # Context boost - check for related words nearby
-        context_window = text[max(0, match.start()-50):match.end()+50]
-        context_boost = 0
-        for context_word in pattern.context_words:
-            if context_word.lower() in context_window.lower():
-                context_boost += 0.05
+        confidence = base_confidence * SOURCE_MULTIPLIERS.get(source_type, 0.7)
         
-        # Epithet boost
-        for epithet in pattern.epithets:
-            if epithet.lower() in context_window.lower():
-                context_boost += 0.1
+        # Context and epithet boosts - check for related words nearby. The
+        # window is lowercased once, not once per word
+        context_window = text[max(0, match.start()-50):match.end()+50].lower()
+        context_boost = sum(
+            boost for word, boost in self.context_boosts[pattern.entity_id] if word in context_window
+        )
         
         # Apply boosts but cap at 1.0
         final_confidence = min(1.0, confidence + context_boost)
         
         return final_confidence
     
-    def process_corpus_batch(self, batch_size: int = 1000, max_workers: int = 4) -> Dict[str, Any]:
-        """Process the entire corpus in batches with parallel processing"""
+    def process_corpus_batch(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Re-extract the slokas whose text or matching patterns changed since
+        they were last extracted, diff-applying their mentions batch by batch
+        (see ``extraction_manifest``)
+        """
         start_time = time.time()
+        manifest = ExtractionManifest(self.pool, self.pattern_fingerprints())
         
-        self.logger.info(f"Starting large-scale entity extraction with {max_workers} workers")
+        self.logger.info(f"Starting incremental entity extraction: {len(manifest.changed_entities)} "
+                         f"entities with changed patterns, {len(manifest.entries)} slokas in the manifest")
         
-        with self.get_connection() as conn:
-            # Get total count for progress tracking
-            total_slokas = conn.execute("SELECT COUNT(*) as count FROM slokas").fetchone()['count']
-            
-            # Load already processed slokas to skip them
-            processed_units = conn.execute("""
-                SELECT DISTINCT text_unit_id FROM text_entity_mentions
-            """).fetchall()
-            
-            self.processed_cache = {row['text_unit_id'] for row in processed_units}
-            
-            self.logger.info(f"Found {len(self.processed_cache)} already processed slokas")
-            
-            # Process in batches
-            results = {
-                'entities': {},
-                'mentions': [],
-                'statistics': {
-                    'total_slokas': total_slokas,
-                    'processed_slokas': 0,
-                    'entities_found': 0,
-                    'new_entities': 0,
-                    'processing_time': 0
-                }
+        conn = self.get_connection()
+        # Get total count for progress tracking
+        total_slokas = conn.execute("SELECT COUNT(*) as count FROM slokas").fetchone()['count']
+        
+        results = {
+            'entities': {},
+            'mentions': [],
+            'statistics': {
+                'total_slokas': total_slokas,
+                'processed_slokas': 0,
+                'skipped_slokas': 0,
+                'removed_slokas': 0,
+                'entities_found': 0,
+                'new_entities': 0,
+                'mentions_inserted': 0,
+                'mentions_deleted': 0,
+                'mentions_updated': 0,
+                'processing_time': 0
             }
-            
-            offset = 0
-            while offset < total_slokas:
-                batch_start = time.time()
-                
-                # Get batch of slokas
-                slokas = conn.execute("""
-                    SELECT kanda_id, sarga_id, sloka_id, sloka, translation, meaning
-                    FROM slokas 
-                    ORDER BY kanda_id, sarga_id, sloka_id
-                    LIMIT ? OFFSET ?
-                """, (batch_size, offset)).fetchall()
-                
-                if not slokas:
-                    break
-                
-                # Process batch with parallel workers
-                batch_results = self._process_batch_parallel(slokas, max_workers)
-                
-                # Store results in database
-                self._store_batch_results(batch_results)
-                
-                # Update statistics
-                batch_time = time.time() - batch_start
-                results['statistics']['processed_slokas'] += len(slokas)
-                results['statistics']['entities_found'] += len(batch_results)
-                
-                # Progress logging
-                progress = (offset + len(slokas)) / total_slokas * 100
-                self.logger.info(f"Progress: {progress:.1f}% ({offset + len(slokas)}/{total_slokas}) - "
-                               f"Batch time: {batch_time:.2f}s - Found: {len(batch_results)} entities")
-                
-                offset += batch_size
+        }
+        statistics = results['statistics']
+        
+        seen = 0
+        for slokas in sloka_batches(conn, batch_size):
+            batch_start = time.time()
+        
+            # Re-extract only the entities the manifest says may have changed
+            extracted = []
+            for sloka_row in slokas:
+                text_unit_id = f"{sloka_row['kanda_id']}.{sloka_row['sarga_id']}.{sloka_row['sloka_id']}"
+                text_hash = content_hash(sloka_row['sloka'], sloka_row['translation'], sloka_row['meaning'])
+                scope = manifest.scope(text_unit_id, text_hash)
+                if not scope:
+                    statistics['skipped_slokas'] += 1
+                    continue
+                mentions = [
+                    (text_unit_id, pattern.entity_id, mention['start'], mention['end'],
+                     mention['confidence'], source_type)
+                    for pattern, source_type, mention in self._sloka_mentions(sloka_row)
+                    if pattern.entity_id in scope
+                ]
+                statistics['entities_found'] += len(mentions)
+                extracted.append((text_unit_id, text_hash, scope, mentions))
+        
+            # Store the changes in the database
+            changes = manifest.apply(extracted)
+            statistics['processed_slokas'] += len(extracted)
+            for change, count in changes.items():
+                statistics[f'mentions_{change}'] += count
+        
+            # Progress logging
+            seen += len(slokas)
+            progress = seen / total_slokas * 100
+            self.logger.info(f"Progress: {progress:.1f}% ({seen}/{total_slokas}) - "
+                           f"Batch time: {time.time() - batch_start:.2f}s - "
+                           f"Re-extracted: {len(extracted)} slokas - Changes: {changes}")
+        
+        statistics['removed_slokas'] = manifest.finish()
+        statistics['new_entities'] = self._refresh_entities(manifest.touched_entities)
         
         total_time = time.time() - start_time
-        results['statistics']['processing_time'] = total_time
+        statistics['processing_time'] = total_time
         
-        self.logger.info(f"Completed corpus processing in {total_time:.2f}s")
+        self.logger.info(f"Completed incremental corpus processing in {total_time:.2f}s")
         return results
-    
-    def _process_batch_parallel(self, slokas: List, max_workers: int) -> List[Dict[str, Any]]:
-        """Process a batch of slokas in parallel"""
-        all_extractions = []
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all slokas for processing
-            future_to_sloka = {
-                executor.submit(self.extract_entities_from_sloka, sloka): sloka 
-                for sloka in slokas
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_sloka):
-                try:
-                    extractions = future.result()
-                    all_extractions.extend(extractions)
-                except Exception as e:
-                    sloka = future_to_sloka[future]
-                    self.logger.error(f"Error processing sloka {sloka.get('sloka_id', 'unknown')}: {e}")
-        
-        return all_extractions
-    
-    def _store_batch_results(self, extractions: List[Dict[str, Any]]):
-        """Store extraction results in database efficiently"""
-        if not extractions:
-            return
         
-        with self.get_connection() as conn:
-            # Group extractions by entity for efficient storage
-            entities_data = defaultdict(list)
-            mentions_data = []
-            
-            for extraction in extractions:
-                entity_id = extraction['entity_id']
-                entities_data[entity_id].append(extraction)
-                
-                # Prepare mention data
-                mentions_data.append((
-                    extraction['text_unit_id'],
-                    entity_id, 
-                    extraction['span_start'],
-                    extraction['span_end'],
-                    extraction['confidence'],
-                    extraction['source_type']
-                ))
-            
-            # Store/update entities
-            for entity_id, entity_extractions in entities_data.items():
-                self._store_or_update_entity(conn, entity_id, entity_extractions)
-            
-            # Batch insert mentions
-            conn.executemany("""
-                INSERT OR IGNORE INTO text_entity_mentions 
-                (text_unit_id, entity_id, span_start, span_end, confidence, source_type)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, mentions_data)
-            
-            conn.commit()
-            self.logger.debug(f"Stored {len(entities_data)} entities and {len(mentions_data)} mentions")
-    
-    def _store_or_update_entity(self, conn, entity_id: str, extractions: List[Dict[str, Any]]):
-        """Store or update entity information"""
-        if not extractions:
-            return
+    def pattern_fingerprints(self) -> Dict[str, str]:
+        """Fingerprint of each entity's patterns, for the extraction manifest"""
+        return {pattern.entity_id: pattern_fingerprint(pattern) for pattern in self.entity_patterns}
+        
+    def _refresh_entities(self, entity_ids) -> int:
+        """
+        Recompute the occurrence count and confidence of extracted entities from
+        their stored mentions, keeping their validation state. Returns the
+        number of entities created.
+        """
+        if not entity_ids:
+            return 0
+        
+        sources = ', '.join('?' * len(SOURCE_TYPES))
+        created = 0
+        with self.pool.write() as conn:
+            for entity_id in sorted(entity_ids):
+                count, avg_confidence = conn.execute(f"""
+                    SELECT COUNT(*), AVG(confidence) FROM text_entity_mentions
+                    WHERE entity_id = ? AND source_type IN ({sources})
+                """, (entity_id, *SOURCE_TYPES)).fetchone()
+                row = self._entity_row(entity_id, avg_confidence, count) if count else None
+                if not row:
+                    continue
         
-        first_extraction = extractions[0]
-        entity_type = first_extraction['entity_type']
+                exists = conn.execute("SELECT 1 FROM kg_entities WHERE kg_id = ?", (row[0],)).fetchone()
+                created += exists is None
+                conn.execute("""
+                    INSERT INTO kg_entities
+                    (kg_id, entity_type, labels, properties, validation_status, extraction_method,
+                     extraction_confidence, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (kg_id) DO UPDATE SET
+                        entity_type = excluded.entity_type, labels = excluded.labels,
+                        properties = excluded.properties, extraction_confidence = excluded.extraction_confidence,
+                        updated_at = CURRENT_TIMESTAMP
+                """, row)
+        return created
         
+    def process_corpus_parallel(self, workers: Optional[int] = None, replace: bool = False) -> Dict[str, Any]:
+        """
+        Extract the whole corpus with a pool of processes, one sarga per task,
+        streaming the mentions into the bulk loader in sloka order.
+        
+        Unlike ``process_corpus_batch`` this re-extracts every sloka: loading
+        upserts mentions on their natural key, so a rerun doesn't duplicate
+        them, and with ``replace`` the results replace the knowledge graph
+        and the extraction manifest is rebuilt to match.
+        """
+        start_time = time.time()
+        workers = default_workers(workers)
+        shards = [
+            (row['kanda_id'], row['sarga_id'])
+            for row in self.get_connection().execute(
+                "SELECT DISTINCT kanda_id, sarga_id FROM slokas ORDER BY kanda_id, sarga_id"
+            )
+        ]
+        self.logger.info(f"Starting parallel entity extraction of {len(shards)} sargas with {workers} workers")
+        
+        # entity_id -> [mentions, confidence sum], filled as the mentions stream by
+        found = defaultdict(lambda: [0, 0.0])
+        mentions_per_sloka = Counter()
+        
+        def mentions():
+            for sarga_mentions in map_shards(_extract_sarga, shards, workers,
+                                             initializer=_init_worker, initargs=(self.db_path,)):
+                for mention in sarga_mentions:
+                    totals = found[mention[1]]
+                    totals[0] += 1
+                    totals[1] += mention[4]
+                    mentions_per_sloka[mention[0]] += 1
+                    yield mention
+        
+        def entities():
+            for entity_id in sorted(found):
+                count, confidence_sum = found[entity_id]
+                row = self._entity_row(entity_id, confidence_sum / count, count)
+                if row:
+                    yield row
+        
+        load = KGBulkLoader(self.pool).load(entities=entities(), mentions=mentions(), replace=replace)
+        if replace:
+            self._rebuild_manifest(mentions_per_sloka)
+        
+        total_time = time.time() - start_time
+        statistics = {
+            'sargas': len(shards),
+            'workers': workers,
+            'entities_found': load['entities'],
+            'mentions_found': load['mentions'],
+            'mentions_by_entity': {entity_id: totals[0] for entity_id, totals in sorted(found.items())},
+            'processing_time': total_time
+        }
+        self.logger.info(f"Completed parallel corpus processing in {total_time:.2f}s: "
+                         f"{load['mentions']} mentions of {load['entities']} entities")
+        return {'statistics': statistics, 'load': load}
+    
+    def _rebuild_manifest(self, mentions_per_sloka: Dict[str, int]):
+        """Record every sloka as extracted from its current text with the current patterns"""
+        manifest = ExtractionManifest(self.pool, self.pattern_fingerprints())
+        rows = []
+        for sloka_row in iter_slokas(self.get_connection()):
+            text_unit_id = f"{sloka_row['kanda_id']}.{sloka_row['sarga_id']}.{sloka_row['sloka_id']}"
+            text_hash = content_hash(sloka_row['sloka'], sloka_row['translation'], sloka_row['meaning'])
+            rows.append((text_unit_id, text_hash, mentions_per_sloka[text_unit_id]))
+        manifest.record(rows)
+        manifest.finish()
+    
+    def _entity_row(self, entity_id: str, avg_confidence: float, occurrence_count: int) -> Optional[Tuple]:
+        """Entity row in ``ENTITY_COLUMNS`` order for an extracted entity, or None if it has no pattern"""
         # Find corresponding pattern for labels and properties
-        pattern = next((p for p in self.entity_patterns if p.entity_id == entity_id), None)
+        pattern = self.patterns_by_id.get(entity_id)
         if not pattern:
-            return
-        
-        # Calculate aggregated confidence and occurrence count
-        total_confidence = sum(e['confidence'] for e in extractions)
-        avg_confidence = total_confidence / len(extractions)
-        occurrence_count = len(extractions)
+            return None
         
         # Prepare labels
         labels = {
@@ -520,20 +421,9 @@ class ScalableEntityExtractor:
             'context_words': pattern.context_words
         }
         
-        # Store/update entity
         kg_id = f"http://ramayanam.hanuma.com/entity/{entity_id}"
-        
-        conn.execute("""
-            INSERT OR REPLACE INTO kg_entities 
-            (kg_id, entity_type, labels, properties, extraction_method, extraction_confidence, updated_at)
-            VALUES (?, ?, ?, ?, 'automated', ?, CURRENT_TIMESTAMP)
-        """, (
-            kg_id,
-            entity_type,
-            json.dumps(labels),
-            json.dumps(properties),
-            avg_confidence
-        ))
+        return (kg_id, pattern.entity_type.value, json.dumps(labels), json.dumps(properties),
+                'pending', 'automated', avg_confidence)
     
     def get_processing_statistics(self) -> Dict[str, Any]:
         """Get current processing statistics"""
@@ -550,6 +440,19 @@ class ScalableEntityExtractor:
             return stats
 
 
+# The extractor of a process_corpus_parallel worker process
+_worker_extractor: Optional[ScalableEntityExtractor] = None
+
+
+def _init_worker(db_path: str):
+    global _worker_extractor
+    _worker_extractor = ScalableEntityExtractor(db_path)
+
+
+def _extract_sarga(shard: Tuple[int, int]) -> List[Tuple]:
+    return _worker_extractor.extract_sarga_mentions(*shard)
+
+
 def run_scaled_extraction():
     """Main function to run scaled entity extraction"""
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -566,7 +469,7 @@ def run_scaled_extraction():
           f"({initial_stats['completion_percentage']:.1f}%)")
     
     # Run scaled extraction
-    results = extractor.process_corpus_batch(batch_size=500, max_workers=4)
+    results = extractor.process_corpus_parallel()
     
     # Get final statistics
     final_stats = extractor.get_processing_statistics()
@@ -0,0 +1,215 @@
+"""
+Candidate generation (blocking) for entity deduplication.
+
+Deduplication used to score every pair of entities of a type, which is
+quadratic and was already the slowest step with a few thousand discovered
+entities. ``candidate_pairs`` instead gives each entity a handful of
+blocking keys and only pairs entities of the same type that share one:
+
+- exact keys: every name (labels, epithets and alternative names), folded
+  for case and diacritics;
+- phonetic keys: the consonant skeleton of every name, with common
+  transliteration variants folded (aspirates, long vowels, sibilants,
+  doubled letters; Devanagari vowel signs and viramas dropped), so Raama,
+  Rama and Ram share a key;
+- sorted neighbourhood: every label is paired with the next few labels in
+  sorted order, and in the order of the reversed labels, which catches a
+  typo near either end of a name;
+- MinHash LSH over the character bigrams of every name, which catches
+  names sharing most of their bigrams in any position;
+- prefix filtering over context words: sets whose Jaccard similarity can
+  reach the threshold always share one of their rarest few words, so those
+  words are keys (exact for the context-word similarity).
+
+Keys only select pairs; every candidate is still scored in full.
+"""
+import logging
+import math
+import random
+import unicodedata
+import zlib
+from collections import Counter, defaultdict
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Labels paired with each of the next SORTED_WINDOW labels in sorted order
+SORTED_WINDOW = 2
+
+# MinHash signature of LSH_BANDS bands of LSH_ROWS hashes: names with bigram
+# Jaccard 0.6 collide in some band with p ~ 0.72, at 0.3 with p ~ 0.06
+LSH_BANDS = 8
+LSH_ROWS = 4
+
+# Shorter names differ in too few bigrams for LSH to tell them apart; the
+# phonetic and sorted-neighbourhood keys cover them
+MIN_LSH_LENGTH = 6
+
+# LSH buckets larger than this are skipped: they hold common bigrams, not
+# similar names, and would make blocking quadratic again
+MAX_LSH_BUCKET = 20
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+# Fixed hash functions (a * x + b) mod p standing in for random permutations
+_random = random.Random(1729)
+_PERMUTATIONS = [(_random.randrange(1, _MERSENNE_PRIME), _random.randrange(_MERSENNE_PRIME))
+                 for _ in range(LSH_BANDS * LSH_ROWS)]
+
+# Transliteration variants folded by the phonetic key, applied in order
+_LATIN_FOLDS = (
+    ('ksh', 'ks'), ('x', 'ks'), ('sh', 's'), ('z', 'j'), ('w', 'v'), ('q', 'k'), ('ph', 'f'),
+    ('kh', 'k'), ('gh', 'g'), ('ch', 'c'), ('jh', 'j'), ('th', 't'), ('dh', 'd'), ('bh', 'b'),
+)
+_LATIN_VOWELS = set('aeiouy')
+
+# Devanagari vowel signs, virama, nukta, anusvara and the like
+_DEVANAGARI_SIGNS = frozenset(
+    chr(code) for code in range(0x0900, 0x0980) if unicodedata.category(chr(code)).startswith('M')
+)
+
+
+@dataclass
+class BlockingEntity:
+    """What blocking knows about an entity: its labels, epithets and alternative names."""
+    entity_type: str
+    labels: List[str]
+    aliases: List[str] = field(default_factory=list)
+    context_words: FrozenSet[str] = field(default_factory=frozenset)
+
+
+@lru_cache(maxsize=1 << 16)
+def fold_name(name: str) -> str:
+    """A name lowercased, without Latin diacritics, punctuation or spaces."""
+    decomposed = unicodedata.normalize('NFKD', name.lower())
+    return ''.join(char for char in decomposed if char.isalnum() or char in _DEVANAGARI_SIGNS)
+
+
+def _is_devanagari(char: str) -> bool:
+    return 'ऀ' <= char <= 'ॿ'
+
+
+def phonetic_key(name: str) -> str:
+    """The consonant skeleton of a name, keeping its first letter."""
+    return _skeleton(fold_name(name))
+
+
+def _skeleton(folded: str) -> str:
+    if not folded:
+        return ''
+    if _is_devanagari(folded[0]):
+        # Consonants only: drop signs and independent vowels
+        kept = [char for i, char in enumerate(folded)
+                if i == 0 or not (char in _DEVANAGARI_SIGNS or 'ऄ' <= char <= 'औ')]
+    else:
+        for variant, folded_variant in _LATIN_FOLDS:
+            folded = folded.replace(variant, folded_variant)
+        kept = [char for i, char in enumerate(folded) if i == 0 or char not in _LATIN_VOWELS]
+    # Doubled letters are folded (Ramaa / Rammaa)
+    skeleton = [char for i, char in enumerate(kept) if i == 0 or char != kept[i - 1]]
+    return ''.join(skeleton)
+
+
+@lru_cache(maxsize=1 << 16)
+def _bigram_hashes(bigram: str) -> Tuple[int, ...]:
+    """A bigram under every hash function (there are only a few thousand distinct bigrams)."""
+    h = zlib.crc32(bigram.encode('utf-8'))
+    return tuple((a * h + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS)
+
+
+def minhash_bands(name: str) -> List[Tuple[int, ...]]:
+    """The LSH band keys of the MinHash signature of a name's character bigrams."""
+    padded = f"^{name}$"
+    bigrams = {padded[i:i + 2] for i in range(len(padded) - 1)}
+    signature = list(map(min, zip(*map(_bigram_hashes, bigrams))))
+    return [tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]) for band in range(LSH_BANDS)]
+
+
+@lru_cache(maxsize=1 << 16)
+def _name_keys(name: str) -> Tuple[Tuple, ...]:
+    """The exact, phonetic and LSH band keys of one name."""
+    folded = fold_name(name)
+    if not folded:
+        return ()
+    keys = [('name', folded)]
+    skeleton = _skeleton(folded)
+    # One-letter skeletons (Ra, Aya) would block unrelated names together
+    if len(skeleton) > 1:
+        keys.append(('phonetic', skeleton))
+    if len(folded) >= MIN_LSH_LENGTH:
+        keys.extend(('lsh', band, key) for band, key in enumerate(minhash_bands(folded)))
+    return tuple(keys)
+
+
+def _prefix_words(words: FrozenSet[str], rank: Dict[str, int], threshold: float) -> List[str]:
+    """
+    The rarest words of a set that any other set with Jaccard similarity of
+    at least ``threshold`` must share one of.
+    """
+    # J >= t implies an overlap of at least ceil(t * |words|)
+    overlap = math.ceil(threshold * len(words) - 1e-9)
+    return sorted(words, key=lambda word: (rank[word], word))[:len(words) - overlap + 1]
+
+
+def _pairs_in(members: Sequence[int]) -> Iterable[Tuple[int, int]]:
+    for i, first in enumerate(members):
+        for second in members[i + 1:]:
+            if first != second:
+                yield _pair(first, second)
+
+
+def _pair(first: int, second: int) -> Tuple[int, int]:
+    return (first, second) if first < second else (second, first)
+
+
+def candidate_pairs(entities: Sequence[BlockingEntity], context_threshold: float = 0.75,
+                    window: int = SORTED_WINDOW) -> Set[Tuple[int, int]]:
+    """
+    Pairs (i, j), i < j, of indices into ``entities`` worth scoring: same
+    type, and sharing a blocking key or neighbouring in a sorted name order.
+    """
+    blocks: Dict[Tuple, List[int]] = defaultdict(list)
+    lsh_buckets: Dict[Tuple, List[int]] = defaultdict(list)
+    names_by_type: Dict[str, Set[Tuple[str, int]]] = defaultdict(set)
+    word_counts = Counter(word for entity in entities for word in entity.context_words)
+    rank = {word: position for position, (word, _) in enumerate(
+        sorted(word_counts.items(), key=lambda item: (item[1], item[0])))}
+
+    for index, entity in enumerate(entities):
+        entity_type = entity.entity_type
+        keys = set()
+        for name in entity.labels + entity.aliases:
+            keys.update(_name_keys(name))
+        for label in entity.labels:
+            if fold_name(label):
+                names_by_type[entity_type].add((fold_name(label), index))
+        if entity.context_words:
+            keys.update(('context', word)
+                        for word in _prefix_words(entity.context_words, rank, context_threshold))
+        for key in keys:
+            (lsh_buckets if key[0] == 'lsh' else blocks)[(entity_type, *key)].append(index)
+
+    pairs: Set[Tuple[int, int]] = set()
+    for members in blocks.values():
+        pairs.update(_pairs_in(members))
+
+    skipped = 0
+    for members in lsh_buckets.values():
+        if len(members) > MAX_LSH_BUCKET:
+            skipped += 1
+            continue
+        pairs.update(_pairs_in(members))
+
+    for names in names_by_type.values():
+        for order in (sorted(names), sorted(names, key=lambda item: (item[0][::-1], item[1]))):
+            for position, (_, index) in enumerate(order):
+                pairs.update(_pair(index, other) for _, other in order[position + 1:position + 1 + window]
+                             if other != index)
+
+    logger.info(f"Blocking selected {len(pairs)} candidate pairs among {len(entities)} entities"
+                f"{f' ({skipped} oversized LSH buckets skipped)' if skipped else ''}")
+    return pairs
@@ -9,9 +9,61 @@ import logging
 from typing import Dict, List, Set, Tuple, Optional, Any
 from collections import defaultdict
 from dataclasses import dataclass
-from difflib import SequenceMatcher
 import re
 
+from rapidfuzz import fuzz
+
+from api.services.connection_pool import get_connection_pool
+from api.services.entity_blocking import BlockingEntity, candidate_pairs
+
+# Rows of a merge plan (temp.merge_plan) that the merge would collapse, as
+# temp.merge_dropped rows: relationships whose ends meet, and rows repeating
+# the natural key of another row after re-pointing. Of duplicates, a row not
+# re-pointed is kept, else the oldest.
+PLAN_IDS = "(SELECT old_id FROM merge_plan UNION SELECT new_id FROM merge_plan)"
+
+DROPPED_RELATIONSHIPS = f"""
+    INSERT INTO merge_dropped (tbl, id, reason)
+    WITH mapped AS (
+        SELECT r.id, COALESCE(s.new_id, r.subject_id) AS subject_id, r.predicate,
+               COALESCE(o.new_id, r.object_id) AS object_id,
+               s.old_id IS NOT NULL OR o.old_id IS NOT NULL AS moved
+        FROM kg_relationships r
+        LEFT JOIN merge_plan s ON s.old_id = r.subject_id
+        LEFT JOIN merge_plan o ON o.old_id = r.object_id
+        WHERE r.subject_id IN {PLAN_IDS} OR r.object_id IN {PLAN_IDS}
+    ),
+    ranked AS (
+        SELECT id, ROW_NUMBER() OVER key_order AS position, MAX(moved) OVER key_order AS any_moved
+        FROM mapped
+        WHERE NOT (moved AND subject_id = object_id)
+        WINDOW key_order AS (PARTITION BY subject_id, predicate, object_id ORDER BY moved, id
+                             ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+    )
+    SELECT 'kg_relationships', id, 'self_loop' FROM mapped WHERE moved AND subject_id = object_id
+    UNION ALL
+    SELECT 'kg_relationships', id, 'duplicate' FROM ranked WHERE any_moved AND position > 1
+"""
+
+DROPPED_MENTIONS = f"""
+    INSERT INTO merge_dropped (tbl, id, reason)
+    WITH mapped AS (
+        SELECT m.id, m.text_unit_id, COALESCE(p.new_id, m.entity_id) AS entity_id, m.span_start,
+               m.span_end, m.source_type, p.old_id IS NOT NULL AS moved
+        FROM text_entity_mentions m
+        LEFT JOIN merge_plan p ON p.old_id = m.entity_id
+        WHERE m.entity_id IN {PLAN_IDS}
+    ),
+    ranked AS (
+        SELECT id, ROW_NUMBER() OVER key_order AS position, MAX(moved) OVER key_order AS any_moved
+        FROM mapped
+        WINDOW key_order AS (PARTITION BY text_unit_id, entity_id, span_start, span_end, source_type
+                             ORDER BY moved, id
+                             ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+    )
+    SELECT 'text_entity_mentions', id, 'duplicate' FROM ranked WHERE any_moved AND position > 1
+"""
+
 @dataclass
 class DuplicateCandidate:
     """Candidate pair of potentially duplicate entities"""
@@ -21,6 +73,36 @@ class DuplicateCandidate:
     similarity_type: str  # 'name', 'pattern', 'context'
     confidence: float
 
+@dataclass
+class EntityRecord:
+    """An entity row with its JSON columns parsed, as compared by deduplication"""
+    entity_id: str
+    entity_type: str
+    labels: Dict[str, str]
+    properties: Dict[str, Any]
+    epithets: Set[str]       # epithets and alternative names
+    context_words: Set[str]
+    
+    @classmethod
+    def from_row(cls, row) -> 'EntityRecord':
+        properties = json.loads(row['properties'])
+        return cls(
+            entity_id=row['kg_id'].split('/')[-1],
+            entity_type=row['entity_type'],
+            labels=json.loads(row['labels']),
+            properties=properties,
+            epithets=set(properties.get('epithets', []) + properties.get('alternative_names', [])),
+            context_words=set(properties.get('context_words', []))
+        )
+    
+    def blocking_entity(self) -> BlockingEntity:
+        return BlockingEntity(
+            entity_type=self.entity_type,
+            labels=[label for label in self.labels.values() if isinstance(label, str)],
+            aliases=list(self.epithets),
+            context_words=frozenset(self.context_words)
+        )
+
 @dataclass
 class MergeProposal:
     """Proposal for merging entities"""
@@ -36,6 +118,7 @@ class EntityDeduplicationService:
     
     def __init__(self, db_path: str = "data/db/ramayanam.db"):
         self.db_path = db_path
+        self.pool = get_connection_pool(db_path)
         self.logger = logging.getLogger(__name__)
         
         # Similarity thresholds
@@ -43,67 +126,57 @@ class EntityDeduplicationService:
         self.context_similarity_threshold = 0.7
         self.minimum_merge_confidence = 0.75
         
-    def get_connection(self):
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's pooled database connection (shared across services)"""
+        return self.pool.connection()
     
     def find_duplicate_candidates(self) -> List[DuplicateCandidate]:
-        """Find potential duplicate entities using multiple strategies"""
+        """
+        Find potential duplicate entities using multiple strategies. Only pairs
+        of entities of the same type selected by blocking (see entity_blocking)
+        are scored.
+        """
         self.logger.info("Starting duplicate entity detection")
         
         candidates = []
         
         with self.get_connection() as conn:
-            entities = conn.execute("""
+            entities = [EntityRecord.from_row(row) for row in conn.execute("""
                 SELECT kg_id, entity_type, labels, properties 
                 FROM kg_entities
-            """).fetchall()
+            """)]
         
-        entities_list = list(entities)
+        pairs = candidate_pairs([entity.blocking_entity() for entity in entities],
+                                context_threshold=self.minimum_merge_confidence)
         
-        # Compare each entity with every other entity
-        for i in range(len(entities_list)):
-            for j in range(i + 1, len(entities_list)):
-                entity1 = entities_list[i]
-                entity2 = entities_list[j]
-                
-                # Only compare entities of the same type
-                if entity1['entity_type'] != entity2['entity_type']:
-                    continue
-                
-                candidate = self._analyze_entity_similarity(entity1, entity2)
-                if candidate and candidate.confidence >= self.minimum_merge_confidence:
-                    candidates.append(candidate)
+        # Scored in the order an all-pairs comparison would visit them
+        for i, j in sorted(pairs):
+            candidate = self._analyze_entity_similarity(entities[i], entities[j])
+            if candidate and candidate.confidence >= self.minimum_merge_confidence:
+                candidates.append(candidate)
         
         self.logger.info(f"Found {len(candidates)} duplicate candidates")
         return candidates
     
-    def _analyze_entity_similarity(self, entity1, entity2) -> Optional[DuplicateCandidate]:
+    def _analyze_entity_similarity(self, entity1: EntityRecord, entity2: EntityRecord) -> Optional[DuplicateCandidate]:
         """Analyze similarity between two entities"""
-        entity1_id = self._extract_entity_id(entity1['kg_id'])
-        entity2_id = self._extract_entity_id(entity2['kg_id'])
-        
-        labels1 = json.loads(entity1['labels'])
-        labels2 = json.loads(entity2['labels'])
-        properties1 = json.loads(entity1['properties'])
-        properties2 = json.loads(entity2['properties'])
+        entity1_id = entity1.entity_id
+        entity2_id = entity2.entity_id
         
         similarities = []
         
         # Name similarity (primary labels)
-        name_sim = self._calculate_name_similarity(labels1, labels2)
+        name_sim = self._calculate_name_similarity(entity1.labels, entity2.labels)
         if name_sim > 0:
             similarities.append(('name', name_sim))
         
         # Epithet/alternative name similarity
-        epithet_sim = self._calculate_epithet_similarity(properties1, properties2)
+        epithet_sim = self._calculate_epithet_similarity(entity1.epithets, entity2.epithets)
         if epithet_sim > 0:
             similarities.append(('epithet', epithet_sim))
         
         # Context similarity (context words)
-        context_sim = self._calculate_context_similarity(properties1, properties2)
+        context_sim = self._calculate_context_similarity(entity1.context_words, entity2.context_words)
         if context_sim > 0:
             similarities.append(('context', context_sim))
         
@@ -132,27 +205,28 @@ class EntityDeduplicationService:
         """Extract entity ID from KG URI"""
         return kg_id.split('/')[-1]
     
+    def _kg_id(self, entity_id: str) -> str:
+        """KG URI of an entity ID"""
+        return f"http://ramayanam.hanuma.com/entity/{entity_id}"
+    
     def _calculate_name_similarity(self, labels1: Dict, labels2: Dict) -> float:
         """Calculate similarity between entity names"""
         similarities = []
         
         # Compare English names
         if 'en' in labels1 and 'en' in labels2:
-            en_sim = SequenceMatcher(None, labels1['en'].lower(), labels2['en'].lower()).ratio()
+            en_sim = fuzz.ratio(labels1['en'].lower(), labels2['en'].lower()) / 100
             similarities.append(en_sim)
         
         # Compare Sanskrit names
         if 'sa' in labels1 and 'sa' in labels2:
-            sa_sim = SequenceMatcher(None, labels1['sa'], labels2['sa']).ratio()
+            sa_sim = fuzz.ratio(labels1['sa'], labels2['sa']) / 100
             similarities.append(sa_sim)
         
         return max(similarities) if similarities else 0.0
     
-    def _calculate_epithet_similarity(self, props1: Dict, props2: Dict) -> float:
+    def _calculate_epithet_similarity(self, epithets1: Set[str], epithets2: Set[str]) -> float:
         """Calculate similarity between epithets and alternative names"""
-        epithets1 = set(props1.get('epithets', []) + props1.get('alternative_names', []))
-        epithets2 = set(props2.get('epithets', []) + props2.get('alternative_names', []))
-        
         if not epithets1 or not epithets2:
             return 0.0
         
@@ -165,16 +239,14 @@ class EntityDeduplicationService:
         max_sim = 0.0
         for e1 in epithets1:
             for e2 in epithets2:
-                sim = SequenceMatcher(None, e1.lower(), e2.lower()).ratio()
+                # Pairs at or below 0.8 don't count, so rapidfuzz may give up early on them
+                sim = fuzz.ratio(e1.lower(), e2.lower(), score_cutoff=80) / 100
                 max_sim = max(max_sim, sim)
         
         return max_sim if max_sim > 0.8 else 0.0
     
-    def _calculate_context_similarity(self, props1: Dict, props2: Dict) -> float:
+    def _calculate_context_similarity(self, context1: Set[str], context2: Set[str]) -> float:
         """Calculate similarity between context words"""
-        context1 = set(props1.get('context_words', []))
-        context2 = set(props2.get('context_words', []))
-        
         if not context1 or not context2:
             return 0.0
         
@@ -204,38 +276,37 @@ class EntityDeduplicationService:
         return proposals
     
     def _find_connected_components(self, candidates: List[DuplicateCandidate]) -> List[List[str]]:
-        """Find connected components of entities that should be merged together"""
-        # Build adjacency list
-        graph = defaultdict(set)
-        all_entities = set()
+        """
+        Find connected components of entities that should be merged together,
+        with a union-find (no recursion, so any group size works)
+        """
+        parent: Dict[str, str] = {}
+        size: Dict[str, int] = {}
+        
+        def find(entity: str) -> str:
+            parent.setdefault(entity, entity)
+            while parent[entity] != entity:
+                # Path halving
+                parent[entity] = parent[parent[entity]]
+                entity = parent[entity]
+            return entity
         
         for candidate in candidates:
-            graph[candidate.entity1_id].add(candidate.entity2_id)
-            graph[candidate.entity2_id].add(candidate.entity1_id)
-            all_entities.add(candidate.entity1_id)
-            all_entities.add(candidate.entity2_id)
-        
-        # Find connected components using DFS
-        visited = set()
-        components = []
-        
-        for entity in all_entities:
-            if entity not in visited:
-                component = []
-                self._dfs(entity, graph, visited, component)
-                if len(component) > 1:
-                    components.append(component)
-        
-        return components
-    
-    def _dfs(self, entity: str, graph: Dict[str, Set[str]], visited: Set[str], component: List[str]):
-        """Depth-first search for connected components"""
-        visited.add(entity)
-        component.append(entity)
-        
-        for neighbor in graph[entity]:
-            if neighbor not in visited:
-                self._dfs(neighbor, graph, visited, component)
+            root1, root2 = find(candidate.entity1_id), find(candidate.entity2_id)
+            if root1 == root2:
+                continue
+            # Union by size keeps the trees shallow
+            if size.get(root1, 1) < size.get(root2, 1):
+                root1, root2 = root2, root1
+            parent[root2] = root1
+            size[root1] = size.get(root1, 1) + size.get(root2, 1)
+        
+        # Members in order of first appearance
+        components: Dict[str, List[str]] = defaultdict(list)
+        for entity in parent:
+            components[find(entity)].append(entity)
+        
+        return [component for component in components.values() if len(component) > 1]
     
     def _create_merge_proposal_for_group(self, conn, entity_group: List[str], 
                                        candidates: List[DuplicateCandidate]) -> Optional[MergeProposal]:
@@ -329,42 +400,104 @@ class EntityDeduplicationService:
         """Execute a merge proposal"""
         self.logger.info(f"Executing merge: {proposal.primary_entity_id} <- {proposal.duplicate_entity_ids}")
         
-        with self.get_connection() as conn:
-            try:
-                # Update primary entity with merged data
-                primary_kg_id = f"http://ramayanam.hanuma.com/entity/{proposal.primary_entity_id}"
-                
-                conn.execute("""
+        try:
+            self.execute_merge_plan([proposal])
+        except Exception as e:
+            self.logger.error(f"Failed to execute merge proposal: {e}")
+            return False
+        
+        self.logger.info(f"Successfully merged {len(proposal.duplicate_entity_ids)} entities into {proposal.primary_entity_id}")
+        return True
+    
+    def execute_merge_plan(self, proposals: List[MergeProposal], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Execute a whole merge plan in one transaction. Every duplicate is
+        mapped to its primary in a temporary table, and mentions and both
+        ends of relationships are re-pointed by one UPDATE each, whichever
+        form (bare id or kg_id) they refer to the entity by. Rows the merge
+        would collapse are deleted first: relationships turned into self-loops,
+        and relationships and mentions duplicating another row's natural key
+        (as the bulk loader keys them). With ``dry_run`` nothing is changed;
+        either way the report has the affected row counts.
+        """
+        mapping = {}
+        primaries = set()
+        for proposal in proposals:
+            primaries.add(proposal.primary_entity_id)
+            for duplicate_id in proposal.duplicate_entity_ids:
+                if duplicate_id in mapping:
+                    raise ValueError(f"Entity {duplicate_id} is a duplicate in more than one merge proposal")
+                mapping[duplicate_id] = proposal.primary_entity_id
+        if primaries & set(mapping):
+            raise ValueError(f"Entities both merged and merged into: {sorted(primaries & set(mapping))}")
+        
+        report = {
+            'proposals': len(proposals),
+            'entities_merged': len(mapping),
+            'dry_run': dry_run
+        }
+        
+        with self.pool.write() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS merge_plan (old_id TEXT PRIMARY KEY, new_id TEXT NOT NULL)")
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS merge_dropped (tbl TEXT, id INTEGER, reason TEXT, "
+                         "PRIMARY KEY (tbl, id))")
+            conn.execute("DELETE FROM merge_plan")
+            conn.execute("DELETE FROM merge_dropped")
+            conn.executemany("INSERT INTO merge_plan (old_id, new_id) VALUES (?, ?)", [
+                row for duplicate_id, primary_id in mapping.items()
+                for row in ((duplicate_id, primary_id), (self._kg_id(duplicate_id), self._kg_id(primary_id)))
+            ])
+            conn.execute(DROPPED_RELATIONSHIPS)
+            conn.execute(DROPPED_MENTIONS)
+            dropped = dict(((table, reason), count) for table, reason, count in conn.execute(
+                "SELECT tbl, reason, COUNT(*) FROM merge_dropped GROUP BY tbl, reason"
+            ))
+            report['relationship_self_loops'] = dropped.get(('kg_relationships', 'self_loop'), 0)
+            report['duplicate_relationships'] = dropped.get(('kg_relationships', 'duplicate'), 0)
+            report['duplicate_mentions'] = dropped.get(('text_entity_mentions', 'duplicate'), 0)
+            if not dry_run:
+                for table in ('kg_relationships', 'text_entity_mentions'):
+                    conn.execute(f"""
+                        DELETE FROM {table} WHERE id IN (SELECT id FROM merge_dropped WHERE tbl = '{table}')
+                    """)
+            
+            for key, table, column in (
+                ('mentions', 'text_entity_mentions', 'entity_id'),
+                ('relationship_subjects', 'kg_relationships', 'subject_id'),
+                ('relationship_objects', 'kg_relationships', 'object_id'),
+            ):
+                report[key] = conn.execute(f"""
+                    SELECT COUNT(*) FROM {table} WHERE {column} IN (SELECT old_id FROM merge_plan)
+                    AND id NOT IN (SELECT id FROM merge_dropped WHERE tbl = '{table}')
+                """).fetchone()[0]
+                if not dry_run:
+                    conn.execute(f"""
+                        UPDATE {table}
+                        SET {column} = (SELECT new_id FROM merge_plan WHERE old_id = {table}.{column})
+                        WHERE {column} IN (SELECT old_id FROM merge_plan)
+                    """)
+            
+            report['entities_deleted'] = conn.execute("""
+                SELECT COUNT(*) FROM kg_entities WHERE kg_id IN (SELECT old_id FROM merge_plan)
+            """).fetchone()[0]
+            if not dry_run:
+                # Primary entities get the merged labels and properties
+                conn.executemany("""
                     UPDATE kg_entities 
                     SET labels = ?, properties = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE kg_id = ?
-                """, (
-                    json.dumps(proposal.merged_labels),
-                    json.dumps(proposal.merged_properties),
-                    primary_kg_id
-                ))
-                
-                # Transfer mentions from duplicate entities to primary
-                for duplicate_id in proposal.duplicate_entity_ids:
-                    conn.execute("""
-                        UPDATE text_entity_mentions 
-                        SET entity_id = ? 
-                        WHERE entity_id = ?
-                    """, (proposal.primary_entity_id, duplicate_id))
-                
-                # Delete duplicate entities
-                for duplicate_id in proposal.duplicate_entity_ids:
-                    duplicate_kg_id = f"http://ramayanam.hanuma.com/entity/{duplicate_id}"
-                    conn.execute("DELETE FROM kg_entities WHERE kg_id = ?", (duplicate_kg_id,))
-                
-                conn.commit()
-                self.logger.info(f"Successfully merged {len(proposal.duplicate_entity_ids)} entities into {proposal.primary_entity_id}")
-                return True
-                
-            except Exception as e:
-                self.logger.error(f"Failed to execute merge proposal: {e}")
-                conn.rollback()
-                return False
+                """, [
+                    (json.dumps(proposal.merged_labels), json.dumps(proposal.merged_properties),
+                     self._kg_id(proposal.primary_entity_id))
+                    for proposal in proposals
+                ])
+                conn.execute("DELETE FROM kg_entities WHERE kg_id IN (SELECT old_id FROM merge_plan)")
+            
+            conn.execute("DROP TABLE merge_plan")
+            conn.execute("DROP TABLE merge_dropped")
+        
+        self.logger.info(f"{'Dry run of merge plan' if dry_run else 'Executed merge plan'}: {report}")
+        return report
     
     def run_deduplication_process(self, auto_merge_threshold: float = 0.9) -> Dict[str, Any]:
         """Run the complete deduplication process"""
@@ -378,21 +511,31 @@ class EntityDeduplicationService:
         
         # Auto-merge high confidence proposals
         auto_merged = 0
+        auto_merge = []
         manual_review = []
         
         for proposal in proposals:
             if proposal.confidence >= auto_merge_threshold:
-                if self.execute_merge_proposal(proposal):
-                    auto_merged += 1
+                auto_merge.append(proposal)
             else:
                 manual_review.append(proposal)
         
+        # High confidence proposals are merged together, in one transaction
+        merge_report = None
+        if auto_merge:
+            try:
+                merge_report = self.execute_merge_plan(auto_merge)
+                auto_merged = len(auto_merge)
+            except Exception as e:
+                self.logger.error(f"Failed to execute merge plan: {e}")
+        
         results = {
             'candidates_found': len(candidates),
             'proposals_created': len(proposals),
             'auto_merged': auto_merged,
             'manual_review_needed': len(manual_review),
-            'manual_review_proposals': manual_review
+            'manual_review_proposals': manual_review,
+            'merge_report': merge_report
         }
         
         self.logger.info(f"Deduplication complete: {auto_merged} auto-merged, {len(manual_review)} need manual review")
@@ -0,0 +1,197 @@
+"""
+Multi-pattern matching for entity extraction.
+
+The extractors used to call ``re.finditer`` once per entity regex on every
+text field of every sloka: a few dozen full passes over each text, nearly
+all of them finding nothing. ``MultiPatternMatcher`` compiles a whole list
+of regexes into one matcher:
+
+- every regex that starts with a literal (``\\bRama\\b``, ``राम[ःोम्स्य]?``,
+  ``\\bson of Vayu\\b``) contributes that literal to one Aho-Corasick
+  automaton. A single scan of the text finds where any of the literals
+  occur, and only there is the regex itself tried, anchored at the
+  occurrence;
+- the remaining regexes (no usable literal prefix) are joined into one
+  alternation that screens the text in a single pass; only when it matches
+  are they run individually.
+
+The matches are exactly those of running ``re.finditer`` with each regex in
+turn, returned in that same order (by regex, then by position), so the
+extractors' mentions, confidences and statistics are unchanged.
+"""
+import re
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+
+# Literal prefixes shorter than this match too often to be worth indexing
+MIN_LITERAL_LENGTH = 2
+
+
+def _case_fold_table() -> Dict[int, int]:
+    """
+    ``str.translate`` table mapping lowercase characters that ``re`` treats as
+    equal under IGNORECASE (e.g. 's' and the long 'ſ') to one representative.
+    """
+    try:
+        from re._casefix import _EXTRA_CASES
+    except ImportError:
+        return {}
+    table: Dict[int, int] = {}
+    for char, extras in _EXTRA_CASES.items():
+        canonical = min((char,) + extras)
+        for member in (char,) + extras:
+            table[member] = min(table.get(member, canonical), canonical)
+    return table
+
+
+_CASE_FOLD = _case_fold_table()
+
+
+def literal_prefix(regex: str, flags: int = 0) -> str:
+    """
+    The literal text every match of ``regex`` starts with, skipping leading
+    zero-width assertions such as ``\\b``; empty if there is none.
+    """
+    try:
+        parsed = sre_parse.parse(regex, flags)
+    except re.error:
+        return ''
+    chars = []
+    for op, av in parsed:
+        if op is sre_parse.AT and not chars:
+            continue
+        if op is not sre_parse.LITERAL:
+            break
+        chars.append(chr(av))
+    return ''.join(chars)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton reporting every occurrence of a set of words."""
+
+    def __init__(self, words: Sequence[str]):
+        self.words = list(words)
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                following = goto[state].get(char)
+                if following is None:
+                    following = goto[state][char] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = following
+            outputs[state].append(index)
+
+        # Breadth-first failure links, folded into the transitions so a scan
+        # takes exactly one dictionary lookup per character
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in goto]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                queue.append(following)
+                fallback = self._delta[fail[state]].get(char, 0) if state else 0
+                fail[following] = fallback
+                outputs[following] = outputs[following] + outputs[fallback]
+            if state:
+                for char, following in self._delta[fail[state]].items():
+                    self._delta[state].setdefault(char, following)
+        self._outputs = [tuple(output) for output in outputs]
+
+    def __len__(self):
+        return len(self._delta)
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """(start, word index) of every occurrence, overlapping ones included."""
+        delta, outputs, words = self._delta, self._outputs, self.words
+        found = []
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                for index in outputs[state]:
+                    found.append((position - len(words[index]) + 1, index))
+        return found
+
+
+class MultiPatternMatcher:
+    """Finds the matches of many regexes in a text in one pass."""
+
+    def __init__(self, patterns: Sequence[str], flags: int = re.IGNORECASE):
+        self.patterns = list(patterns)
+        self.flags = flags
+        self._compiled = [re.compile(pattern, flags) for pattern in self.patterns]
+        self._ignore_case = bool(flags & re.IGNORECASE)
+
+        # Patterns by the literal they start with; the others are screened
+        literals: Dict[str, List[int]] = {}
+        self._unindexed: List[int] = []
+        for index, pattern in enumerate(self.patterns):
+            literal = literal_prefix(pattern, flags)
+            if self._ignore_case:
+                literal = literal.lower().translate(_CASE_FOLD)
+            if len(literal) >= MIN_LITERAL_LENGTH:
+                literals.setdefault(literal, []).append(index)
+            else:
+                self._unindexed.append(index)
+        self._literal_patterns = list(literals.values())
+        self._automaton = AhoCorasick(list(literals))
+        self._screen: Optional[re.Pattern] = None
+        if self._unindexed:
+            self._screen = re.compile(
+                '|'.join(f'(?:{self.patterns[index]})' for index in self._unindexed), flags
+            )
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def finditer(self, text: str) -> List[Tuple[int, re.Match]]:
+        """
+        ``(pattern index, match)`` for every match, ordered as if calling
+        ``re.finditer`` with each pattern in turn.
+        """
+        if not text:
+            return []
+        haystack = text.lower().translate(_CASE_FOLD) if self._ignore_case else text
+        if len(haystack) != len(text):
+            # Lowercasing changed the length (e.g. 'İ'), so positions in the
+            # haystack are not positions in the text: match pattern by pattern
+            return [(index, match) for index, compiled in enumerate(self._compiled)
+                    for match in compiled.finditer(text)]
+
+        candidates: Dict[int, Optional[List[int]]] = {}
+        for start, word in self._automaton.find_all(haystack):
+            for index in self._literal_patterns[word]:
+                candidates.setdefault(index, []).append(start)
+        if self._screen is not None and self._screen.search(text):
+            for index in self._unindexed:
+                candidates[index] = None
+
+        found = []
+        for index in sorted(candidates):
+            compiled = self._compiled[index]
+            starts = candidates[index]
+            if starts is None:
+                found.extend((index, match) for match in compiled.finditer(text))
+                continue
+            # A match can only start where the pattern's literal occurs, so
+            # trying the pattern at each occurrence in order, skipping those
+            # inside the previous match, gives finditer's matches
+            end = -1
+            for start in starts:
+                if start < end:
+                    continue
+                match = compiled.match(text, start)
+                if match:
+                    found.append((index, match))
+                    end = match.end()
+        return found
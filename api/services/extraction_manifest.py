@@ -0,0 +1,220 @@
+"""
+Extraction manifest for incremental re-extraction.
+
+Incremental extraction used to skip every sloka that had any mention, so a
+corrected sloka or a new pattern was never picked up short of a full rerun.
+The manifest (migration 6 in ``kg_schema``) records, per sloka, a hash of
+its text fields and the version of the pattern set it was extracted with,
+and remembers the fingerprint of each entity's patterns. A run then
+recomputes:
+
+- every entity in slokas that are new or whose text changed;
+- only the entities whose patterns were added, changed or removed in
+  slokas extracted with the previous pattern set;
+- nothing in slokas already extracted from the same text with the current
+  patterns.
+
+Recomputed mentions are diffed against the stored ones by natural key
+(text unit, entity, span, source type): only mentions that appeared are
+inserted, only those that vanished are deleted, and changed confidences are
+updated in place. Only the mentions the sloka extractor writes (source types
+``SOURCE_TYPES``) are ever touched.
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+from api.services.kg_schema import migrate_kg_schema
+
+
+logger = logging.getLogger(__name__)
+
+# Mention source types written by the sloka extractor, one per text field
+SOURCE_TYPES = ('sanskrit', 'translation', 'meaning')
+
+# Text units per "IN (...)" lookup
+LOOKUP_CHUNK = 500
+
+UPSERT_ENTRY = """
+    INSERT INTO kg_extraction_manifest (text_unit_id, content_hash, pattern_version, mention_count)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (text_unit_id) DO UPDATE SET
+        content_hash = excluded.content_hash, pattern_version = excluded.pattern_version,
+        mention_count = excluded.mention_count, extracted_at = CURRENT_TIMESTAMP
+"""
+
+
+def content_hash(sloka: str, translation: str, meaning: str) -> str:
+    """Hash of the text fields of a sloka."""
+    digest = hashlib.sha1()
+    for text in (sloka, translation, meaning):
+        digest.update((text or '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def pattern_fingerprint(pattern) -> str:
+    """Hash of every field of an entity pattern dataclass."""
+    fields = json.dumps(dataclasses.asdict(pattern), sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(fields.encode('utf-8')).hexdigest()
+
+
+def pattern_set_version(fingerprints: Dict[str, str]) -> str:
+    """Version of a whole pattern set, from the fingerprints of its entities."""
+    return hashlib.sha1(json.dumps(sorted(fingerprints.items())).encode('utf-8')).hexdigest()
+
+
+class ExtractionManifest:
+    """Decides which slokas and entities to re-extract, and applies the results."""
+
+    def __init__(self, pool, fingerprints: Dict[str, str]):
+        self.pool = pool
+        migrate_kg_schema(pool)
+        conn = pool.connection()
+        self.fingerprints = dict(fingerprints)
+        self.version = pattern_set_version(self.fingerprints)
+        self.entries: Dict[str, Tuple[str, str]] = {
+            row[0]: (row[1], row[2]) for row in conn.execute(
+                "SELECT text_unit_id, content_hash, pattern_version FROM kg_extraction_manifest"
+            )
+        }
+        stored = dict(conn.execute("SELECT entity_id, fingerprint FROM kg_extraction_patterns").fetchall())
+        self.stored_version = pattern_set_version(stored)
+        entities = set(self.fingerprints) | set(stored)
+        self.all_entities = frozenset(entities)
+        self.changed_entities = frozenset(
+            entity_id for entity_id in entities if self.fingerprints.get(entity_id) != stored.get(entity_id)
+        )
+        self.touched_entities: Set[str] = set()
+        self._seen: Set[str] = set()
+
+    def scope(self, text_unit_id: str, text_hash: str) -> frozenset:
+        """Entities whose mentions in a sloka must be recomputed (empty if none)."""
+        self._seen.add(text_unit_id)
+        entry = self.entries.get(text_unit_id)
+        if entry is None or entry[0] != text_hash:
+            return self.all_entities
+        if entry[1] == self.version:
+            return frozenset()
+        if entry[1] == self.stored_version:
+            return self.changed_entities
+        # Extracted with an older pattern set than the last completed run
+        return self.all_entities
+
+    def apply(self, extracted: Iterable[Tuple[str, str, frozenset, List[Tuple]]]) -> Dict[str, int]:
+        """
+        Diff-apply re-extracted slokas, given as (text unit id, content hash,
+        scope, mentions) with mentions in ``MENTION_COLUMNS`` order, and
+        record them in the manifest, in one transaction.
+
+        Returns the number of mentions inserted, deleted and updated.
+        """
+        extracted = list(extracted)
+        counts = {'inserted': 0, 'deleted': 0, 'updated': 0}
+        if not extracted:
+            return counts
+
+        with self.pool.write() as conn:
+            existing = self._owned_mentions(conn, [text_unit_id for text_unit_id, _, _, _ in extracted])
+            inserts, deletes, updates, manifest_rows = [], [], [], []
+            for text_unit_id, text_hash, scope, mentions in extracted:
+                current = {}
+                kept = 0
+                for mention_id, entity_id, *span, confidence in existing.get(text_unit_id, ()):
+                    if entity_id not in scope:
+                        kept += 1
+                        continue
+                    key = (entity_id, *span)
+                    if key in current:
+                        deletes.append((mention_id,))  # duplicate of a stored mention
+                        self.touched_entities.add(entity_id)
+                    else:
+                        current[key] = (mention_id, confidence)
+
+                recomputed = {}
+                for _, entity_id, span_start, span_end, confidence, source_type in mentions:
+                    if entity_id in scope:
+                        recomputed[(entity_id, span_start, span_end, source_type)] = confidence
+
+                for key, (mention_id, confidence) in current.items():
+                    if key not in recomputed:
+                        deletes.append((mention_id,))
+                        self.touched_entities.add(key[0])
+                    elif recomputed[key] != confidence:
+                        updates.append((recomputed[key], mention_id))
+                        self.touched_entities.add(key[0])
+                for key, confidence in recomputed.items():
+                    if key not in current:
+                        entity_id, span_start, span_end, source_type = key
+                        inserts.append((text_unit_id, entity_id, span_start, span_end, confidence, source_type))
+                        self.touched_entities.add(entity_id)
+                manifest_rows.append((text_unit_id, text_hash, self.version, kept + len(recomputed)))
+
+            conn.executemany("DELETE FROM text_entity_mentions WHERE id = ?", deletes)
+            conn.executemany("UPDATE text_entity_mentions SET confidence = ? WHERE id = ?", updates)
+            conn.executemany("""
+                INSERT INTO text_entity_mentions
+                (text_unit_id, entity_id, span_start, span_end, confidence, source_type)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, inserts)
+            conn.executemany(UPSERT_ENTRY, manifest_rows)
+
+        for text_unit_id, text_hash, _, _ in extracted:
+            self.entries[text_unit_id] = (text_hash, self.version)
+        counts.update(inserted=len(inserts), deleted=len(deletes), updated=len(updates))
+        return counts
+
+    def record(self, rows: Iterable[Tuple[str, str, int]]):
+        """
+        Record slokas as extracted with the current patterns, given as (text
+        unit id, content hash, mention count), e.g. after a full extraction.
+        """
+        rows = [(text_unit_id, text_hash, self.version, count) for text_unit_id, text_hash, count in rows]
+        with self.pool.write() as conn:
+            conn.executemany(UPSERT_ENTRY, rows)
+        for text_unit_id, text_hash, _, _ in rows:
+            self._seen.add(text_unit_id)
+            self.entries[text_unit_id] = (text_hash, self.version)
+
+    def finish(self) -> int:
+        """
+        Complete a run over the whole corpus: forget slokas that are gone
+        (deleting their mentions) and record the current pattern fingerprints.
+        Returns the number of slokas removed.
+        """
+        removed = [text_unit_id for text_unit_id in self.entries if text_unit_id not in self._seen]
+        with self.pool.write() as conn:
+            gone = [mention for mentions in self._owned_mentions(conn, removed).values() for mention in mentions]
+            self.touched_entities.update(mention[1] for mention in gone)
+            conn.executemany("DELETE FROM text_entity_mentions WHERE id = ?", [(mention[0],) for mention in gone])
+            conn.executemany("DELETE FROM kg_extraction_manifest WHERE text_unit_id = ?",
+                             [(text_unit_id,) for text_unit_id in removed])
+            conn.execute("DELETE FROM kg_extraction_patterns")
+            conn.executemany(
+                "INSERT INTO kg_extraction_patterns (entity_id, fingerprint) VALUES (?, ?)",
+                sorted(self.fingerprints.items())
+            )
+        for text_unit_id in removed:
+            del self.entries[text_unit_id]
+        self.stored_version = self.version
+        return len(removed)
+
+    def _owned_mentions(self, conn, text_unit_ids: List[str]) -> Dict[str, List[Tuple]]:
+        """
+        The stored SOURCE_TYPES mentions of text units, by text unit, as
+        (id, entity, span start, span end, source type, confidence).
+        """
+        mentions: Dict[str, List[Tuple]] = {}
+        sources = ', '.join('?' * len(SOURCE_TYPES))
+        for start in range(0, len(text_unit_ids), LOOKUP_CHUNK):
+            chunk = text_unit_ids[start:start + LOOKUP_CHUNK]
+            for row in conn.execute(f"""
+                SELECT text_unit_id, id, entity_id, span_start, span_end, source_type, confidence
+                FROM text_entity_mentions
+                WHERE text_unit_id IN ({', '.join('?' * len(chunk))}) AND source_type IN ({sources})
+                ORDER BY id
+            """, chunk + list(SOURCE_TYPES)):
+                mentions.setdefault(row[0], []).append(tuple(row[1:]))
+        return mentions
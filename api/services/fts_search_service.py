@@ -0,0 +1,366 @@
+"""
+Sloka search backed by a persistent SQLite FTS5 index.
+
+``OptimizedFuzzySearchService`` keeps the whole corpus and its search
+indices in every worker. This backend instead keeps a trigram FTS5 index
+over the ``slokas`` table, next to the corpus on disk: the index narrows
+each query down to a few thousand candidate slokas, which are then scored
+with the same rapidfuzz ``partial_ratio`` as the in-memory search. Nothing
+is held in process beyond the result cache, so memory-constrained pods can
+serve search straight from the database file.
+
+Select it with ``SEARCH_BACKEND=fts``. The index is created (and then kept
+in sync by triggers) on first use; build it ahead of time with::
+
+    python -m api.services.fts_search_service ramayanam/ramayanam.db
+"""
+import logging
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from rapidfuzz import fuzz
+
+from api.config import Config
+from api.services.connection_pool import get_connection_pool
+from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService, _timed_search
+
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'slokas_fts'
+
+# The corpus has no transliterated column, so the Sanskrit search indexes
+# the Devanagari sloka text alongside the word meanings
+INDEXED_COLUMNS = ('sloka', 'meaning', 'translation')
+
+# Sloka columns matched and scored per search field
+SEARCH_COLUMNS = {
+    'translation': ('translation',),
+    'sanskrit': ('sloka', 'meaning'),
+}
+
+# Slokas missing any of these are not searched, as in ``build_search_indices``
+REQUIRED_COLUMNS = {
+    'translation': ('translation',),
+    'sanskrit': ('sloka', 'meaning'),
+}
+
+# The trigram tokenizer can't match anything shorter than this
+MIN_TRIGRAM_QUERY = 3
+
+# Words at least this long also contribute the trigrams of their
+# single-deletion variants when the query as typed finds few candidates
+MIN_DELETION_WORD = 4
+
+SLOKA_COLUMNS = "s.rowid AS row_id, s.kanda_id, s.sarga_id, s.sloka_id, s.sloka, s.meaning, s.translation"
+
+
+def _fts_index_exists(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone() is not None
+
+
+def ensure_fts_index(pool) -> bool:
+    """
+    Create and populate the sloka FTS5 index if the database lacks it.
+
+    The index uses ``slokas`` as its external content table, so it only
+    stores the trigram postings; triggers keep it in step with later
+    changes to the corpus. Returns True if the index was built.
+    """
+    if _fts_index_exists(pool.connection()):
+        return False
+
+    columns = ', '.join(INDEXED_COLUMNS)
+    new_values = ', '.join(f"new.{column}" for column in INDEXED_COLUMNS)
+    old_values = ', '.join(f"old.{column}" for column in INDEXED_COLUMNS)
+    insert = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.rowid, {new_values});"
+    delete = (f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+              f"VALUES ('delete', old.rowid, {old_values});")
+
+    started = time.perf_counter()
+    with pool.write() as conn:
+        # Re-check under the lock: another worker may have built it
+        if _fts_index_exists(conn):
+            return False
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                {columns}, content = 'slokas', content_rowid = 'rowid', tokenize = 'trigram'
+            )
+        """)
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        # External-content FTS tables don't track their content table themselves
+        conn.execute(f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON slokas BEGIN {insert} END")
+        conn.execute(f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON slokas BEGIN {delete} END")
+        conn.execute(f"CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE ON slokas BEGIN {delete} {insert} END")
+    logger.info(f"Built {FTS_TABLE} for {pool.db_path} in {time.perf_counter() - started:.2f}s")
+    return True
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _query_trigrams(query: str, with_deletions: bool = False) -> List[str]:
+    """
+    Distinct trigrams of the words of ``query``, in query order.
+
+    A typo changes every trigram it touches, so a misspelt short word
+    ("raam") may share none with its correct spelling; its single-deletion
+    variants ("ram") usually do.
+    """
+    words = [word for word in query.split() if len(word) >= MIN_TRIGRAM_QUERY] or [query]
+    if with_deletions:
+        words = words + [
+            word[:i] + word[i + 1:]
+            for word in words if len(word) >= MIN_DELETION_WORD
+            for i in range(len(word))
+        ]
+    return list(dict.fromkeys(
+        word[i:i + 3] for word in words for i in range(len(word) - 2)
+    ))
+
+
+class FTSSearchService(OptimizedFuzzySearchService):
+    """
+    Drop-in replacement for ``OptimizedFuzzySearchService`` that generates
+    candidates from the FTS5 index instead of scanning in-process indices.
+
+    Scores, thresholds, result layout, ordering and caching follow the
+    in-memory service; only slokas outside the candidate set can be missed.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, candidate_limit: Optional[int] = None):
+        self.db_path = db_path or Config.SEARCH_DB_PATH
+        self.pool = get_connection_pool(self.db_path)
+        self.candidate_limit = candidate_limit or Config.FTS_SEARCH_CANDIDATES
+        super().__init__(ramayanam_data=None)
+
+    def _build_search_indices(self):
+        """Make sure the FTS5 index exists; nothing is built in process."""
+        ensure_fts_index(self.pool)
+
+    def _query_slokas(self, conn: sqlite3.Connection, search_field: str, match: Optional[str] = None,
+                      kanda_number: Optional[int] = None, by_rank: bool = False, limit: Optional[int] = None,
+                      contains: Optional[Tuple[Tuple[str, ...], str]] = None) -> sqlite3.Cursor:
+        """
+        Searchable slokas, optionally restricted to an FTS match, to those
+        with a ``(columns, text)`` substring, and to a kanda.
+        """
+        conditions = [f"s.{column} != ''" for column in REQUIRED_COLUMNS[search_field]]
+        params: list = []
+        if match is not None:
+            source = f"{FTS_TABLE} f JOIN slokas s ON s.rowid = f.rowid"
+            conditions.insert(0, f"{FTS_TABLE} MATCH ?")
+            params.append(match)
+        else:
+            source = "slokas s"
+        if contains is not None:
+            columns, text = contains
+            conditions.append('(' + ' OR '.join(f"instr(lower(s.{column}), ?) > 0" for column in columns) + ')')
+            params.extend(text for _ in columns)
+        if kanda_number is not None:
+            conditions.append("s.kanda_id = ?")
+            params.append(kanda_number)
+        order = "f.rank" if by_rank else "s.kanda_id, s.sarga_id, s.sloka_id"
+        params.append(-1 if limit is None else limit)
+        return conn.execute(f"""
+            SELECT {SLOKA_COLUMNS} FROM {source}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order} LIMIT ?
+        """, params)
+
+    def _substring_matches(self, conn, search_field, columns, query, limit=None):
+        """Slokas containing the query verbatim (the in-memory exact matches), in corpus order."""
+        if len(query) < MIN_TRIGRAM_QUERY:
+            return self._query_slokas(conn, search_field, limit=limit, contains=(columns, query)).fetchall()
+        match = f"{{{' '.join(columns)}}} : {_phrase(query)}"
+        return self._query_slokas(conn, search_field, match, limit=limit).fetchall()
+
+    def _fuzzy_candidates(self, conn, search_field, columns, query):
+        """Best-ranked slokas sharing trigrams with the query."""
+        def candidates(trigrams):
+            match = f"{{{' '.join(columns)}}} : ({' OR '.join(_phrase(t) for t in trigrams)})"
+            return self._query_slokas(conn, search_field, match, by_rank=True,
+                                      limit=self.candidate_limit).fetchall()
+
+        trigrams = _query_trigrams(query)
+        rows = candidates(trigrams)
+        if len(rows) < self.candidate_limit:
+            widened = _query_trigrams(query, with_deletions=True)
+            if len(widened) > len(trigrams):
+                rows = candidates(widened)
+        return rows
+
+    @staticmethod
+    def _item(row: sqlite3.Row, search_field: str) -> dict:
+        item = {
+            'sloka_id': f"{row['kanda_id']}.{row['sarga_id']}.{row['sloka_id']}",
+            'sloka_text': row['sloka'],
+            'translation': row['translation'],
+            'meaning': row['meaning']
+        }
+        # The in-memory index entries carry the searched fields lowercased,
+        # and results are built (and highlighted) from those
+        if search_field == 'translation':
+            item['translation'] = item['translation'].lower()
+        else:
+            item['sloka_text'] = item['sloka_text'].lower()
+            item['meaning'] = item['meaning'].lower()
+        return item
+
+    def _rank(self, rows: Iterable[sqlite3.Row], search_field: str, columns: Tuple[str, ...], query: str,
+              threshold: int, fields=None, source=None, max_results: Optional[int] = None) -> List[dict]:
+        """
+        Score candidates with ``partial_ratio`` and build the results above
+        ``threshold``, best first and in corpus order among equal scores.
+        """
+        scored = {}
+        for row in rows:
+            if row['row_id'] in scored:
+                continue
+            ratio = max(fuzz.partial_ratio(row[column].lower(), query) for column in columns)
+            if ratio > threshold:
+                scored[row['row_id']] = (ratio, row)
+
+        ranked = sorted(
+            scored.values(),
+            key=lambda entry: (-entry[0], entry[1]['kanda_id'], entry[1]['sarga_id'], entry[1]['sloka_id'])
+        )
+        if max_results is not None:
+            ranked = ranked[:max_results]
+        return [
+            self._build_result(self._item(row, search_field), ratio, search_field, query, fields, source)
+            for ratio, row in ranked
+        ]
+
+    def _search(self, query, search_field, threshold=70, max_results=None, fields=None,
+                kanda_number=None, columns=None, source=None) -> List[dict]:
+        conn = self.pool.connection()
+        columns = columns or SEARCH_COLUMNS[search_field]
+
+        if len(query) < MIN_TRIGRAM_QUERY or kanda_number is not None:
+            # Too short for the trigram index, or confined to a kanda, which
+            # holds about as many slokas as a candidate set: score the slokas
+            # as they stream by
+            rows = self._query_slokas(conn, search_field, kanda_number=kanda_number)
+            return self._rank(rows, search_field, columns, query, threshold, fields, source, max_results)
+
+        # Verbatim matches score 100, so they are always candidates even
+        # when the trigram ranking would leave them out
+        rows = self._substring_matches(conn, search_field, columns, query, self.candidate_limit)
+        rows += self._fuzzy_candidates(conn, search_field, columns, query)
+        return self._rank(rows, search_field, columns, query, threshold, fields, source, max_results)
+
+    def _exact_results(self, query, search_field, max_results, fields=None):
+        """
+        The in-memory service's shortcut: when at least ``max_results``
+        slokas contain the query verbatim, the first of them are the result.
+        """
+        rows = self._substring_matches(self.pool.connection(), search_field, SEARCH_COLUMNS[search_field],
+                                       query, limit=max_results)
+        if len(rows) < max_results:
+            return None
+        return [self._build_result(self._item(row, search_field), 100, search_field, query, fields) for row in rows]
+
+    def search_stream(self, query, search_type='translation', threshold=70, batch_size=50, fields=None):
+        """Stream search results in batches of ``batch_size``, best first."""
+        query = query.lower().strip()
+        if not query:
+            return
+
+        start_time = time.perf_counter()
+        try:
+            search_field = 'translation' if search_type == 'translation' else 'sanskrit'
+            results = self._search(query, search_field, threshold, fields=fields, source="ramayana")
+            for i in range(0, len(results), batch_size):
+                yield results[i:i + batch_size]
+
+        except Exception as e:
+            self.logger.error(f"Error in stream search: {e}")
+
+        finally:
+            stream_type = 'stream_translation' if search_type == 'translation' else 'stream_sanskrit'
+            self._record_search(stream_type, time.perf_counter() - start_time)
+
+    @_timed_search('translation')
+    def search_translation_fuzzy(self, query, max_results=1000, fields=None):
+        """Fuzzy search of the translations, candidates drawn from the FTS5 index."""
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        cache_key = self._get_cache_key(query, 'translation', fields=fields)
+        cached_result = self._get_cached_result(cache_key, 'translation')
+        if cached_result:
+            self.logger.info(f"Cache hit for translation search: {query}")
+            return cached_result[:max_results]
+
+        self.logger.info(f"Searching translations for query: {query}")
+        results = self._exact_results(query, 'translation', max_results, fields)
+        if results is None:
+            results = self._search(query, 'translation', 70, max_results, fields, source="ramayana")
+
+        self._cache_result(cache_key, results)
+        return results
+
+    @_timed_search('sanskrit')
+    def search_sloka_sanskrit_fuzzy(self, query, threshold=70, max_results=1000, fields=None):
+        """Fuzzy search of the sloka text and meanings, candidates drawn from the FTS5 index."""
+        query = query.lower()
+        cache_key = self._get_cache_key(query, 'sanskrit', threshold=threshold, fields=fields)
+        cached_result = self._get_cached_result(cache_key, 'sanskrit')
+        if cached_result:
+            self.logger.info(f"Cache hit for Sanskrit search: {query}")
+            return cached_result[:max_results]
+
+        self.logger.info(f"Searching Sanskrit for query: {query}")
+        results = self._exact_results(query, 'sanskrit', max_results, fields)
+        if results is None:
+            results = self._search(query, 'sanskrit', threshold, max_results, fields, source="ramayana")
+
+        self._cache_result(cache_key, results)
+        return results
+
+    @_timed_search('translation_kanda')
+    def search_translation_in_kanda_fuzzy(self, kanda_number, query, threshold=70, fields=None):
+        """Search for translations in a specific Kanda using fuzzy matching."""
+        query = query.lower()
+        cache_key = self._get_cache_key(query, 'translation_kanda', kanda=kanda_number,
+                                        threshold=threshold, fields=fields)
+        cached_result = self._get_cached_result(cache_key, 'translation_kanda')
+        if cached_result:
+            self.logger.info(f"Cache hit for Kanda {kanda_number} translation search: {query}")
+            return cached_result
+
+        results = self._search(query, 'translation', threshold, fields=fields, kanda_number=kanda_number)
+        self._cache_result(cache_key, results)
+        return results
+
+    @_timed_search('sanskrit_kanda')
+    def search_sloka_sanskrit_in_kanda_fuzzy(self, kanda_number, query, threshold=70, fields=None):
+        """Search for slokas in a specified kanda using fuzzy matching."""
+        query = query.lower()
+        cache_key = self._get_cache_key(query, 'sanskrit_kanda', kanda=kanda_number,
+                                        threshold=threshold, fields=fields)
+        cached_result = self._get_cached_result(cache_key, 'sanskrit_kanda')
+        if cached_result:
+            self.logger.info(f"Cache hit for Kanda {kanda_number} Sanskrit search: {query}")
+            return cached_result
+
+        # Like the in-memory service, the kanda search scores the sloka text only
+        results = self._search(query, 'sanskrit', threshold, fields=fields, kanda_number=kanda_number,
+                               columns=('sloka',))
+        self._cache_result(cache_key, results)
+        return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    db_path = sys.argv[1] if len(sys.argv) > 1 else Config.SEARCH_DB_PATH
+    built = ensure_fts_index(get_connection_pool(db_path))
+    print(f"{db_path}: {FTS_TABLE} {'built' if built else 'already present'}")
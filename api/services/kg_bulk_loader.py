@@ -0,0 +1,179 @@
+"""
+Bulk ingestion of knowledge graph extraction results.
+
+Extraction results used to be written with one ``execute`` per entity,
+relationship and mention. ``KGBulkLoader`` streams them with
+``executemany`` into temporary staging tables, then merges each staging
+table into its KG table with a few set-based statements, all in one
+transaction:
+
+- entities are upserted on ``kg_id`` (``ON CONFLICT DO UPDATE``), so a row
+  is updated in place instead of deleted and reinserted;
+- relationships and mentions have no unique key, so they are upserted on
+  their natural keys ((subject, predicate, object) and (text unit, entity,
+  span)): existing rows get the new metadata or confidence, the rest are
+  inserted. Loading the same results twice no longer duplicates them.
+
+A full rebuild (``replace=True``) empties the tables first and drops their
+secondary indexes for the duration of the load, recreating them once at the
+end. The triggers that maintain the normalized names, search indexes and
+summary tables stay in place either way.
+
+Rows are staged before the write transaction starts (temporary tables don't
+lock the database), so a slow generator, such as a parallel extraction
+streaming its mentions, doesn't hold up other writers while it runs.
+"""
+import logging
+import time
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+from api.services.kg_schema import migrate_kg_schema
+
+
+logger = logging.getLogger(__name__)
+
+# Rows handed to each executemany call
+BATCH_SIZE = 5000
+
+# Column order of the rows given to KGBulkLoader.load
+ENTITY_COLUMNS = ('kg_id', 'entity_type', 'labels', 'properties',
+                  'validation_status', 'extraction_method', 'extraction_confidence')
+RELATIONSHIP_COLUMNS = ('subject_id', 'predicate', 'object_id', 'metadata')
+MENTION_COLUMNS = ('text_unit_id', 'entity_id', 'span_start', 'span_end', 'confidence', 'source_type')
+
+# (table, staging table, columns, natural key) in load order
+TABLES = (
+    ('kg_entities', 'kg_stage_entities', ENTITY_COLUMNS, ('kg_id',)),
+    ('kg_relationships', 'kg_stage_relationships', RELATIONSHIP_COLUMNS, ('subject_id', 'predicate', 'object_id')),
+    # Spans are offsets into one text field of the sloka, named by source_type
+    ('text_entity_mentions', 'kg_stage_mentions', MENTION_COLUMNS,
+     ('text_unit_id', 'entity_id', 'span_start', 'span_end', 'source_type')),
+)
+
+
+class KGBulkLoader:
+    """Loads entities, relationships and mentions in one set-based transaction."""
+
+    def __init__(self, pool, batch_size: int = BATCH_SIZE):
+        self.pool = pool
+        self.batch_size = batch_size
+
+    def load(self, entities: Iterable[Tuple] = (), relationships: Iterable[Tuple] = (),
+             mentions: Iterable[Tuple] = (), replace: bool = False) -> Dict[str, float]:
+        """
+        Upsert rows given as tuples in ``ENTITY_COLUMNS``,
+        ``RELATIONSHIP_COLUMNS`` and ``MENTION_COLUMNS`` order (JSON columns
+        already serialized). With ``replace``, the loaded rows replace the
+        whole knowledge graph instead.
+
+        Mentions are staged first and entities last, so ``entities`` may be
+        a generator summarizing the mentions streamed before it.
+
+        Returns the rows staged per table, the elapsed seconds and the
+        overall rows per second.
+        """
+        migrate_kg_schema(self.pool)
+        started = time.perf_counter()
+        conn = self.pool.connection()
+        counts = {}
+        try:
+            for (table, stage, columns, _), rows in reversed(list(zip(TABLES, (entities, relationships, mentions)))):
+                counts[table] = self._stage(conn, stage, columns, rows)
+
+            with self.pool.write() as conn:
+                deferred = self._drop_indexes(conn) if replace else []
+                if replace:
+                    # Mentions and relationships first: they refer to entities
+                    for table, _, _, _ in reversed(TABLES):
+                        conn.execute(f"DELETE FROM {table}")
+
+                for table, stage, columns, key in TABLES:
+                    if table == 'kg_entities':
+                        self._merge_entities(conn, stage)
+                    else:
+                        self._merge(conn, table, stage, columns, key, check_existing=not replace)
+
+                for sql in deferred:
+                    conn.execute(sql)
+        finally:
+            for _, stage, _, _ in TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+            conn.commit()
+
+        seconds = time.perf_counter() - started
+        total = sum(counts.values())
+        result = {
+            'entities': counts['kg_entities'],
+            'relationships': counts['kg_relationships'],
+            'mentions': counts['text_entity_mentions'],
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(total / seconds) if seconds > 0 else total
+        }
+        logger.info(f"Bulk loaded {total} KG rows in {seconds:.2f}s "
+                    f"({result['rows_per_second']} rows/s, replace={replace}): {counts}")
+        return result
+
+    def _drop_indexes(self, conn) -> List[str]:
+        """Drop the secondary indexes of the KG tables, returning their definitions."""
+        tables = [table for table, _, _, _ in TABLES]
+        rows = conn.execute(
+            f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join('?' * len(tables))})",
+            tables
+        ).fetchall()
+        for name, _ in rows:
+            conn.execute(f'DROP INDEX "{name}"')
+        return [sql for _, sql in rows]
+
+    def _stage(self, conn, stage: str, columns: Tuple[str, ...], rows: Iterable[Tuple]) -> int:
+        conn.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+        conn.execute(f"CREATE TEMP TABLE {stage} ({', '.join(columns)})")
+        insert = f"INSERT INTO temp.{stage} VALUES ({', '.join('?' * len(columns))})"
+        rows = iter(rows)
+        count = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return count
+            conn.executemany(insert, batch)
+            count += len(batch)
+
+    def _merge_entities(self, conn, stage: str):
+        columns = ', '.join(ENTITY_COLUMNS)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in ENTITY_COLUMNS[1:])
+        # "WHERE true" tells the parser the ON CONFLICT belongs to the INSERT;
+        # among duplicate kg_ids in the batch the last one wins
+        conn.execute(f"""
+            INSERT INTO kg_entities ({columns}, updated_at)
+            SELECT {columns}, CURRENT_TIMESTAMP FROM temp.{stage} WHERE true ORDER BY rowid
+            ON CONFLICT (kg_id) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP
+        """)
+
+    def _merge(self, conn, table: str, stage: str, columns: Tuple[str, ...], key: Tuple[str, ...],
+               check_existing: bool):
+        key_list = ', '.join(key)
+        values = [column for column in columns if column not in key]
+        # Keep the last staged row of each natural key
+        conn.execute(f"""
+            DELETE FROM temp.{stage}
+            WHERE rowid NOT IN (SELECT MAX(rowid) FROM temp.{stage} GROUP BY {key_list})
+        """)
+        # Look rows up by the first key column only (text unit, subject): the
+        # unary + keeps SQLite off the far less selective entity_id index
+        matches = ' AND '.join(
+            f"{'' if i == 0 else '+'}t.{column} = s.{column}" for i, column in enumerate(key)
+        )
+        if check_existing:
+            conn.execute(f"""
+                UPDATE {table} AS t SET {', '.join(f'{column} = s.{column}' for column in values)}
+                FROM temp.{stage} AS s WHERE {matches}
+            """)
+            conn.execute(f"""
+                DELETE FROM temp.{stage} AS s
+                WHERE EXISTS (SELECT 1 FROM {table} AS t WHERE {matches})
+            """)
+        conn.execute(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM temp.{stage} ORDER BY rowid
+        """)
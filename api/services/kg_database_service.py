@@ -10,119 +10,147 @@ import sqlite3
 import logging
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator, Callable
 from pathlib import Path
 
 from api.models.kg_models import KGEntity, KGRelationship, EntityType, SemanticAnnotation
 from api.services.automated_entity_extraction import RamayanaEntityExtractor
+from api.services.metrics_service import get_metrics_registry, instrument_methods
+from api.services.connection_pool import get_connection_pool
+from api.services.kg_schema import migrate_kg_schema
+from api.services.kg_bulk_loader import KGBulkLoader
 
 
+# "kanda.sarga.sloka" id of a slokas row (aliased ``s``). It must stay
+# identical to the expression of idx_slokas_text_unit_id, or SQLite can't
+# use that index to join mentions to their slokas. The other side of the join
+# needs a unary + to drop its TEXT affinity, which would also rule it out.
+SLOKA_TEXT_UNIT_ID = (
+    "CAST(s.kanda_id AS TEXT) || '.' || CAST(s.sarga_id AS TEXT) || '.' || CAST(s.sloka_id AS TEXT)"
+)
+
+# Indexes the source-reference queries rely on; also in scripts/add_kg_tables.sql
+QUERY_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_slokas_text_unit_id ON slokas("
+    "CAST(kanda_id AS TEXT) || '.' || CAST(sarga_id AS TEXT) || '.' || CAST(sloka_id AS TEXT))",
+    "CREATE INDEX IF NOT EXISTS idx_text_mentions_entity_confidence "
+    "ON text_entity_mentions(entity_id, confidence DESC)",
+)
+
+# Source references shown per entity on the validation dashboard
+MAX_SOURCE_REFERENCES = 5
+
+# Name matches above which entity search ranks by name length instead of bm25
+MAX_BM25_MATCHES = 1000
+
+KG_QUERY_DURATION = get_metrics_registry().histogram(
+    'ramayanam_kg_query_duration_seconds',
+    'Knowledge graph database operation latency by service method',
+    ['operation']
+)
+
+
+@instrument_methods(KG_QUERY_DURATION, exclude=('get_connection',))
 class KGDatabaseService:
     """Service for managing knowledge graph data in SQLite database"""
     
     def __init__(self, db_path: str = "data/db/ramayanam.db"):
         self.db_path = db_path
+        self.pool = get_connection_pool(db_path)
         self.logger = logging.getLogger(__name__)
+        self._schema_ready = False
+        self._trigram_index = None
     
     def get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        """Get this thread's pooled database connection (shared across services)"""
+        conn = self.pool.connection()
+        if not self._schema_ready:
+            self._ensure_schema(conn)
         return conn
     
-    def store_extraction_results(self, extraction_results: Dict[str, Any]) -> Dict[str, int]:
-        """Store automated extraction results in database"""
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        """Migrate the KG schema and create the query indexes (once per service)"""
+        self._schema_ready = True
+        try:
+            migrate_kg_schema(self.pool)
+        except sqlite3.DatabaseError as e:
+            self.logger.error(f"Could not migrate KG schema: {e}")
+        try:
+            for statement in QUERY_INDEXES:
+                conn.execute(statement)
+            conn.commit()
+        except sqlite3.DatabaseError as e:
+            # e.g. a read-only database: queries still work, just slower
+            self.logger.warning(f"Could not create query indexes: {e}")
+    
+    def store_extraction_results(self, extraction_results: Dict[str, Any],
+                                 replace: bool = False) -> Dict[str, int]:
+        """
+        Store automated extraction results in database.
+        
+        Rows are bulk upserted in one transaction (see ``KGBulkLoader``);
+        with ``replace`` they replace the whole knowledge graph.
+        """
         self.logger.info("Storing extraction results in database")
         
         entities = extraction_results.get('entities', {})
         relationships = extraction_results.get('relationships', [])
         annotations = extraction_results.get('annotations', [])
         
+        result = KGBulkLoader(self.pool).load(
+            entities=self._rows(entities.values(), self._entity_row, 'entity'),
+            relationships=self._rows(relationships, self._relationship_row, 'relationship'),
+            mentions=self._rows(annotations, self._annotation_row, 'annotation'),
+            replace=replace
+        )
         stats = {
-            'entities_stored': 0,
-            'relationships_stored': 0,
-            'annotations_stored': 0
+            'entities_stored': result['entities'],
+            'relationships_stored': result['relationships'],
+            'annotations_stored': result['mentions'],
+            'rows_per_second': result['rows_per_second']
         }
         
-        with self.get_connection() as conn:
-            # Store entities
-            for entity_id, entity in entities.items():
-                self._store_entity(conn, entity)
-                stats['entities_stored'] += 1
-            
-            # Store relationships
-            for relationship in relationships:
-                self._store_relationship(conn, relationship)
-                stats['relationships_stored'] += 1
-            
-            # Store annotations
-            for annotation in annotations:
-                self._store_annotation(conn, annotation)
-                stats['annotations_stored'] += 1
-            
-            conn.commit()
-        
         self.logger.info(f"Stored: {stats}")
         return stats
     
-    def _store_entity(self, conn: sqlite3.Connection, entity: KGEntity):
-        """Store a single entity"""
-        try:
-            # Extract validation status and confidence from properties
-            properties = entity.properties or {}
-            validation_status = properties.get('validation_status', 'pending')
-            extraction_method = properties.get('extraction_method', 'automated')
-            extraction_confidence = properties.get('confidence_score', 0.7)
-            
-            conn.execute("""
-                INSERT OR REPLACE INTO kg_entities 
-                (kg_id, entity_type, labels, properties, validation_status, 
-                 extraction_method, extraction_confidence, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                entity.kg_id,
-                entity.entity_type.value,
-                json.dumps(entity.labels),
-                json.dumps(entity.properties),
-                validation_status,
-                extraction_method,
-                extraction_confidence
-            ))
-        except Exception as e:
-            self.logger.error(f"Error storing entity {entity.kg_id}: {e}")
+    def _rows(self, items: Iterable[Any], to_row: Callable[[Any], Tuple], kind: str) -> Iterator[Tuple]:
+        """Convert items to loader rows, logging and skipping the malformed ones"""
+        for item in items:
+            try:
+                yield to_row(item)
+            except Exception as e:
+                self.logger.error(f"Error storing {kind} {item!r}: {e}")
     
-    def _store_relationship(self, conn: sqlite3.Connection, relationship: KGRelationship):
-        """Store a single relationship"""
-        try:
-            conn.execute("""
-                INSERT OR REPLACE INTO kg_relationships 
-                (subject_id, predicate, object_id, metadata)
-                VALUES (?, ?, ?, ?)
-            """, (
-                relationship.subject_id,
-                relationship.predicate,
-                relationship.object_id,
-                json.dumps(relationship.metadata)
-            ))
-        except Exception as e:
-            self.logger.error(f"Error storing relationship: {e}")
+    def _entity_row(self, entity: KGEntity) -> Tuple:
+        # Validation status and confidence live in the properties of extracted entities
+        properties = entity.properties or {}
+        return (
+            entity.kg_id,
+            entity.entity_type.value,
+            json.dumps(entity.labels),
+            json.dumps(entity.properties),
+            properties.get('validation_status', 'pending'),
+            properties.get('extraction_method', 'automated'),
+            properties.get('confidence_score', 0.7)
+        )
     
-    def _store_annotation(self, conn: sqlite3.Connection, annotation: SemanticAnnotation):
-        """Store a single annotation"""
-        try:
-            conn.execute("""
-                INSERT OR REPLACE INTO text_entity_mentions 
-                (text_unit_id, entity_id, span_start, span_end, confidence, source_type)
-                VALUES (?, ?, ?, ?, ?, 'automated')
-            """, (
-                annotation.text_unit_id,
-                annotation.entity_id,
-                annotation.span_start,
-                annotation.span_end,
-                annotation.confidence
-            ))
-        except Exception as e:
-            self.logger.error(f"Error storing annotation: {e}")
+    def _relationship_row(self, relationship: KGRelationship) -> Tuple:
+        return (
+            relationship.subject_id,
+            relationship.predicate,
+            relationship.object_id,
+            json.dumps(relationship.metadata)
+        )
+    
+    def _annotation_row(self, annotation: SemanticAnnotation) -> Tuple:
+        return (
+            annotation.text_unit_id,
+            annotation.entity_id,
+            annotation.span_start,
+            annotation.span_end,
+            annotation.confidence,
+            'automated'
+        )
     
     def get_all_entities(self, entity_type: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Get all entities, optionally filtered by type"""
@@ -138,13 +166,14 @@ class KGDatabaseService:
         
         with self.get_connection() as conn:
             rows = conn.execute(query, params).fetchall()
+            labels = self._get_labels(conn, [row['kg_id'] for row in rows])
             
             entities = []
             for row in rows:
                 entity = {
                     'kg_id': row['kg_id'],
                     'entity_type': row['entity_type'],
-                    'labels': json.loads(row['labels']),
+                    'labels': labels.get(row['kg_id'], {}),
                     'properties': json.loads(row['properties']),
                     'created_at': row['created_at'],
                     'updated_at': row['updated_at']
@@ -167,7 +196,7 @@ class KGDatabaseService:
             return {
                 'kg_id': row['kg_id'],
                 'entity_type': row['entity_type'],
-                'labels': json.loads(row['labels']),
+                'labels': self._get_labels(conn, [kg_id]).get(kg_id, {}),
                 'properties': json.loads(row['properties']),
                 'created_at': row['created_at'],
                 'updated_at': row['updated_at']
@@ -231,13 +260,14 @@ class KGDatabaseService:
                 WHERE tem.text_unit_id = ?
                 ORDER BY tem.span_start
             """, (text_unit_id,)).fetchall()
+            labels = self._get_labels(conn, [row['kg_id'] for row in rows])
             
             entities = []
             for row in rows:
                 entity = {
                     'kg_id': row['kg_id'],
                     'entity_type': row['entity_type'],
-                    'labels': json.loads(row['labels']),
+                    'labels': labels.get(row['kg_id'], {}),
                     'properties': json.loads(row['properties']),
                     'mention': {
                         'span_start': row['span_start'],
@@ -250,75 +280,281 @@ class KGDatabaseService:
             return entities
     
     def search_entities(self, query: str, entity_type: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search entities by name/label"""
-        sql_query = """
-            SELECT * FROM kg_entities 
-            WHERE (labels LIKE ? OR kg_id LIKE ?)
-        """
-        params = [f'%{query}%', f'%{query}%']
-        
-        if entity_type:
-            sql_query += " AND entity_type = ?"
-            params.append(entity_type)
-        
-        sql_query += " ORDER BY kg_id LIMIT ?"
-        params.append(limit)
-        
+        """Search entities by label, epithet, alternative name or id, best matches first"""
         with self.get_connection() as conn:
-            rows = conn.execute(sql_query, params).fetchall()
+            matches = self._match_entity_names(conn, query, entity_type, limit)
+            entity_ids = [match['entity_id'] for match in matches]
+            rows = {
+                row['kg_id']: row for row in conn.execute(
+                    "SELECT * FROM kg_entities WHERE kg_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(entity_ids),)
+                )
+            }
+            labels = self._get_labels(conn, entity_ids)
             
             entities = []
-            for row in rows:
+            for entity_id in entity_ids:
+                row = rows[entity_id]
                 entity = {
                     'kg_id': row['kg_id'],
                     'entity_type': row['entity_type'],
-                    'labels': json.loads(row['labels']),
+                    'labels': labels.get(row['kg_id'], {}),
                     'properties': json.loads(row['properties'])
                 }
                 entities.append(entity)
             
             return entities
     
+    def autocomplete_entities(self, prefix: str, entity_type: Optional[str] = None,
+                              limit: int = 10) -> List[Dict[str, Any]]:
+        """Entity name suggestions for a partially typed query, without entity properties"""
+        with self.get_connection() as conn:
+            matches = self._match_entity_names(conn, prefix, entity_type, limit)
+            labels = self._get_labels(conn, [match['entity_id'] for match in matches])
+            
+            suggestions = []
+            for match in matches:
+                entity_labels = labels.get(match['entity_id'], {})
+                suggestions.append({
+                    'kg_id': match['entity_id'],
+                    'entity_type': match['entity_type'],
+                    'label': entity_labels.get('en', match['name']),
+                    'labels': entity_labels,
+                    'matched': {
+                        'name': match['name'],
+                        'kind': match['kind'],
+                        'lang': match['lang']
+                    }
+                })
+            
+            return suggestions
+    
+    def _match_entity_names(self, conn: sqlite3.Connection, query: str,
+                            entity_type: Optional[str], limit: int) -> List[sqlite3.Row]:
+        """
+        Entities with a name matching ``query``, best first, one row per
+        entity with its best-matching name.
+
+        Every word of the query is matched as a word prefix through the FTS5
+        prefix index and ranked by bm25. Remaining slots are filled with
+        substring matches from the trigram index, so "ama" still finds Rama.
+        """
+        terms = [term.replace('"', '') for term in query.split()]
+        terms = [term for term in terms if term]
+        if not terms or limit <= 0:
+            return []
+        
+        matches = self._match_search_index(
+            conn, 'entity_search', ' '.join(f'"{term}"*' for term in terms), entity_type, limit
+        )
+        
+        substring = ' '.join(terms)
+        if len(matches) < limit and len(substring) >= 3 and self._has_trigram_index(conn):
+            found = {match['entity_id'] for match in matches}
+            extra = self._match_search_index(
+                conn, 'entity_search_trigram', f'"{substring}"', entity_type, limit + len(found)
+            )
+            matches += [match for match in extra if match['entity_id'] not in found][:limit - len(matches)]
+        
+        return matches
+    
+    def _match_search_index(self, conn: sqlite3.Connection, index: str, match: str,
+                            entity_type: Optional[str], limit: int) -> List[sqlite3.Row]:
+        """
+        Run one FTS5 query, keeping the best-ranked name of each entity.
+
+        Only the best few name matches are joined to their entities, taking
+        more if too few distinct entities (of the requested type) are among
+        them. bm25 is computed for every match, which takes tens of
+        milliseconds for unselective prefixes like "r"; those rank shorter
+        (closer) names first instead.
+        """
+        match_count = conn.execute(
+            f"SELECT COUNT(*) FROM {index} WHERE {index} MATCH ?", (match,)
+        ).fetchone()[0]
+        if not match_count:
+            return []
+        score = 'f.rank' if match_count <= MAX_BM25_MATCHES else 'length(n.name)'
+        
+        sql_query = f"""
+            WITH hits AS (
+                SELECT n.entity_id, n.name, n.kind, n.lang, {score} as score
+                FROM {index} f
+                JOIN entity_search_names n ON n.id = f.rowid
+                WHERE {index} MATCH ?
+                ORDER BY score
+                LIMIT ?
+            )
+            SELECT h.entity_id, h.name, h.kind, h.lang, e.entity_type, MIN(h.score) as score
+            FROM hits h
+            JOIN kg_entities e ON e.kg_id = h.entity_id
+        """
+        type_filter = []
+        if entity_type:
+            sql_query += " WHERE e.entity_type = ?"
+            type_filter.append(entity_type)
+        sql_query += " GROUP BY h.entity_id ORDER BY score, h.entity_id LIMIT ?"
+        
+        candidates = limit * 4
+        while True:
+            rows = conn.execute(sql_query, [match, candidates] + type_filter + [limit]).fetchall()
+            if len(rows) >= limit or candidates >= match_count:
+                return rows
+            candidates *= 4
+    
+    def _has_trigram_index(self, conn: sqlite3.Connection) -> bool:
+        if self._trigram_index is None:
+            self._trigram_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'entity_search_trigram'"
+            ).fetchone() is not None
+        return self._trigram_index
+    
+    def _get_labels(self, conn: sqlite3.Connection, entity_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """Get the {lang: label} mappings of many entities in one query"""
+        if not entity_ids:
+            return {}
+        labels = {}
+        for row in conn.execute("""
+            SELECT entity_id, lang, label FROM entity_labels
+            WHERE entity_id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(entity_ids),)):
+            labels.setdefault(row['entity_id'], {})[row['lang']] = row['label']
+        return labels
+    
+    def _get_epithets(self, conn: sqlite3.Connection,
+                      entity_ids: List[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Get the epithets and alternative names of many entities, by kind, in one query"""
+        if not entity_ids:
+            return {}
+        epithets = {}
+        for row in conn.execute("""
+            SELECT entity_id, kind, epithet FROM entity_epithets
+            WHERE entity_id IN (SELECT value FROM json_each(?))
+            ORDER BY entity_id, kind, position
+        """, (json.dumps(entity_ids),)):
+            epithets.setdefault(row['entity_id'], {}).setdefault(row['kind'], []).append(row['epithet'])
+        return epithets
+    
+    def get_entity_types(self, entity_ids: List[str]) -> Dict[str, str]:
+        """Get the entity_type of many entities in one query"""
+        if not entity_ids:
+            return {}
+        with self.get_connection() as conn:
+            return {
+                row['kg_id']: row['entity_type']
+                for row in conn.execute(
+                    "SELECT kg_id, entity_type FROM kg_entities WHERE kg_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(entity_ids),)
+                )
+            }
+    
+    def get_entities_by_ids(self, entity_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the type, labels and properties of many entities in two queries"""
+        if not entity_ids:
+            return {}
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT kg_id, entity_type, properties FROM kg_entities "
+                "WHERE kg_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(entity_ids),)
+            ).fetchall()
+            labels = self._get_labels(conn, entity_ids)
+            
+            return {
+                row['kg_id']: {
+                    'kg_id': row['kg_id'],
+                    'entity_type': row['entity_type'],
+                    'labels': labels.get(row['kg_id'], {}),
+                    'properties': json.loads(row['properties'] or '{}')
+                }
+                for row in rows
+            }
+    
+    def get_entity_summaries(self, entity_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get what a graph view shows of many entities (type, labels, epithets,
+        confidence and mention count) in a fixed number of queries.
+        """
+        if not entity_ids:
+            return {}
+        with self.get_connection() as conn:
+            ids = json.dumps(entity_ids)
+            rows = conn.execute("""
+                SELECT kg_id, entity_type, extraction_confidence FROM kg_entities
+                WHERE kg_id IN (SELECT value FROM json_each(?))
+            """, (ids,)).fetchall()
+            mention_counts = dict(conn.execute("""
+                SELECT entity_id, mention_count FROM kg_entity_mention_counts
+                WHERE entity_id IN (SELECT value FROM json_each(?))
+            """, (ids,)).fetchall())
+            labels = self._get_labels(conn, entity_ids)
+            epithets = self._get_epithets(conn, entity_ids)
+            
+            return {
+                row['kg_id']: {
+                    'entity_type': row['entity_type'],
+                    'labels': labels.get(row['kg_id'], {}),
+                    'epithets': epithets.get(row['kg_id'], {}).get('epithet', []),
+                    'confidence': row['extraction_confidence'],
+                    'mention_count': mention_counts.get(row['kg_id'], 0)
+                }
+                for row in rows
+            }
+    
+    def _get_entity_stats(self, conn: sqlite3.Connection) -> List[sqlite3.Row]:
+        """Rows of the trigger-maintained kg_entity_stats summary (a few dozen at most)"""
+        return conn.execute("""
+            SELECT entity_type, validation_status, confidence_range, entity_count, confidence_sum
+            FROM kg_entity_stats
+            WHERE entity_count > 0
+        """).fetchall()
+    
+    def _get_counter(self, conn: sqlite3.Connection, name: str) -> int:
+        row = conn.execute("SELECT value FROM kg_counters WHERE name = ?", (name,)).fetchone()
+        return row['value'] if row else 0
+    
+    def _count_by(self, stats: List[sqlite3.Row], column: str) -> Dict[str, int]:
+        counts = {}
+        for row in stats:
+            counts[row[column]] = counts.get(row[column], 0) + row['entity_count']
+        return counts
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get knowledge graph statistics"""
         with self.get_connection() as conn:
             # Entity counts by type
-            entity_counts = {}
-            rows = conn.execute("""
-                SELECT entity_type, COUNT(*) as count 
-                FROM kg_entities 
-                GROUP BY entity_type
-            """).fetchall()
-            
-            for row in rows:
-                entity_counts[row['entity_type']] = row['count']
-            
-            # Total relationships
-            relationship_count = conn.execute(
-                "SELECT COUNT(*) as count FROM kg_relationships"
-            ).fetchone()['count']
+            entity_counts = self._count_by(self._get_entity_stats(conn), 'entity_type')
             
-            # Total mentions
-            mention_count = conn.execute(
-                "SELECT COUNT(*) as count FROM text_entity_mentions"
-            ).fetchone()['count']
+            relationship_count = self._get_counter(conn, 'relationships')
+            mention_count = self._get_counter(conn, 'mentions')
             
-            # Top entities by mentions
+            # Top entities by mentions, read off the mention count index
             top_entities = conn.execute("""
-                SELECT e.kg_id, e.labels, COUNT(tem.id) as mention_count
-                FROM kg_entities e
-                LEFT JOIN text_entity_mentions tem ON e.kg_id = tem.entity_id
-                GROUP BY e.kg_id
-                ORDER BY mention_count DESC
+                SELECT m.entity_id AS kg_id, m.mention_count
+                FROM kg_entity_mention_counts m
+                JOIN kg_entities e ON e.kg_id = m.entity_id
+                ORDER BY m.mention_count DESC
                 LIMIT 10
             """).fetchall()
+            top_entities = [(row['kg_id'], row['mention_count']) for row in top_entities]
+            if len(top_entities) < 10:
+                # Fewer than ten entities are mentioned at all
+                top_entities += [
+                    (row['kg_id'], 0) for row in conn.execute("""
+                        SELECT kg_id FROM kg_entities
+                        WHERE kg_id NOT IN (SELECT entity_id FROM kg_entity_mention_counts)
+                        LIMIT ?
+                    """, (10 - len(top_entities),))
+                ]
+            
+            labels = self._get_labels(conn, [kg_id for kg_id, _ in top_entities])
             
             top_entities_list = []
-            for row in top_entities:
+            for kg_id, count in top_entities:
                 top_entities_list.append({
-                    'kg_id': row['kg_id'],
-                    'labels': json.loads(row['labels']),
-                    'mention_count': row['mention_count']
+                    'kg_id': kg_id,
+                    'labels': labels.get(kg_id, {}),
+                    'mention_count': count
                 })
             
             return {
@@ -402,34 +638,40 @@ class KGDatabaseService:
             }
     
     def get_pending_entities(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get entities pending validation"""
+        """Get entities pending validation, with their top source references"""
         with self.get_connection() as conn:
             rows = conn.execute("""
-                SELECT e.*, COUNT(tem.id) as mention_count
+                SELECT e.*,
+                       (SELECT m.mention_count FROM kg_entity_mention_counts m
+                        WHERE m.entity_id = e.kg_id) as mention_count
                 FROM kg_entities e
-                LEFT JOIN text_entity_mentions tem ON e.kg_id = tem.entity_id
                 WHERE e.validation_status = 'pending'
-                GROUP BY e.kg_id
                 ORDER BY e.extraction_confidence DESC, mention_count DESC
                 LIMIT ?
             """, (limit,)).fetchall()
             
+            # One query each for the labels, names and references of all
+            # entities on the page
+            entity_ids = [row['kg_id'] for row in rows]
+            labels = self._get_labels(conn, entity_ids)
+            epithets = self._get_epithets(conn, entity_ids)
+            source_refs = self._get_source_references(conn, entity_ids)
+            
             entities = []
             for row in rows:
-                # Get source references for this entity
-                source_refs = self._get_entity_source_references(row['kg_id'])
-                
+                entity_labels = labels.get(row['kg_id'], {})
+                names = epithets.get(row['kg_id'], {})
                 entity = {
                     'id': row['kg_id'],
-                    'text': self._extract_original_text(row['labels']),
-                    'normalizedForm': self._extract_english_name(row['labels']),
+                    'text': self._original_text(entity_labels),
+                    'normalizedForm': self._english_name(entity_labels),
                     'type': row['entity_type'],
                     'confidence': row['extraction_confidence'] or 0.0,
-                    'sourceReferences': source_refs,
+                    'sourceReferences': source_refs.get(row['kg_id'], []),
                     'extractionMethod': row['extraction_method'] or 'automated',
                     'validationStatus': row['validation_status'],
-                    'epithets': json.loads(row['properties']).get('epithets', []),
-                    'alternativeNames': []
+                    'epithets': names.get('epithet', []),
+                    'alternativeNames': names.get('alternative_name', [])
                 }
                 entities.append(entity)
             
@@ -438,60 +680,75 @@ class KGDatabaseService:
     def _get_entity_source_references(self, entity_id: str) -> List[Dict[str, Any]]:
         """Get source references for an entity"""
         with self.get_connection() as conn:
-            rows = conn.execute("""
-                SELECT tem.*, s.sloka, s.translation, s.meaning
+            return self._get_source_references(conn, [entity_id]).get(entity_id, [])
+    
+    def _get_source_references(self, conn: sqlite3.Connection,
+                               entity_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the highest-confidence source references of many entities at once.
+
+        A window function ranks each entity's mentions by confidence and keeps
+        the top MAX_SOURCE_REFERENCES; the ids are passed as one JSON array so
+        any number of entities takes a single query.
+        """
+        if not entity_ids:
+            return {}
+        
+        rows = conn.execute(f"""
+            WITH ranked AS (
+                SELECT tem.entity_id, tem.text_unit_id, tem.span_start, tem.span_end,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY tem.entity_id
+                           ORDER BY tem.confidence DESC, tem.id
+                       ) as reference_rank
                 FROM text_entity_mentions tem
-                LEFT JOIN slokas s ON (
-                    CAST(s.kanda_id AS TEXT) || '.' || 
-                    CAST(s.sarga_id AS TEXT) || '.' || 
-                    CAST(s.sloka_id AS TEXT) = tem.text_unit_id
-                )
-                WHERE tem.entity_id = ?
-                ORDER BY tem.confidence DESC
-                LIMIT 5
-            """, (entity_id,)).fetchall()
-            
-            references = []
-            for row in rows:
-                # Parse text_unit_id to get kanda/sarga/sloka
-                parts = row['text_unit_id'].split('.')
-                if len(parts) == 3:
-                    kanda_id, sarga_id, sloka_id = parts
-                    
-                    # Get context from sloka text
-                    context = row['sloka'] or row['translation'] or row['meaning'] or 'No context available'
-                    if len(context) > 200:
-                        context = context[:200] + '...'
-                    
-                    reference = {
-                        'sloka_id': row['text_unit_id'],
-                        'kanda': f'Kanda{kanda_id}',
-                        'sarga': sarga_id,
-                        'position': {
-                            'start': row['span_start'],
-                            'end': row['span_end']
-                        },
-                        'context': context
-                    }
-                    references.append(reference)
-            
-            return references
+                WHERE tem.entity_id IN (SELECT value FROM json_each(?))
+            )
+            SELECT r.*, s.sloka, s.translation, s.meaning
+            FROM ranked r
+            LEFT JOIN slokas s ON {SLOKA_TEXT_UNIT_ID} = +r.text_unit_id
+            WHERE r.reference_rank <= ?
+            ORDER BY r.entity_id, r.reference_rank
+        """, (json.dumps(entity_ids), MAX_SOURCE_REFERENCES)).fetchall()
+        
+        references = {}
+        for row in rows:
+            reference = self._format_source_reference(row)
+            if reference:
+                references.setdefault(row['entity_id'], []).append(reference)
+        return references
     
-    def _extract_original_text(self, labels_json: str) -> str:
-        """Extract original text from labels JSON"""
-        try:
-            labels = json.loads(labels_json)
-            return labels.get('sa', labels.get('en', 'Unknown'))
-        except:
-            return 'Unknown'
+    def _format_source_reference(self, row: sqlite3.Row) -> Optional[Dict[str, Any]]:
+        """Shape a mention joined with its sloka into a dashboard source reference"""
+        # Parse text_unit_id to get kanda/sarga/sloka
+        parts = row['text_unit_id'].split('.')
+        if len(parts) != 3:
+            return None
+        kanda_id, sarga_id, sloka_id = parts
+        
+        # Get context from sloka text
+        context = row['sloka'] or row['translation'] or row['meaning'] or 'No context available'
+        if len(context) > 200:
+            context = context[:200] + '...'
+        
+        return {
+            'sloka_id': row['text_unit_id'],
+            'kanda': f'Kanda{kanda_id}',
+            'sarga': sarga_id,
+            'position': {
+                'start': row['span_start'],
+                'end': row['span_end']
+            },
+            'context': context
+        }
     
-    def _extract_english_name(self, labels_json: str) -> str:
-        """Extract English name from labels JSON"""
-        try:
-            labels = json.loads(labels_json)
-            return labels.get('en', 'Unknown')
-        except:
-            return 'Unknown'
+    def _original_text(self, labels: Dict[str, str]) -> str:
+        """Original (Sanskrit) text of an entity from its labels"""
+        return labels.get('sa', labels.get('en', 'Unknown'))
+    
+    def _english_name(self, labels: Dict[str, str]) -> str:
+        """English name of an entity from its labels"""
+        return labels.get('en', 'Unknown')
     
     def validate_entity(self, entity_id: str, validation: Dict[str, Any], validated_by: str = 'user'):
         """Validate an entity"""
@@ -550,19 +807,23 @@ class KGDatabaseService:
                 LIMIT ?
             """, (limit,)).fetchall()
             
+            conflict_entity_ids = [json.loads(row['entity_ids']) for row in rows]
+            
+            # Labels of the entities of all conflicts in one query
+            labels = self._get_labels(conn, sorted({
+                entity_id for entity_ids in conflict_entity_ids for entity_id in entity_ids
+            }))
+            
             conflicts = []
-            for row in rows:
-                entity_ids = json.loads(row['entity_ids'])
-                entities = []
-                
-                # Get entity details for each ID
-                for entity_id in entity_ids:
-                    entity = self.get_entity_by_id(entity_id)
-                    if entity:
-                        entities.append({
-                            'id': entity['kg_id'],
-                            'normalizedForm': self._extract_english_name(entity['labels'])
-                        })
+            for row, entity_ids in zip(rows, conflict_entity_ids):
+                entities = [
+                    {
+                        'id': entity_id,
+                        'normalizedForm': self._english_name(labels[entity_id])
+                    }
+                    for entity_id in entity_ids
+                    if entity_id in labels
+                ]
                 
                 conflict = {
                     'id': row['id'],
@@ -593,52 +854,21 @@ class KGDatabaseService:
     def get_enhanced_statistics(self) -> Dict[str, Any]:
         """Get enhanced statistics for Entity Discovery dashboard"""
         with self.get_connection() as conn:
-            # Entity type counts by validation status
-            entity_type_stats = {}
-            rows = conn.execute("""
-                SELECT entity_type, validation_status, COUNT(*) as count
-                FROM kg_entities
-                GROUP BY entity_type, validation_status
-            """).fetchall()
+            stats = self._get_entity_stats(conn)
+            entity_counts = self._count_by(stats, 'entity_type')
             
-            entity_counts = {}
-            for row in rows:
-                entity_type = row['entity_type']
-                if entity_type not in entity_counts:
-                    entity_counts[entity_type] = 0
-                entity_counts[entity_type] += row['count']
-            
-            # Confidence distribution
-            confidence_rows = conn.execute("""
-                SELECT 
-                    CASE 
-                        WHEN extraction_confidence >= 0.9 THEN '90-100%'
-                        WHEN extraction_confidence >= 0.8 THEN '80-89%'
-                        WHEN extraction_confidence >= 0.7 THEN '70-79%'
-                        WHEN extraction_confidence >= 0.6 THEN '60-69%'
-                        ELSE '0-59%'
-                    END as confidence_range,
-                    COUNT(*) as count
-                FROM kg_entities
-                WHERE extraction_confidence > 0
-                GROUP BY confidence_range
-            """).fetchall()
-            
-            confidence_dist = {}
-            for row in confidence_rows:
-                confidence_dist[row['confidence_range']] = row['count']
+            # Confidence distribution, over entities with a positive confidence
+            scored = [row for row in stats if row['confidence_range']]
+            confidence_dist = self._count_by(scored, 'confidence_range')
             
             # Processing stats
-            avg_confidence = conn.execute("""
-                SELECT AVG(extraction_confidence) as avg_conf
-                FROM kg_entities
-                WHERE extraction_confidence > 0
-            """).fetchone()['avg_conf'] or 0.0
+            scored_count = sum(row['entity_count'] for row in scored)
+            avg_confidence = (
+                sum(row['confidence_sum'] for row in scored) / scored_count if scored_count else 0.0
+            )
             
             total_entities = sum(entity_counts.values())
-            total_mentions = conn.execute("""
-                SELECT COUNT(*) as count FROM text_entity_mentions
-            """).fetchone()['count']
+            total_mentions = self._get_counter(conn, 'mentions')
             
             # Recent activity (mock for now)
             recent_activity = [
@@ -693,27 +923,9 @@ class KGDatabaseService:
     def get_discovery_metrics(self) -> Dict[str, Any]:
         """Get discovery metrics for dashboard"""
         with self.get_connection() as conn:
-            # Entity counts by validation status
-            validation_stats = {}
-            rows = conn.execute("""
-                SELECT validation_status, COUNT(*) as count 
-                FROM kg_entities 
-                GROUP BY validation_status
-            """).fetchall()
-            
-            for row in rows:
-                validation_stats[row['validation_status']] = row['count']
-            
-            # Entity counts by type
-            type_stats = {}
-            rows = conn.execute("""
-                SELECT entity_type, COUNT(*) as count 
-                FROM kg_entities 
-                GROUP BY entity_type
-            """).fetchall()
-            
-            for row in rows:
-                type_stats[row['entity_type']] = row['count']
+            stats = self._get_entity_stats(conn)
+            validation_stats = self._count_by(stats, 'validation_status')
+            type_stats = self._count_by(stats, 'entity_type')
             
             # Recent discovery sessions
             recent_sessions = conn.execute("""
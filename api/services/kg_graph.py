@@ -0,0 +1,461 @@
+"""
+In-process adjacency graph of the knowledge graph relationships.
+
+Relationship lookups used to be one ``WHERE subject_id = ? OR object_id = ?``
+query per entity, which makes anything multi-hop a query per visited node.
+``KGGraph`` loads ``kg_relationships`` once into compressed sparse row (CSR)
+arrays over integer entity ids, one set per direction, so a traversal step
+is a slice of a few ``array`` objects.
+
+Writes after the load are picked up from ``kg_relationship_changes`` (see
+migration 3 in ``kg_schema``): inserted edges go into small per-node delta
+lists and deleted ones into a tombstone set, both consulted alongside the
+CSR arrays. An update is logged as a delete and an insert of the same id,
+which tombstones the loaded version and adds the new one to the deltas.
+Once the deltas outgrow ``COMPACT_FRACTION`` of the graph it is reloaded
+into fresh arrays. Databases without the change log fall back to a full
+reload whenever the relationship count or highest id changes.
+"""
+import logging
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from api.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ('out', 'in', 'both')
+
+# Deltas (inserted plus deleted edges) beyond this fraction of the loaded
+# edges, or beyond MIN_COMPACT_EDGES on small graphs, trigger a reload
+COMPACT_FRACTION = 0.1
+MIN_COMPACT_EDGES = 1024
+
+# Traversals never go further than this, whatever the caller asks for
+MAX_HOPS = 6
+
+
+class CSRAdjacency:
+    """Edges grouped by source node: ``targets[offsets[n]:offsets[n + 1]]``."""
+
+    __slots__ = ('offsets', 'targets', 'predicates', 'edge_ids')
+
+    def __init__(self, node_count: int, edges: List[Tuple[int, int, int, int]]):
+        """Build from ``(source, target, predicate, edge_id)`` tuples with a counting sort."""
+        counts = [0] * (node_count + 1)
+        for source, _, _, _ in edges:
+            counts[source + 1] += 1
+        for node in range(node_count):
+            counts[node + 1] += counts[node]
+        self.offsets = array('l', counts)
+
+        position = counts[:-1]
+        targets = [0] * len(edges)
+        predicates = [0] * len(edges)
+        edge_ids = [0] * len(edges)
+        for source, target, predicate, edge_id in edges:
+            slot = position[source]
+            targets[slot], predicates[slot], edge_ids[slot] = target, predicate, edge_id
+            position[source] = slot + 1
+        self.targets = array('l', targets)
+        self.predicates = array('l', predicates)
+        self.edge_ids = array('q', edge_ids)
+
+    def edges(self, node: int) -> Iterator[Tuple[int, int, int]]:
+        """``(target, predicate, edge_id)`` of the edges leaving ``node``."""
+        if node + 1 >= len(self.offsets):
+            return
+        for slot in range(self.offsets[node], self.offsets[node + 1]):
+            yield self.targets[slot], self.predicates[slot], self.edge_ids[slot]
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.offsets, self.targets, self.predicates, self.edge_ids))
+
+
+class _GraphState:
+    """One consistent view of the graph; refreshes swap in a new one."""
+
+    def __init__(self, out_edges: CSRAdjacency, in_edges: CSRAdjacency, edge_count: int):
+        self.out_edges = out_edges
+        self.in_edges = in_edges
+        self.edge_count = edge_count
+        self.added_out: Dict[int, List[Tuple[int, int, int]]] = {}
+        self.added_in: Dict[int, List[Tuple[int, int, int]]] = {}
+        self.added_count = 0
+        self.removed: Set[int] = set()
+
+    def copy(self) -> '_GraphState':
+        state = _GraphState(self.out_edges, self.in_edges, self.edge_count)
+        state.added_out = {node: list(edges) for node, edges in self.added_out.items()}
+        state.added_in = {node: list(edges) for node, edges in self.added_in.items()}
+        state.added_count = self.added_count
+        state.removed = set(self.removed)
+        return state
+
+    def neighbors(self, node: int, direction: str) -> Iterator[Tuple[int, int, int, bool]]:
+        """``(neighbor, predicate, edge_id, outgoing)`` of the live edges at ``node``."""
+        sides = []
+        if direction in ('out', 'both'):
+            sides.append((self.out_edges, self.added_out, True))
+        if direction in ('in', 'both'):
+            sides.append((self.in_edges, self.added_in, False))
+        removed = self.removed
+        for csr, added, outgoing in sides:
+            for neighbor, predicate, edge_id in csr.edges(node):
+                if edge_id not in removed:
+                    yield neighbor, predicate, edge_id, outgoing
+            # Tombstones only hide loaded edges; deleted delta edges leave their lists
+            for neighbor, predicate, edge_id in added.get(node, ()):
+                yield neighbor, predicate, edge_id, outgoing
+
+    def drop_added(self, source: Optional[int], target: Optional[int], edge_id: int):
+        """Remove an inserted edge from the delta lists, if it is there."""
+        for node, added in ((source, self.added_out), (target, self.added_in)):
+            edges = added.get(node)
+            if edges:
+                kept = [edge for edge in edges if edge[2] != edge_id]
+                if len(kept) < len(edges):
+                    added[node] = kept
+                    if added is self.added_out:
+                        self.added_count -= 1
+
+
+class KGGraph:
+    """
+    Traversals (k-hop neighborhoods, shortest paths) over ``kg_relationships``.
+
+    Entity ids and predicates are interned to integers; the CSR arrays hold
+    only those. Every public method first refreshes the graph from the
+    database, at most once per ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, kg_service, refresh_interval: Optional[float] = None):
+        self.kg_service = kg_service
+        self.refresh_interval = (
+            Config.KG_GRAPH_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._predicates: List[str] = []
+        self._predicate_index: Dict[str, int] = {}
+        self._state: Optional[_GraphState] = None
+        self._change_log = False
+        self._log_position = 0
+        self._loaded_max_id = 0
+        self._loaded_signature = None
+        self._last_check = 0.0
+        self.loaded_at: Optional[float] = None
+        # Bumped whenever the graph changes, so derived caches can tell
+        self.version = 0
+        self.reload()
+
+    def _intern(self, kg_id: str) -> int:
+        node = self._index.get(kg_id)
+        if node is None:
+            node = self._index[kg_id] = len(self._ids)
+            self._ids.append(kg_id)
+        return node
+
+    def _intern_predicate(self, predicate: str) -> int:
+        code = self._predicate_index.get(predicate)
+        if code is None:
+            code = self._predicate_index[predicate] = len(self._predicates)
+            self._predicates.append(predicate)
+        return code
+
+    def reload(self):
+        """Load every relationship into fresh CSR arrays."""
+        started = time.perf_counter()
+        conn = self.kg_service.get_connection()
+        with self._lock:
+            self._change_log = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'kg_relationship_changes'"
+            ).fetchone() is not None
+            # Read the log position first: changes committed while loading are
+            # replayed afterwards, and replaying an already loaded one is a no-op
+            if self._change_log:
+                self._log_position = conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM kg_relationship_changes"
+                ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT id, subject_id, predicate, object_id FROM kg_relationships"
+            ).fetchall()
+
+            edges = [
+                (self._intern(subject), self._intern(obj), self._intern_predicate(predicate), edge_id)
+                for edge_id, subject, predicate, obj in rows
+            ]
+            node_count = len(self._ids)
+            self._state = _GraphState(
+                CSRAdjacency(node_count, edges),
+                CSRAdjacency(node_count, [(target, source, predicate, edge_id)
+                                          for source, target, predicate, edge_id in edges]),
+                len(edges)
+            )
+            self._loaded_max_id = max((edge[3] for edge in edges), default=0)
+            self._loaded_signature = (len(edges), self._loaded_max_id)
+            self._last_check = time.monotonic()
+            self.loaded_at = time.time()
+            self.version += 1
+        logger.info(f"Loaded KG graph: {node_count} nodes, {len(edges)} edges "
+                    f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def refresh(self, force: bool = False):
+        """Apply relationship changes made since the last refresh."""
+        if not force and time.monotonic() - self._last_check < self.refresh_interval:
+            return
+        conn = self.kg_service.get_connection()
+        with self._lock:
+            self._last_check = time.monotonic()
+            if not self._change_log:
+                signature = tuple(conn.execute(
+                    "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM kg_relationships"
+                ).fetchone())
+                needs_reload = signature != self._loaded_signature
+            else:
+                state = self._state
+                budget = max(MIN_COMPACT_EDGES, int(state.edge_count * COMPACT_FRACTION))
+                pending = budget - state.added_count - len(state.removed)
+                changes = conn.execute("""
+                    SELECT id, op, relationship_id, subject_id, predicate, object_id
+                    FROM kg_relationship_changes WHERE id > ? ORDER BY id LIMIT ?
+                """, (self._log_position, pending + 1)).fetchall()
+                needs_reload = len(changes) > pending
+                if changes and not needs_reload:
+                    self._apply_changes(changes)
+        if needs_reload:
+            self.reload()
+
+    def _apply_changes(self, changes):
+        state = self._state.copy()
+        for log_id, op, edge_id, subject, predicate, obj in changes:
+            if op == 'delete':
+                state.drop_added(self._index.get(subject), self._index.get(obj), edge_id)
+                if edge_id <= self._loaded_max_id:
+                    state.removed.add(edge_id)
+            elif edge_id > self._loaded_max_id or edge_id in state.removed:
+                # New, or the new version of an updated edge (logged as a
+                # delete then an insert of the same id); an insert of a loaded
+                # edge is a change replayed after the load
+                source, target = self._intern(subject), self._intern(obj)
+                code = self._intern_predicate(predicate)
+                state.added_out.setdefault(source, []).append((target, code, edge_id))
+                state.added_in.setdefault(target, []).append((source, code, edge_id))
+                state.added_count += 1
+            self._log_position = log_id
+        self._state = state
+        self.version += 1
+
+    def _node(self, kg_id: str) -> Optional[int]:
+        return self._index.get(kg_id)
+
+    def has_entity(self, kg_id: str) -> bool:
+        """Whether ``kg_id`` takes part in any loaded relationship."""
+        return kg_id in self._index
+
+    def _predicate_filter(self, predicates: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if not predicates:
+            return None
+        # Unknown predicates match nothing rather than everything
+        return {self._predicate_index.get(predicate, -1) for predicate in predicates}
+
+    def _edge(self, node: int, neighbor: int, predicate: int, edge_id: int, outgoing: bool) -> Dict:
+        subject, obj = (node, neighbor) if outgoing else (neighbor, node)
+        return {
+            'id': edge_id,
+            'subject_id': self._ids[subject],
+            'predicate': self._predicates[predicate],
+            'object_id': self._ids[obj]
+        }
+
+    def neighborhood(self, kg_id: str, hops: int = 1, direction: str = 'both',
+                     predicates: Optional[Iterable[str]] = None,
+                     limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Entities within ``hops`` edges of ``kg_id``, breadth first.
+
+        Returns the reached ``nodes`` (with their ``distance``, the seed at 0)
+        and the ``edges`` between them that the traversal followed. ``limit``
+        caps the number of nodes returned, nearest first.
+        """
+        self._check_direction(direction)
+        self.refresh()
+        hops = max(0, min(hops, MAX_HOPS))
+        state = self._state
+        allowed = self._predicate_filter(predicates)
+
+        start = self._node(kg_id)
+        nodes = [{'kg_id': kg_id, 'distance': 0}]
+        edges = []
+        if start is None:
+            return {'nodes': nodes, 'edges': edges}
+
+        distance = {start: 0}
+        seen_edges = set()
+        frontier = [start]
+        for depth in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor, predicate, edge_id, outgoing in state.neighbors(node, direction):
+                    if allowed is not None and predicate not in allowed:
+                        continue
+                    if neighbor not in distance:
+                        if limit is not None and len(distance) >= limit:
+                            continue
+                        distance[neighbor] = depth
+                        next_frontier.append(neighbor)
+                        nodes.append({'kg_id': self._ids[neighbor], 'distance': depth})
+                    if edge_id not in seen_edges:
+                        seen_edges.add(edge_id)
+                        edges.append(self._edge(node, neighbor, predicate, edge_id, outgoing))
+            frontier = next_frontier
+            if not frontier:
+                break
+        return {'nodes': nodes, 'edges': edges}
+
+    def ego_network(self, seeds: Iterable[str], radius: int = 1, direction: str = 'both',
+                    predicates: Optional[Iterable[str]] = None, max_nodes: Optional[int] = None,
+                    max_edges: Optional[int] = None,
+                    allow: Optional[Callable[[List[str]], Set[str]]] = None) -> Dict:
+        """
+        The subgraph within ``radius`` edges of any of ``seeds``.
+
+        Nodes are reached breadth first from all seeds at once, nearest first
+        up to ``max_nodes``; ``allow`` may veto the candidates of each level
+        (given their kg_ids, it returns those to keep). The edges are all
+        relationships among the reached nodes (not only those the traversal
+        followed), with parallel duplicates folded into a ``count``, up to
+        ``max_edges``. ``truncated`` tells whether either cap was hit.
+        """
+        self._check_direction(direction)
+        self.refresh()
+        radius = max(0, min(radius, MAX_HOPS))
+        state = self._state
+        allowed = self._predicate_filter(predicates)
+        truncated = False
+
+        nodes = []
+        distance: Dict[int, int] = {}
+        for kg_id in dict.fromkeys(seeds):
+            nodes.append({'kg_id': kg_id, 'distance': 0})
+            node = self._node(kg_id)
+            if node is not None:
+                distance[node] = 0
+
+        frontier = list(distance)
+        for depth in range(1, radius + 1):
+            candidates = {}
+            for node in frontier:
+                for neighbor, predicate, _, _ in state.neighbors(node, direction):
+                    if neighbor not in distance and (allowed is None or predicate in allowed):
+                        candidates.setdefault(neighbor, None)
+            if allow is not None and candidates:
+                keep = allow([self._ids[node] for node in candidates])
+                candidates = {node: None for node in candidates if self._ids[node] in keep}
+            frontier = []
+            for node in candidates:
+                if max_nodes is not None and len(nodes) >= max_nodes:
+                    truncated = True
+                    break
+                distance[node] = depth
+                frontier.append(node)
+                nodes.append({'kg_id': self._ids[node], 'distance': depth})
+            if not frontier:
+                break
+
+        edges: Dict[Tuple[int, int, int], Dict] = {}
+        for node in distance:
+            for neighbor, predicate, edge_id, _ in state.neighbors(node, 'out'):
+                if neighbor not in distance or (allowed is not None and predicate not in allowed):
+                    continue
+                key = (node, predicate, neighbor)
+                if key in edges:
+                    edges[key]['count'] += 1
+                    continue
+                if max_edges is not None and len(edges) >= max_edges:
+                    truncated = True
+                    continue
+                edges[key] = dict(self._edge(node, neighbor, predicate, edge_id, True), count=1)
+        return {'nodes': nodes, 'edges': list(edges.values()), 'truncated': truncated}
+
+    def shortest_path(self, source_id: str, target_id: str, max_hops: int = MAX_HOPS,
+                      direction: str = 'both',
+                      predicates: Optional[Iterable[str]] = None) -> Optional[List[Dict]]:
+        """
+        Edges of a shortest path from ``source_id`` to ``target_id``, in order.
+
+        Searches breadth first from both ends at once. Returns an empty list
+        when the two ids are the same and None when there is no path within
+        ``max_hops`` edges.
+        """
+        self._check_direction(direction)
+        self.refresh()
+        if source_id == target_id:
+            return []
+        source, target = self._node(source_id), self._node(target_id)
+        if source is None or target is None:
+            return None
+        state = self._state
+        allowed = self._predicate_filter(predicates)
+        max_hops = max(0, min(max_hops, MAX_HOPS))
+        backward = {'out': 'in', 'in': 'out', 'both': 'both'}[direction]
+
+        # node -> (previous node, predicate, edge id, outgoing) on each side
+        parents = ({source: None}, {target: None})
+        frontiers = ([source], [target])
+        directions = (direction, backward)
+        for _ in range(max_hops):
+            # Expand the smaller frontier
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            here, there = parents[side], parents[1 - side]
+            next_frontier = []
+            for node in frontiers[side]:
+                for neighbor, predicate, edge_id, outgoing in state.neighbors(node, directions[side]):
+                    if neighbor in here or (allowed is not None and predicate not in allowed):
+                        continue
+                    here[neighbor] = (node, predicate, edge_id, outgoing)
+                    if neighbor in there:
+                        return self._join_path(parents, neighbor)
+                    next_frontier.append(neighbor)
+            if not next_frontier:
+                return None
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        return None
+
+    def _join_path(self, parents, meeting: int) -> List[Dict]:
+        forward, backward = parents
+        path = []
+        node = meeting
+        while forward[node] is not None:
+            previous, predicate, edge_id, outgoing = forward[node]
+            path.append(self._edge(previous, node, predicate, edge_id, outgoing))
+            node = previous
+        path.reverse()
+        node = meeting
+        while backward[node] is not None:
+            following, predicate, edge_id, outgoing = backward[node]
+            path.append(self._edge(following, node, predicate, edge_id, outgoing))
+            node = following
+        return path
+
+    @staticmethod
+    def _check_direction(direction: str):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {', '.join(DIRECTIONS)}")
+
+    def stats(self) -> Dict:
+        state = self._state
+        return {
+            'nodes': len(self._ids),
+            'edges': state.edge_count + state.added_count - len(state.removed),
+            'predicates': len(self._predicates),
+            'pending_inserts': state.added_count,
+            'pending_deletes': len(state.removed),
+            'incremental': self._change_log,
+            'csr_bytes': state.out_edges.nbytes() + state.in_edges.nbytes(),
+            'loaded_at': self.loaded_at
+        }
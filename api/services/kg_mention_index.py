@@ -0,0 +1,292 @@
+"""
+In-process index of entity mentions by sloka and by entity.
+
+The sloka reader annotates every sloka of a sarga page with its entities,
+which used to be a ``text_entity_mentions`` join (plus JSON decoding of
+every entity row) per sloka. ``MentionIndex`` loads the mentions once into
+parallel ``array`` columns sorted by sloka ordinal, so the mentions of a
+sloka or of a whole sarga are one ``bisect`` and a slice, and a CSR index
+over the same rows by entity serves the mentions of an entity.
+
+Mentions whose text unit is not a ``kanda.sarga.sloka`` id (e.g. a
+preface) have no place in reading order. They are kept as plain dicts by
+entity and returned after the others by ``mentions_of_entity`` only.
+
+Entity details are not held in memory: annotations fetch the type, labels
+and properties of the distinct entities they contain in one batched query.
+
+The index reloads when the ``mention_changes`` counter (migration 5 in
+``kg_schema``) moves, checked at most once per ``refresh_interval`` seconds.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from api.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+# Bits of a sloka ordinal below the sarga and sloka numbers
+SARGA_SHIFT = 16
+KANDA_SHIFT = 32
+
+
+def sloka_ordinal(kanda: int, sarga: int, sloka: int) -> int:
+    """Integer that sorts slokas in reading order."""
+    return (kanda << KANDA_SHIFT) | (sarga << SARGA_SHIFT) | sloka
+
+
+def parse_text_unit_id(text_unit_id: str) -> Optional[int]:
+    """Ordinal of a ``"kanda.sarga.sloka"`` id, or None if it isn't one."""
+    try:
+        kanda, sarga, sloka = (int(part) for part in text_unit_id.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    if min(kanda, sarga, sloka) < 0 or max(sarga, sloka) >= 1 << SARGA_SHIFT:
+        return None
+    return sloka_ordinal(kanda, sarga, sloka)
+
+
+def format_text_unit_id(ordinal: int) -> str:
+    mask = (1 << SARGA_SHIFT) - 1
+    return f"{ordinal >> KANDA_SHIFT}.{(ordinal >> SARGA_SHIFT) & mask}.{ordinal & mask}"
+
+
+class _MentionColumns:
+    """All mentions as parallel arrays, sorted by (sloka ordinal, span start)."""
+
+    def __init__(self, rows: List[Tuple], entity_count: int):
+        # rows: (ordinal, span_start, mention_id, entity, span_end, confidence, source_type)
+        rows.sort()
+        self.ordinals = array('q', (row[0] for row in rows))
+        self.span_starts = array('l', (row[1] for row in rows))
+        self.mention_ids = array('q', (row[2] for row in rows))
+        self.entities = array('l', (row[3] for row in rows))
+        self.span_ends = array('l', (row[4] for row in rows))
+        self.confidences = array('d', (row[5] for row in rows))
+        self.source_types = array('b', (row[6] for row in rows))
+
+        # CSR over entities: entity_rows[entity_offsets[e]:entity_offsets[e + 1]]
+        # are the positions of e's mentions, in reading order
+        counts = [0] * (entity_count + 1)
+        for entity in self.entities:
+            counts[entity + 1] += 1
+        for entity in range(entity_count):
+            counts[entity + 1] += counts[entity]
+        self.entity_offsets = array('l', counts)
+        position = counts[:-1]
+        entity_rows = [0] * len(rows)
+        for row, entity in enumerate(self.entities):
+            entity_rows[position[entity]] = row
+            position[entity] += 1
+        self.entity_rows = array('l', entity_rows)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def range(self, low: int, high: int) -> range:
+        """Positions of the mentions with ``low <= ordinal < high``."""
+        return range(bisect_left(self.ordinals, low), bisect_left(self.ordinals, high))
+
+    def nbytes(self) -> int:
+        columns = (self.ordinals, self.span_starts, self.mention_ids, self.entities, self.span_ends,
+                   self.confidences, self.source_types, self.entity_offsets, self.entity_rows)
+        return sum(a.itemsize * len(a) for a in columns)
+
+
+class MentionIndex:
+    """Mentions of entities in slokas, served from memory."""
+
+    def __init__(self, kg_service, refresh_interval: Optional[float] = None):
+        self.kg_service = kg_service
+        self.refresh_interval = (
+            Config.KG_MENTION_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self._lock = threading.Lock()
+        self._entity_ids: List[str] = []
+        self._entity_index: Dict[str, int] = {}
+        self._source_types: List[str] = []
+        self._columns: Optional[_MentionColumns] = None
+        self._unplaced: Dict[str, List[Dict]] = {}
+        self._loaded_signature = None
+        self._last_check = 0.0
+        self.unplaced = 0
+        self.loaded_at: Optional[float] = None
+        self.reload()
+
+    def _signature(self, conn) -> Tuple:
+        try:
+            row = conn.execute("SELECT value FROM kg_counters WHERE name = 'mention_changes'").fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if row is not None:
+            return ('changes', row[0])
+        # Not migrated (e.g. a read-only database): fall back to count and max id
+        return tuple(conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM text_entity_mentions"
+        ).fetchone())
+
+    def reload(self):
+        """Load every mention into fresh arrays."""
+        started = time.perf_counter()
+        conn = self.kg_service.get_connection()
+        with self._lock:
+            signature = self._signature(conn)
+            entity_ids: List[str] = []
+            entity_index: Dict[str, int] = {}
+            source_types: List[str] = []
+            source_index: Dict[str, int] = {}
+            rows = []
+            unplaced: Dict[str, List[Dict]] = {}
+            for mention_id, text_unit_id, entity_id, span_start, span_end, confidence, source_type in conn.execute(
+                "SELECT id, text_unit_id, entity_id, span_start, span_end, confidence, source_type "
+                "FROM text_entity_mentions"
+            ):
+                if confidence is None:
+                    confidence = 1.0
+                ordinal = parse_text_unit_id(text_unit_id)
+                if ordinal is None:
+                    unplaced.setdefault(entity_id, []).append({
+                        'id': mention_id,
+                        'text_unit_id': text_unit_id,
+                        'entity_id': entity_id,
+                        'span_start': span_start,
+                        'span_end': span_end,
+                        'confidence': confidence,
+                        'source_type': source_type
+                    })
+                    continue
+                entity = entity_index.get(entity_id)
+                if entity is None:
+                    entity = entity_index[entity_id] = len(entity_ids)
+                    entity_ids.append(entity_id)
+                source = source_index.get(source_type)
+                if source is None:
+                    source = source_index[source_type] = len(source_types)
+                    source_types.append(source_type)
+                rows.append((ordinal, span_start, mention_id, entity, span_end, confidence, source))
+
+            columns = _MentionColumns(rows, len(entity_ids))
+            self._entity_ids, self._entity_index = entity_ids, entity_index
+            self._source_types = source_types
+            self._columns = columns
+            self._unplaced = unplaced
+            self._loaded_signature = signature
+            self._last_check = time.monotonic()
+            self.unplaced = sum(len(mentions) for mentions in unplaced.values())
+            self.loaded_at = time.time()
+        if self.unplaced:
+            logger.warning(f"Mention index found {self.unplaced} mentions without a kanda.sarga.sloka "
+                           f"text unit; they are served by entity only")
+        logger.info(f"Loaded mention index: {len(columns)} mentions of {len(entity_ids)} entities "
+                    f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def refresh(self, force: bool = False):
+        """Reload if mentions were written since the last load."""
+        if not force and time.monotonic() - self._last_check < self.refresh_interval:
+            return
+        self._last_check = time.monotonic()
+        if self._signature(self.kg_service.get_connection()) != self._loaded_signature:
+            self.reload()
+
+    def _snapshot(self):
+        # A reload swaps all of these at once under the lock
+        with self._lock:
+            return self._columns, self._entity_ids, self._entity_index, self._source_types, self._unplaced
+
+    def _mention(self, columns: _MentionColumns, entity_ids: List[str],
+                 source_types: List[str], row: int) -> Dict:
+        return {
+            'id': columns.mention_ids[row],
+            'text_unit_id': format_text_unit_id(columns.ordinals[row]),
+            'entity_id': entity_ids[columns.entities[row]],
+            'span_start': columns.span_starts[row],
+            'span_end': columns.span_ends[row],
+            'confidence': columns.confidences[row],
+            'source_type': source_types[columns.source_types[row]]
+        }
+
+    def _mentions_between(self, low: int, high: int) -> List[Dict]:
+        self.refresh()
+        columns, entity_ids, _, source_types, _ = self._snapshot()
+        return [self._mention(columns, entity_ids, source_types, row) for row in columns.range(low, high)]
+
+    def mentions_in_text_unit(self, text_unit_id: str) -> List[Dict]:
+        """Mentions in one sloka, by position in the text."""
+        ordinal = parse_text_unit_id(text_unit_id)
+        if ordinal is None:
+            return []
+        return self._mentions_between(ordinal, ordinal + 1)
+
+    def mentions_in_sarga(self, kanda: int, sarga: int) -> List[Dict]:
+        """Mentions in every sloka of a sarga, in reading order."""
+        return self._mentions_between(sloka_ordinal(kanda, sarga, 0), sloka_ordinal(kanda, sarga + 1, 0))
+
+    def mentions_of_entity(self, kg_id: str) -> List[Dict]:
+        """Mentions of one entity, in reading order, then those outside it."""
+        self.refresh()
+        columns, entity_ids, entity_index, source_types, unplaced = self._snapshot()
+        mentions = []
+        entity = entity_index.get(kg_id)
+        if entity is not None and entity + 1 < len(columns.entity_offsets):
+            mentions = [
+                self._mention(columns, entity_ids, source_types, columns.entity_rows[slot])
+                for slot in range(columns.entity_offsets[entity], columns.entity_offsets[entity + 1])
+            ]
+        return mentions + [dict(mention) for mention in unplaced.get(kg_id, ())]
+
+    def entities_in_text_unit(self, text_unit_id: str) -> List[Dict]:
+        """
+        Entities mentioned in one sloka, in the shape of
+        ``KGDatabaseService.get_entities_in_text_unit``: one entry per mention.
+        """
+        mentions = self.mentions_in_text_unit(text_unit_id)
+        details = self.kg_service.get_entities_by_ids(list({m['entity_id'] for m in mentions}))
+        return [
+            dict(details[mention['entity_id']], mention={
+                'span_start': mention['span_start'],
+                'span_end': mention['span_end'],
+                'confidence': mention['confidence']
+            })
+            for mention in mentions if mention['entity_id'] in details
+        ]
+
+    def annotate_sarga(self, kanda: int, sarga: int) -> Dict:
+        """
+        Entity annotations for every sloka of a sarga.
+
+        Returns ``annotations`` (the mentions of each sloka, by text unit id)
+        and ``entities`` (type and labels of each entity mentioned), so every
+        entity's details appear once however often it is mentioned.
+        """
+        mentions = self.mentions_in_sarga(kanda, sarga)
+        details = self.kg_service.get_entities_by_ids(list({m['entity_id'] for m in mentions}))
+
+        annotations: Dict[str, List[Dict]] = {}
+        for mention in mentions:
+            if mention['entity_id'] not in details:
+                continue
+            annotations.setdefault(mention.pop('text_unit_id'), []).append(mention)
+        return {
+            'annotations': annotations,
+            'entities': {
+                kg_id: {'entity_type': entity['entity_type'], 'labels': entity['labels']}
+                for kg_id, entity in details.items()
+            },
+            'mention_count': sum(len(items) for items in annotations.values())
+        }
+
+    def stats(self) -> Dict:
+        columns, entity_ids, _, _, _ = self._snapshot()
+        return {
+            'mentions': len(columns),
+            'entities': len(entity_ids),
+            'unplaced': self.unplaced,
+            'memory_bytes': columns.nbytes(),
+            'loaded_at': self.loaded_at
+        }
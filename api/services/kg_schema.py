@@ -0,0 +1,655 @@
+"""
+Versioned schema migrations for the knowledge graph tables.
+
+``kg_entities`` stores labels and properties as JSON strings, which made
+name lookups full-table ``LIKE`` scans and put validation state inside the
+properties blob. Migration 1 adds:
+
+- ``entity_labels``: one row per (entity, language) label, with a
+  lowercased copy indexed for lookups by name;
+- ``entity_epithets``: the epithets and alternative names of each entity;
+- validation and confidence as real columns on ``kg_entities``, backfilled
+  from the properties JSON.
+
+The JSON columns stay the format writers use: triggers on ``kg_entities``
+keep the normalized tables in sync with every insert, update and delete,
+so existing writers (extraction, deduplication, scripts) need no changes.
+
+Migration 2 adds full-text search over entity names: every label,
+epithet and alternative name is a row of ``entity_search_names``, indexed
+by two FTS5 tables kept in sync by triggers on the normalized tables:
+
+- ``entity_search`` (unicode61, diacritics folded, prefix indexes) for
+  word-prefix autocomplete ranked by bm25;
+- ``entity_search_trigram`` (trigram tokenizer) for substring matches.
+  It is skipped on SQLite builds older than 3.34, which lack the tokenizer.
+
+Migration 3 adds ``kg_relationship_changes``, an append-only log of
+inserted and deleted relationships written by triggers on
+``kg_relationships``. The in-process graph (``kg_graph``) replays it to
+stay current without reloading every relationship.
+
+Migration 4 materializes the aggregates the dashboards show, kept current
+by triggers so reading them never rescans the entity or mention tables:
+
+- ``kg_entity_stats``: entity counts and confidence sums per (type,
+  validation status, confidence range). ``kg_entity_stat_keys`` records
+  the group each entity is counted in, so a row replaced by
+  ``INSERT OR REPLACE`` (which fires no delete trigger) is uncounted first;
+- ``kg_entity_mention_counts``: mentions per entity, indexed by count for
+  the top entities;
+- ``kg_counters``: total relationships and mentions.
+
+Migration 5 adds a ``mention_changes`` counter to ``kg_counters``, bumped
+by every write to ``text_entity_mentions``, which tells the in-process
+mention index (``kg_mention_index``) when to reload.
+
+Migration 6 adds the extraction manifest (``extraction_manifest``):
+``kg_extraction_manifest`` records, per sloka, the hash of the text it was
+last extracted from and the version of the pattern set used, and
+``kg_extraction_patterns`` the fingerprint of each entity's patterns in the
+last completed run, so re-extraction can tell which patterns changed.
+
+Migration 7 indexes ``slokas`` by (kanda, sarga, sloka), the key batch
+consumers page through with ``corpus_iterator``.
+
+Migration 8 adds each entity's id to ``entity_search_names`` (kind
+``'id'``), kept in sync by triggers on ``kg_entities``, so search still
+finds entities by id slug as the ``LIKE`` scan over ``kg_id`` did.
+
+The applied version is tracked in ``PRAGMA user_version``.
+"""
+import logging
+import sqlite3
+from typing import Callable, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Columns every kg_entities table should have, with their definitions.
+# Older databases may predate scripts/enhance_kg_tables_for_discovery.sql.
+ENTITY_COLUMNS = (
+    ('validation_status', "TEXT DEFAULT 'pending'"),
+    ('validation_notes', "TEXT DEFAULT ''"),
+    ('validated_by', "TEXT DEFAULT ''"),
+    ('validated_at', "TIMESTAMP DEFAULT NULL"),
+    ('extraction_method', "TEXT DEFAULT 'automated'"),
+    ('extraction_confidence', "REAL DEFAULT 0.0"),
+    ('validation_confidence', "REAL DEFAULT NULL"),
+    ('needs_manual_review', "INTEGER DEFAULT 0"),
+)
+
+MENTION_COLUMNS = (
+    ('extraction_metadata', "TEXT DEFAULT '{}'"),
+    ('validation_status', "TEXT DEFAULT 'pending'"),
+)
+
+# Kinds of names stored in entity_epithets, keyed by their properties field
+EPITHET_KINDS = (
+    ('epithets', 'epithet'),
+    ('alternative_names', 'alternative_name'),
+)
+
+NORMALIZED_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS entity_labels (
+        entity_id TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        label TEXT NOT NULL,
+        label_normalized TEXT NOT NULL,        -- lower(label), for lookups by name
+        PRIMARY KEY (entity_id, lang)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entity_labels_normalized ON entity_labels(label_normalized, entity_id)",
+    """
+    CREATE TABLE IF NOT EXISTS entity_epithets (
+        entity_id TEXT NOT NULL,
+        kind TEXT NOT NULL,                    -- 'epithet' or 'alternative_name'
+        epithet TEXT NOT NULL,
+        epithet_normalized TEXT NOT NULL,
+        position INTEGER NOT NULL,             -- order within the properties list
+        PRIMARY KEY (entity_id, kind, epithet)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entity_epithets_normalized ON entity_epithets(epithet_normalized, entity_id)",
+    "CREATE INDEX IF NOT EXISTS idx_kg_entities_validation_confidence "
+    "ON kg_entities(validation_status, extraction_confidence DESC)",
+)
+
+
+def _sync_statements(entity: str) -> str:
+    """
+    SQL that rebuilds the normalized rows of one entity from its JSON columns.
+
+    ``entity`` is the row to read (``new`` in a trigger); malformed JSON is
+    treated as empty rather than failing the write.
+    """
+    labels = f"CASE WHEN json_valid({entity}.labels) THEN {entity}.labels ELSE '{{}}' END"
+    properties = f"CASE WHEN json_valid({entity}.properties) THEN {entity}.properties ELSE '{{}}' END"
+    epithet_selects = '\n            UNION ALL\n'.join(
+        f"""            SELECT {entity}.kg_id, '{kind}', value, lower(value), COALESCE(key, 0)
+            FROM json_each({properties}, '$.{field}')
+            WHERE type = 'text'"""
+        for field, kind in EPITHET_KINDS
+    )
+    return f"""
+        DELETE FROM entity_labels WHERE entity_id = {entity}.kg_id;
+        INSERT OR REPLACE INTO entity_labels (entity_id, lang, label, label_normalized)
+            SELECT {entity}.kg_id, key, value, lower(value)
+            FROM json_each({labels})
+            WHERE type = 'text';
+        DELETE FROM entity_epithets WHERE entity_id = {entity}.kg_id;
+        INSERT OR IGNORE INTO entity_epithets (entity_id, kind, epithet, epithet_normalized, position)
+{epithet_selects};
+    """
+
+
+def _triggers() -> Tuple[str, ...]:
+    return (
+        # INSERT OR REPLACE deletes the old row without firing delete
+        # triggers, so the insert trigger clears stale rows itself
+        f"""
+        CREATE TRIGGER IF NOT EXISTS kg_entities_normalize_insert
+        AFTER INSERT ON kg_entities
+        BEGIN
+            {_sync_statements('new')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS kg_entities_normalize_update
+        AFTER UPDATE OF kg_id, labels, properties ON kg_entities
+        BEGIN
+            DELETE FROM entity_labels WHERE entity_id = old.kg_id;
+            DELETE FROM entity_epithets WHERE entity_id = old.kg_id;
+            {_sync_statements('new')}
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS kg_entities_normalize_delete
+        AFTER DELETE ON kg_entities
+        BEGIN
+            DELETE FROM entity_labels WHERE entity_id = old.kg_id;
+            DELETE FROM entity_epithets WHERE entity_id = old.kg_id;
+        END
+        """,
+    )
+
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def _migrate_normalized_entities(conn: sqlite3.Connection):
+    """Migration 1: labels and epithets tables, first-class validation columns."""
+    _add_missing_columns(conn, 'kg_entities', ENTITY_COLUMNS)
+    if _table_exists(conn, 'text_entity_mentions'):
+        _add_missing_columns(conn, 'text_entity_mentions', MENTION_COLUMNS)
+
+    # Validation state written into properties by the bulk validation tools
+    # wins over the column default it was never copied to, but not over a
+    # status set in the column (the extractor always writes 'pending' into
+    # properties, and validate_entity only updates the column)
+    properties_win = """
+        (validation_status IS NULL OR validation_status = 'pending')
+        AND COALESCE(json_extract(properties, '$.validation_status'), 'pending') != 'pending'
+    """
+    conn.execute(f"""
+        UPDATE kg_entities SET
+            validation_status = CASE WHEN {properties_win}
+                THEN json_extract(properties, '$.validation_status')
+                ELSE COALESCE(validation_status, 'pending')
+            END,
+            validation_confidence = CASE WHEN {properties_win}
+                THEN COALESCE(json_extract(properties, '$.validation_confidence'), validation_confidence)
+                ELSE COALESCE(validation_confidence, json_extract(properties, '$.validation_confidence'))
+            END,
+            needs_manual_review = CASE WHEN {properties_win}
+                THEN COALESCE(json_extract(properties, '$.needs_manual_review'), needs_manual_review, 0)
+                ELSE COALESCE(needs_manual_review, json_extract(properties, '$.needs_manual_review'), 0)
+            END,
+            extraction_confidence = CASE
+                WHEN extraction_confidence IS NULL OR extraction_confidence = 0
+                THEN COALESCE(json_extract(properties, '$.confidence_score'), extraction_confidence, 0.0)
+                ELSE extraction_confidence
+            END
+        WHERE json_valid(properties)
+    """)
+
+    for statement in NORMALIZED_TABLES:
+        conn.execute(statement)
+
+    conn.execute("DELETE FROM entity_labels")
+    conn.execute("DELETE FROM entity_epithets")
+    conn.execute("""
+        INSERT OR REPLACE INTO entity_labels (entity_id, lang, label, label_normalized)
+        SELECT e.kg_id, l.key, l.value, lower(l.value)
+        FROM kg_entities e, json_each(CASE WHEN json_valid(e.labels) THEN e.labels ELSE '{}' END) l
+        WHERE l.type = 'text'
+    """)
+    for field, kind in EPITHET_KINDS:
+        conn.execute(f"""
+            INSERT OR IGNORE INTO entity_epithets (entity_id, kind, epithet, epithet_normalized, position)
+            SELECT e.kg_id, ?, p.value, lower(p.value), COALESCE(p.key, 0)
+            FROM kg_entities e,
+                 json_each(CASE WHEN json_valid(e.properties) THEN e.properties ELSE '{{}}' END,
+                           '$.{field}') p
+            WHERE p.type = 'text'
+        """, (kind,))
+
+    for trigger in _triggers():
+        conn.execute(trigger)
+
+
+# Full-text indexes over entity_search_names, by table name
+SEARCH_INDEXES = (
+    ('entity_search', "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'"),
+    ('entity_search_trigram', "tokenize = 'trigram'"),
+)
+
+
+def _migrate_entity_search(conn: sqlite3.Connection):
+    """Migration 2: FTS5 indexes over entity labels, epithets and alternative names."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entity_search_names (
+            id INTEGER PRIMARY KEY,
+            entity_id TEXT NOT NULL,
+            kind TEXT NOT NULL,                -- 'label', 'epithet', 'alternative_name' or 'id'
+            lang TEXT,                         -- labels only
+            name TEXT NOT NULL
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_entity_search_names_entity ON entity_search_names(entity_id, kind)"
+    )
+
+    indexes = []
+    for table, options in SEARCH_INDEXES:
+        try:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+                    name, content = 'entity_search_names', content_rowid = 'id', {options}
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            if table == 'entity_search':
+                raise
+            logger.warning(f"Skipping {table}: {e}")
+            continue
+        indexes.append(table)
+
+    conn.execute("DELETE FROM entity_search_names")
+    conn.execute("""
+        INSERT INTO entity_search_names (entity_id, kind, lang, name)
+        SELECT entity_id, 'label', lang, label FROM entity_labels
+        UNION ALL
+        SELECT entity_id, kind, NULL, epithet FROM entity_epithets
+    """)
+    for table in indexes:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+    # External-content FTS tables don't track their content table themselves
+    inserts = ''.join(
+        f"INSERT INTO {table}(rowid, name) VALUES (new.id, new.name);\n" for table in indexes
+    )
+    deletes = ''.join(
+        f"INSERT INTO {table}({table}, rowid, name) VALUES ('delete', old.id, old.name);\n"
+        for table in indexes
+    )
+    label_insert = """
+        INSERT INTO entity_search_names (entity_id, kind, lang, name)
+        VALUES (new.entity_id, 'label', new.lang, new.label);
+    """
+    label_delete = """
+        DELETE FROM entity_search_names
+        WHERE entity_id = old.entity_id AND kind = 'label' AND lang = old.lang;
+    """
+    epithet_insert = """
+        INSERT INTO entity_search_names (entity_id, kind, lang, name)
+        VALUES (new.entity_id, new.kind, NULL, new.epithet);
+    """
+    epithet_delete = """
+        DELETE FROM entity_search_names
+        WHERE entity_id = old.entity_id AND kind = old.kind AND name = old.epithet;
+    """
+    triggers = (
+        ('entity_search_names_insert', 'AFTER INSERT ON entity_search_names', inserts),
+        ('entity_search_names_delete', 'AFTER DELETE ON entity_search_names', deletes),
+        ('entity_search_names_update', 'AFTER UPDATE ON entity_search_names', deletes + inserts),
+        ('entity_labels_search_insert', 'AFTER INSERT ON entity_labels', label_insert),
+        ('entity_labels_search_delete', 'AFTER DELETE ON entity_labels', label_delete),
+        ('entity_labels_search_update', 'AFTER UPDATE ON entity_labels', label_delete + label_insert),
+        ('entity_epithets_search_insert', 'AFTER INSERT ON entity_epithets', epithet_insert),
+        ('entity_epithets_search_delete', 'AFTER DELETE ON entity_epithets', epithet_delete),
+        ('entity_epithets_search_update', 'AFTER UPDATE ON entity_epithets', epithet_delete + epithet_insert),
+    )
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+
+def _migrate_relationship_changes(conn: sqlite3.Connection):
+    """Migration 3: change log of kg_relationships for incremental graph refreshes."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kg_relationship_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,                  -- 'insert' or 'delete'
+            relationship_id INTEGER NOT NULL,
+            subject_id TEXT NOT NULL,
+            predicate TEXT NOT NULL,
+            object_id TEXT NOT NULL
+        )
+    """)
+    if not _table_exists(conn, 'kg_relationships'):
+        logger.warning("No kg_relationships table; relationship change log left without triggers")
+        return
+
+    def log(op, row):
+        return (
+            f"INSERT INTO kg_relationship_changes (op, relationship_id, subject_id, predicate, object_id) "
+            f"VALUES ('{op}', {row}.id, {row}.subject_id, {row}.predicate, {row}.object_id);"
+        )
+
+    triggers = (
+        ('kg_relationships_log_insert', 'AFTER INSERT ON kg_relationships', log('insert', 'new')),
+        ('kg_relationships_log_delete', 'AFTER DELETE ON kg_relationships', log('delete', 'old')),
+        ('kg_relationships_log_update', 'AFTER UPDATE OF id, subject_id, predicate, object_id ON kg_relationships',
+         log('delete', 'old') + log('insert', 'new')),
+    )
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+
+# Dashboard confidence ranges as (label, lower bound), highest first. Entities
+# without a positive extraction confidence are counted under ''.
+CONFIDENCE_RANGES = (
+    ('90-100%', 0.9),
+    ('80-89%', 0.8),
+    ('70-79%', 0.7),
+    ('60-69%', 0.6),
+    ('0-59%', 0.0),
+)
+
+SUMMARY_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS kg_entity_stats (
+        entity_type TEXT NOT NULL,
+        validation_status TEXT NOT NULL,
+        confidence_range TEXT NOT NULL,        -- a CONFIDENCE_RANGES label, or ''
+        entity_count INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (entity_type, validation_status, confidence_range)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS kg_entity_stat_keys (
+        kg_id TEXT PRIMARY KEY,
+        entity_type TEXT NOT NULL,
+        validation_status TEXT NOT NULL,
+        confidence_range TEXT NOT NULL,
+        confidence REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS kg_entity_mention_counts (
+        entity_id TEXT PRIMARY KEY,
+        mention_count INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_kg_entity_mention_counts_top "
+    "ON kg_entity_mention_counts(mention_count DESC, entity_id)",
+    """
+    CREATE TABLE IF NOT EXISTS kg_counters (
+        name TEXT PRIMARY KEY,                 -- 'relationships' or 'mentions'
+        value INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def _stat_key_columns(entity: str) -> Tuple[str, str, str, str]:
+    """SQL for the kg_entity_stats group and counted confidence of a kg_entities row."""
+    confidence = f"{entity}.extraction_confidence"
+    ranges = ' '.join(
+        f"WHEN {confidence} >= {bound} THEN '{label}'" for label, bound in CONFIDENCE_RANGES[:-1]
+    )
+    return (
+        f"{entity}.entity_type",
+        f"COALESCE({entity}.validation_status, 'pending')",
+        f"CASE {ranges} WHEN {confidence} > 0 THEN '{CONFIDENCE_RANGES[-1][0]}' ELSE '' END",
+        f"CASE WHEN {confidence} > 0 THEN {confidence} ELSE 0 END",
+    )
+
+
+def _entity_stats_triggers() -> Tuple[Tuple[str, str, str], ...]:
+    def uncount(kg_id):
+        key = f"SELECT entity_type, validation_status, confidence_range FROM kg_entity_stat_keys WHERE kg_id = {kg_id}"
+        return f"""
+            UPDATE kg_entity_stats SET
+                entity_count = entity_count - 1,
+                confidence_sum = confidence_sum - (SELECT confidence FROM kg_entity_stat_keys WHERE kg_id = {kg_id})
+            WHERE (entity_type, validation_status, confidence_range) = ({key});
+            DELETE FROM kg_entity_stat_keys WHERE kg_id = {kg_id};
+        """
+
+    entity_type, status, confidence_range, confidence = _stat_key_columns('new')
+    count = f"""
+        INSERT INTO kg_entity_stat_keys (kg_id, entity_type, validation_status, confidence_range, confidence)
+        VALUES (new.kg_id, {entity_type}, {status}, {confidence_range}, {confidence});
+        INSERT INTO kg_entity_stats (entity_type, validation_status, confidence_range, entity_count, confidence_sum)
+        VALUES ({entity_type}, {status}, {confidence_range}, 1, {confidence})
+        ON CONFLICT (entity_type, validation_status, confidence_range) DO UPDATE SET
+            entity_count = entity_count + 1,
+            confidence_sum = confidence_sum + excluded.confidence_sum;
+    """
+    return (
+        ('kg_entities_stats_insert', 'AFTER INSERT ON kg_entities', uncount('new.kg_id') + count),
+        ('kg_entities_stats_update',
+         'AFTER UPDATE OF kg_id, entity_type, validation_status, extraction_confidence ON kg_entities',
+         uncount('old.kg_id') + count),
+        ('kg_entities_stats_delete', 'AFTER DELETE ON kg_entities', uncount('old.kg_id')),
+    )
+
+
+def _mention_count_triggers() -> Tuple[Tuple[str, str, str], ...]:
+    def add(row):
+        return f"""
+            INSERT INTO kg_entity_mention_counts (entity_id, mention_count) VALUES ({row}.entity_id, 1)
+            ON CONFLICT (entity_id) DO UPDATE SET mention_count = mention_count + 1;
+        """
+
+    def remove(row):
+        return f"""
+            UPDATE kg_entity_mention_counts SET mention_count = mention_count - 1
+            WHERE entity_id = {row}.entity_id;
+            DELETE FROM kg_entity_mention_counts WHERE entity_id = {row}.entity_id AND mention_count <= 0;
+        """
+
+    def total(delta):
+        return f"UPDATE kg_counters SET value = value {delta} WHERE name = 'mentions';"
+
+    return (
+        ('text_entity_mentions_count_insert', 'AFTER INSERT ON text_entity_mentions', add('new') + total('+ 1')),
+        ('text_entity_mentions_count_delete', 'AFTER DELETE ON text_entity_mentions', remove('old') + total('- 1')),
+        ('text_entity_mentions_count_update', 'AFTER UPDATE OF entity_id ON text_entity_mentions',
+         remove('old') + add('new')),
+    )
+
+
+def _relationship_count_triggers() -> Tuple[Tuple[str, str, str], ...]:
+    return (
+        ('kg_relationships_count_insert', 'AFTER INSERT ON kg_relationships',
+         "UPDATE kg_counters SET value = value + 1 WHERE name = 'relationships';"),
+        ('kg_relationships_count_delete', 'AFTER DELETE ON kg_relationships',
+         "UPDATE kg_counters SET value = value - 1 WHERE name = 'relationships';"),
+    )
+
+
+def _migrate_summary_tables(conn: sqlite3.Connection):
+    """Migration 4: trigger-maintained entity, mention and relationship aggregates."""
+    for statement in SUMMARY_TABLES:
+        conn.execute(statement)
+    for table in ('kg_entity_stats', 'kg_entity_stat_keys', 'kg_entity_mention_counts', 'kg_counters'):
+        conn.execute(f"DELETE FROM {table}")
+
+    entity_type, status, confidence_range, confidence = _stat_key_columns('e')
+    conn.execute(f"""
+        INSERT INTO kg_entity_stat_keys (kg_id, entity_type, validation_status, confidence_range, confidence)
+        SELECT e.kg_id, {entity_type}, {status}, {confidence_range}, {confidence} FROM kg_entities e
+    """)
+    conn.execute("""
+        INSERT INTO kg_entity_stats (entity_type, validation_status, confidence_range, entity_count, confidence_sum)
+        SELECT entity_type, validation_status, confidence_range, COUNT(*), SUM(confidence)
+        FROM kg_entity_stat_keys
+        GROUP BY entity_type, validation_status, confidence_range
+    """)
+    triggers = list(_entity_stats_triggers())
+
+    for name, table, table_triggers in (
+        ('mentions', 'text_entity_mentions', _mention_count_triggers()),
+        ('relationships', 'kg_relationships', _relationship_count_triggers()),
+    ):
+        if not _table_exists(conn, table):
+            logger.warning(f"No {table} table; its counts stay at zero")
+            conn.execute("INSERT INTO kg_counters (name, value) VALUES (?, 0)", (name,))
+            continue
+        conn.execute(f"INSERT INTO kg_counters (name, value) SELECT ?, COUNT(*) FROM {table}", (name,))
+        triggers.extend(table_triggers)
+    if _table_exists(conn, 'text_entity_mentions'):
+        conn.execute("""
+            INSERT INTO kg_entity_mention_counts (entity_id, mention_count)
+            SELECT entity_id, COUNT(*) FROM text_entity_mentions GROUP BY entity_id
+        """)
+
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+
+def _migrate_mention_changes(conn: sqlite3.Connection):
+    """Migration 5: a counter of text_entity_mentions writes."""
+    conn.execute("INSERT OR REPLACE INTO kg_counters (name, value) VALUES ('mention_changes', 0)")
+    if not _table_exists(conn, 'text_entity_mentions'):
+        return
+
+    bump = "UPDATE kg_counters SET value = value + 1 WHERE name = 'mention_changes';"
+    for op in ('INSERT', 'DELETE', 'UPDATE'):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS text_entity_mentions_changes_{op.lower()}
+            AFTER {op} ON text_entity_mentions BEGIN {bump} END
+        """)
+
+
+def _migrate_extraction_manifest(conn: sqlite3.Connection):
+    """Migration 6: what each sloka was last extracted from, and with which patterns."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kg_extraction_manifest (
+            text_unit_id TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,        -- of the sloka's text, translation and meaning
+            pattern_version TEXT NOT NULL,     -- of the pattern set it was extracted with
+            mention_count INTEGER NOT NULL DEFAULT 0,
+            extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kg_extraction_patterns (
+            entity_id TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+
+def _migrate_sloka_position(conn: sqlite3.Connection):
+    """Migration 7: index slokas in reading order, for keyset pagination."""
+    if _table_exists(conn, 'slokas'):
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_slokas_position ON slokas(kanda_id, sarga_id, sloka_id)"
+        )
+
+
+
+def _migrate_entity_id_search(conn: sqlite3.Connection):
+    """Migration 8: entity ids as searchable names."""
+    conn.execute("DELETE FROM entity_search_names WHERE kind = 'id'")
+    conn.execute("""
+        INSERT INTO entity_search_names (entity_id, kind, lang, name)
+        SELECT kg_id, 'id', NULL, kg_id FROM kg_entities
+    """)
+
+    id_insert = """
+        INSERT INTO entity_search_names (entity_id, kind, lang, name)
+        VALUES (new.kg_id, 'id', NULL, new.kg_id);
+    """
+    id_delete = """
+        DELETE FROM entity_search_names WHERE entity_id = old.kg_id AND kind = 'id';
+    """
+    triggers = (
+        # INSERT OR REPLACE fires no delete trigger, so clear the replaced row first
+        ('kg_entities_id_search_insert', 'AFTER INSERT ON kg_entities',
+         id_delete.replace('old.', 'new.') + id_insert),
+        ('kg_entities_id_search_update', 'AFTER UPDATE OF kg_id ON kg_entities', id_delete + id_insert),
+        ('kg_entities_id_search_delete', 'AFTER DELETE ON kg_entities', id_delete),
+    )
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+
+# Applied in order; migration N brings the database to user_version N
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _migrate_normalized_entities,
+    _migrate_entity_search,
+    _migrate_relationship_changes,
+    _migrate_summary_tables,
+    _migrate_mention_changes,
+    _migrate_extraction_manifest,
+    _migrate_sloka_position,
+    _migrate_entity_id_search,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_kg_schema(pool) -> int:
+    """
+    Bring the database of a connection pool up to SCHEMA_VERSION.
+
+    Each migration runs in its own immediate transaction, so concurrent
+    workers migrate the database once. Databases without KG tables are left
+    alone. Returns the resulting schema version.
+    """
+    conn = pool.connection()
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+    if not _table_exists(conn, 'kg_entities'):
+        return get_schema_version(conn)
+
+    for target, migration in enumerate(MIGRATIONS, start=1):
+        with pool.write() as conn:
+            # Re-read under the lock: another process may have migrated
+            if get_schema_version(conn) >= target:
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+        logger.info(f"Migrated KG schema of {pool.db_path} to version {target}")
+    return get_schema_version(conn)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from api.services.connection_pool import get_connection_pool
+
+    logging.basicConfig(level=logging.INFO)
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "data/db/ramayanam.db"
+    print(f"{db_path}: KG schema version {migrate_kg_schema(get_connection_pool(db_path))}")
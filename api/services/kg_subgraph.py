@@ -0,0 +1,208 @@
+"""
+Radius-limited ego networks for the knowledge graph visualization.
+
+The graph view used to assemble its graph from an ``/entities/<id>`` and a
+``/relationships/<id>`` request per entity. ``SubgraphService`` returns the
+whole neighborhood of one or more seed entities in one response, in the
+``GraphData`` shape the UI renders: topology from the in-memory ``KGGraph``,
+node details (labels, type, mention counts) from a fixed number of batched
+queries, and a radial layout to start the force simulation from.
+
+Responses are cached by their parameters for ``SUBGRAPH_CACHE_TTL`` seconds,
+and dropped as soon as the relationship graph changes.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_MAX_NODES = 150
+DEFAULT_MAX_EDGES = 500
+
+# Hard caps, whatever the caller asks for
+MAX_NODES = 1000
+MAX_EDGES = 5000
+MAX_RADIUS = 3
+
+SUBGRAPH_CACHE_TTL = 300
+SUBGRAPH_CACHE_SIZE = 128
+
+# Distance between the rings of the radial layout, in layout units
+RING_SPACING = 150.0
+
+
+def radial_layout(nodes: List[Dict], edges: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """
+    Place seeds at the centre and each further node on the ring of its
+    distance, next to the node it was reached from.
+
+    Returns ``{kg_id: {'x': ..., 'y': ...}}``. Deterministic, so cached and
+    fresh responses lay out identically.
+    """
+    positions: Dict[str, Dict[str, float]] = {}
+    angles: Dict[str, float] = {}
+    distance = {node['kg_id']: node['distance'] for node in nodes}
+
+    neighbors: Dict[str, List[str]] = {}
+    for edge in edges:
+        neighbors.setdefault(edge['subject_id'], []).append(edge['object_id'])
+        neighbors.setdefault(edge['object_id'], []).append(edge['subject_id'])
+
+    rings: Dict[int, List[str]] = {}
+    for node in nodes:
+        rings.setdefault(node['distance'], []).append(node['kg_id'])
+
+    for depth in sorted(rings):
+        ring = rings[depth]
+        if depth == 0:
+            # Several seeds sit on a small inner circle
+            radius = 0.0 if len(ring) == 1 else RING_SPACING / 3
+            order = ring
+        else:
+            radius = RING_SPACING * depth
+
+            def parent_angle(kg_id):
+                parents = [angles[p] for p in neighbors.get(kg_id, ()) if distance.get(p) == depth - 1]
+                return min(parents) if parents else 0.0
+
+            order = sorted(ring, key=lambda kg_id: (parent_angle(kg_id), kg_id))
+        for i, kg_id in enumerate(order):
+            angle = 2 * math.pi * i / len(order)
+            angles[kg_id] = angle
+            positions[kg_id] = {
+                'x': round(radius * math.cos(angle), 1),
+                'y': round(radius * math.sin(angle), 1)
+            }
+    return positions
+
+
+class SubgraphService:
+    """Builds and caches ego-network subgraphs for the graph visualization."""
+
+    def __init__(self, kg_service, kg_graph):
+        self.kg_service = kg_service
+        self.kg_graph = kg_graph
+        self.logger = logging.getLogger(__name__)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {'hits': 0, 'misses': 0}
+
+    def _cache_key(self, *parts) -> str:
+        return hashlib.md5(repr(parts).encode()).hexdigest()
+
+    def _get_cached(self, key: str, version: int) -> Optional[Dict]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                cached_at, cached_version, result = entry
+                if cached_version == version and time.time() - cached_at < SUBGRAPH_CACHE_TTL:
+                    self._cache.move_to_end(key)
+                    self._cache_stats['hits'] += 1
+                    return result
+                del self._cache[key]
+            self._cache_stats['misses'] += 1
+            return None
+
+    def _put_cached(self, key: str, version: int, result: Dict):
+        with self._cache_lock:
+            self._cache[key] = (time.time(), version, result)
+            while len(self._cache) > SUBGRAPH_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        with self._cache_lock:
+            return dict(self._cache_stats, size=len(self._cache))
+
+    def get_subgraph(self, seeds: Iterable[str], radius: int = 1, entity_types: Optional[Iterable[str]] = None,
+                     predicates: Optional[Iterable[str]] = None, direction: str = 'both',
+                     max_nodes: int = DEFAULT_MAX_NODES, max_edges: int = DEFAULT_MAX_EDGES) -> Dict:
+        """
+        Ego network of ``seeds`` as ``{'nodes', 'edges', 'metadata'}``.
+
+        ``entity_types`` restricts the non-seed nodes (and so the paths
+        through them) to those types; ``predicates`` and ``direction``
+        restrict the relationships followed and shown.
+        """
+        seeds = list(dict.fromkeys(seeds))
+        if not seeds:
+            raise ValueError("At least one seed entity is required")
+        radius = max(0, min(radius, MAX_RADIUS))
+        max_nodes = max(len(seeds), min(max_nodes, MAX_NODES))
+        max_edges = max(0, min(max_edges, MAX_EDGES))
+        entity_types = sorted(set(entity_types)) if entity_types else None
+        predicates = sorted(set(predicates)) if predicates else None
+
+        # Refresh first, so the version read below is the one the result reflects
+        self.kg_graph.refresh()
+        version = self.kg_graph.version
+        key = self._cache_key(tuple(sorted(seeds)), radius, entity_types, predicates, direction,
+                              max_nodes, max_edges)
+        cached = self._get_cached(key, version)
+        if cached is not None:
+            return cached
+
+        allow = None
+        if entity_types:
+            def allow(kg_ids):
+                types = self.kg_service.get_entity_types(kg_ids)
+                return {kg_id for kg_id, entity_type in types.items() if entity_type in entity_types}
+
+        network = self.kg_graph.ego_network(
+            seeds, radius=radius, direction=direction, predicates=predicates,
+            max_nodes=max_nodes, max_edges=max_edges, allow=allow
+        )
+        result = self._build_graph_data(seeds, network, radius)
+        self._put_cached(key, version, result)
+        return result
+
+    def _build_graph_data(self, seeds: List[str], network: Dict, radius: int) -> Dict:
+        summaries = self.kg_service.get_entity_summaries([node['kg_id'] for node in network['nodes']])
+        positions = radial_layout(network['nodes'], network['edges'])
+        max_mentions = max((s['mention_count'] for s in summaries.values()), default=0) or 1
+
+        nodes = []
+        for node in network['nodes']:
+            kg_id = node['kg_id']
+            summary = summaries.get(kg_id, {})
+            labels = summary.get('labels', {})
+            mentions = summary.get('mention_count', 0)
+            nodes.append({
+                'id': kg_id,
+                'name': labels.get('en') or kg_id.rsplit('/', 1)[-1],
+                'sanskritName': labels.get('sa'),
+                'type': summary.get('entity_type'),
+                'mentions': mentions,
+                'relevance': 1.0 if node['distance'] == 0 else round(mentions / max_mentions, 3),
+                'confidence': summary.get('confidence'),
+                'epithets': summary.get('epithets', []),
+                'distance': node['distance'],
+                'seed': node['distance'] == 0,
+                'x': positions[kg_id]['x'],
+                'y': positions[kg_id]['y']
+            })
+
+        edges = [
+            {
+                'source': edge['subject_id'],
+                'target': edge['object_id'],
+                'relationship': edge['predicate'],
+                'weight': edge['count']
+            }
+            for edge in network['edges']
+        ]
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'metadata': {
+                'centerEntity': seeds[0],
+                'seeds': seeds,
+                'maxDepth': radius,
+                'totalEntities': len(nodes),
+                'truncated': network['truncated'],
+                'layout': 'radial'
+            }
+        }
@@ -0,0 +1,308 @@
+"""
+In-process metrics with a Prometheus text exposition.
+
+Counters, histograms and callback gauges are registered in a global
+``MetricsRegistry``; ``/metrics`` renders them in the Prometheus text
+format (version 0.0.4). Histograms export cumulative buckets for
+aggregation across workers, plus p50/p95/p99 over a sliding window of
+recent observations as a companion summary (``<name>_quantiles``).
+
+Metrics are per process: under gunicorn each worker reports its own.
+"""
+import bisect
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow scans
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra.items())
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def quantile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank quantile of an already sorted sequence."""
+    if not sorted_values:
+        return float('nan')
+    rank = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class _Metric:
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self, name=None, type_name=None) -> List[str]:
+        name = name or self.name
+        return [
+            f"# HELP {name} {self.documentation}",
+            f"# TYPE {name} {type_name or self.type_name}"
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally labelled."""
+
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    def __init__(self, bucket_count: int, window: int):
+        self.bucket_counts = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+
+class Histogram(_Metric):
+    """
+    Bucketed distribution of observations (e.g. latencies in seconds).
+
+    A sliding window of the most recent ``window`` observations per label
+    set backs the p50/p95/p99 estimates.
+    """
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 window: int = 1024):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets), self.window)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series.bucket_counts[index] += 1
+            series.count += 1
+            series.sum += value
+            series.recent.append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def quantiles(self, **labels) -> Dict[float, float]:
+        """p50/p95/p99 over the recent observations of one label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            recent = sorted(series.recent) if series else []
+        return {q: quantile(recent, q) for q in QUANTILES}
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series.count if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [
+                (key, list(series.bucket_counts), series.count, series.sum, sorted(series.recent))
+                for key, series in sorted(self._series.items())
+            ]
+
+        lines = self._header()
+        for key, bucket_counts, count, total, _ in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, {'le': _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, {'le': '+Inf'})
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+
+        summary = f"{self.name}_quantiles"
+        lines.extend(self._header(summary, 'summary'))
+        for key, _, _, _, recent in snapshot:
+            for q in QUANTILES:
+                labels = _format_labels(self.labelnames, key, {'quantile': str(q)})
+                lines.append(f"{summary}{labels} {_format_value(quantile(recent, q))}")
+            lines.append(f"{summary}_sum{_format_labels(self.labelnames, key)} {_format_value(sum(recent))}")
+            lines.append(f"{summary}_count{_format_labels(self.labelnames, key)} {len(recent)}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """
+    Gauge whose values are read at scrape time.
+
+    The callback returns ``{label_values_tuple: value}`` (or a bare number
+    for an unlabelled gauge). Errors in the callback drop the gauge from
+    that scrape rather than failing it.
+    """
+
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, callback: Callable, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def collect(self) -> Dict[LabelValues, float]:
+        values = self.callback()
+        if values is None:
+            return {}
+        if not isinstance(values, dict):
+            return {(): values}
+        return {tuple(str(v) for v in key): value for key, value in values.items()}
+
+    def render(self) -> List[str]:
+        try:
+            values = sorted(self.collect().items())
+        except Exception:
+            return []
+        lines = self._header()
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics of the process, keyed by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, tuple(labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, tuple(labelnames), buckets)
+
+    def gauge_callback(self, name: str, documentation: str, callback: Callable,
+                       labelnames: Iterable[str] = ()) -> CallbackGauge:
+        """Register (or replace the callback of) a scrape-time gauge."""
+        gauge = self._get_or_create(CallbackGauge, name, documentation, callback, tuple(labelnames))
+        gauge.callback = callback
+        return gauge
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def instrument_methods(histogram: Histogram, label: str = 'operation', exclude: Iterable[str] = ()):
+    """
+    Class decorator that times every public method into ``histogram``,
+    labelled with the method name.
+    """
+    excluded = set(exclude)
+
+    def wrap(method, name):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**{label: name}):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_') or name in excluded or not callable(attribute) \
+                    or isinstance(attribute, (staticmethod, classmethod)):
+                continue
+            setattr(cls, name, wrap(attribute, name))
+        return cls
+
+    return decorate
+
+
+# Global metrics registry instance
+_metrics_registry = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -8,6 +8,78 @@ import time
 from collections import OrderedDict
 import weakref
 import gc
+import functools
+
+from api.services.metrics_service import get_metrics_registry
+from api.services.search_index import build_search_indices
+
+
+SEARCH_DURATION = get_metrics_registry().histogram(
+    'ramayanam_search_duration_seconds',
+    'Fuzzy search latency by search type, including cache hits',
+    ['search_type']
+)
+SEARCH_CACHE_REQUESTS = get_metrics_registry().counter(
+    'ramayanam_search_cache_requests_total',
+    'Search result cache lookups by search type and result (hit/miss)',
+    ['search_type', 'result']
+)
+
+
+# Fields a search result may carry, in the order they are serialized
+RESULT_FIELDS = ('sloka_number', 'sloka', 'translation', 'meaning', 'ratio', 'source')
+
+# Compact "ids + scores" projection for clients that fetch the text separately
+COMPACT_FIELDS = ('sloka_number', 'ratio')
+
+
+def resolve_result_fields(fields=None, compact=False):
+    """
+    Resolve a ``fields=`` projection into a tuple of result field names.
+
+    Args:
+        fields: Comma separated string or iterable of field names (None for all)
+        compact: Return only sloka ids and scores
+
+    Returns:
+        Tuple of field names (always including ``sloka_number`` and ``ratio``),
+        or None when the full payload is requested
+
+    Raises:
+        ValueError: If an unknown field name is requested
+    """
+    if compact:
+        return COMPACT_FIELDS
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    requested = [field.strip() for field in fields if field and field.strip()]
+    unknown = [field for field in requested if field not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown result fields: {', '.join(unknown)}")
+    if not requested:
+        return None
+    # Ids and scores are always kept: they identify and rank each result.
+    # Serialization order stays stable regardless of request order.
+    return tuple(
+        field for field in RESULT_FIELDS
+        if field in requested or field in COMPACT_FIELDS
+    )
+
+
+def _timed_search(search_type):
+    """Record the duration of a search method under ``search_type``."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._record_search(search_type, time.perf_counter() - start_time)
+        return wrapper
+    return decorator
 
 
 class OptimizedFuzzySearchService:
@@ -37,13 +109,16 @@ class OptimizedFuzzySearchService:
         )
         # Performance metrics
         self._search_stats = {'total_searches': 0, 'avg_response_time': 0}
+        self._stats_lock = threading.Lock()
 
-    def _get_cache_key(self, query, search_type, kanda=None, threshold=70):
+    def _get_cache_key(self, query, search_type, kanda=None, threshold=70, fields=None):
         """Generate a cache key for search results."""
         key_string = f"{search_type}:{query}:{kanda}:{threshold}"
+        if fields:
+            key_string += ":" + ",".join(fields)
         return hashlib.md5(key_string.encode()).hexdigest()
     
-    def _get_cached_result(self, cache_key):
+    def _get_cached_result(self, cache_key, search_type='unknown'):
         """Get cached search result if available and not expired."""
         with self._cache_lock:
             if cache_key in self._search_cache:
@@ -52,6 +127,7 @@ class OptimizedFuzzySearchService:
                     # Move to end (mark as recently used)
                     self._search_cache.move_to_end(cache_key)
                     self._cache_stats['hits'] += 1
+                    SEARCH_CACHE_REQUESTS.inc(search_type=search_type, result='hit')
                     return self._search_cache[cache_key]
                 else:
                     # Remove expired entry
@@ -60,6 +136,7 @@ class OptimizedFuzzySearchService:
                     self._cache_stats['evictions'] += 1
             
             self._cache_stats['misses'] += 1
+            SEARCH_CACHE_REQUESTS.inc(search_type=search_type, result='miss')
             return None
     
     def _cache_result(self, cache_key, result):
@@ -113,59 +190,47 @@ class OptimizedFuzzySearchService:
                 'total_hits': self._cache_stats['hits'],
                 'total_misses': self._cache_stats['misses'],
                 'total_evictions': self._cache_stats['evictions'],
-                'search_stats': self._search_stats.copy()
+                'search_stats': self.get_search_stats()
             }
 
+    def get_search_stats(self):
+        """Get search count and mean response time across all search methods."""
+        with self._stats_lock:
+            return self._search_stats.copy()
+
+    def _record_search(self, search_type, seconds):
+        """Update the running search statistics and the latency histogram."""
+        with self._stats_lock:
+            total_searches = self._search_stats['total_searches'] + 1
+            current_avg = self._search_stats['avg_response_time']
+            self._search_stats['total_searches'] = total_searches
+            self._search_stats['avg_response_time'] = (
+                (current_avg * (total_searches - 1) + seconds) / total_searches
+            )
+        SEARCH_DURATION.observe(seconds, search_type=search_type)
+
+    def get_executor_queue_depth(self):
+        """Number of search chunks waiting for a thread in the shared pool."""
+        return self._thread_pool._work_queue.qsize()
+
     def _build_search_indices(self):
-        """Pre-build optimized search indices with streaming support."""
+        """
+        Pre-build the compact columnar search indices (see ``search_index``).
+
+        The indices are a handful of large objects rather than a dict per
+        sloka, so when built in a pre-forking master they stay shared with
+        the workers instead of being copied on first read.
+        """
         self.logger.info("Building optimized search indices...")
         start_time = time.time()
         
-        self.translation_index = []
-        self.sanskrit_index = []
-        # Add streaming-friendly sorted indices
-        self.translation_sorted_by_ratio = []
-        self.sanskrit_sorted_by_ratio = []
-        
-        sloka_count = 0
-        processed_count = 0
-        
-        for kanda_number, kanda in self.ramayanam_data.kandas.items():
-            for sarga_number, sarga in kanda.sargas.items():
-                for sloka_number, sloka in sarga.slokas.items():
-                    if sloka:
-                        sloka_ref = {
-                            'sloka_id': sloka.id,
-                            'sloka_text': sloka.text,
-                            'translation': sloka.translation,
-                            'meaning': sloka.meaning,
-                            'kanda': kanda_number,
-                            'sarga': sarga_number,
-                            'sloka_num': sloka_number
-                        }
-                        
-                        if sloka.translation:
-                            translation_entry = sloka_ref.copy()
-                            translation_entry['translation'] = sloka.translation.lower()
-                            self.translation_index.append(translation_entry)
-                        
-                        if sloka.text and sloka.meaning:
-                            sanskrit_entry = sloka_ref.copy()
-                            sanskrit_entry['sloka_text'] = sloka.text.lower()
-                            sanskrit_entry['meaning'] = sloka.meaning.lower()
-                            self.sanskrit_index.append(sanskrit_entry)
-                        
-                        sloka_count += 1
-                        processed_count += 1
-                        
-                        # Log progress for large datasets
-                        if processed_count % 1000 == 0:
-                            self.logger.debug(f"Processed {processed_count} slokas...")
+        self.translation_index, self.sanskrit_index = build_search_indices(self.ramayanam_data)
         
         build_time = time.time() - start_time
         self.logger.info(f"Built optimized search indices in {build_time:.2f}s: "
-                        f"{sloka_count} slokas, {len(self.translation_index)} translations, "
-                        f"{len(self.sanskrit_index)} sanskrit entries")
+                        f"{len(self.translation_index)} translations, "
+                        f"{len(self.sanskrit_index)} sanskrit entries, "
+                        f"{(self.translation_index.nbytes() + self.sanskrit_index.nbytes()) / (1024 * 1024):.1f} MB")
 
     def tokenize(self, text):
         """Tokenizes the input text into a list of tokens."""
@@ -187,16 +252,58 @@ class OptimizedFuzzySearchService:
 
         return " ".join(highlighted_tokens)
 
-    def _parallel_search_chunk(self, chunk, query, threshold, search_field):
-        """Search a chunk of data in parallel with enhanced error handling."""
+    def _build_result(self, item, ratio, search_field, query, fields=None, source=None):
+        """
+        Assemble a search result containing only the requested fields.
+
+        Highlighting is the expensive part of building a result, so highlighted
+        text is only computed when the corresponding field is requested.
+        """
+        def wanted(field):
+            return fields is None or field in fields
+
+        result = {}
+        if wanted('sloka_number'):
+            result['sloka_number'] = item['sloka_id']
+        if search_field == 'translation':
+            if wanted('sloka'):
+                result['sloka'] = item['sloka_text']
+            if wanted('translation'):
+                result['translation'] = self.search_and_highlight(item['translation'], query)
+            if wanted('meaning'):
+                result['meaning'] = item['meaning']
+        else:
+            if wanted('sloka'):
+                result['sloka'] = self.search_and_highlight(item['sloka_text'], query)
+            if wanted('translation'):
+                result['translation'] = item['translation']
+            if wanted('meaning'):
+                result['meaning'] = self.search_and_highlight(item['meaning'], query)
+        if wanted('ratio'):
+            result['ratio'] = ratio
+        if source and wanted('source'):
+            result['source'] = source
+        return result
+
+    def _parallel_search_chunk(self, index, start, stop, query, threshold, search_field, fields=None):
+        """Search rows ``start`` to ``stop`` of an index with enhanced error handling."""
         results = []
         chunk_start_time = time.time()
         
         try:
-            for item in chunk:
+            if search_field == 'translation':
+                # Rows are sliced out one at a time; the shared index itself is never copied
+                rows = zip(index.column('translation').iter_range(start, stop))
+            elif search_field in ['sloka_text', 'sanskrit']:
+                rows = zip(index.column('sloka_text').iter_range(start, stop),
+                           index.column('meaning').iter_range(start, stop))
+            else:
+                rows = ()
+            
+            for row, texts in enumerate(rows, start):
                 try:
                     if search_field == 'translation':
-                        text = item.get('translation', '')
+                        text = texts[0]
                         if not text:
                             continue
                         
@@ -204,19 +311,12 @@ class OptimizedFuzzySearchService:
                         ratio = fuzz.partial_ratio(text, query)
                         
                         if ratio > threshold:
-                            highlighted_text = self.search_and_highlight(text, query)
-                            results.append({
-                                "sloka_number": item['sloka_id'],
-                                "sloka": item['sloka_text'],
-                                "translation": highlighted_text,
-                                "meaning": item['meaning'],
-                                "ratio": ratio,
-                                "source": "ramayana",
-                            })
+                            results.append(self._build_result(
+                                index.row(row), ratio, 'translation', query, fields, source="ramayana"
+                            ))
                     
-                    elif search_field in ['sloka_text', 'sanskrit']:
-                        sloka_text = item.get('sloka_text', '')
-                        meaning_text = item.get('meaning', '')
+                    else:
+                        sloka_text, meaning_text = texts
                         
                         if not sloka_text or not meaning_text:
                             continue
@@ -227,37 +327,29 @@ class OptimizedFuzzySearchService:
                         ratio = max(sloka_ratio, meaning_ratio)
                         
                         if ratio > threshold:
-                            highlighted_text = self.search_and_highlight(sloka_text, query)
-                            highlighted_meaning = self.search_and_highlight(meaning_text, query)
-                            results.append({
-                                "sloka_number": item['sloka_id'],
-                                "sloka": highlighted_text,
-                                "translation": item['translation'],
-                                "meaning": highlighted_meaning,
-                                "ratio": ratio,
-                                "source": "ramayana",
-                            })
+                            results.append(self._build_result(
+                                index.row(row), ratio, 'sanskrit', query, fields, source="ramayana"
+                            ))
                 
                 except Exception as e:
-                    self.logger.warning(f"Error processing item {item.get('sloka_id', 'unknown')}: {e}")
+                    self.logger.warning(f"Error processing row {row}: {e}")
                     continue
             
             chunk_time = time.time() - chunk_start_time
-            self.logger.debug(f"Processed chunk of {len(chunk)} items in {chunk_time:.3f}s, found {len(results)} matches")
+            self.logger.debug(f"Processed chunk of {stop - start} items in {chunk_time:.3f}s, found {len(results)} matches")
             
         except Exception as e:
             self.logger.error(f"Error in parallel search chunk: {e}")
         
         return results
     
-    def search_stream(self, query, search_type='translation', threshold=70, batch_size=50):
+    def search_stream(self, query, search_type='translation', threshold=70, batch_size=50, fields=None):
         """Stream search results in batches for better user experience."""
         query = query.lower().strip()
         if not query:
             return
         
-        start_time = time.time()
-        self._search_stats['total_searches'] += 1
+        start_time = time.perf_counter()
         
         try:
             # Choose the appropriate index
@@ -269,13 +361,13 @@ class OptimizedFuzzySearchService:
             total_processed = 0
             
             for i in range(0, len(index), batch_size):
-                batch = index[i:i + batch_size]
-                chunk_results = self._parallel_search_chunk(batch, query, threshold, search_field)
+                batch_stop = min(i + batch_size, len(index))
+                chunk_results = self._parallel_search_chunk(index, i, batch_stop, query, threshold, search_field, fields)
                 
                 # Sort current batch results
                 chunk_results.sort(key=lambda x: x["ratio"], reverse=True)
                 batch_results.extend(chunk_results)
-                total_processed += len(batch)
+                total_processed += batch_stop - i
                 
                 # Yield batch if we have enough results or processed all data
                 if len(batch_results) >= batch_size or i + batch_size >= len(index):
@@ -302,26 +394,26 @@ class OptimizedFuzzySearchService:
         
         finally:
             # Update performance stats
-            search_time = time.time() - start_time
-            current_avg = self._search_stats['avg_response_time']
-            total_searches = self._search_stats['total_searches']
-            self._search_stats['avg_response_time'] = (
-                (current_avg * (total_searches - 1) + search_time) / total_searches
-            )
+            stream_type = 'stream_translation' if search_type == 'translation' else 'stream_sanskrit'
+            self._record_search(stream_type, time.perf_counter() - start_time)
 
-    def search_translation_fuzzy(self, query, max_results=1000):
+    @_timed_search('translation')
+    def search_translation_fuzzy(self, query, max_results=1000, fields=None):
         """
         Enhanced optimized search for fuzzy translations with streaming support.
+
+        ``fields`` restricts each result to the given field names
+        (see ``resolve_result_fields``); None returns the full payload.
         """
         query = query.lower().strip()
         if not query:
             return []
             
         start_time = time.time()
-        cache_key = self._get_cache_key(query, 'translation')
+        cache_key = self._get_cache_key(query, 'translation', fields=fields)
         
         # Check cache first
-        cached_result = self._get_cached_result(cache_key)
+        cached_result = self._get_cached_result(cache_key, 'translation')
         if cached_result:
             self.logger.info(f"Cache hit for translation search: {query}")
             return cached_result[:max_results]
@@ -329,18 +421,12 @@ class OptimizedFuzzySearchService:
         self.logger.info(f"Searching translations for query: {query}")
         
         # Quick exact match check first for better performance
-        exact_matches = [item for item in self.translation_index if query in item['translation']]
+        exact_matches = self.translation_index.column('translation').rows_containing(query)
         if len(exact_matches) >= max_results:
-            results = []
-            for item in exact_matches[:max_results]:
-                highlighted_text = self.search_and_highlight(item['translation'], query)
-                results.append({
-                    "sloka_number": item['sloka_id'],
-                    "sloka": item['sloka_text'],
-                    "translation": highlighted_text,
-                    "meaning": item['meaning'],
-                    "ratio": 100,  # Exact match
-                })
+            results = [
+                self._build_result(self.translation_index.row(row), 100, 'translation', query, fields)  # Exact match
+                for row in exact_matches[:max_results]
+            ]
             results.sort(key=lambda x: x["ratio"], reverse=True)
             self._cache_result(cache_key, results)
             return results
@@ -348,14 +434,16 @@ class OptimizedFuzzySearchService:
         # Enhanced parallel processing with dynamic chunk sizing
         optimal_workers = min(8, max(2, len(self.translation_index) // 500))
         chunk_size = max(50, len(self.translation_index) // optimal_workers)
-        chunks = [self.translation_index[i:i+chunk_size] for i in range(0, len(self.translation_index), chunk_size)]
+        chunks = [(i, i + chunk_size) for i in range(0, len(self.translation_index), chunk_size)]
         
         all_results = []
         futures = []
         
         # Submit all chunks for parallel processing
-        for chunk in chunks:
-            future = self._thread_pool.submit(self._parallel_search_chunk, chunk, query, 70, 'translation')
+        for start, stop in chunks:
+            future = self._thread_pool.submit(
+                self._parallel_search_chunk, self.translation_index, start, stop, query, 70, 'translation', fields
+            )
             futures.append(future)
         
         # Collect results with timeout handling
@@ -378,15 +466,16 @@ class OptimizedFuzzySearchService:
         
         return final_results
 
-    def search_sloka_sanskrit_fuzzy(self, query, threshold=70, max_results=1000):
+    @_timed_search('sanskrit')
+    def search_sloka_sanskrit_fuzzy(self, query, threshold=70, max_results=1000, fields=None):
         """
         Optimized search for slokas in Sanskrit using pre-built indices and parallel processing.
         """
         query = query.lower()
-        cache_key = self._get_cache_key(query, 'sanskrit', threshold=threshold)
+        cache_key = self._get_cache_key(query, 'sanskrit', threshold=threshold, fields=fields)
         
         # Check cache first
-        cached_result = self._get_cached_result(cache_key)
+        cached_result = self._get_cached_result(cache_key, 'sanskrit')
         if cached_result:
             self.logger.info(f"Cache hit for Sanskrit search: {query}")
             return cached_result[:max_results]
@@ -394,34 +483,31 @@ class OptimizedFuzzySearchService:
         self.logger.info(f"Searching Sanskrit for query: {query}")
         
         # Quick exact match check first
-        exact_matches = [item for item in self.sanskrit_index 
-                        if query in item['sloka_text'] or query in item['meaning']]
+        exact_matches = sorted(
+            set(self.sanskrit_index.column('sloka_text').rows_containing(query))
+            | set(self.sanskrit_index.column('meaning').rows_containing(query))
+        )
         if len(exact_matches) >= max_results:
-            results = []
-            for item in exact_matches[:max_results]:
-                highlighted_text = self.search_and_highlight(item['sloka_text'], query)
-                highlighted_meaning = self.search_and_highlight(item['meaning'], query)
-                results.append({
-                    "sloka_number": item['sloka_id'],
-                    "sloka": highlighted_text,
-                    "translation": item['translation'],
-                    "meaning": highlighted_meaning,
-                    "ratio": 100,  # Exact match
-                })
+            results = [
+                self._build_result(self.sanskrit_index.row(row), 100, 'sanskrit', query, fields)  # Exact match
+                for row in exact_matches[:max_results]
+            ]
             results.sort(key=lambda x: x["ratio"], reverse=True)
             self._cache_result(cache_key, results)
             return results
         
         # Use parallel processing for fuzzy search
         chunk_size = max(100, len(self.sanskrit_index) // 4)
-        chunks = [self.sanskrit_index[i:i+chunk_size] for i in range(0, len(self.sanskrit_index), chunk_size)]
+        chunks = [(i, i + chunk_size) for i in range(0, len(self.sanskrit_index), chunk_size)]
         
+        # Runs on the shared pool (rather than a throwaway one per search) so
+        # that its queue depth reflects all pending search work
         all_results = []
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [executor.submit(self._parallel_search_chunk, chunk, query, threshold, 'sloka_text') for chunk in chunks]
-            for future in futures:
-                chunk_results = future.result()
-                all_results.extend(chunk_results)
+        futures = [self._thread_pool.submit(self._parallel_search_chunk, self.sanskrit_index, start, stop, query,
+                                            threshold, 'sloka_text', fields) for start, stop in chunks]
+        for future in futures:
+            chunk_results = future.result()
+            all_results.extend(chunk_results)
         
         # Sort by ratio and limit results
         all_results.sort(key=lambda x: x["ratio"], reverse=True)
@@ -431,64 +517,55 @@ class OptimizedFuzzySearchService:
         self._cache_result(cache_key, final_results)
         return final_results
 
-    def search_translation_in_kanda_fuzzy(self, kanda_number, query, threshold=70):
+    @_timed_search('translation_kanda')
+    def search_translation_in_kanda_fuzzy(self, kanda_number, query, threshold=70, fields=None):
         """Search for translations in a specific Kanda using fuzzy matching."""
         query = query.lower()
-        cache_key = self._get_cache_key(query, 'translation_kanda', kanda=kanda_number, threshold=threshold)
+        cache_key = self._get_cache_key(query, 'translation_kanda', kanda=kanda_number,
+                                        threshold=threshold, fields=fields)
         
         # Check cache first
-        cached_result = self._get_cached_result(cache_key)
+        cached_result = self._get_cached_result(cache_key, 'translation_kanda')
         if cached_result:
             self.logger.info(f"Cache hit for Kanda {kanda_number} translation search: {query}")
             return cached_result
         
         # Filter by kanda and search
-        kanda_items = [item for item in self.translation_index if item['kanda'] == kanda_number]
+        start, stop = self.translation_index.kanda_range(kanda_number)
+        texts = self.translation_index.column('translation').iter_range(start, stop)
         
         results = []
-        for item in kanda_items:
-            ratio = fuzz.partial_ratio(item['translation'], query)
+        for row, text in enumerate(texts, start):
+            ratio = fuzz.partial_ratio(text, query)
             if ratio > threshold:
-                highlighted_text = self.search_and_highlight(item['translation'], query)
-                results.append({
-                    "sloka_number": item['sloka_id'],
-                    "sloka": item['sloka_text'],
-                    "translation": highlighted_text,
-                    "meaning": item['meaning'],
-                    "ratio": ratio,
-                })
+                results.append(self._build_result(self.translation_index.row(row), ratio, 'translation', query, fields))
         
         results.sort(key=lambda x: x["ratio"], reverse=True)
         self._cache_result(cache_key, results)
         return results
 
-    def search_sloka_sanskrit_in_kanda_fuzzy(self, kanda_number, query, threshold=70):
+    @_timed_search('sanskrit_kanda')
+    def search_sloka_sanskrit_in_kanda_fuzzy(self, kanda_number, query, threshold=70, fields=None):
         """Search for slokas in a specified kanda using fuzzy matching."""
         query = query.lower()
-        cache_key = self._get_cache_key(query, 'sanskrit_kanda', kanda=kanda_number, threshold=threshold)
+        cache_key = self._get_cache_key(query, 'sanskrit_kanda', kanda=kanda_number,
+                                        threshold=threshold, fields=fields)
         
         # Check cache first
-        cached_result = self._get_cached_result(cache_key)
+        cached_result = self._get_cached_result(cache_key, 'sanskrit_kanda')
         if cached_result:
             self.logger.info(f"Cache hit for Kanda {kanda_number} Sanskrit search: {query}")
             return cached_result
         
         # Filter by kanda and search
-        kanda_items = [item for item in self.sanskrit_index if item['kanda'] == kanda_number]
+        start, stop = self.sanskrit_index.kanda_range(kanda_number)
+        texts = self.sanskrit_index.column('sloka_text').iter_range(start, stop)
         
         results = []
-        for item in kanda_items:
-            ratio = fuzz.partial_ratio(item['sloka_text'], query)
+        for row, text in enumerate(texts, start):
+            ratio = fuzz.partial_ratio(text, query)
             if ratio > threshold:
-                highlighted_text = self.search_and_highlight(item['sloka_text'], query)
-                highlighted_meaning = self.search_and_highlight(item['meaning'], query)
-                results.append({
-                    "sloka_number": item['sloka_id'],
-                    "sloka": highlighted_text,
-                    "translation": item['translation'],
-                    "meaning": highlighted_meaning,
-                    "ratio": ratio,
-                })
+                results.append(self._build_result(self.sanskrit_index.row(row), ratio, 'sanskrit', query, fields))
         
         results.sort(key=lambda x: x["ratio"], reverse=True)
         self._cache_result(cache_key, results)
@@ -0,0 +1,50 @@
+"""
+Process-parallel execution of corpus extraction.
+
+Entity extraction is pure-Python regex and scoring work, so threads take
+turns on the GIL and a corpus run used one core however many workers it was
+given. ``map_shards`` instead runs a module-level task on every shard of the
+corpus (a sarga, in practice) in a pool of processes, each set up once by an
+initializer, and yields the results in shard order: however the work is
+scheduled, the merged output is the same as a serial run's.
+
+Tasks should return compact tuples rather than objects, since every result
+is pickled back to the parent process.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from api.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+# Shards handed to a worker at a time, to amortize the pickling round trip
+CHUNK_SIZE = 4
+
+
+def default_workers(workers: Optional[int] = None) -> int:
+    """Worker count to use: ``workers``, else the configured count, else one per CPU."""
+    workers = workers or Config.EXTRACTION_WORKERS
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def map_shards(task: Callable[[Any], Any], shards: Sequence[Any], workers: int,
+               initializer: Optional[Callable] = None, initargs: tuple = (),
+               chunksize: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    ``task(shard)`` for every shard, computed by ``workers`` processes and
+    yielded in the order of ``shards``. With one worker the tasks run in this
+    process, after calling ``initializer`` here.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(task, shards)
+        return
+
+    logger.info(f"Extracting {len(shards)} shards with {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        yield from executor.map(task, shards, chunksize=chunksize)
@@ -0,0 +1,110 @@
+"""
+Entity patterns shared by the extractors.
+
+The pattern extractor, the scalable extractor and the translation KG
+builder each defined their entity patterns as literal lists in code,
+rebuilt them and compiled their regexes on every construction, and looked
+patterns up by entity id with a linear scan. The patterns now live in one
+data file (``Config.ENTITY_PATTERNS_PATH``) with a named set per
+extractor, and a process-wide ``PatternRegistry`` per file:
+
+- parses the file once, and hands each extractor fresh pattern objects,
+  so an extractor may tweak its own patterns without affecting others;
+- compiles each list of regexes into a ``MultiPatternMatcher`` once, shared
+  by every extractor matching the same regexes (and by forked extraction
+  workers, which inherit it).
+
+``PatternIndex`` indexes a list of patterns by entity id.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from api.config import Config
+from api.models.kg_models import EntityType
+from api.services.entity_matcher import MultiPatternMatcher
+
+
+logger = logging.getLogger(__name__)
+
+P = TypeVar('P')
+
+
+class PatternIndex(Generic[P]):
+    """Patterns by entity id, in definition order."""
+
+    def __init__(self, patterns: Iterable[P]):
+        self._by_id: Dict[str, P] = {}
+        for pattern in patterns:
+            # The first definition of an entity wins, as the linear scans did
+            self._by_id.setdefault(pattern.entity_id, pattern)
+
+    def get(self, entity_id: str) -> Optional[P]:
+        return self._by_id.get(entity_id)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._by_id
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+class PatternRegistry:
+    """The pattern sets of one data file and the matchers compiled from them."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sets: Optional[Dict[str, Any]] = None
+        self._matchers: Dict[Tuple[Tuple[str, ...], int], MultiPatternMatcher] = {}
+
+    def definitions(self, name: str) -> Any:
+        """
+        A copy of the raw definitions of a pattern set, as stored in the file.
+        Raises KeyError for an unknown set.
+        """
+        with self._lock:
+            if self._sets is None:
+                with open(self.path, encoding='utf-8') as f:
+                    self._sets = json.load(f)
+                logger.info(f"Loaded entity pattern sets from {self.path}")
+            return copy.deepcopy(self._sets[name])
+
+    def patterns(self, name: str, factory: Callable[..., P]) -> List[P]:
+        """
+        The patterns of a set as ``factory(**definition)`` objects, with the
+        ``entity_type`` of each definition as an ``EntityType``.
+        """
+        return [
+            factory(**{**definition, 'entity_type': EntityType(definition['entity_type'])})
+            for definition in self.definitions(name)
+        ]
+
+    def matcher(self, regexes: Sequence[str], flags: Optional[int] = None) -> MultiPatternMatcher:
+        """The matcher for a list of regexes, compiled on first use."""
+        key = (tuple(regexes), flags)
+        with self._lock:
+            matcher = self._matchers.get(key)
+        if matcher is None:
+            # Compiled outside the lock; a concurrent duplicate is harmless
+            matcher = MultiPatternMatcher(key[0]) if flags is None else MultiPatternMatcher(key[0], flags)
+            with self._lock:
+                matcher = self._matchers.setdefault(key, matcher)
+        return matcher
+
+
+_registries: Dict[str, PatternRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_pattern_registry(path: Optional[str] = None) -> PatternRegistry:
+    """Get the shared pattern registry of a data file (default: Config.ENTITY_PATTERNS_PATH)."""
+    key = os.path.abspath(path or Config.ENTITY_PATTERNS_PATH)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = PatternRegistry(key)
+        return registry
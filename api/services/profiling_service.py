@@ -0,0 +1,348 @@
+"""
+Profiling service for diagnosing hot paths and memory growth on demand.
+
+Nothing in here runs unless it is switched on, either for the whole process
+(via configuration or the admin endpoints) or for a single request.
+Three tools are available:
+
+- a sampling CPU profiler that periodically walks the stacks of all threads,
+- tracemalloc snapshots with top-allocation listings and snapshot diffs,
+- per-request deterministic profiles (cProfile) and allocation diffs.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical CPU profiler.
+
+    A daemon thread wakes up every ``interval`` seconds and records the
+    current stack of every other thread. Functions that show up in many
+    samples are where the process spends its time.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._samples = Counter()
+        self._self_samples = Counter()
+        self._total_samples = 0
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._stopped_at = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self.running:
+            return
+        with self._lock:
+            self._samples.clear()
+            self._self_samples.clear()
+            self._total_samples = 0
+        self._stop_event.clear()
+        self._started_at = time.time()
+        self._stopped_at = None
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling; collected samples are kept until the next start."""
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+        self._stopped_at = time.time()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_ident:
+                        continue
+                    self._record(frame)
+
+    def _record(self, frame):
+        seen = set()
+        depth = 0
+        leaf = True
+        while frame is not None and depth < self.max_depth:
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            if leaf:
+                self._self_samples[key] += 1
+                leaf = False
+            # Count each function once per stack so recursion doesn't inflate it
+            if key not in seen:
+                self._samples[key] += 1
+                seen.add(key)
+            frame = frame.f_back
+            depth += 1
+        self._total_samples += 1
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        """Return the functions seen most often, by cumulative and self samples."""
+        with self._lock:
+            total = self._total_samples or 1
+
+            def rows(counter):
+                return [
+                    {
+                        'function': name,
+                        'file': filename,
+                        'line': lineno,
+                        'samples': count,
+                        'percent': round(count / total * 100, 2)
+                    }
+                    for (filename, lineno, name), count in counter.most_common(limit)
+                ]
+
+            end = self._stopped_at or time.time()
+            return {
+                'running': self.running,
+                'interval': self.interval,
+                'total_samples': self._total_samples,
+                'duration': round(end - self._started_at, 3) if self._started_at else 0,
+                'cumulative': rows(self._samples),
+                'self': rows(self._self_samples)
+            }
+
+
+class ProfilingService:
+    """Opt-in profiling surface for the API process."""
+
+    def __init__(self, max_snapshots: int = 10, max_request_profiles: int = 50,
+                 sample_interval: float = 0.005):
+        self.logger = logging.getLogger(__name__)
+        self.cpu_sampler = SamplingProfiler(interval=sample_interval)
+        self._snapshots = OrderedDict()
+        self._max_snapshots = max_snapshots
+        self._request_profiles = deque(maxlen=max_request_profiles)
+        self._lock = threading.Lock()
+        # tracemalloc is process-wide: requests profiling memory share one
+        # trace, started by the first and stopped by the last of them unless
+        # it was already running (or was started from the admin API meanwhile)
+        self._memory_requests = 0
+        self._requests_own_tracing = False
+
+    # === Memory tracing ===
+
+    def start_memory_tracing(self, frames: int = 10) -> bool:
+        """Start tracemalloc for the whole process. Returns True if it was started."""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                # Keeps running after profiled requests finish
+                self._requests_own_tracing = False
+                return False
+            tracemalloc.start(frames)
+        self.logger.info(f"tracemalloc started with {frames} frames")
+        return True
+
+    def stop_memory_tracing(self) -> bool:
+        """Stop tracemalloc and drop stored snapshots. Returns True if it was running."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return False
+            tracemalloc.stop()
+            self._requests_own_tracing = False
+            self._snapshots.clear()
+        self.logger.info("tracemalloc stopped")
+        return True
+
+    def take_snapshot(self, label: Optional[str] = None) -> str:
+        """Take a tracemalloc snapshot and keep it for later diffs."""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory tracing is not enabled")
+
+        snapshot_id = label or f"snapshot-{uuid.uuid4().hex[:8]}"
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._trace_filters())
+        with self._lock:
+            self._snapshots[snapshot_id] = {
+                'snapshot': snapshot,
+                'taken_at': time.time()
+            }
+            while len(self._snapshots) > self._max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {'id': snapshot_id, 'taken_at': entry['taken_at']}
+                for snapshot_id, entry in self._snapshots.items()
+            ]
+
+    def top_allocations(self, snapshot_id: Optional[str] = None, limit: int = 25,
+                        group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """Largest allocation sites in a stored snapshot (or a fresh one)."""
+        snapshot = self._get_snapshot(snapshot_id)
+        stats = snapshot.statistics(group_by)
+        return [self._format_stat(stat) for stat in stats[:limit]]
+
+    def diff_snapshots(self, from_id: str, to_id: Optional[str] = None, limit: int = 25,
+                       group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """Allocation growth between two snapshots (``to_id`` defaults to now)."""
+        old = self._get_snapshot(from_id)
+        new = self._get_snapshot(to_id)
+        stats = new.compare_to(old, group_by)
+        return [self._format_stat_diff(stat) for stat in stats[:limit]]
+
+    def _get_snapshot(self, snapshot_id: Optional[str]):
+        if snapshot_id is None:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("Memory tracing is not enabled")
+            return tracemalloc.take_snapshot().filter_traces(self._trace_filters())
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"Snapshot '{snapshot_id}' not found")
+        return entry['snapshot']
+
+    @staticmethod
+    def _trace_filters():
+        return [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ]
+
+    @staticmethod
+    def _format_stat(stat) -> Dict[str, Any]:
+        frame = stat.traceback[0]
+        return {
+            'location': f"{frame.filename}:{frame.lineno}",
+            'size_kb': round(stat.size / 1024, 2),
+            'count': stat.count
+        }
+
+    @staticmethod
+    def _format_stat_diff(stat) -> Dict[str, Any]:
+        frame = stat.traceback[0]
+        return {
+            'location': f"{frame.filename}:{frame.lineno}",
+            'size_kb': round(stat.size / 1024, 2),
+            'size_diff_kb': round(stat.size_diff / 1024, 2),
+            'count': stat.count,
+            'count_diff': stat.count_diff
+        }
+
+    # === Per-request profiling ===
+
+    def begin_request_profile(self, modes: List[str]) -> Dict[str, Any]:
+        """Start profiling a single request. ``modes`` may contain 'cpu' and 'memory'."""
+        state = {'modes': modes, 'started_at': time.perf_counter()}
+
+        if 'memory' in modes:
+            with self._lock:
+                if self._memory_requests == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start(10)
+                    self._requests_own_tracing = True
+                self._memory_requests += 1
+            try:
+                state['memory_before'] = tracemalloc.take_snapshot()
+            except RuntimeError:
+                # Stopped from the admin API in between: no memory profile
+                self._release_memory_request()
+
+        if 'cpu' in modes:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            state['cpu_profiler'] = profiler
+
+        return state
+
+    def end_request_profile(self, state: Dict[str, Any], method: str, path: str,
+                            limit: int = 20) -> str:
+        """Finish a request profile started by ``begin_request_profile`` and store it."""
+        profile = {
+            'id': uuid.uuid4().hex[:12],
+            'method': method,
+            'path': path,
+            'timestamp': time.time(),
+            'duration_ms': round((time.perf_counter() - state['started_at']) * 1000, 3)
+        }
+
+        profiler = state.get('cpu_profiler')
+        if profiler is not None:
+            profiler.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats('cumulative').print_stats(limit)
+            profile['cpu'] = stream.getvalue()
+
+        if 'memory_before' in state:
+            try:
+                # Tracing may have been stopped from the admin API meanwhile
+                if tracemalloc.is_tracing():
+                    after = tracemalloc.take_snapshot()
+                    stats = after.filter_traces(self._trace_filters()).compare_to(
+                        state['memory_before'].filter_traces(self._trace_filters()), 'lineno'
+                    )
+                    profile['memory'] = [self._format_stat_diff(stat) for stat in stats[:limit]]
+            finally:
+                self._release_memory_request()
+
+        with self._lock:
+            self._request_profiles.append(profile)
+        return profile['id']
+
+    def _release_memory_request(self):
+        with self._lock:
+            self._memory_requests -= 1
+            if self._memory_requests == 0 and self._requests_own_tracing:
+                tracemalloc.stop()
+                self._requests_own_tracing = False
+
+    def get_request_profiles(self, profile_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Stored per-request profiles, newest first."""
+        with self._lock:
+            profiles = list(self._request_profiles)
+        if profile_id:
+            return [p for p in profiles if p['id'] == profile_id]
+        return list(reversed(profiles))
+
+    # === Status ===
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {
+            'cpu_sampling': self.cpu_sampler.running,
+            'memory_tracing': tracemalloc.is_tracing(),
+            'snapshots': self.list_snapshots(),
+            'request_profiles': len(self._request_profiles)
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            status['traced_memory_kb'] = round(current / 1024, 2)
+            status['traced_peak_kb'] = round(peak / 1024, 2)
+        return status
+
+
+# Global profiling service instance
+_profiling_service = None
+
+
+def get_profiling_service() -> ProfilingService:
+    """Get the global profiling service instance."""
+    global _profiling_service
+    if _profiling_service is None:
+        _profiling_service = ProfilingService()
+    return _profiling_service
@@ -0,0 +1,170 @@
+"""
+Compact, copy-on-write friendly search indices.
+
+The fuzzy search service used to keep one dict per sloka per index, each
+holding lowercased copies of the searched text. Under a pre-forking server
+every worker built those again, and even when built once in the master,
+scanning them bumps the refcounts of tens of thousands of objects and so
+un-shares every page they live on.
+
+Here each searched column is stored as one large string with the values
+joined by a separator, plus an ``array`` of row offsets, so a scan touches
+a handful of objects. Rows are sliced out one at a time into short-lived,
+worker-local strings, leaving the shared pages untouched. The original
+sloka objects are only dereferenced to build results for matching rows.
+"""
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# Values are joined with a character that never appears in the corpus, so
+# substring matches of a query without it can never span two rows
+SEPARATOR = '\x00'
+
+
+class TextColumn:
+    """A column of strings stored as one joined string and row offsets."""
+
+    __slots__ = ('text', 'offsets')
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        # Missing (or non-text) values are indexed as empty strings
+        parts = [value.replace(SEPARATOR, '') if isinstance(value, str) else ''
+                 for value in values]
+        self.text = SEPARATOR.join(parts)
+
+        self.offsets = array('L')
+        position = 0
+        for part in parts:
+            self.offsets.append(position)
+            position += len(part) + 1
+        # Sentinel: end of the last row plus the (virtual) trailing separator
+        self.offsets.append(position)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, row: int) -> str:
+        return self.text[self.offsets[row]:self.offsets[row + 1] - 1]
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """Values of rows ``start`` to ``stop`` (exclusive), one at a time."""
+        text, offsets = self.text, self.offsets
+        for row in range(start, min(stop, len(self))):
+            yield text[offsets[row]:offsets[row + 1] - 1]
+
+    def rows_containing(self, needle: str) -> List[int]:
+        """Rows whose value contains ``needle``, in row order."""
+        if not needle:
+            return list(range(len(self)))
+        if SEPARATOR in needle:
+            return []
+
+        rows = []
+        text, offsets = self.text, self.offsets
+        position = text.find(needle)
+        while position != -1:
+            row = bisect_right(offsets, position) - 1
+            rows.append(row)
+            # Skip to the next row: one hit per row is enough
+            position = text.find(needle, offsets[row + 1])
+        return rows
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.text) + self.offsets.itemsize * len(self.offsets)
+
+
+class SearchIndex:
+    """
+    Columnar index over the slokas searchable by one field.
+
+    ``columns`` holds the lowercased searched fields; rows are in corpus
+    order, so each kanda occupies a contiguous range.
+    """
+
+    def __init__(self, slokas: Sequence, columns: Dict[str, TextColumn], kandas: array,
+                 sargas: array, sloka_numbers: array):
+        self.slokas = tuple(slokas)
+        self.columns = columns
+        self.kandas = kandas
+        self.sargas = sargas
+        self.sloka_numbers = sloka_numbers
+        self._kanda_ranges = self._compute_kanda_ranges(kandas)
+
+    @staticmethod
+    def _compute_kanda_ranges(kandas: array) -> Dict[int, Tuple[int, int]]:
+        ranges = {}
+        for row, kanda in enumerate(kandas):
+            start, _ = ranges.get(kanda, (row, row))
+            ranges[kanda] = (start, row + 1)
+        return ranges
+
+    def __len__(self) -> int:
+        return len(self.slokas)
+
+    def column(self, field: str) -> TextColumn:
+        return self.columns[field]
+
+    def kanda_range(self, kanda_number: int) -> Tuple[int, int]:
+        """Row range ``(start, stop)`` of a kanda; empty if it isn't indexed."""
+        return self._kanda_ranges.get(kanda_number, (0, 0))
+
+    def row(self, row: int) -> Dict[str, object]:
+        """Materialize one row as a dict, in the layout of the old index entries."""
+        sloka = self.slokas[row]
+        entry = {
+            'sloka_id': sloka.id,
+            'sloka_text': sloka.text,
+            'translation': sloka.translation,
+            'meaning': sloka.meaning,
+            'kanda': self.kandas[row],
+            'sarga': self.sargas[row],
+            'sloka_num': self.sloka_numbers[row]
+        }
+        for field, column in self.columns.items():
+            entry[field] = column.get(row)
+        return entry
+
+    def nbytes(self) -> int:
+        """Approximate size of the index itself (not of the sloka objects)."""
+        numbers = sum(a.itemsize * len(a) for a in (self.kandas, self.sargas, self.sloka_numbers))
+        references = 8 * len(self.slokas)
+        return sum(column.nbytes() for column in self.columns.values()) + numbers + references
+
+
+def build_search_indices(ramayanam_data) -> Tuple[SearchIndex, SearchIndex]:
+    """
+    Build the translation and Sanskrit indices from the corpus.
+
+    The translation index searches lowercased translations and the Sanskrit
+    index lowercased sloka text and meaning.
+    """
+    translation_rows = []
+    sanskrit_rows = []
+    for kanda_number, kanda in ramayanam_data.kandas.items():
+        for sarga_number, sarga in kanda.sargas.items():
+            for sloka_number, sloka in sarga.slokas.items():
+                if not sloka:
+                    continue
+                row = (sloka, kanda_number, sarga_number, sloka_number)
+                if sloka.translation:
+                    translation_rows.append(row)
+                if sloka.text and sloka.meaning:
+                    sanskrit_rows.append(row)
+
+    def build(rows, fields):
+        return SearchIndex(
+            [row[0] for row in rows],
+            {field: TextColumn(getattr(row[0], attr).lower() for row in rows)
+             for field, attr in fields},
+            array('H', (row[1] for row in rows)),
+            array('H', (row[2] for row in rows)),
+            array('H', (row[3] for row in rows)),
+        )
+
+    return (
+        build(translation_rows, (('translation', 'translation'),)),
+        build(sanskrit_rows, (('sloka_text', 'text'), ('meaning', 'meaning'))),
+    )
@@ -0,0 +1,273 @@
+"""
+Lazy, dependency-ordered registry for the application's heavy services.
+
+Importing the app used to load the corpus, build the fuzzy search indices,
+open the KG database service and probe the AI client libraries before a
+worker could accept its first request. Services are now registered here
+with a factory and their dependencies, and are only built when first used.
+Services marked ``background`` (the corpus and search indices) are built
+on a daemon thread once the worker is up; ``/ready`` reports their state.
+
+Controllers keep module-level names for their services, but these are
+``LazyService`` proxies that resolve through the registry on first
+attribute access.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+PENDING = 'pending'
+BUILDING = 'building'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ServiceDefinition:
+    """A registered service: how to build it and what it depends on."""
+
+    def __init__(self, name: str, factory: Callable[..., Any],
+                 depends_on: Iterable[str] = (), background: bool = False):
+        self.name = name
+        self.factory = factory
+        self.depends_on = tuple(depends_on)
+        self.background = background
+        self.state = PENDING
+        self.instance = None
+        self.error: Optional[str] = None
+        self.build_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class ServiceRegistry:
+    """Builds services on demand, dependencies first, at most once each."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._services: Dict[str, ServiceDefinition] = {}
+        self._background_thread = None
+        self._background_lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[..., Any],
+                 depends_on: Iterable[str] = (), background: bool = False):
+        """
+        Register a service factory.
+
+        The factory is called with the built dependencies as keyword
+        arguments, in the order given by ``depends_on``.
+        """
+        self._services[name] = ServiceDefinition(name, factory, depends_on, background)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._services
+
+    def get(self, name: str) -> Any:
+        """Return the service, building it (and its dependencies) if needed."""
+        return self._build(name, ())
+
+    def peek(self, name: str) -> Any:
+        """Return the service if it has been built, else None. Never builds."""
+        definition = self._services.get(name)
+        if definition is None or definition.state != READY:
+            return None
+        return definition.instance
+
+    def _build(self, name: str, chain: tuple) -> Any:
+        if name not in self._services:
+            raise KeyError(f"Service '{name}' is not registered")
+        if name in chain:
+            raise RuntimeError(f"Circular service dependency: {' -> '.join(chain + (name,))}")
+
+        definition = self._services[name]
+        if definition.state == READY:
+            return definition.instance
+
+        # Dependencies are built outside this service's lock so that two
+        # services sharing a dependency cannot deadlock each other
+        dependencies = {
+            dependency: self._build(dependency, chain + (name,))
+            for dependency in definition.depends_on
+        }
+
+        # Concurrent callers (e.g. a request racing the background build)
+        # wait here until the first builder finishes
+        with definition.lock:
+            if definition.state == READY:
+                return definition.instance
+
+            definition.state = BUILDING
+            started = time.perf_counter()
+            try:
+                instance = definition.factory(**dependencies)
+            except Exception as e:
+                definition.state = FAILED
+                definition.error = str(e)
+                self.logger.error(f"Failed to build service '{name}': {e}")
+                raise
+
+            definition.instance = instance
+            definition.build_seconds = round(time.perf_counter() - started, 3)
+            definition.error = None
+            definition.state = READY
+            self.logger.info(f"Service '{name}' ready in {definition.build_seconds}s")
+            return instance
+
+    def build_order(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Topological order in which ``names`` (default: all services) get built."""
+        order: List[str] = []
+        visited = set()
+
+        def visit(name):
+            if name in visited:
+                return
+            visited.add(name)
+            for dependency in self._services[name].depends_on:
+                visit(dependency)
+            order.append(name)
+
+        for name in (names if names is not None else self._services):
+            visit(name)
+        return order
+
+    def start_background(self) -> bool:
+        """
+        Build all background services on a daemon thread.
+
+        Must be called in the process that will serve requests (i.e. after
+        a pre-forking server has forked), since threads don't survive fork.
+        Returns False if the build was already started.
+        """
+        with self._background_lock:
+            if self._background_thread is not None:
+                return False
+            self._background_thread = threading.Thread(
+                target=self.warm, name="service-warmup", daemon=True
+            )
+            self._background_thread.start()
+            return True
+
+    def warm(self):
+        """
+        Build all background services in the calling thread.
+
+        Used directly by a pre-forking master (see ``gunicorn.conf.py``) so
+        the workers inherit the built indices.
+        """
+        targets = [name for name, d in self._services.items() if d.background]
+        for name in self.build_order(targets):
+            try:
+                self.get(name)
+            except Exception:
+                # Already logged; a failed service is reported by status()
+                # and retried on the next request that needs it
+                pass
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background build has finished."""
+        thread = self._background_thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.is_ready()
+
+    def is_ready(self) -> bool:
+        """True once every background service has been built."""
+        return all(d.state == READY for d in self._services.values() if d.background)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'state': d.state,
+                'background': d.background,
+                'depends_on': list(d.depends_on),
+                'build_seconds': d.build_seconds,
+                'error': d.error
+            }
+            for name, d in self._services.items()
+        }
+
+    def proxy(self, name: str) -> 'LazyService':
+        return LazyService(self, name)
+
+
+class LazyService:
+    """Stand-in for a registered service that resolves it on first use."""
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        return f"<LazyService {self._name!r}>"
+
+
+def _register_default_services(registry: ServiceRegistry):
+    """Register the app's services. Imports happen inside the factories."""
+    from api.config import Config
+
+    def load_ramayanam():
+        from ramayanam import Ramayanam
+        return Ramayanam.load()
+
+    def build_fuzzy_search(ramayanam_data):
+        from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService
+        return OptimizedFuzzySearchService(ramayanam_data)
+
+    def build_fts_search():
+        from api.services.fts_search_service import FTSSearchService
+        return FTSSearchService(Config.SEARCH_DB_PATH)
+
+    def build_sloka_reader():
+        from api.config import Config
+        from api.services.sloka_reader import SlokaReader
+        return SlokaReader(Config.SLOKAS_PATH)
+
+    def build_kg_service():
+        from api.services.kg_database_service import KGDatabaseService
+        return KGDatabaseService()
+
+    def build_kg_graph(kg_service):
+        from api.services.kg_graph import KGGraph
+        return KGGraph(kg_service)
+
+    def build_kg_mentions(kg_service):
+        from api.services.kg_mention_index import MentionIndex
+        return MentionIndex(kg_service)
+
+    def build_kg_subgraph(kg_service, kg_graph):
+        from api.services.kg_subgraph import SubgraphService
+        return SubgraphService(kg_service, kg_graph)
+
+    def build_chat_service():
+        from api.services.chat_service import get_chat_service
+        return get_chat_service()
+
+    registry.register('ramayanam_data', load_ramayanam, background=True)
+    if Config.SEARCH_BACKEND == 'fts':
+        # Searches the corpus database directly, without loading the corpus
+        registry.register('fuzzy_search', build_fts_search, background=True)
+    else:
+        registry.register('fuzzy_search', build_fuzzy_search,
+                          depends_on=('ramayanam_data',), background=True)
+    registry.register('sloka_reader', build_sloka_reader)
+    registry.register('kg_service', build_kg_service)
+    registry.register('kg_graph', build_kg_graph, depends_on=('kg_service',))
+    registry.register('kg_mentions', build_kg_mentions, depends_on=('kg_service',))
+    registry.register('kg_subgraph', build_kg_subgraph, depends_on=('kg_service', 'kg_graph'))
+    registry.register('chat_service', build_chat_service)
+
+
+# Global service registry instance
+_service_registry = None
+
+
+def get_service_registry() -> ServiceRegistry:
+    """Get the global service registry, with the default services registered."""
+    global _service_registry
+    if _service_registry is None:
+        _service_registry = ServiceRegistry()
+        _register_default_services(_service_registry)
+    return _service_registry
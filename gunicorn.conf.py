@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for the Ramayanam API.
+
+With ``preload_app`` (the default) the app is imported once in the master,
+which builds the corpus and search indices before forking. The indices are
+laid out as a few large objects (see ``api/services/search_index.py``) and
+everything built is moved out of the garbage collector's reach with
+``gc.freeze()``, so the workers share those pages copy-on-write instead of
+each holding a private copy.
+"""
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+worker_class = 'sync'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+if preload_app:
+    # The master builds the services itself (below); a background build
+    # thread would not survive the fork
+    os.environ['WARM_SERVICES_ON_STARTUP'] = 'false'
+
+
+def when_ready(server):
+    """Build the heavy services in the master, then freeze them for sharing."""
+    if not preload_app:
+        return
+
+    from api.services.service_registry import get_service_registry
+
+    registry = get_service_registry()
+    registry.warm()
+    server.log.info(f"Services built before fork: ready={registry.is_ready()}")
+
+    # Collections in the workers would otherwise touch (and un-share) every
+    # object the master built
+    gc.collect()
+    gc.freeze()
@@ -44,6 +44,17 @@ CREATE INDEX IF NOT EXISTS idx_kg_relationships_object ON kg_relationships(objec
 CREATE INDEX IF NOT EXISTS idx_text_mentions_unit ON text_entity_mentions(text_unit_id);
 CREATE INDEX IF NOT EXISTS idx_text_mentions_entity ON text_entity_mentions(entity_id);
 CREATE INDEX IF NOT EXISTS idx_text_mentions_confidence ON text_entity_mentions(confidence);
+CREATE INDEX IF NOT EXISTS idx_text_mentions_entity_confidence ON text_entity_mentions(entity_id, confidence DESC);
+
+-- Joins mentions ("1.1.8") to slokas without a full scan; the expression must
+-- match SLOKA_TEXT_UNIT_ID in api/services/kg_database_service.py
+CREATE INDEX IF NOT EXISTS idx_slokas_text_unit_id ON slokas(
+    CAST(kanda_id AS TEXT) || '.' || CAST(sarga_id AS TEXT) || '.' || CAST(sloka_id AS TEXT)
+);
+
+-- Normalized entity_labels / entity_epithets tables, their sync triggers and the
+-- validation columns are applied by the versioned migrations in
+-- api/services/kg_schema.py (run on first use, or: python -m api.services.kg_schema <db>)
 
 -- Sample data insertion removed - entities will be populated by automated extraction
 -- Use the translation_kg_builder.py script or /api/kg/extract endpoint to populate real data
\ No newline at end of file
@@ -14,12 +14,17 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from api.services.corpus_loader import CorpusLoader
+from api.config import Config
+from api.services.corpus_compiler import compile_corpus
+from api.services.parallel_extraction import default_workers
+from ramayanam.ramayanam import PICKLE_FILE
+
+DB_PATH = Path(Config.SEARCH_DB_PATH)
 
 def backup_existing_database():
     """Create a backup of the existing database"""
-    db_path = project_root / "data" / "db" / "ramayanam.db"
-    backup_path = project_root / "data" / "db" / "ramayanam_backup.db"
+    db_path = DB_PATH
+    backup_path = DB_PATH.with_name("ramayanam_backup.db")
     
     if db_path.exists():
         import shutil
@@ -59,16 +64,10 @@ def rebuild_database():
     print("🔄 Rebuilding database with YuddhaKanda...")
     
     try:
-        # Initialize corpus loader
-        corpus_loader = CorpusLoader()
-        
-        # Load all kandas (including YuddhaKanda)
-        print("📖 Loading corpus data...")
-        corpus_loader.load_corpus()
-        
-        # Save to database
-        print("💾 Saving to database...")
-        corpus_loader.save_to_database()
+        # Compile all kandas (including YuddhaKanda) into the database and snapshot
+        print("📖 Compiling corpus data...")
+        stats = compile_corpus(Config.SLOKAS_PATH, str(DB_PATH), PICKLE_FILE, default_workers())
+        print(f"💾 {stats['compiled_sargas']} sargas compiled, {stats['unchanged_sargas']} unchanged")
         
         print("✅ Database rebuild completed successfully!")
         return True
@@ -83,7 +82,7 @@ def verify_yuddha_kanda_in_db():
     """Verify that YuddhaKanda data is properly loaded in the database"""
     print("🔍 Verifying YuddhaKanda data in database...")
     
-    db_path = project_root / "data" / "db" / "ramayanam.db"
+    db_path = DB_PATH
     if not db_path.exists():
         print(f"❌ Database not found: {db_path}")
         return False
@@ -15,6 +15,15 @@ from typing import Dict, List, Set, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.services.connection_pool import get_connection_pool
+from api.services.kg_bulk_loader import KGBulkLoader
+from api.services.pattern_registry import get_pattern_registry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -52,7 +61,9 @@ class TranslationKGBuilder:
         self.relationships: List[KGRelationship] = []
         
         # Initialize entity patterns for both English and Sanskrit
+        self.registry = get_pattern_registry()
         self.entity_patterns = self._define_entity_patterns()
+        self.matcher = self._build_matcher()
         
         # Initialize database
         self._init_database()
@@ -113,133 +124,62 @@ class TranslationKGBuilder:
         """)
     
     def _define_entity_patterns(self) -> Dict[EntityType, List[Dict[str, Any]]]:
-        """Define comprehensive patterns for entity recognition in translations"""
+        """Patterns for entity recognition in translations, from the shared pattern registry"""
         return {
-            EntityType.PERSON: [
-                # Core characters
-                {"pattern": r"\b(Rama|Lord Rama|Shri Rama|राम|रामः|राघव|दाशरथि)\b", "canonical": "rama", "epithets": ["राघव", "दाशरथि", "कोसलेन्द्र"]},
-                {"pattern": r"\b(Sita|Seetha|Janaki|सीता|सीतः|जानकी|मैथिली|वैदेही)\b", "canonical": "sita", "epithets": ["जानकी", "मैथिली", "वैदेही"]},
-                {"pattern": r"\b(Hanuman|Anjaneya|हनुमान्|हनुमत्|आञ्जनेय|पवनात्मज|मारुति)\b", "canonical": "hanuman", "epithets": ["आञ्जनेय", "पवनात्मज", "मारुति"]},
-                {"pattern": r"\b(Lakshmana|Lakshman|लक्ष्मण|लक्ष्मणः|सौमित्रि)\b", "canonical": "lakshmana", "epithets": ["सौमित्रि"]},
-                {"pattern": r"\b(Bharata|Bharat|भरत|भरतः)\b", "canonical": "bharata", "epithets": []},
-                {"pattern": r"\b(Shatrughna|Satrughna|शत्रुघ्न|शत्रुघ्नः)\b", "canonical": "shatrughna", "epithets": []},
-                {"pattern": r"\b(Dasharatha|Dasaratha|दशरथ|दशरथः)\b", "canonical": "dasharatha", "epithets": []},
-                {"pattern": r"\b(Kaushalya|Kausalya|कौशल्या)\b", "canonical": "kaushalya", "epithets": []},
-                {"pattern": r"\b(Kaikeyi|कैकेयी)\b", "canonical": "kaikeyi", "epithets": []},
-                {"pattern": r"\b(Sumitra|सुमित्रा)\b", "canonical": "sumitra", "epithets": []},
-                {"pattern": r"\b(Ravana|Ravan|रावण|रावणः|दशानन|लङ्केश)\b", "canonical": "ravana", "epithets": ["दशानन", "लङ्केश"]},
-                {"pattern": r"\b(Vibhishana|Vibhishan|विभीषण|विभीषणः)\b", "canonical": "vibhishana", "epithets": []},
-                {"pattern": r"\b(Sugriva|Sugreeva|सुग्रीव|सुग्रीवः)\b", "canonical": "sugriva", "epithets": []},
-                {"pattern": r"\b(Vali|Bali|वाली|बली)\b", "canonical": "vali", "epithets": []},
-                {"pattern": r"\b(Jatayu|जटायु|जटायुः)\b", "canonical": "jatayu", "epithets": []},
-                {"pattern": r"\b(Sampati|सम्पाति)\b", "canonical": "sampati", "epithets": []},
-                {"pattern": r"\b(Angada|अङ्गद|अङ्गदः)\b", "canonical": "angada", "epithets": []},
-                {"pattern": r"\b(Jambavan|Jambavant|जाम्बवान्|जाम्बवत्)\b", "canonical": "jambavan", "epithets": []},
-                {"pattern": r"\b(Surpanakha|शूर्पणखा)\b", "canonical": "surpanakha", "epithets": []},
-                {"pattern": r"\b(Khara|खर|खरः)\b", "canonical": "khara", "epithets": []},
-                {"pattern": r"\b(Dushana|दूषण|दूषणः)\b", "canonical": "dushana", "epithets": []},
-                {"pattern": r"\b(Trijata|त्रिजटा)\b", "canonical": "trijata", "epithets": []},
-                {"pattern": r"\b(Mandodari|मन्दोदरी)\b", "canonical": "mandodari", "epithets": []},
-            ],
-            
-            EntityType.PLACE: [
-                {"pattern": r"\b(Ayodhya|Ayodhya|अयोध्या)\b", "canonical": "ayodhya", "type": "city"},
-                {"pattern": r"\b(Lanka|Lankapuri|लङ्का|लङ्कापुरी)\b", "canonical": "lanka", "type": "city"},
-                {"pattern": r"\b(Mithila|मिथिला)\b", "canonical": "mithila", "type": "city"},
-                {"pattern": r"\b(Kishkindha|Kishkindhya|किष्किन्धा)\b", "canonical": "kishkindha", "type": "city"},
-                {"pattern": r"\b(Dandaka|Dandakaranya|दण्डक|दण्डकारण्य)\b", "canonical": "dandaka", "type": "forest"},
-                {"pattern": r"\b(Chitrakuta|Chitrakoot|चित्रकूट)\b", "canonical": "chitrakuta", "type": "mountain"},
-                {"pattern": r"\b(Panchavati|पञ्चवटी)\b", "canonical": "panchavati", "type": "hermitage"},
-                {"pattern": r"\b(Rishyamukha|ऋष्यमूक)\b", "canonical": "rishyamukha", "type": "mountain"},
-                {"pattern": r"\b(Vindhya|विन्ध्य)\b", "canonical": "vindhya", "type": "mountain"},
-                {"pattern": r"\b(Godavari|गोदावरी)\b", "canonical": "godavari", "type": "river"},
-                {"pattern": r"\b(Ganga|Ganges|गङ्गा)\b", "canonical": "ganga", "type": "river"},
-                {"pattern": r"\b(Sarayu|सरयू)\b", "canonical": "sarayu", "type": "river"},
-                {"pattern": r"\b(Kosala|कोसल)\b", "canonical": "kosala", "type": "kingdom"},
-                {"pattern": r"\b(Ashoka Vatika|अशोक वाटिका)\b", "canonical": "ashoka_vatika", "type": "garden"},
-            ],
-            
-            EntityType.OBJECT: [
-                {"pattern": r"\b(bow|धनुष|धनुः|Shiva's bow|शिव धनुष)\b", "canonical": "bow", "significance": "divine_weapon"},
-                {"pattern": r"\b(chariot|रथ|रथः)\b", "canonical": "chariot", "significance": "vehicle"},
-                {"pattern": r"\b(crown|मुकुट|किरीट)\b", "canonical": "crown", "significance": "royal_insignia"},
-                {"pattern": r"\b(ring|अङ्गुलीयक|मुद्रिका)\b", "canonical": "ring", "significance": "token"},
-                {"pattern": r"\b(arrow|बाण|शर|इषु)\b", "canonical": "arrow", "significance": "weapon"},
-                {"pattern": r"\b(sword|खड्ग|असि)\b", "canonical": "sword", "significance": "weapon"},
-                {"pattern": r"\b(mace|गदा)\b", "canonical": "mace", "significance": "weapon"},
-                {"pattern": r"\b(ornament|आभूषण|अलङ्कार)\b", "canonical": "ornament", "significance": "decoration"},
-            ],
-            
-            EntityType.CONCEPT: [
-                {"pattern": r"\b(dharma|righteousness|धर्म|धर्मः)\b", "canonical": "dharma", "category": "ethics"},
-                {"pattern": r"\b(karma|action|कर्म|कर्मन्)\b", "canonical": "karma", "category": "action"},
-                {"pattern": r"\b(devotion|भक्ति|भक्तिः)\b", "canonical": "devotion", "category": "spiritual"},
-                {"pattern": r"\b(duty|कर्तव्य)\b", "canonical": "duty", "category": "ethics"},
-                {"pattern": r"\b(exile|वनवास|अरण्यवास)\b", "canonical": "exile", "category": "circumstance"},
-                {"pattern": r"\b(sacrifice|यज्ञ|यागः)\b", "canonical": "sacrifice", "category": "ritual"},
-                {"pattern": r"\b(meditation|ध्यान|समाधि)\b", "canonical": "meditation", "category": "spiritual"},
-                {"pattern": r"\b(knowledge|ज्ञान|विद्या)\b", "canonical": "knowledge", "category": "wisdom"},
-                {"pattern": r"\b(truth|सत्य|सत्यम्)\b", "canonical": "truth", "category": "virtue"},
-                {"pattern": r"\b(compassion|करुणा|दया)\b", "canonical": "compassion", "category": "virtue"},
-            ],
-            
-            EntityType.EVENT: [
-                {"pattern": r"\b(coronation|राज्याभिषेक|पट्टाभिषेक)\b", "canonical": "coronation", "type": "ceremony"},
-                {"pattern": r"\b(exile|वनवास|प्रवास)\b", "canonical": "exile", "type": "journey"},
-                {"pattern": r"\b(abduction|हरण|अपहरण)\b", "canonical": "abduction", "type": "conflict"},
-                {"pattern": r"\b(war|युद्ध|संग्राम|रण)\b", "canonical": "war", "type": "conflict"},
-                {"pattern": r"\b(marriage|विवाह|पाणिग्रहण)\b", "canonical": "marriage", "type": "ceremony"},
-                {"pattern": r"\b(swayamvara|स्वयंवर)\b", "canonical": "swayamvara", "type": "ceremony"},
-                {"pattern": r"\b(funeral|अन्त्येष्टि|दाह)\b", "canonical": "funeral", "type": "ceremony"},
-                {"pattern": r"\b(sacrifice|यज्ञ|होम)\b", "canonical": "sacrifice", "type": "ritual"},
-                {"pattern": r"\b(blessing|आशीर्वाद|वरदान)\b", "canonical": "blessing", "type": "divine_act"},
-                {"pattern": r"\b(curse|शाप|श्राप)\b", "canonical": "curse", "type": "divine_act"},
-            ]
+            EntityType(entity_type): patterns
+            for entity_type, patterns in self.registry.definitions('translation').items()
         }
     
+    def _build_matcher(self):
+        """One matcher over every pattern, with the (entity type, pattern info) of each"""
+        owners = [
+            (entity_type, pattern_info)
+            for entity_type, patterns in self.entity_patterns.items()
+            for pattern_info in patterns
+        ]
+        return self.registry.matcher([pattern_info["pattern"] for _, pattern_info in owners]), owners
+    
     def extract_entities_from_text(self, text: str, text_unit_id: str) -> List[KGEntity]:
         """Extract entities from a single text passage"""
         found_entities = []
         text_lower = text.lower()
         
-        for entity_type, patterns in self.entity_patterns.items():
-            for pattern_info in patterns:
-                pattern = pattern_info["pattern"]
-                canonical = pattern_info["canonical"]
+        # Every pattern matched in one pass, in pattern order
+        matcher, owners = self.matcher
+        for index, match in matcher.finditer(text):
+            entity_type, pattern_info = owners[index]
+            canonical = pattern_info["canonical"]
+            
+            start, end = match.span()
+            matched_text = match.group()
+            
+            # Create entity ID
+            entity_id = f"http://ramayanam.hanuma.com/entity/{canonical}"
+            
+            # Check if entity already exists
+            if entity_id in self.entities:
+                entity = self.entities[entity_id]
+                entity.mentions.append((text_unit_id, start, end))
+            else:
+                # Create new entity
+                labels = {"en": canonical.replace("_", " ").title()}
                 
-                # Find all matches
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    start, end = match.span()
-                    matched_text = match.group()
-                    
-                    # Create entity ID
-                    entity_id = f"http://ramayanam.hanuma.com/entity/{canonical}"
-                    
-                    # Check if entity already exists
-                    if entity_id in self.entities:
-                        entity = self.entities[entity_id]
-                        entity.mentions.append((text_unit_id, start, end))
-                    else:
-                        # Create new entity
-                        labels = {"en": canonical.replace("_", " ").title()}
-                        
-                        # Add Sanskrit label if available in pattern
-                        properties = {}
-                        for key, value in pattern_info.items():
-                            if key not in ["pattern", "canonical"]:
-                                properties[key] = value
-                        
-                        entity = KGEntity(
-                            kg_id=entity_id,
-                            entity_type=entity_type,
-                            labels=labels,
-                            properties=properties,
-                            mentions=[(text_unit_id, start, end)]
-                        )
-                        
-                        self.entities[entity_id] = entity
-                        found_entities.append(entity)
+                # Add Sanskrit label if available in pattern
+                properties = {}
+                for key, value in pattern_info.items():
+                    if key not in ["pattern", "canonical"]:
+                        properties[key] = value
+                
+                entity = KGEntity(
+                    kg_id=entity_id,
+                    entity_type=entity_type,
+                    labels=labels,
+                    properties=properties,
+                    mentions=[(text_unit_id, start, end)]
+                )
+                
+                self.entities[entity_id] = entity
+                found_entities.append(entity)
         
         return found_entities
     
@@ -418,46 +358,29 @@ class TranslationKGBuilder:
         
         logger.info(f"Inferred {len(self.relationships)} relationships")
     
-    def save_to_database(self):
-        """Save entities and relationships to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing data
-        cursor.execute("DELETE FROM text_entity_mentions")
-        cursor.execute("DELETE FROM kg_relationships") 
-        cursor.execute("DELETE FROM kg_entities")
-        
-        # Insert entities
-        for entity in self.entities.values():
-            cursor.execute("""
-                INSERT INTO kg_entities (kg_id, entity_type, labels, properties)
-                VALUES (?, ?, ?, ?)
-            """, (
-                entity.kg_id,
-                entity.entity_type.value,
-                json.dumps(entity.labels),
-                json.dumps(entity.properties)
-            ))
-            
-            # Insert mentions
-            for text_unit_id, start, end in entity.mentions:
-                cursor.execute("""
-                    INSERT INTO text_entity_mentions 
-                    (text_unit_id, entity_id, span_start, span_end, confidence, source_type)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (text_unit_id, entity.kg_id, start, end, 0.9, 'automated'))
-        
-        # Insert relationships
-        for rel in self.relationships:
-            cursor.execute("""
-                INSERT INTO kg_relationships (subject_id, predicate, object_id, metadata)
-                VALUES (?, ?, ?, ?)
-            """, (rel.subject_id, rel.predicate, rel.object_id, json.dumps(rel.metadata)))
+    def save_to_database(self) -> Dict[str, Any]:
+        """Replace the knowledge graph in the database with the built entities and relationships"""
+        entities = [
+            (entity.kg_id, entity.entity_type.value, json.dumps(entity.labels), json.dumps(entity.properties),
+             'pending', 'automated', entity.properties.get('confidence_score', 0.0))
+            for entity in self.entities.values()
+        ]
+        mentions = (
+            (text_unit_id, entity.kg_id, start, end, 0.9, 'automated')
+            for entity in self.entities.values()
+            for text_unit_id, start, end in entity.mentions
+        )
+        relationships = (
+            (rel.subject_id, rel.predicate, rel.object_id, json.dumps(rel.metadata))
+            for rel in self.relationships
+        )
         
-        conn.commit()
-        conn.close()
-        logger.info(f"Saved {len(self.entities)} entities and {len(self.relationships)} relationships to database")
+        load = KGBulkLoader(get_connection_pool(self.db_path)).load(
+            entities=entities, relationships=relationships, mentions=mentions, replace=True
+        )
+        logger.info(f"Saved {load['entities']} entities, {load['relationships']} relationships and "
+                    f"{load['mentions']} mentions to database ({load['rows_per_second']} rows/s)")
+        return load
     
     def build_knowledge_graph(self) -> Dict[str, Any]:
         """Main method to build the complete knowledge graph"""
@@ -470,7 +393,7 @@ class TranslationKGBuilder:
         self.infer_relationships()
         
         # Save to database
-        self.save_to_database()
+        load = self.save_to_database()
         
         # Return summary
         return {
@@ -480,7 +403,9 @@ class TranslationKGBuilder:
                 "slokas_processed": processing_results["total_slokas"],
                 "entities_extracted": len(self.entities),
                 "relationships_inferred": len(self.relationships),
-                "error_files": processing_results["error_files"]
+                "error_files": processing_results["error_files"],
+                "load_seconds": load["seconds"],
+                "load_rows_per_second": load["rows_per_second"]
             },
             "entities": {eid: {"type": e.entity_type.value, "labels": e.labels, "mention_count": len(e.mentions)} 
                        for eid, e in self.entities.items()},
@@ -3,6 +3,7 @@ Pytest configuration and fixtures for the Ramayanam application.
 """
 
 import os
+import sqlite3
 import sys
 import pytest
 import tempfile
@@ -176,6 +177,51 @@ def temp_data_files():
     shutil.rmtree(temp_dir, ignore_errors=True)
 
 
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'scripts')
+
+
+@pytest.fixture
+def kg_db_factory():
+    """
+    Create temporary databases with a slokas table, seeded with the given
+    rows (in column order), plus the KG tables of the given schema scripts.
+    """
+    paths = []
+
+    def create(slokas=(), scripts=('add_kg_tables.sql',)):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        paths.append(path)
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE slokas (kanda_id INTEGER, sarga_id INTEGER, sloka_id INTEGER, "
+            "sloka TEXT, meaning TEXT, translation TEXT)"
+        )
+        conn.executemany("INSERT INTO slokas VALUES (?, ?, ?, ?, ?, ?)", slokas)
+        for script in scripts:
+            with open(os.path.join(SCRIPTS_DIR, script), encoding='utf-8') as f:
+                conn.executescript(f.read())
+        conn.commit()
+        conn.close()
+        return path
+
+    yield create
+
+    for path in paths:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+@pytest.fixture
+def kg_db(kg_db_factory):
+    """
+    Path of a temporary KG database with an empty slokas table. Modules
+    seed their own rows by overriding it with a fixture that requests it.
+    """
+    return kg_db_factory()
+
+
 @pytest.fixture
 def mock_config():
     """Mock configuration for testing."""
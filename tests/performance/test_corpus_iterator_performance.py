@@ -0,0 +1,58 @@
+"""
+Benchmark for paging through the corpus in batches.
+
+Reads every sloka of a corpus the size of the Ramayana in small batches,
+once with the ``LIMIT ? OFFSET ?`` paging batch consumers used to do and
+once with keyset pagination over the position index.
+"""
+
+import json
+import time
+
+import pytest
+
+from api.services.connection_pool import get_connection_pool
+from api.services.corpus_iterator import sloka_batches
+from api.services.kg_schema import migrate_kg_schema
+
+
+SLOKA_COUNT = 7 * 90 * 30
+BATCH_SIZE = 100
+
+
+def _offset_batches(conn, batch_size):
+    offset = 0
+    while True:
+        rows = conn.execute("""
+            SELECT kanda_id, sarga_id, sloka_id, sloka, translation, meaning
+            FROM slokas
+            ORDER BY kanda_id, sarga_id, sloka_id
+            LIMIT ? OFFSET ?
+        """, (batch_size, offset)).fetchall()
+        if not rows:
+            return
+        yield rows
+        offset += batch_size
+
+
+@pytest.mark.performance
+def test_corpus_paging(kg_db_factory):
+    path = kg_db_factory(
+        [(kanda, sarga, sloka, 'श्लोक ' * 12, 'meaning ' * 28, 'translation ' * 30)
+         for kanda in range(1, 8) for sarga in range(1, 91) for sloka in range(1, 31)]
+    )
+    pool = get_connection_pool(path)
+    migrate_kg_schema(pool)
+    conn = pool.connection()
+    results = {}
+    positions = {}
+
+    for name, batches in (('limit_offset', _offset_batches), ('keyset', sloka_batches)):
+        started = time.perf_counter()
+        positions[name] = [tuple(row)[:3] for batch in batches(conn, BATCH_SIZE) for row in batch]
+        results[f'{name}_seconds'] = round(time.perf_counter() - started, 3)
+
+    assert positions['keyset'] == positions['limit_offset']
+    assert len(positions['keyset']) == SLOKA_COUNT
+    print(f"\nPaging {SLOKA_COUNT} slokas {BATCH_SIZE} at a time: {json.dumps(results, indent=2)}")
+    assert results['keyset_seconds'] < results['limit_offset_seconds']
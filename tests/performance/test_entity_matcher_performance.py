@@ -0,0 +1,86 @@
+"""
+Throughput benchmark for matching entity patterns across the whole corpus.
+
+Runs the pattern extractor's Sanskrit and English regexes over a synthetic
+corpus the size of the Ramayana (every sloka with its Sanskrit text, word
+meanings and translation), once with the multi-pattern matcher and once with
+the per-regex ``re.finditer`` loop it replaced.
+"""
+
+import json
+import random
+import re
+import time
+
+import pytest
+
+from api.services.automated_entity_extraction import RamayanaEntityExtractor
+from api.services.entity_matcher import MultiPatternMatcher
+
+
+SLOKA_COUNT = 18000
+
+SANSKRIT_WORDS = ['तपस्वी', 'वाग्विदां', 'वरम्', 'नारदं', 'परिपप्रच्छ', 'मुनिपुङ्गवम्', 'कोन्वस्मिन्',
+                  'साम्प्रतं', 'लोके', 'गुणवान्', 'कश्च', 'वीर्यवान्', 'धर्मज्ञश्च', 'कृतज्ञश्च', 'सत्यवाक्यो',
+                  'दृढव्रतः', 'चारित्रेण', 'को', 'युक्तः', 'सर्वभूतेषु', 'हितः', 'विद्वान्', 'समर्थश्च', '।']
+SANSKRIT_NAMES = ['रामः', 'रामस्य', 'राघवम्', 'सीताम्', 'वैदेही', 'हनुमान्', 'मारुतिः', 'रावणेन', 'लक्ष्मणस्य']
+ENGLISH_WORDS = ['ascetic', 'enquired', 'of', 'the', 'sage', 'ever', 'engaged', 'in', 'practice', 'religious',
+                 'austerities', 'study', 'vedas', 'best', 'among', 'eloquent', 'who', 'is', 'virtuous', 'valiant',
+                 'in', 'this', 'world', 'today', 'and', 'with', 'great', 'delight', 'said']
+ENGLISH_NAMES = ['Rama', 'Raghava', 'Sita', 'Vaidehi', 'Hanuman', 'Ravana', 'Lakshmana', 'son of Vayu']
+
+
+def _text(rng, words, names, length):
+    tokens = [rng.choice(words) for _ in range(length)]
+    for _ in range(rng.randrange(3)):
+        tokens[rng.randrange(length)] = rng.choice(names)
+    return ' '.join(tokens)
+
+
+def _corpus(rng):
+    return [
+        (_text(rng, SANSKRIT_WORDS, SANSKRIT_NAMES, 12),
+         _text(rng, SANSKRIT_WORDS + ENGLISH_WORDS, SANSKRIT_NAMES + ENGLISH_NAMES, 30),
+         _text(rng, ENGLISH_WORDS, ENGLISH_NAMES, 28))
+        for _ in range(SLOKA_COUNT)
+    ]
+
+
+def _per_regex(regexes, text):
+    return [(index, match.span()) for index, regex in enumerate(regexes)
+            for match in re.finditer(regex, text, re.IGNORECASE)]
+
+
+def _matcher(matcher, text):
+    return [(index, match.span()) for index, match in matcher.finditer(text)]
+
+
+@pytest.mark.performance
+def test_corpus_matching_throughput():
+    corpus = _corpus(random.Random(11))
+    patterns = RamayanaEntityExtractor().entity_patterns
+    sanskrit = [regex for pattern in patterns for regex in pattern.sanskrit_patterns]
+    english = [regex for pattern in patterns for regex in pattern.english_patterns]
+    results = {}
+    found = {}
+
+    started = time.perf_counter()
+    found['per_regex'] = [
+        (_per_regex(sanskrit, sloka), _per_regex(english, meaning), _per_regex(english, translation))
+        for sloka, meaning, translation in corpus
+    ]
+    results['per_regex_finditer'] = round(SLOKA_COUNT / (time.perf_counter() - started))
+
+    started = time.perf_counter()
+    sanskrit_matcher, english_matcher = MultiPatternMatcher(sanskrit), MultiPatternMatcher(english)
+    found['matcher'] = [
+        (_matcher(sanskrit_matcher, sloka), _matcher(english_matcher, meaning),
+         _matcher(english_matcher, translation))
+        for sloka, meaning, translation in corpus
+    ]
+    results['multi_pattern_matcher'] = round(SLOKA_COUNT / (time.perf_counter() - started))
+
+    assert found['matcher'] == found['per_regex']
+    print(f"\nMatching {len(sanskrit) + len(english)} entity regexes over {SLOKA_COUNT} slokas, "
+          f"slokas per second: {json.dumps(results, indent=2)}")
+    assert results['multi_pattern_matcher'] > results['per_regex_finditer']
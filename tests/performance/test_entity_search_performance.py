@@ -0,0 +1,98 @@
+"""
+Latency benchmark for knowledge-graph entity search and autocomplete.
+
+Builds a synthetic KG much larger than the current one and compares the
+FTS5-backed search with the ``LIKE '%q%'`` scan over the labels JSON it
+replaced.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import pytest
+
+from api.services.kg_database_service import KGDatabaseService
+
+
+ENTITY_COUNT = 50000
+QUERIES = ['ra', 'rav', 'sug', 'hanu', 'dasa', 'ayo', 'lak', 'vib', 'jan', 'kum']
+SYLLABLES = ['ra', 'ma', 'si', 'ta', 'la', 'ksh', 'ha', 'nu', 'su', 'gri', 'va',
+             'vi', 'bhi', 'sha', 'da', 'ja', 'na', 'ka', 'ku', 'bha', 'ra', 'ta', 'yo', 'dhya']
+
+
+def _name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+@pytest.fixture(scope='module')
+def large_kg_db():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE kg_entities (
+            kg_id TEXT PRIMARY KEY, entity_type TEXT NOT NULL, labels TEXT NOT NULL,
+            properties TEXT DEFAULT '{}', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO kg_entities (kg_id, entity_type, labels, properties) VALUES (?, ?, ?, ?)",
+        [
+            (f'http://ramayanam.hanuma.com/entity/e{i}', rng.choice(['Person', 'Place', 'Object']),
+             json.dumps({'en': _name(rng)}),
+             json.dumps({'epithets': [_name(rng) for _ in range(2)]}))
+            for i in range(ENTITY_COUNT)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+    service = KGDatabaseService(path)
+    service.get_connection()  # runs the schema migrations
+    yield path, service
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _time_ms(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            fn(query)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 2)
+    }
+
+
+@pytest.mark.performance
+def test_entity_search_latency(large_kg_db):
+    path, service = large_kg_db
+    conn = service.get_connection()
+
+    def like_scan(query):
+        conn.execute(
+            "SELECT * FROM kg_entities WHERE labels LIKE ? OR kg_id LIKE ? ORDER BY kg_id LIMIT 20",
+            (f'%{query}%', f'%{query}%')
+        ).fetchall()
+
+    results = {
+        'like_scan': _time_ms(like_scan),
+        'search_entities': _time_ms(lambda q: service.search_entities(q, limit=20)),
+        'autocomplete': _time_ms(lambda q: service.autocomplete_entities(q, limit=10)),
+    }
+    print(f"\nEntity search over {ENTITY_COUNT} entities: {json.dumps(results, indent=2)}")
+
+    assert service.autocomplete_entities('hanu')
+    assert results['autocomplete']['p50_ms'] < 10
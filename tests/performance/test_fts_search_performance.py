@@ -0,0 +1,71 @@
+"""
+Latency and recall of the FTS5 search backend against the in-memory search.
+
+Runs on a copy of the corpus database, so the index built here doesn't
+grow the checked-out one.
+"""
+
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import pytest
+
+from api.services.fts_search_service import FTSSearchService
+from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService
+from ramayanam import Ramayanam
+from ramayanam.ramayanam import DB_FILE
+
+
+QUERIES = ['rama', 'forest exile', 'sita in lanka', 'hanumaan', 'sugreeva', 'dasharatha', 'raam']
+TOP_K = 100
+
+
+@pytest.fixture(scope='module')
+def backends():
+    if not os.path.exists(DB_FILE):
+        pytest.skip("Corpus database not available")
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'ramayanam.db')
+    shutil.copyfile(DB_FILE, path)
+
+    started = time.perf_counter()
+    fts = FTSSearchService(path)
+    build_seconds = time.perf_counter() - started
+    yield fts, OptimizedFuzzySearchService(Ramayanam.load()), build_seconds
+    fts.pool.close_thread_connection()
+    shutil.rmtree(directory)
+
+
+def _measure(service, query):
+    service._search_cache.clear()  # time the search, not a cache hit
+    started = time.perf_counter()
+    results = service.search_translation_fuzzy(query, TOP_K)
+    return results, (time.perf_counter() - started) * 1000
+
+
+@pytest.mark.performance
+def test_fts_search_latency_and_recall(backends):
+    fts, memory, build_seconds = backends
+
+    report = {}
+    for query in QUERIES:
+        fts_results, fts_ms = _measure(fts, query)
+        memory_results, memory_ms = _measure(memory, query)
+        # Compare by score: among equally scored slokas the cut at TOP_K is arbitrary
+        memory_scores = sorted((r['ratio'] for r in memory_results), reverse=True)
+        fts_scores = sorted((r['ratio'] for r in fts_results), reverse=True)
+        matched = sum(a == b for a, b in zip(memory_scores, fts_scores))
+        report[query] = {
+            'fts_ms': round(fts_ms, 1),
+            'memory_ms': round(memory_ms, 1),
+            'score_recall': round(matched / max(1, len(memory_scores)), 2)
+        }
+    print(f"\nFTS index built in {build_seconds:.2f}s; top-{TOP_K} translation search: "
+          f"{json.dumps(report, indent=2)}")
+
+    assert statistics.median(r['fts_ms'] for r in report.values()) < 250
+    assert statistics.mean(r['score_recall'] for r in report.values()) > 0.8
@@ -0,0 +1,91 @@
+"""
+Throughput benchmark for loading a full corpus of KG extraction results.
+
+Loads a synthetic extraction roughly the size of a full-corpus run (entities,
+relationships and a mention for every few slokas of all seven kandas) with
+the bulk loader, and compares it with the row-at-a-time inserts it replaced.
+"""
+
+import json
+import random
+import time
+
+import pytest
+
+from api.services.connection_pool import get_connection_pool
+from api.services.kg_bulk_loader import KGBulkLoader
+from api.services.kg_database_service import KGDatabaseService
+
+
+ENTITY_COUNT = 3000
+RELATIONSHIP_COUNT = 10000
+MENTION_COUNT = 100000
+PREDICATES = ['sonOf', 'hasSpouse', 'devoteeOf', 'brotherOf', 'allyOf', 'enemyOf', 'livesIn']
+
+
+def _extraction(rng):
+    entities = [
+        (f'e{i}', rng.choice(['Person', 'Place', 'Object']), json.dumps({'en': f'Entity {i}'}),
+         json.dumps({'epithets': [f'epithet {i}']}), 'pending', 'automated', round(rng.random(), 2))
+        for i in range(ENTITY_COUNT)
+    ]
+    relationships = [
+        (f'e{rng.randrange(ENTITY_COUNT)}', rng.choice(PREDICATES), f'e{rng.randrange(ENTITY_COUNT)}', '{}')
+        for _ in range(RELATIONSHIP_COUNT)
+    ]
+    mentions = [
+        (f'{rng.randint(1, 7)}.{rng.randint(1, 120)}.{rng.randint(1, 60)}', f'e{rng.randrange(ENTITY_COUNT)}',
+         start, start + 5, 0.9, 'automated')
+        for start in (rng.randrange(200) for _ in range(MENTION_COUNT))
+    ]
+    return entities, relationships, mentions
+
+
+def _database(kg_db_factory):
+    path = kg_db_factory()
+    KGDatabaseService(path).get_connection()  # runs the schema migrations
+    return path
+
+
+def _row_at_a_time(path, entities, relationships, mentions):
+    """The per-row inserts of the former store_extraction_results."""
+    conn = get_connection_pool(path).connection()
+    for row in entities:
+        conn.execute("""
+            INSERT OR REPLACE INTO kg_entities (kg_id, entity_type, labels, properties, validation_status,
+                                                extraction_method, extraction_confidence, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, row)
+    for row in relationships:
+        conn.execute(
+            "INSERT OR REPLACE INTO kg_relationships (subject_id, predicate, object_id, metadata) VALUES (?, ?, ?, ?)",
+            row
+        )
+    for row in mentions:
+        conn.execute(
+            "INSERT OR REPLACE INTO text_entity_mentions "
+            "(text_unit_id, entity_id, span_start, span_end, confidence, source_type) VALUES (?, ?, ?, ?, ?, ?)",
+            row
+        )
+    conn.commit()
+
+
+@pytest.mark.performance
+def test_full_corpus_load_throughput(kg_db_factory):
+    entities, relationships, mentions = _extraction(random.Random(5))
+    rows = len(entities) + len(relationships) + len(mentions)
+    results = {}
+
+    path = _database(kg_db_factory)
+    started = time.perf_counter()
+    _row_at_a_time(path, entities, relationships, mentions)
+    results['row_at_a_time'] = round(rows / (time.perf_counter() - started))
+
+    loader = KGBulkLoader(get_connection_pool(_database(kg_db_factory)))
+    results['bulk_replace'] = loader.load(entities, relationships, mentions, replace=True)['rows_per_second']
+    results['bulk_upsert_again'] = loader.load(entities, relationships, mentions)['rows_per_second']
+    conn = loader.pool.connection()
+    assert conn.execute("SELECT COUNT(*) FROM kg_entities").fetchone()[0] == ENTITY_COUNT
+
+    print(f"\nLoading {rows} KG rows, rows per second: {json.dumps(results, indent=2)}")
+    assert results['bulk_replace'] > results['row_at_a_time']
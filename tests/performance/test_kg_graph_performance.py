@@ -0,0 +1,101 @@
+"""
+Latency benchmark for traversals over the in-memory KG relationship graph.
+
+Builds a synthetic relationship graph much larger than the current one and
+compares k-hop neighborhoods against the per-entity SQL lookups they replace.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import pytest
+
+from api.services.kg_database_service import KGDatabaseService
+from api.services.kg_graph import KGGraph
+
+
+ENTITY_COUNT = 20000
+RELATIONSHIP_COUNT = 60000
+PREDICATES = ['sonOf', 'hasSpouse', 'devoteeOf', 'brotherOf', 'allyOf', 'enemyOf', 'livesIn']
+SAMPLES = 200
+
+
+@pytest.fixture(scope='module')
+def large_graph():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    rng = random.Random(11)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE kg_relationships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, subject_id TEXT NOT NULL, predicate TEXT NOT NULL,
+            object_id TEXT NOT NULL, metadata TEXT DEFAULT '{}', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX idx_kg_relationships_subject ON kg_relationships(subject_id)")
+    conn.execute("CREATE INDEX idx_kg_relationships_object ON kg_relationships(object_id)")
+    conn.executemany(
+        "INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, ?, ?)",
+        [(f'e{rng.randrange(ENTITY_COUNT)}', rng.choice(PREDICATES), f'e{rng.randrange(ENTITY_COUNT)}')
+         for _ in range(RELATIONSHIP_COUNT)]
+    )
+    conn.commit()
+    conn.close()
+
+    service = KGDatabaseService(path)
+    started = time.perf_counter()
+    graph = KGGraph(service, refresh_interval=60)
+    load_ms = (time.perf_counter() - started) * 1000
+    yield service, graph, load_ms
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _time_us(fn, seeds):
+    timings = []
+    for seed in seeds:
+        started = time.perf_counter()
+        fn(seed)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        'p50_us': round(statistics.median(timings), 1),
+        'p95_us': round(timings[int(len(timings) * 0.95) - 1], 1)
+    }
+
+
+@pytest.mark.performance
+def test_graph_traversal_latency(large_graph):
+    service, graph, load_ms = large_graph
+    rng = random.Random(3)
+    seeds = [f'e{rng.randrange(ENTITY_COUNT)}' for _ in range(SAMPLES)]
+    conn = service.get_connection()
+
+    def sql_two_hops(seed):
+        frontier = {seed}
+        for _ in range(2):
+            reached = set()
+            for node in frontier:
+                for row in conn.execute(
+                    "SELECT subject_id, object_id FROM kg_relationships WHERE subject_id = ? OR object_id = ?",
+                    (node, node)
+                ):
+                    reached.update(row)
+            frontier = reached
+
+    results = {
+        'sql_2_hops': _time_us(sql_two_hops, seeds[:20]),
+        'graph_1_hop': _time_us(lambda seed: graph.neighborhood(seed), seeds),
+        'graph_2_hops': _time_us(lambda seed: graph.neighborhood(seed, hops=2), seeds),
+        'graph_path': _time_us(lambda seed: graph.shortest_path(seed, seeds[0]), seeds),
+    }
+    print(f"\nGraph of {RELATIONSHIP_COUNT} relationships loaded in {load_ms:.0f}ms: "
+          f"{json.dumps(results, indent=2)}")
+
+    assert results['graph_1_hop']['p50_us'] < 1000
@@ -0,0 +1,73 @@
+"""
+Scaling benchmark for the process-parallel corpus extraction.
+
+Extracts a synthetic corpus the size of the Ramayana into a fresh knowledge
+graph with one worker process and with one per CPU (up to four), checks the
+loaded mentions are identical and reports the speedup.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import time
+
+import pytest
+
+from api.services.enhanced_entity_extraction import ScalableEntityExtractor
+
+
+SARGAS_PER_KANDA = 90
+SLOKAS_PER_SARGA = 28
+
+SANSKRIT_WORDS = ['तपस्वी', 'वाग्विदां', 'वरम्', 'नारदं', 'परिपप्रच्छ', 'मुनिपुङ्गवम्', 'साम्प्रतं', 'लोके',
+                  'गुणवान्', 'वीर्यवान्', 'धर्मज्ञश्च', 'सत्यवाक्यो', 'दृढव्रतः', 'चारित्रेण', 'युक्तः', '।']
+SANSKRIT_NAMES = ['रामः', 'राघवम्', 'सीताम्', 'वैदेही', 'हनुमान्', 'रावणः', 'लक्ष्मणस्य', 'अयोध्या']
+ENGLISH_WORDS = ['ascetic', 'enquired', 'of', 'the', 'sage', 'engaged', 'in', 'practice', 'religious',
+                 'study', 'vedas', 'best', 'among', 'eloquent', 'who', 'is', 'virtuous', 'valiant', 'world']
+ENGLISH_NAMES = ['Rama', 'Raghava', 'Sita', 'Janaki', 'Hanuman', 'Ravana', 'Lakshmana', 'Ayodhya']
+
+
+def _text(rng, words, names, length):
+    tokens = [rng.choice(words) for _ in range(length)]
+    for _ in range(rng.randrange(3)):
+        tokens[rng.randrange(length)] = rng.choice(names)
+    return ' '.join(tokens)
+
+
+def _slokas(rng):
+    return [
+        (kanda, sarga, sloka,
+         _text(rng, SANSKRIT_WORDS, SANSKRIT_NAMES, 12),
+         _text(rng, SANSKRIT_WORDS + ENGLISH_WORDS, SANSKRIT_NAMES + ENGLISH_NAMES, 30),
+         _text(rng, ENGLISH_WORDS, ENGLISH_NAMES, 28))
+        for kanda in range(1, 8)
+        for sarga in range(1, SARGAS_PER_KANDA + 1)
+        for sloka in range(1, SLOKAS_PER_SARGA + 1)
+    ]
+
+
+@pytest.mark.performance
+def test_parallel_extraction_scaling(kg_db_factory):
+    workers = min(4, os.cpu_count() or 1)
+    slokas = 7 * SARGAS_PER_KANDA * SLOKAS_PER_SARGA
+    results = {}
+    mentions = {}
+
+    for count in sorted({1, workers}):
+        path = kg_db_factory(_slokas(random.Random(3)))
+        started = time.perf_counter()
+        ScalableEntityExtractor(path).process_corpus_parallel(workers=count, replace=True)
+        results[f'{count}_workers'] = round(slokas / (time.perf_counter() - started))
+        conn = sqlite3.connect(path)
+        mentions[count] = conn.execute(
+            "SELECT text_unit_id, entity_id, span_start, span_end, confidence, source_type "
+            "FROM text_entity_mentions ORDER BY id"
+        ).fetchall()
+        conn.close()
+
+    assert mentions[workers] == mentions[1]
+    print(f"\nExtracting {slokas} slokas into the KG, slokas per second: {json.dumps(results, indent=2)}")
+    if workers > 1:
+        # Near-linear: at least half the ideal speedup
+        assert results[f'{workers}_workers'] > results['1_workers'] * workers / 2
@@ -0,0 +1,81 @@
+"""
+Startup benchmarks for the API process.
+
+Measures what a worker pays before it can accept a request (importing
+``api.app``) separately from the background build of the corpus and search
+indices, each in a fresh interpreter so nothing is already imported.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Runs in a child interpreter; prints a JSON report on the last line
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import api.app
+from api.services.service_registry import get_service_registry
+imported = time.perf_counter()
+registry = get_service_registry()
+states = {name: s['state'] for name, s in registry.status().items()}
+registry.start_background()
+ready = registry.wait_ready(timeout=300)
+finished = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - started,
+    'ready_seconds': finished - started,
+    'ready': ready,
+    'states_after_import': states,
+    'build_seconds': {n: s['build_seconds'] for n, s in registry.status().items()},
+}))
+"""
+
+
+def run_startup(runs=3):
+    env = dict(os.environ, WARM_SERVICES_ON_STARTUP='false', LOG_LEVEL='WARNING')
+    reports = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT],
+            capture_output=True, text=True, cwd=PROJECT_ROOT, env=env, timeout=600
+        )
+        assert result.returncode == 0, result.stderr
+        reports.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return reports
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestStartupPerformance:
+    """Import-time and time-to-ready benchmarks."""
+
+    def test_import_does_not_build_services(self):
+        """Importing the app leaves every registered service unbuilt."""
+        report = run_startup(runs=1)[0]
+
+        assert set(report['states_after_import'].values()) == {'pending'}
+
+    def test_startup_benchmark(self):
+        """Report import time and time until the search indices are ready."""
+        reports = run_startup()
+        import_times = sorted(r['import_seconds'] for r in reports)
+        ready_times = sorted(r['ready_seconds'] for r in reports)
+
+        print("\nStartup benchmark (median of %d runs):" % len(reports))
+        print(f"  import api.app:      {import_times[len(import_times) // 2] * 1000:.1f} ms")
+        print(f"  indices ready after: {ready_times[len(ready_times) // 2] * 1000:.1f} ms")
+        for name, seconds in reports[-1]['build_seconds'].items():
+            if seconds is not None:
+                print(f"    {name}: {seconds * 1000:.1f} ms")
+
+        assert all(r['ready'] for r in reports)
+        # The worker must be able to serve well before the indices are built
+        assert import_times[-1] < ready_times[0]
@@ -0,0 +1,99 @@
+"""
+Memory-per-worker benchmark for pre-forked search indices.
+
+Compares workers that each load the corpus and build their own search
+indices with workers forked from a master that built them once and froze
+them (``gc.freeze()``), as ``gunicorn.conf.py`` does with ``preload_app``.
+Each worker runs the same searches and then reports its RSS, USS (memory
+private to the worker) and PSS (shared pages divided among the sharers).
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Runs in a child interpreter: ``python -c SCRIPT <mode> <workers>``
+WORKER_SCRIPT = """
+import gc, json, os, sys
+import psutil
+from ramayanam import Ramayanam
+from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService
+
+QUERIES = ['rama', 'hanuman', 'devotion to rama', 'forest exile', 'dharma']
+mode, workers = sys.argv[1], int(sys.argv[2])
+
+shared = None
+if mode == 'preload':
+    shared = OptimizedFuzzySearchService(Ramayanam.load())
+    gc.collect()
+    gc.freeze()
+
+children = []
+for _ in range(workers):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        service = shared or OptimizedFuzzySearchService(Ramayanam.load())
+        for query in QUERIES:
+            service.search_translation_fuzzy(query)
+            service.search_sloka_sanskrit_fuzzy(query)
+        gc.collect()
+        info = psutil.Process().memory_full_info()
+        os.write(write_fd, json.dumps({
+            'rss_mb': info.rss / 2**20, 'uss_mb': info.uss / 2**20, 'pss_mb': info.pss / 2**20
+        }).encode())
+        os._exit(0)
+    os.close(write_fd)
+    children.append((pid, read_fd))
+
+reports = []
+for pid, read_fd in children:
+    with os.fdopen(read_fd) as pipe:
+        reports.append(json.loads(pipe.read()))
+    os.waitpid(pid, 0)
+print(json.dumps(reports))
+"""
+
+
+def measure(mode, workers=2):
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    result = subprocess.run(
+        [sys.executable, '-c', WORKER_SCRIPT, mode, str(workers)],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, env=env, timeout=600
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def average(reports, key):
+    return sum(r[key] for r in reports) / len(reports)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.skipif(not hasattr(os, 'fork') or not sys.platform.startswith('linux'),
+                    reason="USS/PSS are only reported on Linux")
+class TestWorkerMemory:
+    """Per-worker memory with and without pre-fork index sharing."""
+
+    def test_rss_per_worker(self):
+        per_worker = measure('per_worker')
+        preload = measure('preload')
+
+        print("\nMemory per worker (MB, mean of %d workers):" % len(preload))
+        print(f"  {'mode':<12}{'RSS':>10}{'USS':>10}{'PSS':>10}")
+        for mode, reports in (('per_worker', per_worker), ('preload', preload)):
+            print(f"  {mode:<12}" + "".join(
+                f"{average(reports, key):>10.1f}" for key in ('rss_mb', 'uss_mb', 'pss_mb')
+            ))
+
+        # Pre-forked workers keep the corpus and indices shared rather than private
+        assert average(preload, 'uss_mb') < average(per_worker, 'uss_mb')
@@ -0,0 +1,156 @@
+"""
+Unit tests for the opt-in profiling service and the admin endpoints.
+"""
+
+import json
+import time
+import tracemalloc
+import pytest
+from unittest.mock import patch
+
+from api.services.profiling_service import ProfilingService, SamplingProfiler
+
+
+ADMIN_HEADERS = {'Authorization': 'Bearer secret-token'}
+
+
+@pytest.fixture
+def admin_token():
+    """Configure an admin token for the duration of a test."""
+    with patch('api.controllers.admin_controller.Config.ADMIN_TOKEN', 'secret-token'):
+        yield 'secret-token'
+
+
+@pytest.mark.service
+class TestProfilingService:
+    """Test cases for ProfilingService."""
+
+    def test_tracemalloc_not_started_at_import(self):
+        """Importing the app must not turn on allocation tracing."""
+        import api.app  # noqa: F401
+        assert not tracemalloc.is_tracing()
+
+    def test_snapshot_requires_tracing(self):
+        """Snapshots are refused while tracing is off."""
+        service = ProfilingService()
+        with pytest.raises(RuntimeError):
+            service.take_snapshot()
+
+    def test_snapshot_diff(self):
+        """Snapshots can be diffed to find allocation growth."""
+        service = ProfilingService()
+        service.start_memory_tracing()
+        try:
+            before = service.take_snapshot('before')
+            retained = [bytearray(1024) for _ in range(200)]
+            after = service.take_snapshot('after')
+
+            diff = service.diff_snapshots(before, after, limit=5)
+            assert diff
+            assert diff[0]['size_diff_kb'] > 0
+            assert len(retained) == 200
+        finally:
+            service.stop_memory_tracing()
+        assert not tracemalloc.is_tracing()
+
+    def test_request_profile_cpu(self):
+        """Per-request CPU profiles are stored and retrievable."""
+        service = ProfilingService()
+        state = service.begin_request_profile(['cpu'])
+        sum(i * i for i in range(10000))
+        profile_id = service.end_request_profile(state, 'GET', '/test')
+
+        profiles = service.get_request_profiles(profile_id)
+        assert len(profiles) == 1
+        assert 'cumulative' in profiles[0]['cpu']
+
+    def test_overlapping_memory_request_profiles(self):
+        """Requests profiling memory share one trace, stopped by the last of them."""
+        service = ProfilingService()
+        first = service.begin_request_profile(['memory'])
+        second = service.begin_request_profile(['memory'])
+
+        service.end_request_profile(first, 'GET', '/first')
+        assert tracemalloc.is_tracing()
+        retained = [bytearray(1024) for _ in range(100)]
+        service.end_request_profile(second, 'GET', '/second')
+
+        assert not tracemalloc.is_tracing()
+        assert service.get_request_profiles()[0]['memory'][0]['size_diff_kb'] > 0
+        assert len(retained) == 100
+
+    def test_sampling_profiler_collects_samples(self):
+        """The sampling profiler records stacks of busy threads."""
+        sampler = SamplingProfiler(interval=0.001)
+        sampler.start()
+        deadline = time.time() + 0.1
+        while time.time() < deadline:
+            sum(i for i in range(1000))
+        sampler.stop()
+
+        report = sampler.report(limit=5)
+        assert not report['running']
+        assert report['total_samples'] > 0
+        assert report['cumulative']
+
+
+@pytest.mark.api
+class TestAdminEndpoints:
+    """Test cases for the admin profiling endpoints."""
+
+    def test_admin_disabled_without_token(self, client):
+        """The admin API is off when no token is configured."""
+        with patch('api.controllers.admin_controller.Config.ADMIN_TOKEN', ''):
+            response = client.get('/api/admin/profiling', headers=ADMIN_HEADERS)
+
+        assert response.status_code == 403
+
+    def test_admin_rejects_bad_token(self, client, admin_token):
+        """Requests with the wrong token are rejected."""
+        response = client.get('/api/admin/profiling', headers={'Authorization': 'Bearer wrong'})
+
+        assert response.status_code == 401
+
+    def test_profiling_status(self, client, admin_token):
+        """Authorized callers can read profiler status."""
+        response = client.get('/api/admin/profiling', headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['success'] is True
+        assert data['status']['memory_tracing'] is False
+
+    def test_non_numeric_limit(self, client, admin_token):
+        """A malformed limit falls back to the default instead of failing."""
+        response = client.get('/api/admin/profiling/cpu?limit=all', headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['success'] is True
+
+    def test_unknown_group_by(self, client, admin_token):
+        """An unknown allocation grouping is rejected before reaching tracemalloc."""
+        response = client.get('/api/admin/profiling/memory/top?group_by=bogus', headers=ADMIN_HEADERS)
+
+        assert response.status_code == 400
+        assert 'group_by' in json.loads(response.data)['error']
+
+    def test_per_request_profile_header(self, client, admin_token):
+        """A profiled request returns a profile id that can be fetched."""
+        headers = dict(ADMIN_HEADERS, **{'X-Profile': 'cpu'})
+        response = client.get('/health', headers=headers)
+
+        assert response.status_code == 200
+        profile_id = response.headers.get('X-Profile-Id')
+        assert profile_id
+
+        response = client.get(f'/api/admin/profiling/requests?id={profile_id}', headers=ADMIN_HEADERS)
+        data = json.loads(response.data)
+        assert data['count'] == 1
+        assert data['profiles'][0]['path'] == '/health'
+
+    def test_profile_header_ignored_without_token(self, client):
+        """Unauthenticated callers cannot trigger profiling."""
+        response = client.get('/health', headers={'X-Profile': 'cpu'})
+
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response.headers
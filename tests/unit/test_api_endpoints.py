@@ -249,6 +249,30 @@ class TestFuzzySearchEndpoints:
         assert 'error' in data
         assert 'invalid' in data['error'].lower()
 
+    
+    def test_fuzzy_search_passes_field_projection(self, client, mock_fuzzy_search_service):
+        """Test that the fields parameter is forwarded to the search service."""
+        response = client.get('/api/ramayanam/slokas/fuzzy-search?query=rama&fields=translation')
+        
+        assert response.status_code == 200
+        _, kwargs = mock_fuzzy_search_service.search_translation_fuzzy.call_args
+        assert kwargs['fields'] == ('sloka_number', 'translation', 'ratio')
+    
+    def test_fuzzy_search_compact_mode(self, client, mock_fuzzy_search_service):
+        """Test that compact mode requests only ids and scores."""
+        response = client.get('/api/ramayanam/slokas/fuzzy-search?query=rama&compact=true')
+        
+        assert response.status_code == 200
+        _, kwargs = mock_fuzzy_search_service.search_translation_fuzzy.call_args
+        assert kwargs['fields'] == ('sloka_number', 'ratio')
+    
+    def test_fuzzy_search_invalid_fields(self, client):
+        """Test fuzzy search with an unknown result field."""
+        response = client.get('/api/ramayanam/slokas/fuzzy-search?query=rama&fields=bogus')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'bogus' in data['error']
 
 @pytest.mark.api
 class TestSanskritSearchEndpoints:
@@ -0,0 +1,57 @@
+"""
+Unit tests for the scalable extractor's context-window confidence scoring.
+"""
+
+import random
+import re
+import pytest
+
+from api.services.enhanced_entity_extraction import ScalableEntityExtractor
+
+
+def _reference_confidence(text, match, pattern, source_type):
+    """The scoring before context boosts were precomputed per entity"""
+    multipliers = {'sanskrit': 1.0, 'translation': 0.9, 'meaning': 0.8}
+    confidence = pattern.confidence_base * multipliers.get(source_type, 0.7)
+    context_window = text[max(0, match.start()-50):match.end()+50]
+    context_boost = 0
+    for context_word in pattern.context_words:
+        if context_word.lower() in context_window.lower():
+            context_boost += 0.05
+    for epithet in pattern.epithets:
+        if epithet.lower() in context_window.lower():
+            context_boost += 0.1
+    return min(1.0, confidence + context_boost)
+
+
+@pytest.mark.service
+class TestConfidenceScoring:
+    """Test cases for _calculate_confidence against the reference scoring."""
+
+    def test_matches_reference_scores(self):
+        extractor = ScalableEntityExtractor(':memory:')
+        rng = random.Random(5)
+        vocabulary = ['राम', 'राघव', 'सीता', 'जानकी', 'वैदेही', 'राजा', 'धनुष', 'अयोध्या', 'वन', 'रावण',
+                      'लंका', 'हनुमान्', 'मारुति', 'वानर', 'Rama', 'Sita', 'the', 'forest', 'धर्म', 'सत्य', '।']
+
+        compared = 0
+        for _ in range(200):
+            # Long texts with many mentions, so windows overlap and clip at both ends
+            text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randrange(1, 80)))
+            for source_type in ('sanskrit', 'translation', 'meaning', 'other'):
+                for pattern in extractor.entity_patterns:
+                    for regex in pattern.sanskrit_patterns + pattern.english_patterns:
+                        for match in re.finditer(regex, text, re.IGNORECASE):
+                            expected = _reference_confidence(text, match, pattern, source_type)
+                            assert extractor._calculate_confidence(text, match, pattern, source_type) == expected
+                            compared += 1
+        assert compared > 1000
+
+    def test_boosts_follow_pattern_order(self):
+        extractor = ScalableEntityExtractor(':memory:')
+        rama = extractor.patterns_by_id.get('rama')
+
+        boosts = extractor.context_boosts['rama']
+
+        assert [word for word, _ in boosts] == [word.lower() for word in rama.context_words + rama.epithets]
+        assert {boost for _, boost in boosts} == {0.05, 0.1}
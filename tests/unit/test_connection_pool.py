@@ -0,0 +1,95 @@
+"""
+Unit tests for the shared SQLite connection pool.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import pytest
+
+from api.services.connection_pool import SQLiteConnectionPool, get_connection_pool
+
+
+@pytest.fixture
+def db_path():
+    """A temporary database file with a small table."""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+    yield path
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+@pytest.mark.service
+class TestSQLiteConnectionPool:
+    """Test cases for SQLiteConnectionPool."""
+
+    def test_connection_reused_within_thread(self, db_path):
+        pool = SQLiteConnectionPool(db_path)
+
+        assert pool.connection() is pool.connection()
+        assert pool.stats()['connections_opened'] == 1
+
+    def test_connection_per_thread(self, db_path):
+        pool = SQLiteConnectionPool(db_path)
+        main_conn = pool.connection()
+        other = []
+
+        thread = threading.Thread(target=lambda: other.append(pool.connection()))
+        thread.start()
+        thread.join()
+
+        assert other[0] is not main_conn
+        assert pool.stats()['connections_opened'] == 2
+
+    def test_pragmas_and_wal(self, db_path):
+        conn = SQLiteConnectionPool(db_path, mmap_size=1024 * 1024, cache_size_kb=2048).connection()
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2048
+        assert conn.row_factory is sqlite3.Row
+
+    def test_with_block_commits_without_closing(self, db_path):
+        pool = SQLiteConnectionPool(db_path)
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('rama')")
+
+        # Still open, and the insert is visible to other connections
+        assert pool.connection().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+        assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+    def test_write_rolls_back_on_error(self, db_path):
+        pool = SQLiteConnectionPool(db_path)
+
+        with pytest.raises(RuntimeError):
+            with pool.write() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('ravana')")
+                raise RuntimeError("abort")
+
+        assert pool.connection().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_connections_not_reused_after_fork(self, db_path):
+        """A forked child opens its own connections."""
+        pool = SQLiteConnectionPool(db_path)
+        parent_conn = pool.connection()
+
+        pool._pid = -1  # as seen from a forked child
+        assert pool.connection() is not parent_conn
+
+    def test_pool_shared_by_path(self, db_path):
+        """Services pointing at the same file share one pool."""
+        from api.services.kg_database_service import KGDatabaseService
+        from api.services.entity_deduplication import EntityDeduplicationService
+
+        kg_service = KGDatabaseService(db_path=db_path)
+        dedup_service = EntityDeduplicationService(db_path=db_path)
+
+        assert kg_service.pool is dedup_service.pool is get_connection_pool(db_path)
+        assert kg_service.get_connection() is dedup_service.get_connection()
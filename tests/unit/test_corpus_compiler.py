@@ -0,0 +1,115 @@
+"""
+Unit tests for the incremental corpus compiler.
+"""
+
+import os
+import pickle
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from api.services.corpus_compiler import compile_corpus
+
+
+def _write_sarga(root, kanda, sarga, kanda_id, translations):
+    kanda_path = root / kanda
+    kanda_path.mkdir(parents=True, exist_ok=True)
+    for file_type in ('sloka', 'meaning', 'translation'):
+        lines = [f"{kanda_id}::{sarga}::{sloka}::{file_type} {text}" for sloka, text in enumerate(translations, 1)]
+        (kanda_path / f"{kanda}_sarga_{sarga}_{file_type}.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    source = tmp_path / 'Slokas'
+    _write_sarga(source, 'BalaKanda', 1, 1, ['Rama was born', 'in Ayodhya'])
+    _write_sarga(source, 'BalaKanda', 2, 1, ['Vishvamitra came'])
+    _write_sarga(source, 'SundaraKanda', 1, 5, ['Hanuman leapt'])
+    return source, str(tmp_path / 'corpus.db'), str(tmp_path / 'ramayanam.pkl')
+
+
+def _slokas(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT kanda_id, sarga_id, sloka_id, translation FROM slokas ORDER BY kanda_id, sarga_id, sloka_id"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.service
+class TestCorpusCompiler:
+    """Test cases for compile_corpus."""
+
+    def test_compiles_tree(self, corpus):
+        source, db_path, snapshot_path = corpus
+
+        stats = compile_corpus(str(source), db_path, snapshot_path)
+
+        assert stats['compiled_sargas'] == 3 and stats['slokas_inserted'] == 4
+        assert _slokas(db_path) == [
+            (1, 1, 1, 'translation Rama was born'), (1, 1, 2, 'translation in Ayodhya'),
+            (1, 2, 1, 'translation Vishvamitra came'), (5, 1, 1, 'translation Hanuman leapt'),
+        ]
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+        assert snapshot.kandas[5].sargas[1].slokas[1].translation == 'translation Hanuman leapt'
+        assert snapshot.kandas[1].sargas[3].slokas == {}
+
+    def test_unchanged_and_touched_files_are_not_recompiled(self, corpus):
+        source, db_path, snapshot_path = corpus
+        compile_corpus(str(source), db_path, snapshot_path)
+
+        stats = compile_corpus(str(source), db_path, snapshot_path)
+        assert stats['unchanged_sargas'] == 3 and stats['compiled_sargas'] == 0
+        assert not stats['snapshot_written']
+
+        touched = source / 'BalaKanda' / 'BalaKanda_sarga_2_meaning.txt'
+        os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns + 10 ** 9))
+        stats = compile_corpus(str(source), db_path, snapshot_path)
+        assert stats['touched_sargas'] == 1 and stats['compiled_sargas'] == 0
+
+        assert compile_corpus(str(source), db_path, snapshot_path)['unchanged_sargas'] == 3
+
+    def test_changed_and_removed_sargas(self, corpus):
+        source, db_path, snapshot_path = corpus
+        compile_corpus(str(source), db_path, snapshot_path)
+
+        _write_sarga(source, 'BalaKanda', 1, 1, ['Rama was born'])
+        for file_type in ('sloka', 'meaning', 'translation'):
+            (source / 'SundaraKanda' / f'SundaraKanda_sarga_1_{file_type}.txt').unlink()
+        stats = compile_corpus(str(source), db_path, snapshot_path)
+
+        assert (stats['compiled_sargas'], stats['removed_sargas'], stats['slokas_inserted']) == (1, 1, 1)
+        assert _slokas(db_path) == [(1, 1, 1, 'translation Rama was born'), (1, 2, 1, 'translation Vishvamitra came')]
+        assert stats['snapshot_written']
+
+        conn = sqlite3.connect(db_path)
+        try:
+            # The FTS index follows the compiled rows
+            assert conn.execute("SELECT count(*) FROM slokas_fts WHERE slokas_fts MATCH 'Ayodhya'").fetchone() == (0,)
+            assert conn.execute("SELECT count(*) FROM slokas_fts WHERE slokas_fts MATCH 'Vishvamitra'").fetchone() == (1,)
+        finally:
+            conn.close()
+
+    def test_parallel_and_forced_compiles_match(self, corpus, tmp_path):
+        source, db_path, _ = corpus
+        compile_corpus(str(source), db_path)
+        parallel_path = str(tmp_path / 'parallel.db')
+
+        assert compile_corpus(str(source), parallel_path, workers=2)['compiled_sargas'] == 3
+        assert compile_corpus(str(source), db_path, force=True)['compiled_sargas'] == 3
+        assert _slokas(parallel_path) == _slokas(db_path)
+
+    def test_failed_forced_compile_keeps_corpus(self, corpus):
+        source, db_path, _ = corpus
+        compile_corpus(str(source), db_path)
+        before = _slokas(db_path)
+
+        with patch('api.services.corpus_compiler._read_sarga', side_effect=OSError('disk gone')):
+            with pytest.raises(OSError):
+                compile_corpus(str(source), db_path, force=True)
+
+        assert _slokas(db_path) == before
+        assert compile_corpus(str(source), db_path)['unchanged_sargas'] == 3
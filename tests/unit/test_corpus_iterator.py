@@ -0,0 +1,79 @@
+"""
+Unit tests for keyset-paginated corpus iteration.
+"""
+
+import pytest
+
+from api.services.connection_pool import get_connection_pool
+from api.services.corpus_iterator import iter_slokas, keyset_batches, sloka_batches, stream_rows
+from api.services.kg_schema import migrate_kg_schema
+
+
+POSITIONS = [(kanda, sarga, sloka) for kanda in (1, 2) for sarga in (1, 2, 3) for sloka in (1, 2, 10)]
+
+
+@pytest.fixture
+def corpus_db(kg_db_factory):
+    # Inserted out of reading order
+    return kg_db_factory([(*position, f'sloka {position}', '', '') for position in reversed(POSITIONS)])
+
+
+@pytest.mark.service
+class TestCorpusIterator:
+    """Test cases for keyset_batches, sloka_batches and stream_rows."""
+
+    @pytest.mark.parametrize('batch_size', [1, 4, 9, 18, 100])
+    def test_sloka_batches_cover_corpus_in_order(self, corpus_db, batch_size):
+        conn = get_connection_pool(corpus_db).connection()
+
+        batches = list(sloka_batches(conn, batch_size))
+
+        assert all(0 < len(batch) <= batch_size for batch in batches)
+        assert [tuple(row)[:3] for batch in batches for row in batch] == POSITIONS
+        assert [row['sloka'] for row in iter_slokas(conn, batch_size)][0] == 'sloka (1, 1, 1)'
+
+    def test_keyset_batches_with_condition(self, corpus_db):
+        conn = get_connection_pool(corpus_db).connection()
+
+        rows = [row for batch in keyset_batches(conn, 'slokas', ('kanda_id', 'sarga_id', 'sloka_id'),
+                                                ('sloka_id', 'kanda_id', 'sarga_id'), batch_size=2,
+                                                where='kanda_id = ? OR sloka_id = ?', params=(2, 10))
+                for row in batch]
+
+        expected = [position for position in POSITIONS if position[0] == 2 or position[2] == 10]
+        assert [(row['kanda_id'], row['sarga_id'], row['sloka_id']) for row in rows] == expected
+
+    def test_writes_between_batches(self, corpus_db):
+        pool = get_connection_pool(corpus_db)
+        seen = 0
+        for batch in sloka_batches(pool.connection(), batch_size=5):
+            with pool.write() as conn:
+                conn.executemany(
+                    "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end) "
+                    "VALUES (?, 'rama', 0, 4)",
+                    [(f"{row['kanda_id']}.{row['sarga_id']}.{row['sloka_id']}",) for row in batch]
+                )
+            seen += len(batch)
+
+        assert seen == len(POSITIONS)
+        count = pool.connection().execute("SELECT COUNT(*) FROM text_entity_mentions").fetchone()[0]
+        assert count == len(POSITIONS)
+
+    def test_slokas_are_seeked_by_index(self, corpus_db):
+        pool = get_connection_pool(corpus_db)
+        migrate_kg_schema(pool)
+
+        plan = pool.connection().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM slokas WHERE (kanda_id, sarga_id, sloka_id) > (?, ?, ?) "
+            "ORDER BY kanda_id, sarga_id, sloka_id LIMIT 5", (1, 2, 3)
+        ).fetchall()
+
+        details = ' '.join(row[-1] for row in plan)
+        assert 'idx_slokas_position' in details
+        assert 'TEMP B-TREE' not in details
+
+    def test_stream_rows(self, corpus_db):
+        conn = get_connection_pool(corpus_db).connection()
+        cursor = conn.execute("SELECT sloka_id FROM slokas ORDER BY kanda_id, sarga_id, sloka_id")
+
+        assert [row[0] for row in stream_rows(cursor, batch_size=4)] == [position[2] for position in POSITIONS]
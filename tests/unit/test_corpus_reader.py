@@ -0,0 +1,72 @@
+"""
+Unit tests for the streaming sloka corpus reader.
+"""
+
+import pytest
+
+from api.services.corpus_loader import load_slokas_from_corpus
+from api.services.corpus_reader import CorpusReader, SlokaRecord, parse_lines
+
+
+def _write_sarga(root, kanda, sarga, kanda_id, slokas, meanings=None, translations=None):
+    kanda_path = root / kanda
+    kanda_path.mkdir(exist_ok=True)
+    for file_type, texts in (('sloka', slokas), ('meaning', meanings), ('translation', translations)):
+        if texts is None:
+            continue
+        lines = [f"{kanda_id}::{sarga}::{sloka}::{text}" for sloka, text in texts]
+        (kanda_path / f"{kanda}_sarga_{sarga}_{file_type}.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    _write_sarga(tmp_path, 'YuddhaKanda', 1, 6, [(1, 'युद्ध')], [(1, 'war')], [(1, 'The war')])
+    for sarga in (10, 2, 1):
+        _write_sarga(tmp_path, 'BalaKanda', sarga, 1,
+                     [(1, f'राम {sarga}'), (2, f'सीता {sarga}')],
+                     # Meanings out of order and one missing translation
+                     [(2, f'Sita {sarga}'), (1, f'Rama {sarga}')],
+                     [(1, f'Rama spoke {sarga}')])
+    # A sarga without its meaning file is incomplete
+    _write_sarga(tmp_path, 'AyodhyaKanda', 1, 2, [(1, 'अयोध्या')], None, [(1, 'Ayodhya')])
+    return tmp_path
+
+
+@pytest.mark.service
+class TestCorpusReader:
+    """Test cases for CorpusReader and the loaders built on it."""
+
+    def test_reading_order(self, corpus):
+        reader = CorpusReader(str(corpus))
+
+        assert [path.name for path in reader.kanda_directories()] == ['BalaKanda', 'AyodhyaKanda', 'YuddhaKanda']
+        assert [(sarga.kanda, sarga.sarga) for sarga in reader.sargas()] == \
+            [('BalaKanda', '1'), ('BalaKanda', '2'), ('BalaKanda', '10'), ('YuddhaKanda', '1')]
+        assert len(reader.sargas(complete=False)) == 5
+
+    def test_aligned_records(self, corpus):
+        records = list(CorpusReader(str(corpus)).iter_slokas())
+
+        assert records[:2] == [
+            SlokaRecord('1', '1', '1', 'राम 1', 'Rama 1', 'Rama spoke 1'),
+            SlokaRecord('1', '1', '2', 'सीता 1', 'Sita 1', ''),
+        ]
+        assert records[-1].text_unit_id == '6.1.1'
+        assert len(records) == 7
+
+    def test_parallel_matches_serial(self, corpus):
+        reader = CorpusReader(str(corpus))
+
+        assert list(reader.iter_slokas(workers=3)) == list(reader.iter_slokas())
+
+    def test_first_line_of_an_id_wins(self):
+        texts = parse_lines(['1::1::1::first', 'not a sloka line', '1::1::1::second', '1::1::2::other'])
+
+        assert texts == {('1', '1', '1'): 'first', ('1', '1', '2'): 'other'}
+
+    def test_load_slokas_from_corpus(self, corpus):
+        slokas = load_slokas_from_corpus(str(corpus))
+
+        assert list(slokas) == ['BalaKanda', 'YuddhaKanda']
+        assert list(slokas['BalaKanda']) == ['1', '2', '10']
+        assert slokas['BalaKanda']['2']['slokas'] == {'BalaKanda_2_1': 'राम 2', 'BalaKanda_2_2': 'सीता 2'}
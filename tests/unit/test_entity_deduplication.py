@@ -0,0 +1,217 @@
+"""
+Unit tests for entity deduplication and its blocking stage.
+"""
+
+import json
+import random
+import sqlite3
+import pytest
+
+from api.services.entity_blocking import BlockingEntity, candidate_pairs, fold_name, phonetic_key
+from api.services.entity_deduplication import (
+    DuplicateCandidate, EntityDeduplicationService, EntityRecord, MergeProposal
+)
+from api.services.kg_database_service import KGDatabaseService
+from api.services.kg_graph import KGGraph
+
+
+
+ENTITIES = [
+    ('rama', 'Person', {'en': 'Rama', 'sa': 'राम'}, {'epithets': ['राघव', 'दाशरथि'], 'context_words': ['धनुष', 'सीता']}),
+    ('raama', 'Person', {'en': 'Raama', 'sa': 'रामः'}, {'epithets': ['राघव']}),
+    ('lakshmana', 'Person', {'en': 'Lakshmana'}, {'alternative_names': ['Saumitri']}),
+    ('laxmana', 'Person', {'en': 'Laxmana'}, {'alternative_names': ['Soumitri']}),
+    ('hanuman', 'Person', {'en': 'Hanuman', 'sa': 'हनुमान्'}, {'context_words': ['वानर', 'लंका', 'राम', 'सीता']}),
+    ('maruti', 'Person', {'en': 'Maruti'}, {'context_words': ['वानर', 'लंका', 'राम', 'सीता']}),
+    ('ravana', 'Person', {'en': 'Ravana', 'sa': 'रावण'}, {'epithets': ['दशग्रीव']}),
+    ('lanka', 'Place', {'en': 'Lanka', 'sa': 'लंका'}, {}),
+    ('lanka_person', 'Person', {'en': 'Lanka'}, {}),
+    ('ayodhya', 'Place', {'en': 'Ayodhya', 'sa': 'अयोध्या'}, {'context_words': ['राजा', 'दशरथ']}),
+]
+
+
+@pytest.fixture
+def kg_db(kg_db):
+    conn = sqlite3.connect(kg_db)
+    conn.executemany(
+        "INSERT INTO kg_entities (kg_id, entity_type, labels, properties) VALUES (?, ?, ?, ?)",
+        [(f"http://ramayanam.hanuma.com/entity/{entity_id}", entity_type,
+          json.dumps(labels, ensure_ascii=False), json.dumps(properties, ensure_ascii=False))
+         for entity_id, entity_type, labels, properties in ENTITIES]
+    )
+    conn.commit()
+    conn.close()
+    return kg_db
+
+
+@pytest.mark.service
+class TestEntityBlocking:
+    """Test cases for the blocking keys and candidate_pairs."""
+
+    def test_phonetic_keys_fold_transliteration_variants(self):
+        assert phonetic_key('Rama') == phonetic_key('Raama') == phonetic_key('Rāma') == phonetic_key('Ram')
+        assert phonetic_key('Lakshmana') == phonetic_key('Laxmana') == phonetic_key('Lakṣmaṇa')
+        assert phonetic_key('राम') == phonetic_key('रामः') != phonetic_key('रावण')
+        assert fold_name('Hanumān Ji') == 'hanumanji'
+        assert fold_name('राम।') == 'राम'
+
+    def test_pairs_stay_within_entity_types(self):
+        entities = [
+            BlockingEntity('Place', ['Lanka']),
+            BlockingEntity('Person', ['Lanka']),
+            BlockingEntity('Person', ['Lankaa']),
+        ]
+
+        assert candidate_pairs(entities) == {(1, 2)}
+
+    def test_context_pairs_are_exact(self):
+        rng = random.Random(3)
+        vocabulary = [f"word{i}" for i in range(30)]
+        entities = [
+            BlockingEntity('Person', [], context_words=frozenset(rng.sample(vocabulary, rng.randrange(1, 8))))
+            for _ in range(300)
+        ]
+
+        pairs = candidate_pairs(entities, context_threshold=0.75)
+
+        for i in range(len(entities)):
+            for j in range(i + 1, len(entities)):
+                first, second = entities[i].context_words, entities[j].context_words
+                if len(first & second) / len(first | second) >= 0.75:
+                    assert (i, j) in pairs
+        # A small fraction of all 44,850 pairs
+        assert len(pairs) < 0.15 * 44850
+
+
+@pytest.mark.service
+class TestEntityDeduplication:
+    """Test cases for EntityDeduplicationService.find_duplicate_candidates."""
+
+    def test_finds_duplicates(self, kg_db):
+        service = EntityDeduplicationService(db_path=kg_db)
+
+        candidates = service.find_duplicate_candidates()
+
+        assert [(c.entity1_id, c.entity2_id, c.similarity_type) for c in candidates] == [
+            ('rama', 'raama', 'epithet'),
+            ('lakshmana', 'laxmana', 'epithet'),
+            ('hanuman', 'maruti', 'context'),
+        ]
+
+    def test_matches_all_pairs_comparison(self, kg_db):
+        service = EntityDeduplicationService(db_path=kg_db)
+        conn = sqlite3.connect(kg_db)
+        conn.row_factory = sqlite3.Row
+        entities = [EntityRecord.from_row(row) for row in conn.execute(
+            "SELECT kg_id, entity_type, labels, properties FROM kg_entities")]
+        conn.close()
+
+        expected = []
+        for i in range(len(entities)):
+            for j in range(i + 1, len(entities)):
+                if entities[i].entity_type == entities[j].entity_type:
+                    candidate = service._analyze_entity_similarity(entities[i], entities[j])
+                    if candidate and candidate.confidence >= service.minimum_merge_confidence:
+                        expected.append(candidate)
+
+        assert service.find_duplicate_candidates() == expected
+
+
+def _kg_id(entity_id):
+    return f"http://ramayanam.hanuma.com/entity/{entity_id}"
+
+
+def _proposal(primary, duplicates):
+    return MergeProposal(primary, duplicates, {'en': primary}, {'merged_from': [primary] + duplicates}, 0, 0.9)
+
+
+@pytest.mark.service
+class TestEntityMerging:
+    """Test cases for merge grouping and the batched merge executor."""
+
+    def test_components_of_long_chains(self, kg_db):
+        service = EntityDeduplicationService(db_path=kg_db)
+        chain = [DuplicateCandidate(f"e{i}", f"e{i + 1}", 0.9, 'name', 0.9) for i in range(5000)]
+        pair = [DuplicateCandidate('x', 'y', 0.9, 'name', 0.9)]
+
+        components = service._find_connected_components(chain + pair)
+
+        assert [len(component) for component in components] == [5001, 2]
+        assert components[1] == ['x', 'y']
+
+    def test_merge_plan(self, kg_db):
+        conn = sqlite3.connect(kg_db)
+        conn.executemany(
+            "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end) VALUES (?, ?, 0, 4)",
+            [('1.1.1', _kg_id('rama')), ('1.1.2', _kg_id('raama')), ('1.1.3', 'raama'),
+             ('1.1.4', _kg_id('laxmana')), ('1.1.5', _kg_id('ravana')), ('1.1.1', _kg_id('raama'))]
+        )
+        conn.executemany(
+            "INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, ?, ?)",
+            [(_kg_id('laxmana'), 'hasBrother', _kg_id('raama')),
+             (_kg_id('ravana'), 'enemyOf', _kg_id('raama')),
+             (_kg_id('hanuman'), 'devoteeOf', _kg_id('rama')),
+             (_kg_id('raama'), 'sameAs', _kg_id('rama')),
+             (_kg_id('hanuman'), 'devoteeOf', _kg_id('raama'))]
+        )
+        conn.commit()
+        service = EntityDeduplicationService(db_path=kg_db)
+        plan = [_proposal('rama', ['raama']), _proposal('lakshmana', ['laxmana'])]
+
+        def snapshot():
+            return (
+                conn.execute("SELECT text_unit_id, entity_id FROM text_entity_mentions ORDER BY id").fetchall(),
+                conn.execute("SELECT subject_id, predicate, object_id FROM kg_relationships ORDER BY id").fetchall(),
+                conn.execute("SELECT kg_id, labels FROM kg_entities ORDER BY kg_id").fetchall(),
+            )
+
+        before = snapshot()
+        report = service.execute_merge_plan(plan, dry_run=True)
+        assert snapshot() == before
+        expected = {
+            'proposals': 2, 'entities_merged': 2, 'mentions': 3, 'relationship_subjects': 1,
+            'relationship_objects': 2, 'entities_deleted': 2, 'relationship_self_loops': 1,
+            'duplicate_relationships': 1, 'duplicate_mentions': 1
+        }
+        assert report == {**expected, 'dry_run': True}
+
+        assert service.execute_merge_plan(plan) == {**expected, 'dry_run': False}
+        mentions, relationships, entities = snapshot()
+        assert mentions == [
+            ('1.1.1', _kg_id('rama')), ('1.1.2', _kg_id('rama')), ('1.1.3', 'rama'),
+            ('1.1.4', _kg_id('lakshmana')), ('1.1.5', _kg_id('ravana')),
+        ]
+        assert relationships == [
+            (_kg_id('lakshmana'), 'hasBrother', _kg_id('rama')), (_kg_id('ravana'), 'enemyOf', _kg_id('rama')),
+            (_kg_id('hanuman'), 'devoteeOf', _kg_id('rama')),
+        ]
+        assert _kg_id('raama') not in dict(entities) and _kg_id('laxmana') not in dict(entities)
+        assert json.loads(dict(entities)[_kg_id('rama')]) == {'en': 'rama'}
+        conn.close()
+
+    def test_merge_plan_updates_live_graph(self, kg_db):
+        conn = sqlite3.connect(kg_db)
+        conn.executemany(
+            "INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, ?, ?)",
+            [(_kg_id('hanuman'), 'devoteeOf', _kg_id('rama')), (_kg_id('ravana'), 'enemyOf', _kg_id('raama'))]
+        )
+        conn.commit()
+        conn.close()
+        graph = KGGraph(KGDatabaseService(kg_db), refresh_interval=0)
+        service = EntityDeduplicationService(db_path=kg_db)
+
+        service.execute_merge_plan([_proposal('rama', ['raama'])])
+        graph.refresh(force=True)
+
+        edges = graph.neighborhood(_kg_id('rama'))['edges']
+        assert sorted((edge['subject_id'], edge['predicate']) for edge in edges) == [
+            (_kg_id('hanuman'), 'devoteeOf'), (_kg_id('ravana'), 'enemyOf')
+        ]
+        assert not graph.neighborhood(_kg_id('raama'))['edges']
+
+    def test_conflicting_plans_are_rejected(self, kg_db):
+        service = EntityDeduplicationService(db_path=kg_db)
+
+        with pytest.raises(ValueError):
+            service.execute_merge_plan([_proposal('rama', ['raama']), _proposal('raama', ['hanuman'])])
+        assert service.execute_merge_proposal(_proposal('hanuman', ['maruti']))
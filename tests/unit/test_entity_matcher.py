@@ -0,0 +1,119 @@
+"""
+Unit tests for the multi-pattern entity matcher and its use by the extractors.
+"""
+
+import re
+import pytest
+
+from api.services.automated_entity_extraction import RamayanaEntityExtractor
+from api.services.enhanced_entity_extraction import ScalableEntityExtractor
+from api.services.entity_matcher import AhoCorasick, MultiPatternMatcher, literal_prefix
+
+
+TEXTS = [
+    'रामः सीताम् अब्रवीत् राघवस्य वचनं श्रुत्वा रामस्य रामेण हनुमान्',
+    'मारुतिः पवनात्मजः रावणेन दशग्रीवस्य लङ्केशः लक्ष्मणस्य अयोध्यायाम्',
+    "Rama's brother Lakshmana; RAMA and Sita (Vaidehi, Janaki) met the son of the Windgod, Hanuman.",
+    'Dasarathi Kakutstha Raghava Ramayana Ravana Rāvaṇa the ten-headed Lankesa',
+    'rama रामः Rama राम',
+    'İstanbul Rama',
+    '',
+]
+
+
+def _finditer(patterns, text):
+    """The per-pattern loop the matcher replaces."""
+    return [(index, match.span()) for index, pattern in enumerate(patterns)
+            for match in re.finditer(pattern, text, re.IGNORECASE)]
+
+
+def _matches(matcher, text):
+    return [(index, match.span()) for index, match in matcher.finditer(text)]
+
+
+@pytest.mark.service
+class TestMultiPatternMatcher:
+    """Test cases for AhoCorasick and MultiPatternMatcher."""
+
+    def test_literal_prefix(self):
+        assert literal_prefix(r'\bRama\b') == 'Rama'
+        assert literal_prefix(r'राम[ःोम्स्य]?') == 'राम'
+        assert literal_prefix(r'\bson of Vayu\b') == 'son of Vayu'
+        assert literal_prefix(r'[ab]c') == ''
+        assert literal_prefix(r'(') == ''
+
+    def test_automaton_reports_overlapping_words(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+        assert sorted(automaton.find_all('ushers')) == [(1, 1), (2, 0), (2, 3)]
+        assert automaton.find_all('xyz') == []
+
+    def test_matches_per_pattern_finditer(self):
+        patterns = [
+            r'राम[ःोम्स्य]?', r'रामस्य', r'\bRama\b', r'\bson of the Windgod\b', r'सीता[म्ं]?',
+            r'\bRāvaṇa\b', r'मारुतिः?', r'[ab]c', r'R|ten-headed', r'\bhanuman\b'
+        ]
+        matcher = MultiPatternMatcher(patterns)
+
+        for text in TEXTS:
+            assert _matches(matcher, text) == _finditer(patterns, text)
+
+    def test_overlapping_patterns_match_independently(self):
+        matcher = MultiPatternMatcher([r'रामस्य', r'राम[ःोम्स्य]?', r'\brama\b'])
+
+        assert _matches(matcher, 'रामस्य रामः') == [(0, (0, 6)), (1, (0, 4)), (1, (7, 11))]
+
+    def test_extractor_regexes(self):
+        for patterns in (
+            [regex for pattern in RamayanaEntityExtractor().entity_patterns for regex in pattern.sanskrit_patterns],
+            [regex for pattern in RamayanaEntityExtractor().entity_patterns for regex in pattern.english_patterns],
+        ):
+            matcher = MultiPatternMatcher(patterns)
+            for text in TEXTS:
+                assert _matches(matcher, text) == _finditer(patterns, text)
+
+
+@pytest.mark.service
+class TestExtractorsUseMatcher:
+    """The extractors find the same mentions as with one finditer per regex."""
+
+    def test_pattern_extractor(self):
+        extractor = RamayanaEntityExtractor()
+        for text in TEXTS:
+            for source_type in ('sanskrit', 'translation'):
+                expected = []
+                for pattern in extractor.entity_patterns:
+                    regexes = pattern.sanskrit_patterns if source_type == 'sanskrit' else pattern.english_patterns
+                    mentions = [match.span() for regex in regexes for match in re.finditer(regex, text, re.IGNORECASE)]
+                    if mentions:
+                        expected.append((pattern.entity_id, mentions))
+                results = extractor._extract_from_text(text, source_type)
+                assert [(result.entity_id, result.mentions) for result in results] == expected
+
+        assert extractor.extraction_stats['patterns_matched'][r'\bRama\b'] == 5
+
+    def test_pattern_extractor_confidence(self):
+        results = RamayanaEntityExtractor()._extract_from_text(TEXTS[0], 'sanskrit')
+
+        rama = next(result for result in results if result.entity_id == 'rama')
+        assert rama.confidence == pytest.approx(0.99)
+
+    def test_scalable_extractor(self, tmp_path):
+        extractor = ScalableEntityExtractor(str(tmp_path / 'unused.db'))
+        row = {'kanda_id': 1, 'sarga_id': 2, 'sloka_id': 3,
+               'sloka': TEXTS[0], 'translation': TEXTS[2], 'meaning': TEXTS[4]}
+
+        extractions = extractor.extract_entities_from_sloka(row)
+
+        expected = []
+        for text, source_type in ((TEXTS[0], 'sanskrit'), (TEXTS[2], 'translation'), (TEXTS[4], 'meaning')):
+            text = text.lower()
+            for pattern in extractor.entity_patterns:
+                regexes = pattern.sanskrit_patterns if source_type == 'sanskrit' else pattern.english_patterns
+                expected.extend(
+                    (pattern.entity_id, source_type, match.start(), match.end(), regex)
+                    for regex in regexes for match in re.finditer(regex, text, re.IGNORECASE)
+                )
+        assert [(e['entity_id'], e['source_type'], e['span_start'], e['span_end'], e['pattern_type'])
+                for e in extractions] == expected
+        assert all(e['text_unit_id'] == '1.2.3' for e in extractions)
@@ -0,0 +1,136 @@
+"""
+Unit tests for manifest-driven incremental re-extraction.
+"""
+
+import sqlite3
+import pytest
+
+from api.services.enhanced_entity_extraction import ScalableEntityExtractor
+from api.services.extraction_manifest import content_hash, pattern_fingerprint, pattern_set_version
+
+
+# (kanda, sarga, sloka, sloka text, translation, meaning)
+SLOKAS = [
+    (1, 1, 1, 'रामः सीताम् अब्रवीत्', 'Rama spoke to Sita.', 'रामः Rama'),
+    (1, 1, 2, 'राघवस्य वचनं', 'The words of Raghava.', 'राघवस्य of Raghava'),
+    (1, 2, 1, 'जानकी वैदेही', 'Janaki, the princess of Videha.', 'जानकी Janaki'),
+]
+
+RAMA_URI = 'http://ramayanam.hanuma.com/entity/rama'
+
+
+@pytest.fixture
+def corpus_db(kg_db_factory):
+    return kg_db_factory([
+        (kanda, sarga, sloka_id, sloka, meaning, translation)
+        for kanda, sarga, sloka_id, sloka, translation, meaning in SLOKAS
+    ])
+
+
+def _query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _mentions(path):
+    return _query(path, "SELECT id, text_unit_id, entity_id, span_start, span_end, source_type "
+                        "FROM text_entity_mentions ORDER BY id")
+
+
+def _execute(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.service
+class TestIncrementalExtraction:
+    """Test cases for process_corpus_batch with the extraction manifest."""
+
+    def test_hashes_and_versions(self):
+        assert content_hash('a', 'b', 'c') != content_hash('a', 'bc', '')
+        assert content_hash('a', None, '') == content_hash('a', '', '')
+        patterns = ScalableEntityExtractor(':memory:').entity_patterns
+        assert pattern_fingerprint(patterns[0]) != pattern_fingerprint(patterns[1])
+        assert pattern_set_version({'a': '1', 'b': '2'}) == pattern_set_version({'b': '2', 'a': '1'})
+
+    def test_first_run_extracts_everything(self, corpus_db):
+        stats = ScalableEntityExtractor(corpus_db).process_corpus_batch()['statistics']
+
+        assert (stats['processed_slokas'], stats['skipped_slokas']) == (3, 0)
+        assert stats['mentions_inserted'] == len(_mentions(corpus_db)) > 0
+        assert stats['new_entities'] == 2
+        assert _query(corpus_db, "SELECT COUNT(*) FROM kg_extraction_manifest") == [(3,)]
+
+    def test_unchanged_corpus_is_skipped(self, corpus_db):
+        ScalableEntityExtractor(corpus_db).process_corpus_batch()
+        before = _mentions(corpus_db)
+
+        stats = ScalableEntityExtractor(corpus_db).process_corpus_batch()['statistics']
+
+        assert (stats['processed_slokas'], stats['skipped_slokas']) == (0, 3)
+        assert _mentions(corpus_db) == before
+
+    def test_changed_text_is_diffed(self, corpus_db):
+        ScalableEntityExtractor(corpus_db).process_corpus_batch()
+        before = _mentions(corpus_db)
+        _execute(corpus_db, "UPDATE slokas SET translation = 'Sita spoke to Rama.' WHERE sloka_id = 1 AND sarga_id = 1")
+
+        stats = ScalableEntityExtractor(corpus_db).process_corpus_batch()['statistics']
+
+        assert (stats['processed_slokas'], stats['skipped_slokas']) == (1, 2)
+        after = _mentions(corpus_db)
+        translation = [row[2:5] for row in after if row[1] == '1.1.1' and row[5] == 'translation']
+        assert sorted(translation) == [('rama', 14, 18), ('sita', 0, 4)]
+        # Mentions that didn't move keep their rows
+        unchanged = [row for row in before if row[5] != 'translation' or row[1] != '1.1.1']
+        assert [row for row in after if row in unchanged] == unchanged
+        assert (stats['mentions_inserted'], stats['mentions_deleted']) == (2, 2)
+
+    def test_changed_patterns_rescan_only_their_entities(self, corpus_db):
+        ScalableEntityExtractor(corpus_db).process_corpus_batch()
+        rama_before = [row for row in _mentions(corpus_db) if row[2] == 'rama']
+
+        extractor = ScalableEntityExtractor(corpus_db)
+        sita = next(pattern for pattern in extractor.entity_patterns if pattern.entity_id == 'sita')
+        sita.english_patterns.append(r"\bprincess of videha\b")
+        extractor.matchers = extractor._build_matchers()
+        stats = extractor.process_corpus_batch()['statistics']
+
+        assert stats['processed_slokas'] == 3
+        assert stats['mentions_inserted'] == 1
+        assert stats['mentions_deleted'] == 0
+        assert [row for row in _mentions(corpus_db) if row[2] == 'rama'] == rama_before
+        assert extractor.process_corpus_batch()['statistics']['processed_slokas'] == 0
+        # Reverting the pattern rescans that entity again
+        reverted = ScalableEntityExtractor(corpus_db).process_corpus_batch()['statistics']
+        assert (reverted['processed_slokas'], reverted['mentions_deleted']) == (3, 1)
+
+    def test_removed_slokas_and_other_sources(self, corpus_db):
+        ScalableEntityExtractor(corpus_db).process_corpus_batch()
+        _execute(corpus_db, "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end, "
+                            "source_type) VALUES ('1.2.1', 'sita', 0, 5, 'manual')")
+        _execute(corpus_db, "UPDATE kg_entities SET validation_status = 'approved' WHERE kg_id = ?", (RAMA_URI,))
+        _execute(corpus_db, "DELETE FROM slokas WHERE sarga_id = 2")
+        _execute(corpus_db, "UPDATE slokas SET sloka = 'रामः रामः' WHERE sloka_id = 2")
+
+        stats = ScalableEntityExtractor(corpus_db).process_corpus_batch()['statistics']
+
+        assert stats['removed_slokas'] == 1
+        assert _query(corpus_db, "SELECT text_unit_id, source_type FROM text_entity_mentions "
+                                 "WHERE text_unit_id = '1.2.1'") == [('1.2.1', 'manual')]
+        assert _query(corpus_db, "SELECT COUNT(*) FROM kg_extraction_manifest") == [(2,)]
+        assert _query(corpus_db, "SELECT validation_status FROM kg_entities WHERE kg_id = ?",
+                      (RAMA_URI,)) == [('approved',)]
+
+    def test_parallel_replace_rebuilds_manifest(self, corpus_db):
+        extractor = ScalableEntityExtractor(corpus_db)
+        extractor.process_corpus_parallel(workers=1, replace=True)
+
+        assert _query(corpus_db, "SELECT text_unit_id, mention_count FROM kg_extraction_manifest "
+                                 "ORDER BY text_unit_id") == [('1.1.1', 5), ('1.1.2', 3), ('1.2.1', 4)]
+        assert extractor.process_corpus_batch()['statistics']['skipped_slokas'] == 3
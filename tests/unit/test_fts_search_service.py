@@ -0,0 +1,177 @@
+"""
+Unit tests for the FTS5-backed sloka search, checked against the in-memory search.
+"""
+
+import os
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from api.services.fts_search_service import FTS_TABLE, FTSSearchService, ensure_fts_index
+from api.services.connection_pool import get_connection_pool
+from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService, resolve_result_fields
+from api.services.service_registry import ServiceRegistry, _register_default_services
+
+
+SLOKAS = [
+    (1, 1, 1, 'रामो विग्रहवान् धर्मः', 'रामः धर्मस्य मूर्तिः', 'Rama is the embodiment of righteousness'),
+    (1, 1, 2, 'सीता रामस्य भार्या', 'सीता पत्नी', 'Sita is the beloved wife of Rama'),
+    (1, 2, 1, 'दशरथः अयोध्यायाम्', 'दशरथः राजा', 'Dasharatha ruled Ayodhya with justice'),
+    (1, 2, 2, 'वनं गच्छति रामः', 'वनम् अरण्यम्', 'Rama goes to the forest in exile'),
+    (2, 1, 1, 'हनुमान् लङ्कां गतः', 'हनुमान् कपिः', 'Hanuman leapt across the ocean to Lanka'),
+    (2, 1, 2, 'रावणः लङ्केश्वरः', 'रावणः राक्षसः', 'Ravana, lord of Lanka, abducted Sita'),
+    (2, 1, 3, 'सुग्रीवः वानरराजः', '', 'Sugriva the monkey king befriended Rama'),
+    (2, 2, 1, 'भरतः पादुके', 'भरतः भ्राता', ''),
+]
+
+
+def _ramayanam_data(rows):
+    """The corpus shape ``build_search_indices`` reads, built from sloka rows."""
+    kandas = {}
+    for kanda, sarga, number, text, meaning, translation in rows:
+        sargas = kandas.setdefault(kanda, SimpleNamespace(sargas={})).sargas
+        slokas = sargas.setdefault(sarga, SimpleNamespace(slokas={})).slokas
+        slokas[number] = SimpleNamespace(id=f"{kanda}.{sarga}.{number}", text=text,
+                                         meaning=meaning, translation=translation)
+    return SimpleNamespace(kandas=kandas)
+
+
+@pytest.fixture
+def corpus_db():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE slokas (kanda_id INTEGER, sarga_id INTEGER, sloka_id INTEGER, "
+        "sloka TEXT, meaning TEXT, translation TEXT)"
+    )
+    conn.executemany("INSERT INTO slokas VALUES (?, ?, ?, ?, ?, ?)", SLOKAS)
+    conn.commit()
+    conn.close()
+    yield path
+    get_connection_pool(path).close_thread_connection()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+@pytest.fixture
+def services(corpus_db):
+    return FTSSearchService(corpus_db), OptimizedFuzzySearchService(_ramayanam_data(SLOKAS))
+
+
+def _ranked(results):
+    return [(result['sloka_number'], result['ratio']) for result in results]
+
+
+@pytest.mark.service
+class TestFTSIndex:
+    """Test cases for building and maintaining the sloka FTS5 index."""
+
+    def test_index_built_once(self, corpus_db):
+        pool = get_connection_pool(corpus_db)
+
+        assert ensure_fts_index(pool) is True
+        assert ensure_fts_index(pool) is False
+        count = pool.connection().execute(f"SELECT COUNT(*) FROM {FTS_TABLE}").fetchone()[0]
+        assert count == len(SLOKAS)
+
+    def test_index_follows_corpus_changes(self, corpus_db):
+        service = FTSSearchService(corpus_db)
+        with service.pool.write() as conn:
+            conn.execute("INSERT INTO slokas VALUES (3, 1, 1, 'विभीषणः', 'विभीषणः', 'Vibhishana sought refuge')")
+            conn.execute("DELETE FROM slokas WHERE kanda_id = 2 AND sarga_id = 1 AND sloka_id = 1")
+
+        assert _ranked(service.search_translation_fuzzy('vibhishana')) == [('3.1.1', 100)]
+        assert service.search_translation_fuzzy('hanuman leapt') == []
+
+
+@pytest.mark.service
+class TestFTSSearchService:
+    """Test cases for FTSSearchService, against OptimizedFuzzySearchService."""
+
+    @pytest.mark.parametrize('query', ['forest exile', 'lanka', 'sita', 'go', 'righteous king'])
+    def test_translation_search_matches_memory_backend(self, services, query):
+        fts, memory = services
+
+        assert fts.search_translation_fuzzy(query) == memory.search_translation_fuzzy(query)
+
+    def test_fuzzy_matches_outside_candidates_are_missed(self, services):
+        """'ravana' scores above the threshold for 'rama' but shares none of its trigrams."""
+        fts, memory = services
+
+        fts_results = fts.search_translation_fuzzy('rama')
+        memory_results = memory.search_translation_fuzzy('rama')
+        assert [r for r in memory_results if r['sloka_number'] != '2.1.2'] == fts_results
+
+    @pytest.mark.parametrize('query', ['सीता', 'लङ्का', 'हनुमान्'])
+    def test_sanskrit_search_matches_memory_backend(self, services, query):
+        fts, memory = services
+
+        assert fts.search_sloka_sanskrit_fuzzy(query) == memory.search_sloka_sanskrit_fuzzy(query)
+
+    @pytest.mark.parametrize('kanda', [1, 2])
+    def test_kanda_search_matches_memory_backend(self, services, kanda):
+        fts, memory = services
+
+        assert (fts.search_translation_in_kanda_fuzzy(kanda, 'rama', 60)
+                == memory.search_translation_in_kanda_fuzzy(kanda, 'rama', 60))
+        assert (fts.search_sloka_sanskrit_in_kanda_fuzzy(kanda, 'राम', 60)
+                == memory.search_sloka_sanskrit_in_kanda_fuzzy(kanda, 'राम', 60))
+
+    def test_misspelt_query_finds_candidates(self, services):
+        """A typo shares no trigram with the word it misspells; deletion variants recover it."""
+        fts, memory = services
+
+        results = fts.search_translation_fuzzy('raam')
+        assert {'1.1.1', '1.1.2', '1.2.2', '2.1.3'} <= {result['sloka_number'] for result in results}
+        assert set(_ranked(results)) <= set(_ranked(memory.search_translation_fuzzy('raam')))
+
+    def test_exact_matches_short_circuit(self, services):
+        fts, memory = services
+
+        results = fts.search_translation_fuzzy('rama', max_results=2)
+        assert _ranked(results) == [('1.1.1', 100), ('1.1.2', 100)]
+        assert 'source' not in results[0]
+        assert results == memory.search_translation_fuzzy('rama', max_results=2)
+
+    def test_stream_and_projection(self, services):
+        fts, memory = services
+        compact = resolve_result_fields(compact=True)
+
+        batches = list(fts.search_stream('lanka', batch_size=1, fields=compact))
+        assert [len(batch) for batch in batches] == [1, 1]
+        assert [set(batch[0]) for batch in batches] == [{'sloka_number', 'ratio'}] * 2
+        assert sum(batches, []) == sum(memory.search_stream('lanka', batch_size=1, fields=compact), [])
+
+    def test_results_are_cached(self, services):
+        fts, _ = services
+
+        first = fts.search_translation_fuzzy('sugriva')
+        assert fts.search_translation_fuzzy('sugriva') == first
+        assert fts.get_cache_stats()['total_hits'] == 1
+
+
+@pytest.mark.service
+class TestSearchBackendSelection:
+    """Test cases for choosing the search backend in the service registry."""
+
+    def test_fts_backend_skips_corpus(self, corpus_db):
+        registry = ServiceRegistry()
+        with patch('api.config.Config.SEARCH_BACKEND', 'fts'), \
+                patch('api.config.Config.SEARCH_DB_PATH', corpus_db):
+            _register_default_services(registry)
+            service = registry.get('fuzzy_search')
+
+        assert isinstance(service, FTSSearchService)
+        assert registry.status()['fuzzy_search']['depends_on'] == []
+        assert registry.status()['ramayanam_data']['state'] == 'pending'
+
+    def test_memory_backend_is_default(self):
+        registry = ServiceRegistry()
+        _register_default_services(registry)
+
+        assert registry.status()['fuzzy_search']['depends_on'] == ['ramayanam_data']
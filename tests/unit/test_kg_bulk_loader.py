@@ -0,0 +1,136 @@
+"""
+Unit tests for bulk ingestion of KG extraction results.
+"""
+
+import sqlite3
+import pytest
+
+from api.models.kg_models import KGEntity, KGRelationship, EntityType, SemanticAnnotation
+from api.services.connection_pool import get_connection_pool
+from api.services.kg_bulk_loader import KGBulkLoader
+from api.services.kg_database_service import KGDatabaseService
+
+
+def _entity(name, entity_type=EntityType.PERSON, confidence=0.9, **properties):
+    return KGEntity(
+        kg_id=name, entity_type=entity_type, labels={'en': name.title()},
+        properties=dict(properties, confidence_score=confidence)
+    )
+
+
+def _results(confidence=0.9):
+    return {
+        'entities': {
+            'rama': _entity('rama', confidence=confidence, epithets=['Raghava']),
+            'sita': _entity('sita'),
+            'ayodhya': _entity('ayodhya', EntityType.PLACE, 0.75),
+        },
+        'relationships': [
+            KGRelationship('rama', 'hasSpouse', 'sita', {'source': '1.1.1'}),
+            KGRelationship('rama', 'livesIn', 'ayodhya'),
+        ],
+        'annotations': [
+            SemanticAnnotation('1.1.1', 'rama', 0, 4, confidence),
+            SemanticAnnotation('1.1.1', 'sita', 10, 14),
+            SemanticAnnotation('1.1.2', 'ayodhya', 3, 10),
+        ],
+    }
+
+
+def _table(conn, sql):
+    return [tuple(row) for row in conn.execute(sql)]
+
+
+@pytest.mark.service
+class TestBulkLoader:
+    """Test cases for KGBulkLoader and store_extraction_results."""
+
+    def test_store_extraction_results(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        stats = service.store_extraction_results(_results())
+        conn = service.get_connection()
+
+        assert (stats['entities_stored'], stats['relationships_stored'], stats['annotations_stored']) == (3, 2, 3)
+        assert stats['rows_per_second'] > 0
+        assert _table(conn, "SELECT kg_id, entity_type, validation_status, extraction_confidence "
+                            "FROM kg_entities ORDER BY kg_id") == [
+            ('ayodhya', 'Place', 'pending', 0.75), ('rama', 'Person', 'pending', 0.9), ('sita', 'Person', 'pending', 0.9)
+        ]
+        # The triggers still maintain the derived tables
+        assert service.search_entities('raghava')[0]['kg_id'] == 'rama'
+        assert service.get_statistics()['total_mentions'] == 3
+        assert service.get_statistics()['total_relationships'] == 2
+
+    def test_reloading_upserts(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        service.store_extraction_results(_results())
+        conn = service.get_connection()
+        created = _table(conn, "SELECT kg_id, created_at FROM kg_entities ORDER BY kg_id")
+
+        results = _results(confidence=0.6)
+        results['relationships'][0].metadata = {'source': '1.1.9'}
+        results['annotations'].append(SemanticAnnotation('1.1.3', 'rama', 0, 4))
+        service.store_extraction_results(results)
+
+        assert _table(conn, "SELECT kg_id, created_at FROM kg_entities ORDER BY kg_id") == created
+        assert conn.execute("SELECT extraction_confidence FROM kg_entities WHERE kg_id = 'rama'").fetchone()[0] == 0.6
+        assert _table(conn, "SELECT subject_id, predicate, object_id, metadata FROM kg_relationships ORDER BY id") == [
+            ('rama', 'hasSpouse', 'sita', '{"source": "1.1.9"}'), ('rama', 'livesIn', 'ayodhya', '{}')
+        ]
+        assert _table(conn, "SELECT text_unit_id, entity_id, confidence FROM text_entity_mentions ORDER BY id") == [
+            ('1.1.1', 'rama', 0.6), ('1.1.1', 'sita', 1.0), ('1.1.2', 'ayodhya', 1.0), ('1.1.3', 'rama', 1.0)
+        ]
+        assert service.get_statistics()['entity_counts'] == {'Person': 2, 'Place': 1}
+
+    def test_duplicates_in_a_batch_collapse(self, kg_db):
+        results = _results()
+        results['relationships'].append(KGRelationship('rama', 'hasSpouse', 'sita', {'source': 'last'}))
+        results['annotations'].append(SemanticAnnotation('1.1.1', 'sita', 10, 14, 0.5))
+        service = KGDatabaseService(kg_db)
+        stats = service.store_extraction_results(results)
+        conn = service.get_connection()
+
+        assert stats['relationships_stored'] == 3
+        assert _table(conn, "SELECT metadata FROM kg_relationships WHERE predicate = 'hasSpouse'") == [
+            ('{"source": "last"}',)
+        ]
+        assert conn.execute("SELECT COUNT(*) FROM text_entity_mentions").fetchone()[0] == 3
+
+    def test_malformed_items_are_skipped(self, kg_db):
+        results = _results()
+        results['entities']['broken'] = KGEntity('broken', 'Person', {'en': 'Broken'})
+        stats = KGDatabaseService(kg_db).store_extraction_results(results)
+
+        assert stats['entities_stored'] == 3
+
+    def test_replace_rebuilds_with_indexes(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        service.store_extraction_results(_results())
+        conn = service.get_connection()
+        indexes = _table(conn, "SELECT name, sql FROM sqlite_master WHERE type = 'index' ORDER BY name")
+
+        pool = get_connection_pool(kg_db)
+        result = KGBulkLoader(pool, batch_size=2).load(
+            entities=[('hanuman', 'Person', '{"en": "Hanuman"}', '{}', 'pending', 'automated', 0.8)],
+            mentions=[('5.1.1', 'hanuman', 0, 7, 0.9, 'automated')] * 3,
+            replace=True
+        )
+
+        assert (result['entities'], result['relationships'], result['mentions']) == (1, 0, 3)
+        assert _table(conn, "SELECT kg_id FROM kg_entities") == [('hanuman',)]
+        assert conn.execute("SELECT COUNT(*) FROM kg_relationships").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM text_entity_mentions").fetchone()[0] == 1
+        assert _table(conn, "SELECT name, sql FROM sqlite_master WHERE type = 'index' ORDER BY name") == indexes
+        assert service.get_entity_by_id('hanuman')['labels'] == {'en': 'Hanuman'}
+        assert service.get_entity_by_id('rama') is None
+        assert service.get_statistics()['entity_counts'] == {'Person': 1}
+
+    def test_failed_load_rolls_back(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        service.store_extraction_results(_results())
+
+        with pytest.raises(sqlite3.Error):
+            KGBulkLoader(get_connection_pool(kg_db)).load(
+                entities=[('hanuman', None, '{}', '{}', 'pending', 'automated', 0.8)], replace=True
+            )
+        assert service.get_statistics()['total_entities'] == 3
@@ -0,0 +1,450 @@
+"""
+Unit tests for KGDatabaseService queries against a temporary database.
+"""
+
+import json
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from api.services.connection_pool import get_connection_pool
+from api.services.kg_database_service import KGDatabaseService, MAX_SOURCE_REFERENCES
+from api.services.kg_schema import SCHEMA_VERSION, get_schema_version, migrate_kg_schema
+
+
+@pytest.fixture
+def kg_db(kg_db_factory):
+    """A temporary KG database with pending entities and their mentions."""
+    path = kg_db_factory(
+        [(1, 1, n, f'sloka {n} ' + 'x' * (250 if n == 1 else 0), f'meaning {n}', f'translation {n}')
+         for n in range(1, 11)],
+        scripts=('add_kg_tables.sql', 'enhance_kg_tables_for_discovery.sql')
+    )
+    conn = sqlite3.connect(path)
+    entities = [
+        ('rama', 'Person', {'en': 'Rama', 'sa': 'राम'}, {'epithets': ['राघव']}, 0.9, 8),
+        ('sita', 'Person', {'en': 'Sita', 'sa': 'सीता'}, {}, 0.9, 2),
+        ('ayodhya', 'Place', {'en': 'Ayodhya', 'sa': 'अयोध्या'}, {}, 0.7, 0),
+    ]
+    for kg_id, entity_type, labels, properties, confidence, mentions in entities:
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, properties, "
+            "validation_status, extraction_confidence) VALUES (?, ?, ?, ?, 'pending', ?)",
+            (kg_id, entity_type, json.dumps(labels, ensure_ascii=False), json.dumps(properties, ensure_ascii=False),
+             confidence)
+        )
+        for n in range(1, mentions + 1):
+            conn.execute(
+                "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end, confidence) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (f'1.1.{n}', kg_id, n, n + 4, n / 10)
+            )
+    conn.execute(
+        "INSERT INTO kg_entities (kg_id, entity_type, labels, properties, validation_status) "
+        "VALUES ('lanka', 'Place', '{\"en\": \"Lanka\"}', "
+        "'{\"validation_status\": \"flagged\", \"validation_confidence\": 0.6, "
+        "\"needs_manual_review\": true, \"alternative_names\": [\"Lankapuri\"]}', 'pending')"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.mark.service
+class TestPendingEntities:
+    """Test cases for KGDatabaseService.get_pending_entities."""
+
+    def test_pending_entities_order_and_shape(self, kg_db):
+        entities = KGDatabaseService(kg_db).get_pending_entities()
+
+        assert [e['id'] for e in entities] == ['rama', 'sita', 'ayodhya']
+        rama = entities[0]
+        assert rama['text'] == 'राम'
+        assert rama['normalizedForm'] == 'Rama'
+        assert rama['type'] == 'Person'
+        assert rama['confidence'] == 0.9
+        assert rama['extractionMethod'] == 'automated'
+        assert rama['validationStatus'] == 'pending'
+        assert rama['epithets'] == ['राघव']
+        assert entities[2]['sourceReferences'] == []
+
+    def test_source_references_are_top_mentions(self, kg_db):
+        rama = KGDatabaseService(kg_db).get_pending_entities()[0]
+        references = rama['sourceReferences']
+
+        assert len(references) == MAX_SOURCE_REFERENCES
+        assert [r['sloka_id'] for r in references] == ['1.1.8', '1.1.7', '1.1.6', '1.1.5', '1.1.4']
+        assert references[0] == {
+            'sloka_id': '1.1.8',
+            'kanda': 'Kanda1',
+            'sarga': '1',
+            'position': {'start': 8, 'end': 12},
+            'context': 'sloka 8 '
+        }
+
+    def test_long_context_is_truncated(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        references = service._get_entity_source_references('sita')
+
+        assert [r['sloka_id'] for r in references] == ['1.1.2', '1.1.1']
+        assert len(references[1]['context']) == 203
+        assert references[1]['context'].endswith('...')
+
+    def test_query_count_independent_of_page_size(self, kg_db):
+        service = KGDatabaseService(kg_db)
+
+        def count_selects(limit):
+            statements = []
+            service.get_connection().set_trace_callback(statements.append)
+            try:
+                entities = service.get_pending_entities(limit=limit)
+            finally:
+                service.get_connection().set_trace_callback(None)
+            return len(entities), len([s for s in statements if 'SELECT' in s])
+
+        one_entity, selects_for_one = count_selects(1)
+        all_entities, selects_for_all = count_selects(10)
+
+        assert (one_entity, all_entities) == (1, 3)
+        assert selects_for_one == selects_for_all
+
+    def test_query_indexes_created(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        service.get_pending_entities(limit=1)
+
+        indexes = {row[0] for row in service.get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+        assert 'idx_slokas_text_unit_id' in indexes
+        assert 'idx_text_mentions_entity_confidence' in indexes
+
+
+@pytest.mark.service
+class TestNormalizedSchema:
+    """Test cases for the normalized labels/epithets schema and its migration."""
+
+    def test_migration_backfills_labels_and_epithets(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        labels = conn.execute(
+            "SELECT lang, label, label_normalized FROM entity_labels WHERE entity_id = 'rama' ORDER BY lang"
+        ).fetchall()
+        assert [tuple(row) for row in labels] == [('en', 'Rama', 'rama'), ('sa', 'राम', 'राम')]
+        epithets = conn.execute("SELECT entity_id, kind, epithet FROM entity_epithets ORDER BY entity_id").fetchall()
+        assert [tuple(row) for row in epithets] == [
+            ('lanka', 'alternative_name', 'Lankapuri'), ('rama', 'epithet', 'राघव')
+        ]
+
+    def test_migration_moves_validation_state_to_columns(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        row = service.get_connection().execute(
+            "SELECT validation_status, validation_confidence, needs_manual_review "
+            "FROM kg_entities WHERE kg_id = 'lanka'"
+        ).fetchone()
+
+        assert tuple(row) == ('flagged', 0.6, 1)
+
+    def test_migration_keeps_validation_columns(self, kg_db):
+        conn = sqlite3.connect(kg_db)
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, properties, validation_status) "
+            "VALUES ('hanuman', 'Person', '{\"en\": \"Hanuman\"}', "
+            "'{\"validation_status\": \"pending\", \"needs_manual_review\": true}', 'validated')"
+        )
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, properties, validation_status) "
+            "VALUES ('kumbhakarna', 'Person', '{\"en\": \"Kumbhakarna\"}', "
+            "'{\"validation_status\": \"flagged\"}', 'rejected')"
+        )
+        conn.commit()
+        conn.close()
+
+        rows = KGDatabaseService(kg_db).get_connection().execute(
+            "SELECT kg_id, validation_status, needs_manual_review FROM kg_entities "
+            "WHERE kg_id IN ('hanuman', 'kumbhakarna') ORDER BY kg_id"
+        ).fetchall()
+
+        assert [tuple(row) for row in rows] == [('hanuman', 'validated', 0), ('kumbhakarna', 'rejected', 0)]
+
+    def test_migration_is_idempotent(self, kg_db):
+        pool = get_connection_pool(kg_db)
+        assert migrate_kg_schema(pool) == SCHEMA_VERSION
+        assert migrate_kg_schema(pool) == SCHEMA_VERSION
+
+        count = pool.connection().execute("SELECT COUNT(*) FROM entity_labels").fetchone()[0]
+        assert count == 7
+
+    def test_triggers_keep_tables_in_sync(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        service.store_extraction_results({'entities': {}})  # migrates
+        conn = service.get_connection()
+
+        conn.execute(
+            "INSERT OR REPLACE INTO kg_entities (kg_id, entity_type, labels, properties) "
+            "VALUES ('rama', 'Person', '{\"en\": \"Ramachandra\"}', '{\"epithets\": [\"Dasarathi\"]}')"
+        )
+        conn.execute("UPDATE kg_entities SET labels = '{\"en\": \"Janaki\"}' WHERE kg_id = 'sita'")
+        conn.execute("DELETE FROM kg_entities WHERE kg_id = 'ayodhya'")
+        conn.commit()
+
+        assert service.get_entity_by_id('rama')['labels'] == {'en': 'Ramachandra'}
+        assert service.get_entity_by_id('sita')['labels'] == {'en': 'Janaki'}
+        assert conn.execute(
+            "SELECT epithet FROM entity_epithets WHERE entity_id = 'rama'"
+        ).fetchall()[0][0] == 'Dasarathi'
+        assert conn.execute(
+            "SELECT COUNT(*) FROM entity_labels WHERE entity_id = 'ayodhya'"
+        ).fetchone()[0] == 0
+
+    def test_name_indexes(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+
+        plan = ' '.join(row['detail'] for row in conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT entity_id FROM entity_labels WHERE label_normalized >= 'ra' AND label_normalized < 'rb'
+            UNION
+            SELECT entity_id FROM entity_epithets WHERE epithet_normalized >= 'ra' AND epithet_normalized < 'rb'
+        """))
+        assert 'idx_entity_labels_normalized' in plan
+        assert 'idx_entity_epithets_normalized' in plan
+
+
+def _scanned_statistics(conn):
+    """The dashboard aggregates computed by scanning the tables."""
+    return {
+        'groups': {tuple(row[:2]): row[2] for row in conn.execute(
+            "SELECT entity_type, validation_status, COUNT(*) FROM kg_entities GROUP BY 1, 2"
+        )},
+        'mentions': dict(conn.execute(
+            "SELECT entity_id, COUNT(*) FROM text_entity_mentions GROUP BY entity_id"
+        ).fetchall()),
+        'relationships': conn.execute("SELECT COUNT(*) FROM kg_relationships").fetchone()[0],
+        'average_confidence': conn.execute(
+            "SELECT AVG(extraction_confidence) FROM kg_entities WHERE extraction_confidence > 0"
+        ).fetchone()[0],
+    }
+
+
+def _materialized_statistics(conn):
+    """The same aggregates read from the summary tables."""
+    groups = {}
+    for entity_type, status, count in conn.execute(
+        "SELECT entity_type, validation_status, entity_count FROM kg_entity_stats WHERE entity_count > 0"
+    ):
+        groups[(entity_type, status)] = groups.get((entity_type, status), 0) + count
+    return {
+        'groups': groups,
+        'mentions': dict(conn.execute(
+            "SELECT entity_id, mention_count FROM kg_entity_mention_counts"
+        ).fetchall()),
+        'relationships': conn.execute(
+            "SELECT value FROM kg_counters WHERE name = 'relationships'"
+        ).fetchone()[0],
+        'average_confidence': conn.execute(
+            "SELECT SUM(confidence_sum) / SUM(entity_count) FROM kg_entity_stats WHERE confidence_range != ''"
+        ).fetchone()[0],
+    }
+
+
+@pytest.mark.service
+class TestSummaryStatistics:
+    """Test cases for the trigger-maintained dashboard aggregates."""
+
+    def test_statistics(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        stats = service.get_statistics()
+
+        assert stats['entity_counts'] == {'Person': 2, 'Place': 2}
+        assert stats['total_entities'] == 4
+        assert stats['total_mentions'] == 10
+        assert stats['total_relationships'] == 0
+        assert [(e['kg_id'], e['mention_count']) for e in stats['top_entities'][:2]] == [('rama', 8), ('sita', 2)]
+        assert {e['kg_id'] for e in stats['top_entities'][2:]} == {'ayodhya', 'lanka'}
+        assert stats['top_entities'][0]['labels'] == {'en': 'Rama', 'sa': 'राम'}
+
+    def test_dashboard_metrics(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        enhanced = service.get_enhanced_statistics()
+        metrics = service.get_discovery_metrics()
+
+        assert enhanced['entityTypeCounts'] == {'Person': 2, 'Place': 2}
+        assert enhanced['confidenceDistribution'] == {'90-100%': 2, '70-79%': 1}
+        assert enhanced['processingStats']['averageConfidence'] == pytest.approx(2.5 / 3)
+        assert enhanced['processingStats']['patternsMatched'] == 10
+        assert metrics['validation_stats'] == {'pending': 3, 'flagged': 1}
+        assert metrics['type_stats'] == {'Person': 2, 'Place': 2}
+        assert metrics['pending_validation'] == 3
+
+    def test_triggers_track_writes(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+
+        conn.execute(
+            "INSERT OR REPLACE INTO kg_entities (kg_id, entity_type, labels, extraction_confidence) "
+            "VALUES ('rama', 'Deity', '{}', 0.65)"
+        )
+        conn.execute("INSERT OR IGNORE INTO kg_entities (kg_id, entity_type, labels) VALUES ('sita', 'Place', '{}')")
+        conn.execute("UPDATE kg_entities SET validation_status = 'approved' WHERE kg_id = 'sita'")
+        conn.execute("DELETE FROM kg_entities WHERE kg_id = 'ayodhya'")
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, extraction_confidence) "
+            "VALUES ('hanuman', 'Person', '{}', 0.85)"
+        )
+        conn.execute("UPDATE text_entity_mentions SET entity_id = 'hanuman' WHERE entity_id = 'sita'")
+        conn.execute("DELETE FROM text_entity_mentions WHERE entity_id = 'rama' AND span_start > 5")
+        conn.executemany(
+            "INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, ?, ?)",
+            [('hanuman', 'devoteeOf', 'rama'), ('rama', 'hasSpouse', 'sita')]
+        )
+        conn.execute("DELETE FROM kg_relationships WHERE predicate = 'hasSpouse'")
+        conn.commit()
+
+        materialized, scanned = _materialized_statistics(conn), _scanned_statistics(conn)
+        assert materialized['groups'] == scanned['groups']
+        assert materialized['mentions'] == scanned['mentions'] == {'rama': 5, 'hanuman': 2}
+        assert materialized['relationships'] == scanned['relationships'] == 1
+        assert materialized['average_confidence'] == pytest.approx(scanned['average_confidence'])
+
+    def test_migration_backfills_summaries(self, kg_db):
+        conn = sqlite3.connect(kg_db)
+        conn.execute(
+            "INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES ('rama', 'hasSpouse', 'sita')"
+        )
+        conn.commit()
+        conn.close()
+
+        conn = KGDatabaseService(kg_db).get_connection()
+        materialized, scanned = _materialized_statistics(conn), _scanned_statistics(conn)
+        assert materialized['groups'] == scanned['groups']
+        assert materialized['mentions'] == scanned['mentions']
+        assert materialized['relationships'] == 1
+
+    def test_statistics_do_not_scan_mentions(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            service.get_statistics()
+            service.get_enhanced_statistics()
+            service.get_discovery_metrics()
+        finally:
+            conn.set_trace_callback(None)
+
+        assert statements
+        assert not any('text_entity_mentions' in sql or 'COUNT(' in sql for sql in statements)
+
+
+@pytest.mark.service
+class TestEntitySearch:
+    """Test cases for full-text entity search and autocomplete."""
+
+    def test_search_by_name_prefix(self, kg_db):
+        service = KGDatabaseService(kg_db)
+
+        assert [e['kg_id'] for e in service.search_entities('RAM')] == ['rama']
+        assert [e['kg_id'] for e in service.search_entities('राघ')] == ['rama']
+        assert [e['kg_id'] for e in service.search_entities('lankap')] == ['lanka']
+        assert service.search_entities('a', entity_type='Place')[0]['labels'] == {
+            'en': 'Ayodhya', 'sa': 'अयोध्या'
+        }
+        assert service.search_entities('  ') == []
+
+    def test_search_folds_diacritics(self, kg_db):
+        service = KGDatabaseService(kg_db)
+
+        assert [e['kg_id'] for e in service.search_entities('Ayōdhyā')] == ['ayodhya']
+
+    def test_substring_matches_follow_prefix_matches(self, kg_db):
+        service = KGDatabaseService(kg_db)
+
+        results = [e['kg_id'] for e in service.search_entities('ita')]
+        assert results == ['sita']
+
+    def test_index_follows_entity_writes(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, properties) "
+            "VALUES ('hanuman', 'Person', '{\"en\": \"Hanuman\"}', '{\"epithets\": [\"Maruti\"]}')"
+        )
+        conn.execute("UPDATE kg_entities SET labels = '{\"en\": \"Vaidehi\"}' WHERE kg_id = 'sita'")
+        conn.execute("DELETE FROM kg_entities WHERE kg_id = 'ayodhya'")
+        conn.commit()
+
+        assert [e['kg_id'] for e in service.search_entities('maru')] == ['hanuman']
+        assert [e['kg_id'] for e in service.search_entities('vaid')] == ['sita']
+        assert [e['kg_id'] for e in service.search_entities('hanu')] == ['hanuman']
+        assert service.search_entities('ayodhya') == []
+        # Raises if the index has drifted from entity_search_names
+        conn.execute("INSERT INTO entity_search(entity_search) VALUES ('integrity-check')")
+
+    def test_search_by_id_slug(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, properties) "
+            "VALUES ('dasaratha_king', 'Person', '{\"en\": \"Dasharatha\"}', '{}')"
+        )
+        conn.execute("UPDATE kg_entities SET labels = '{\"en\": \"Vaidehi\"}' WHERE kg_id = 'sita'")
+        conn.commit()
+
+        # Neither the label nor the epithets contain these
+        assert [e['kg_id'] for e in service.search_entities('dasaratha')] == ['dasaratha_king']
+        assert [e['kg_id'] for e in service.search_entities('sita')] == ['sita']
+        assert service.autocomplete_entities('sita')[0]['matched'] == {'name': 'sita', 'kind': 'id', 'lang': None}
+
+        conn.execute("UPDATE kg_entities SET kg_id = 'dasharatha' WHERE kg_id = 'dasaratha_king'")
+        conn.commit()
+        assert [e['kg_id'] for e in service.search_entities('dasaratha')] == []
+        conn.execute("INSERT INTO entity_search(entity_search) VALUES ('integrity-check')")
+
+    def test_autocomplete_suggestions(self, kg_db):
+        service = KGDatabaseService(kg_db)
+
+        suggestions = service.autocomplete_entities('राघ')
+        assert suggestions == [{
+            'kg_id': 'rama',
+            'entity_type': 'Person',
+            'label': 'Rama',
+            'labels': {'en': 'Rama', 'sa': 'राम'},
+            'matched': {'name': 'राघव', 'kind': 'epithet', 'lang': None}
+        }]
+        assert [s['kg_id'] for s in service.autocomplete_entities('s', limit=1)] == ['sita']
+        assert [s['kg_id'] for s in service.autocomplete_entities('s', entity_type='Place')] == []
+
+    def test_search_uses_fts_index(self, kg_db):
+        service = KGDatabaseService(kg_db)
+        conn = service.get_connection()
+
+        plan = ' '.join(row['detail'] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM entity_search WHERE entity_search MATCH '\"ra\"*'"
+        ))
+        assert 'VIRTUAL TABLE INDEX' in plan
+
+
+@pytest.mark.api
+class TestAutocompleteEndpoint:
+    """Test cases for /api/kg/autocomplete."""
+
+    def test_autocomplete_requires_query(self, client):
+        response = client.get('/api/kg/autocomplete')
+
+        assert response.status_code == 400
+
+    def test_autocomplete(self, client):
+        suggestions = [{'kg_id': 'rama', 'label': 'Rama'}]
+        with patch('api.controllers.kg_controller.kg_service') as mock_service:
+            mock_service.autocomplete_entities.return_value = suggestions
+            response = client.get('/api/kg/autocomplete?q=ra&limit=500&type=Person')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['suggestions'] == suggestions
+        assert data['count'] == 1
+        mock_service.autocomplete_entities.assert_called_once_with(prefix='ra', entity_type='Person', limit=50)
@@ -0,0 +1,260 @@
+"""
+Unit tests for the in-memory KG relationship graph and its traversal endpoints.
+"""
+
+import json
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from api.services.kg_database_service import KGDatabaseService
+from api.services.kg_graph import KGGraph
+from api.services.kg_subgraph import SubgraphService
+
+
+ENTITY = 'http://ramayanam.hanuma.com/entity/'
+
+#   rama -hasSpouse-> sita -daughterOf-> janaka
+#   rama -sonOf-> dasharatha -sonOf-> aja
+#   hanuman -devoteeOf-> rama ; ravana -abducted-> sita ; ravana -livesIn-> lanka
+RELATIONSHIPS = [
+    ('rama', 'hasSpouse', 'sita'),
+    ('sita', 'daughterOf', 'janaka'),
+    ('rama', 'sonOf', 'dasharatha'),
+    ('dasharatha', 'sonOf', 'aja'),
+    ('hanuman', 'devoteeOf', 'rama'),
+    ('ravana', 'abducted', 'sita'),
+    ('ravana', 'livesIn', 'lanka'),
+]
+MENTIONS = {'rama': 4, 'sita': 2, 'ravana': 1}
+
+
+@pytest.fixture
+def kg_db(kg_db):
+    conn = sqlite3.connect(kg_db)
+    for name in {name for s, _, o in RELATIONSHIPS for name in (s, o)} | {'lakshmana'}:
+        conn.execute("INSERT INTO kg_entities (kg_id, entity_type, labels) VALUES (?, ?, ?)",
+                     (ENTITY + name, 'Place' if name == 'lanka' else 'Person', json.dumps({'en': name.title()})))
+    conn.executemany(
+        "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end) VALUES (?, ?, 0, 4)",
+        [(f'1.1.{n}', ENTITY + name) for name, count in MENTIONS.items() for n in range(1, count + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, ?, ?)",
+        [(ENTITY + s, p, ENTITY + o) for s, p, o in RELATIONSHIPS]
+    )
+    conn.commit()
+    conn.close()
+    return kg_db
+
+
+@pytest.fixture
+def graph(kg_db):
+    return KGGraph(KGDatabaseService(kg_db), refresh_interval=0)
+
+
+def _names(nodes):
+    return {node['kg_id'][len(ENTITY):]: node['distance'] for node in nodes}
+
+
+def _path(edges):
+    return [(e['subject_id'][len(ENTITY):], e['predicate'], e['object_id'][len(ENTITY):]) for e in edges]
+
+
+@pytest.mark.service
+class TestKGGraph:
+    """Test cases for KGGraph traversals."""
+
+    def test_k_hop_neighborhood(self, graph):
+        one_hop = graph.neighborhood(ENTITY + 'rama')
+        two_hops = graph.neighborhood(ENTITY + 'rama', hops=2)
+
+        assert _names(one_hop['nodes']) == {'rama': 0, 'sita': 1, 'dasharatha': 1, 'hanuman': 1}
+        assert len(one_hop['edges']) == 3
+        assert _names(two_hops['nodes']) == {
+            'rama': 0, 'sita': 1, 'dasharatha': 1, 'hanuman': 1, 'janaka': 2, 'aja': 2, 'ravana': 2
+        }
+
+    def test_direction_and_predicate_filters(self, graph):
+        outgoing = graph.neighborhood(ENTITY + 'rama', hops=3, direction='out')
+        lineage = graph.neighborhood(ENTITY + 'rama', hops=3, predicates=['sonOf'])
+
+        assert _names(outgoing['nodes']) == {'rama': 0, 'sita': 1, 'dasharatha': 1, 'janaka': 2, 'aja': 2}
+        assert _names(lineage['nodes']) == {'rama': 0, 'dasharatha': 1, 'aja': 2}
+        assert graph.neighborhood(ENTITY + 'rama', predicates=['unknown'])['edges'] == []
+        with pytest.raises(ValueError):
+            graph.neighborhood(ENTITY + 'rama', direction='sideways')
+
+    def test_neighborhood_limit(self, graph):
+        nodes = graph.neighborhood(ENTITY + 'rama', hops=2, limit=3)['nodes']
+
+        assert len(nodes) == 3
+        assert [node['distance'] for node in nodes] == [0, 1, 1]
+
+    def test_shortest_path(self, graph):
+        path = graph.shortest_path(ENTITY + 'hanuman', ENTITY + 'janaka')
+
+        assert _path(path) == [
+            ('hanuman', 'devoteeOf', 'rama'), ('rama', 'hasSpouse', 'sita'), ('sita', 'daughterOf', 'janaka')
+        ]
+        assert _path(graph.shortest_path(ENTITY + 'aja', ENTITY + 'rama')) == [
+            ('dasharatha', 'sonOf', 'aja'), ('rama', 'sonOf', 'dasharatha')
+        ]
+        assert graph.shortest_path(ENTITY + 'rama', ENTITY + 'rama') == []
+
+    def test_shortest_path_respects_limits(self, graph):
+        # Following edge direction, nothing leads from sita back to rama
+        assert graph.shortest_path(ENTITY + 'sita', ENTITY + 'rama', direction='out') is None
+        assert len(graph.shortest_path(ENTITY + 'rama', ENTITY + 'aja', direction='out')) == 2
+        assert graph.shortest_path(ENTITY + 'hanuman', ENTITY + 'janaka', max_hops=2) is None
+        assert graph.shortest_path(ENTITY + 'rama', ENTITY + 'lakshmana') is None
+
+    def test_incremental_refresh(self, graph, kg_db):
+        conn = graph.kg_service.get_connection()
+        conn.execute("INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, ?, ?)",
+                     (ENTITY + 'lakshmana', 'brotherOf', ENTITY + 'rama'))
+        conn.execute("DELETE FROM kg_relationships WHERE predicate = 'abducted'")
+        conn.commit()
+
+        neighbors = _names(graph.neighborhood(ENTITY + 'rama', hops=2)['nodes'])
+        assert neighbors['lakshmana'] == 1
+        assert 'ravana' not in neighbors
+        assert graph.stats()['pending_inserts'] == 1
+        assert graph.stats()['pending_deletes'] == 1
+        assert graph.stats()['edges'] == len(RELATIONSHIPS)
+
+        graph.reload()
+        assert _names(graph.neighborhood(ENTITY + 'rama', hops=2)['nodes']) == neighbors
+        assert graph.stats()['pending_inserts'] == 0
+
+    def test_updated_edges_stay_in_graph(self, graph):
+        conn = graph.kg_service.get_connection()
+        conn.execute("UPDATE kg_relationships SET predicate = 'spouseOf' WHERE predicate = 'hasSpouse'")
+        conn.execute("UPDATE kg_relationships SET object_id = ? WHERE predicate = 'devoteeOf'", (ENTITY + 'sita',))
+        conn.commit()
+        graph.refresh(force=True)
+
+        updated = graph.neighborhood(ENTITY + 'rama')
+        assert sorted(_path(updated['edges'])) == [('rama', 'sonOf', 'dasharatha'), ('rama', 'spouseOf', 'sita')]
+        assert ('hanuman', 'devoteeOf', 'sita') in _path(graph.neighborhood(ENTITY + 'sita')['edges'])
+        assert graph.stats()['edges'] == len(RELATIONSHIPS)
+
+        # Deleting an updated edge removes its new version too
+        conn.execute("DELETE FROM kg_relationships WHERE predicate = 'spouseOf'")
+        conn.commit()
+        graph.refresh(force=True)
+        assert _path(graph.neighborhood(ENTITY + 'rama')['edges']) == [('rama', 'sonOf', 'dasharatha')]
+        assert graph.stats()['edges'] == len(RELATIONSHIPS) - 1
+
+        graph.reload()
+        assert _path(graph.neighborhood(ENTITY + 'rama')['edges']) == [('rama', 'sonOf', 'dasharatha')]
+
+
+@pytest.mark.service
+class TestSubgraphService:
+    """Test cases for SubgraphService ego networks."""
+
+    @pytest.fixture
+    def subgraph(self, graph):
+        return SubgraphService(graph.kg_service, graph)
+
+    def test_ego_network(self, subgraph):
+        data = subgraph.get_subgraph([ENTITY + 'sita'], radius=1)
+        nodes = {node['name']: node for node in data['nodes']}
+
+        assert set(nodes) == {'Sita', 'Rama', 'Janaka', 'Ravana'}
+        assert nodes['Sita']['seed'] and nodes['Sita']['relevance'] == 1.0
+        assert (nodes['Sita']['x'], nodes['Sita']['y']) == (0.0, 0.0)
+        assert nodes['Rama']['mentions'] == 4 and nodes['Rama']['relevance'] == 1.0
+        assert nodes['Ravana']['relevance'] == 0.25
+        assert {(e['source'][len(ENTITY):], e['relationship'], e['target'][len(ENTITY):])
+                for e in data['edges']} == {
+            ('rama', 'hasSpouse', 'sita'), ('sita', 'daughterOf', 'janaka'), ('ravana', 'abducted', 'sita')
+        }
+        assert data['metadata']['truncated'] is False
+
+    def test_multiple_seeds_and_type_filter(self, subgraph):
+        data = subgraph.get_subgraph([ENTITY + 'hanuman', ENTITY + 'lanka'], radius=2)
+        people = subgraph.get_subgraph([ENTITY + 'rama'], radius=3, entity_types=['Person'])
+
+        distances = {node['name']: node['distance'] for node in data['nodes']}
+        assert distances == {'Hanuman': 0, 'Lanka': 0, 'Rama': 1, 'Ravana': 1,
+                             'Sita': 2, 'Dasharatha': 2}
+        assert 'Lanka' not in {node['name'] for node in people['nodes']}
+
+    def test_caps_and_duplicate_edges(self, subgraph, graph):
+        conn = graph.kg_service.get_connection()
+        conn.execute("INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, 'hasSpouse', ?)",
+                     (ENTITY + 'rama', ENTITY + 'sita'))
+        conn.commit()
+
+        data = subgraph.get_subgraph([ENTITY + 'rama'], radius=2, max_nodes=3, max_edges=1)
+        assert len(data['nodes']) == 3
+        assert len(data['edges']) == 1
+        assert data['metadata']['truncated'] is True
+        spouse = subgraph.get_subgraph([ENTITY + 'rama'], predicates=['hasSpouse'])['edges']
+        assert [edge['weight'] for edge in spouse] == [2]
+
+    def test_cached_until_graph_changes(self, subgraph, graph):
+        first = subgraph.get_subgraph([ENTITY + 'rama'])
+        assert subgraph.get_subgraph([ENTITY + 'rama']) is first
+
+        conn = graph.kg_service.get_connection()
+        conn.execute("INSERT INTO kg_relationships (subject_id, predicate, object_id) VALUES (?, 'brotherOf', ?)",
+                     (ENTITY + 'lakshmana', ENTITY + 'rama'))
+        conn.commit()
+        refreshed = subgraph.get_subgraph([ENTITY + 'rama'])
+        assert 'Lakshmana' in {node['name'] for node in refreshed['nodes']}
+        assert subgraph.get_cache_stats()['hits'] == 1
+
+
+@pytest.mark.api
+class TestGraphEndpoints:
+    """Test cases for the /api/kg/graph endpoints."""
+
+    def test_neighbors_endpoint(self, client, graph):
+        with patch('api.controllers.kg_controller.kg_graph', graph):
+            response = client.get('/api/kg/graph/neighbors/rama?hops=2&predicate=sonOf')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert _names(data['nodes']) == {'rama': 0, 'dasharatha': 1, 'aja': 2}
+        assert data['count'] == 2
+        assert data['filters']['predicates'] == ['sonOf']
+        assert 'took_us' in data
+
+    def test_neighbors_endpoint_errors(self, client, graph):
+        with patch('api.controllers.kg_controller.kg_graph', graph), \
+                patch('api.controllers.kg_controller.kg_service') as mock_service:
+            mock_service.get_entity_by_id.return_value = None
+            missing = client.get('/api/kg/graph/neighbors/nobody')
+            invalid = client.get('/api/kg/graph/neighbors/rama?direction=up')
+
+        assert missing.status_code == 404
+        assert invalid.status_code == 400
+
+    def test_path_endpoint(self, client, graph):
+        with patch('api.controllers.kg_controller.kg_graph', graph):
+            found = client.get('/api/kg/graph/path?source=hanuman&target=aja')
+            missing = client.get('/api/kg/graph/path?source=hanuman')
+
+        data = json.loads(found.data)
+        assert data['found'] is True
+        assert data['length'] == 3
+        assert missing.status_code == 400
+
+    def test_subgraph_endpoint(self, client, graph):
+        subgraph = SubgraphService(graph.kg_service, graph)
+        with patch('api.controllers.kg_controller.kg_graph', graph), \
+                patch('api.controllers.kg_controller.kg_service', graph.kg_service), \
+                patch('api.controllers.kg_controller.kg_subgraph', subgraph):
+            found = client.get('/api/kg/subgraph?seed=sita,ravana&radius=1&type=Person')
+            missing = client.get('/api/kg/subgraph?seed=nobody')
+            no_seed = client.get('/api/kg/subgraph')
+
+        data = json.loads(found.data)
+        assert data['success'] is True
+        assert data['metadata']['seeds'] == [ENTITY + 'sita', ENTITY + 'ravana']
+        assert {node['name'] for node in data['nodes']} == {'Sita', 'Ravana', 'Rama', 'Janaka'}
+        assert missing.status_code == 404
+        assert no_seed.status_code == 400
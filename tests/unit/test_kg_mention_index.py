@@ -0,0 +1,158 @@
+"""
+Unit tests for the in-memory entity mention index and the sarga annotation endpoint.
+"""
+
+import json
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from api.services.kg_database_service import KGDatabaseService
+from api.services.kg_mention_index import MentionIndex, format_text_unit_id, parse_text_unit_id
+
+
+ENTITIES = {'rama': ('Person', 'राम'), 'sita': ('Person', 'सीता'), 'ayodhya': ('Place', 'अयोध्या')}
+
+# (text_unit_id, entity, span_start)
+MENTIONS = [
+    ('1.2.1', 'rama', 10),
+    ('1.2.1', 'sita', 2),
+    ('1.2.3', 'ayodhya', 0),
+    ('1.10.1', 'rama', 4),
+    ('1.20.1', 'sita', 4),
+    ('1.1.5', 'rama', 0),
+    ('2.2.1', 'rama', 0),
+    ('preface', 'rama', 0),
+]
+
+
+@pytest.fixture
+def kg_db(kg_db):
+    conn = sqlite3.connect(kg_db)
+    for name, (entity_type, sanskrit) in ENTITIES.items():
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, entity_type, labels, properties) VALUES (?, ?, ?, ?)",
+            (name, entity_type, json.dumps({'en': name.title(), 'sa': sanskrit}), json.dumps({'epithets': []}))
+        )
+    conn.executemany(
+        "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end, confidence) "
+        "VALUES (?, ?, ?, ?, 0.9)",
+        [(text_unit_id, entity, start, start + 4) for text_unit_id, entity, start in MENTIONS]
+    )
+    conn.commit()
+    conn.close()
+    return kg_db
+
+
+@pytest.fixture
+def service(kg_db):
+    return KGDatabaseService(kg_db)
+
+
+@pytest.fixture
+def index(service):
+    return MentionIndex(service, refresh_interval=0)
+
+
+def _units(mentions):
+    return [(m['text_unit_id'], m['entity_id']) for m in mentions]
+
+
+@pytest.mark.service
+class TestMentionIndex:
+    """Test cases for MentionIndex lookups."""
+
+    def test_text_unit_ids(self):
+        assert format_text_unit_id(parse_text_unit_id('7.68.1043')) == '7.68.1043'
+        assert parse_text_unit_id('1.2.10') < parse_text_unit_id('1.10.2') < parse_text_unit_id('2.1.1')
+        assert parse_text_unit_id('preface') is None
+        assert parse_text_unit_id('1.2') is None
+
+    def test_mentions_in_text_unit(self, index):
+        mentions = index.mentions_in_text_unit('1.2.1')
+
+        assert [(m['entity_id'], m['span_start'], m['span_end']) for m in mentions] == [
+            ('sita', 2, 6), ('rama', 10, 14)
+        ]
+        assert mentions[0]['confidence'] == 0.9
+        assert mentions[0]['source_type'] == 'automated'
+        assert index.mentions_in_text_unit('1.2.2') == []
+        assert index.mentions_in_text_unit('preface') == []
+
+    def test_mentions_in_sarga(self, index):
+        assert _units(index.mentions_in_sarga(1, 2)) == [('1.2.1', 'sita'), ('1.2.1', 'rama'), ('1.2.3', 'ayodhya')]
+        assert _units(index.mentions_in_sarga(1, 10)) == [('1.10.1', 'rama')]
+        assert index.mentions_in_sarga(3, 1) == []
+
+    def test_mentions_of_entity(self, index):
+        assert _units(index.mentions_of_entity('rama')) == [
+            ('1.1.5', 'rama'), ('1.2.1', 'rama'), ('1.10.1', 'rama'), ('2.2.1', 'rama'), ('preface', 'rama')
+        ]
+        assert index.mentions_of_entity('hanuman') == []
+        assert index.stats()['mentions'] == len(MENTIONS) - 1
+        assert index.stats()['unplaced'] == 1
+
+    def test_mentions_of_entity_match_database(self, index, service):
+        """Every stored mention of an entity is served, in or out of reading order."""
+        def units(mentions):
+            return sorted((m['id'], m['text_unit_id'], m['span_start'], m['span_end']) for m in mentions)
+
+        assert units(index.mentions_of_entity('rama')) == units(service.get_entity_mentions('rama'))
+
+    def test_entities_in_text_unit_match_database(self, index, service):
+        assert index.entities_in_text_unit('1.2.1') == service.get_entities_in_text_unit('1.2.1')
+
+    def test_annotate_sarga(self, index):
+        annotation = index.annotate_sarga(1, 2)
+
+        assert list(annotation['annotations']) == ['1.2.1', '1.2.3']
+        assert [m['entity_id'] for m in annotation['annotations']['1.2.1']] == ['sita', 'rama']
+        assert annotation['entities'] == {
+            'rama': {'entity_type': 'Person', 'labels': {'en': 'Rama', 'sa': 'राम'}},
+            'sita': {'entity_type': 'Person', 'labels': {'en': 'Sita', 'sa': 'सीता'}},
+            'ayodhya': {'entity_type': 'Place', 'labels': {'en': 'Ayodhya', 'sa': 'अयोध्या'}}
+        }
+        assert annotation['mention_count'] == 3
+
+    def test_reloads_after_writes(self, index, service):
+        conn = service.get_connection()
+        conn.execute(
+            "INSERT INTO text_entity_mentions (text_unit_id, entity_id, span_start, span_end) "
+            "VALUES ('1.2.2', 'ayodhya', 0, 4)"
+        )
+        conn.execute("UPDATE text_entity_mentions SET entity_id = 'sita' WHERE text_unit_id = '2.2.1'")
+        conn.commit()
+
+        assert _units(index.mentions_in_text_unit('1.2.2')) == [('1.2.2', 'ayodhya')]
+        assert _units(index.mentions_of_entity('sita'))[-1] == ('2.2.1', 'sita')
+        assert len(index.mentions_of_entity('rama')) == 4
+
+    def test_no_reload_without_writes(self, index):
+        loaded_at = index.loaded_at
+        index.mentions_in_sarga(1, 2)
+        assert index.loaded_at == loaded_at
+
+
+@pytest.mark.api
+class TestMentionEndpoints:
+    """Test cases for the mention-backed KG endpoints."""
+
+    def test_sarga_annotations_endpoint(self, client, index):
+        with patch('api.controllers.kg_controller.kg_mentions', index):
+            response = client.get('/api/kg/sargas/1/2/annotations')
+
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data['success'] is True
+        assert (data['kanda'], data['sarga'], data['count']) == (1, 2, 3)
+        assert set(data['annotations']) == {'1.2.1', '1.2.3'}
+        assert data['entities']['ayodhya']['entity_type'] == 'Place'
+
+    def test_text_unit_entities_endpoint(self, client, index):
+        with patch('api.controllers.kg_controller.kg_mentions', index):
+            response = client.get('/api/kg/text-units/1.2.1/entities')
+
+        data = json.loads(response.data)
+        assert data['count'] == 2
+        assert [entity['kg_id'] for entity in data['entities']] == ['sita', 'rama']
+        assert data['entities'][0]['mention'] == {'span_start': 2, 'span_end': 6, 'confidence': 0.9}
@@ -0,0 +1,157 @@
+"""
+Unit tests for the metrics subsystem and the /metrics endpoint.
+"""
+
+import math
+import threading
+import pytest
+
+from api.services.metrics_service import MetricsRegistry, instrument_methods, quantile
+from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService, SEARCH_CACHE_REQUESTS
+
+
+@pytest.mark.service
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry and its metric types."""
+
+    def test_counter_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_requests_total', 'Requests', ['result'])
+        counter.inc(result='hit')
+        counter.inc(2, result='miss')
+
+        text = registry.render()
+        assert '# TYPE test_requests_total counter' in text
+        assert 'test_requests_total{result="hit"} 1' in text
+        assert 'test_requests_total{result="miss"} 2' in text
+
+    def test_metrics_are_registered_once(self):
+        """Registering a name twice returns the same metric; type clashes fail."""
+        registry = MetricsRegistry()
+        first = registry.counter('test_total', 'Test')
+        assert registry.counter('test_total', 'Test') is first
+        with pytest.raises(ValueError):
+            registry.histogram('test_total', 'Test')
+
+    def test_labels_must_match(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'Test', ['route'])
+        with pytest.raises(ValueError):
+            counter.inc(path='/x')
+
+    def test_histogram_buckets_and_quantiles(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('test_seconds', 'Latency', ['route'], buckets=(0.1, 1.0))
+        for value in [0.05] * 90 + [0.5] * 9 + [5.0]:
+            histogram.observe(value, route='/a')
+
+        quantiles = histogram.quantiles(route='/a')
+        assert quantiles[0.5] == 0.05
+        assert quantiles[0.95] == 0.5
+        assert quantiles[0.99] == 0.5
+        assert histogram.count(route='/a') == 100
+
+        text = registry.render()
+        assert 'test_seconds_bucket{route="/a",le="0.1"} 90' in text
+        assert 'test_seconds_bucket{route="/a",le="1"} 99' in text
+        assert 'test_seconds_bucket{route="/a",le="+Inf"} 100' in text
+        assert 'test_seconds_count{route="/a"} 100' in text
+        assert 'test_seconds_quantiles{route="/a",quantile="0.99"} 0.5' in text
+
+    def test_quantile_of_empty_window(self):
+        assert math.isnan(quantile([], 0.5))
+
+    def test_callback_gauge_errors_are_skipped(self):
+        """A failing gauge callback doesn't break the scrape."""
+        registry = MetricsRegistry()
+        registry.gauge_callback('test_broken', 'Broken', lambda: 1 / 0)
+        registry.gauge_callback('test_rows', 'Rows', lambda: {('a',): 3}, ['index'])
+
+        text = registry.render()
+        assert 'test_broken' not in text
+        assert 'test_rows{index="a"} 3' in text
+
+    def test_instrument_methods(self):
+        """Public methods are timed under their own name."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('test_query_seconds', 'Queries', ['operation'])
+
+        @instrument_methods(histogram, exclude=('get_connection',))
+        class Service:
+            def get_connection(self):
+                return 'conn'
+
+            def get_entity(self, entity_id):
+                return self._load(entity_id)
+
+            def _load(self, entity_id):
+                return {'id': entity_id}
+
+        assert Service().get_entity('rama') == {'id': 'rama'}
+        assert Service().get_connection() == 'conn'
+        assert histogram.count(operation='get_entity') == 1
+        assert histogram.count(operation='get_connection') == 0
+        assert histogram.count(operation='_load') == 0
+
+    def test_concurrent_counter_updates(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'Test')
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.value() == 8000
+
+
+@pytest.mark.service
+class TestSearchInstrumentation:
+    """Test cases for the fuzzy search service's metrics."""
+
+    def test_search_stats_cover_all_search_methods(self, mock_ramayanam_data):
+        service = OptimizedFuzzySearchService(mock_ramayanam_data)
+
+        service.search_translation_fuzzy("dharma")
+        service.search_sloka_sanskrit_fuzzy("धर्म")
+        service.search_translation_in_kanda_fuzzy(1, "dharma")
+        list(service.search_stream("dharma"))
+
+        stats = service.get_search_stats()
+        assert stats['total_searches'] == 4
+        assert stats['avg_response_time'] > 0
+
+    def test_cache_hits_counted_per_search_type(self, mock_ramayanam_data):
+        service = OptimizedFuzzySearchService(mock_ramayanam_data)
+        hits = SEARCH_CACHE_REQUESTS.value(search_type='translation', result='hit')
+
+        service.search_translation_fuzzy("dharma")
+        service.search_translation_fuzzy("dharma")
+
+        assert SEARCH_CACHE_REQUESTS.value(search_type='translation', result='hit') == hits + 1
+
+
+@pytest.mark.api
+class TestMetricsEndpoint:
+    """Test cases for the /metrics endpoint."""
+
+    def test_metrics_text_format(self, client):
+        client.get('/health')
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        text = response.data.decode()
+        assert '# TYPE ramayanam_http_request_duration_seconds histogram' in text
+        assert 'route="/health"' in text
+
+    def test_blueprint_requests_are_recorded(self, client):
+        client.get('/api/ramayanam/kandas/1')
+        text = client.get('/metrics').data.decode()
+
+        assert ('ramayanam_http_request_duration_seconds_count{blueprint="sloka",'
+                'route="/api/ramayanam/kandas/<int:kanda_number>",method="GET",status="200"}') in text
@@ -0,0 +1,117 @@
+"""
+Unit tests for process-parallel corpus extraction.
+"""
+
+import sqlite3
+import time
+import pytest
+
+from api.services.automated_entity_extraction import RamayanaEntityExtractor
+from api.services.enhanced_entity_extraction import ScalableEntityExtractor
+from api.services.parallel_extraction import default_workers, map_shards
+
+
+# (kanda, sarga, sloka, sloka text, translation, meaning)
+SLOKAS = [
+    (1, 1, 1, 'रामः सीताम् अब्रवीत्', 'Rama spoke to Sita.', 'रामः Rama, सीताम् to Sita'),
+    (1, 1, 2, 'राघवस्य वचनं', 'The words of Raghava.', 'राघवस्य of Raghava'),
+    (1, 2, 1, 'जानकी वैदेही', 'Janaki, the princess of Videha.', 'जानकी Janaki'),
+    (2, 1, 1, 'लक्ष्मणस्य भ्राता रामः', 'Rama, brother of Lakshmana.', 'रामः Rama'),
+]
+
+
+def _slow_square(value):
+    # Early shards finish last, so results arrive out of order
+    time.sleep(0.01 * (4 - value))
+    return value * value
+
+
+@pytest.fixture
+def corpus_db(kg_db_factory):
+    return kg_db_factory([
+        (kanda, sarga, sloka_id, sloka, meaning, translation)
+        for kanda, sarga, sloka_id, sloka, translation, meaning in SLOKAS
+    ])
+
+
+@pytest.fixture
+def corpus_files(tmp_path):
+    data_path = tmp_path / 'Slokas'
+    for kanda_id, kanda in ((1, 'BalaKanda'), (2, 'AyodhyaKanda')):
+        (data_path / kanda).mkdir(parents=True)
+        for sarga_id in (1, 2):
+            rows = [row for row in SLOKAS if row[:2] == (kanda_id, sarga_id)]
+            for file_type, column in (('sloka', 3), ('translation', 4), ('meaning', 5)):
+                lines = [f"{row[0]}::{row[1]}::{row[2]}::{row[column]}" for row in rows]
+                (data_path / kanda / f"{kanda}_sarga_{sarga_id}_{file_type}.txt").write_text(
+                    '\n'.join(lines), encoding='utf-8'
+                )
+    return str(data_path)
+
+
+def _mentions(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(
+            "SELECT text_unit_id, entity_id, span_start, span_end, confidence, source_type "
+            "FROM text_entity_mentions ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.service
+class TestParallelExtraction:
+    """Test cases for map_shards and the extractors' parallel corpus runs."""
+
+    def test_map_shards_keeps_shard_order(self):
+        assert list(map_shards(_slow_square, [1, 2, 3], workers=2, chunksize=1)) == [1, 4, 9]
+        assert list(map_shards(_slow_square, [3, 1], workers=1)) == [9, 1]
+
+    def test_default_workers(self):
+        assert default_workers(3) == 3
+        assert default_workers() >= 1
+
+    def test_scalable_extractor_parallel_matches_serial(self, corpus_db, tmp_path):
+        serial_db = str(tmp_path / 'serial.db')
+        with open(corpus_db, 'rb') as source, open(serial_db, 'wb') as target:
+            target.write(source.read())
+
+        serial = ScalableEntityExtractor(serial_db).process_corpus_parallel(workers=1)
+        parallel = ScalableEntityExtractor(corpus_db).process_corpus_parallel(workers=2)
+
+        assert _mentions(corpus_db) == _mentions(serial_db)
+        assert parallel['statistics']['mentions_by_entity'] == serial['statistics']['mentions_by_entity']
+        assert parallel['statistics']['sargas'] == 3
+        mentions = _mentions(corpus_db)
+        assert mentions[0][:4] == ('1.1.1', 'rama', 0, 4)
+        assert {mention[5] for mention in mentions} == {'sanskrit', 'translation', 'meaning'}
+
+    def test_scalable_extractor_rerun_upserts(self, corpus_db):
+        extractor = ScalableEntityExtractor(corpus_db)
+        first = extractor.process_corpus_parallel(workers=1)
+        extractor.process_corpus_parallel(workers=1)
+
+        assert len(_mentions(corpus_db)) == first['load']['mentions']
+        conn = sqlite3.connect(corpus_db)
+        rama = conn.execute(
+            "SELECT entity_type, extraction_confidence FROM kg_entities "
+            "WHERE kg_id = 'http://ramayanam.hanuma.com/entity/rama'"
+        ).fetchone()
+        conn.close()
+        assert rama[0] == 'Person'
+        assert 0 < rama[1] <= 1
+
+    def test_pattern_extractor_parallel_matches_serial(self, corpus_files):
+        serial = RamayanaEntityExtractor(corpus_files).extract_entities_from_corpus()
+        parallel = RamayanaEntityExtractor(corpus_files).extract_entities_from_corpus(workers=2)
+
+        def annotations(results):
+            return [(a.text_unit_id, a.entity_id, a.span_start, a.span_end, a.confidence)
+                    for a in results['annotations']]
+
+        assert annotations(parallel) == annotations(serial)
+        assert list(parallel['entities']) == list(serial['entities'])
+        assert parallel['statistics']['processed_slokas'] == serial['statistics']['processed_slokas'] == 4
+        assert parallel['statistics']['entities_found'] == serial['statistics']['entities_found']
+        assert parallel['statistics']['patterns_matched'] == serial['statistics']['patterns_matched']
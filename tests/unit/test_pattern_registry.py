@@ -0,0 +1,79 @@
+"""
+Unit tests for the shared entity pattern registry.
+"""
+
+import json
+import pytest
+
+from api.models.kg_models import EntityType
+from api.services.automated_entity_extraction import EntityPattern, RamayanaEntityExtractor
+from api.services.enhanced_entity_extraction import ScalableEntityExtractor
+from api.services.pattern_registry import PatternIndex, PatternRegistry, get_pattern_registry
+
+
+@pytest.fixture
+def patterns_file(tmp_path):
+    path = tmp_path / 'entity_patterns.json'
+    path.write_text(json.dumps({
+        'automated': [
+            {'entity_id': 'rama', 'entity_type': 'Person', 'sanskrit_patterns': ['राम'],
+             'english_patterns': [r'\bRama\b'], 'epithets': ['राघव'], 'confidence_boost': 1.2},
+            {'entity_id': 'lanka', 'entity_type': 'Place', 'sanskrit_patterns': [],
+             'english_patterns': [r'\bLanka\b']},
+        ]
+    }, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.service
+class TestPatternRegistry:
+    """Test cases for PatternRegistry, PatternIndex and the extractors using them."""
+
+    def test_patterns_from_data_file(self, patterns_file):
+        registry = PatternRegistry(patterns_file)
+
+        patterns = registry.patterns('automated', EntityPattern)
+
+        assert [pattern.entity_id for pattern in patterns] == ['rama', 'lanka']
+        assert patterns[0].entity_type is EntityType.PERSON
+        assert patterns[0].confidence_boost == 1.2
+        assert patterns[1].epithets == []
+        with pytest.raises(KeyError):
+            registry.definitions('missing')
+
+    def test_patterns_are_fresh_copies(self, patterns_file):
+        registry = PatternRegistry(patterns_file)
+
+        registry.patterns('automated', EntityPattern)[0].english_patterns.append(r'\bRaghava\b')
+
+        assert registry.patterns('automated', EntityPattern)[0].english_patterns == [r'\bRama\b']
+
+    def test_matchers_are_compiled_once(self, patterns_file):
+        registry = PatternRegistry(patterns_file)
+
+        matcher = registry.matcher([r'\bRama\b', r'\bLanka\b'])
+
+        assert registry.matcher((r'\bRama\b', r'\bLanka\b')) is matcher
+        assert registry.matcher([r'\bLanka\b']) is not matcher
+        assert [(index, match.group()) for index, match in matcher.finditer('Rama reached Lanka')] == \
+            [(0, 'Rama'), (1, 'Lanka')]
+
+    def test_pattern_index(self, patterns_file):
+        patterns = PatternRegistry(patterns_file).patterns('automated', EntityPattern)
+        index = PatternIndex(patterns + [EntityPattern('rama', EntityType.PLACE, [], [])])
+
+        assert index.get('rama') is patterns[0]
+        assert index.get('sita') is None
+        assert 'lanka' in index and len(index) == 2
+
+    def test_shared_by_extractors(self):
+        first, second = RamayanaEntityExtractor(), RamayanaEntityExtractor()
+
+        assert get_pattern_registry() is first.registry is second.registry
+        assert first.matchers['english'][0] is second.matchers['english'][0]
+        assert first.entity_patterns[0] is not second.entity_patterns[0]
+        assert first.patterns_by_id.get('sita').entity_type is EntityType.PERSON
+
+        scalable = ScalableEntityExtractor(':memory:')
+        assert len(scalable.entity_patterns) == 10
+        assert scalable.patterns_by_id.get('rama').confidence_base == 0.95
@@ -0,0 +1,149 @@
+"""
+Unit tests for the lazy service registry and the readiness endpoint.
+"""
+
+import json
+import threading
+import pytest
+
+from api.services.service_registry import ServiceRegistry, LazyService, READY, FAILED, PENDING
+
+
+@pytest.mark.service
+class TestServiceRegistry:
+    """Test cases for ServiceRegistry."""
+
+    def test_services_are_built_lazily(self):
+        """Nothing is built until a service is first requested."""
+        calls = []
+        registry = ServiceRegistry()
+        registry.register('data', lambda: calls.append('data') or 'corpus')
+
+        assert calls == []
+        assert registry.status()['data']['state'] == PENDING
+        assert registry.get('data') == 'corpus'
+        assert registry.get('data') == 'corpus'
+        assert calls == ['data']
+
+    def test_dependencies_built_first(self):
+        """Dependencies are built before, and passed into, their dependents."""
+        order = []
+        registry = ServiceRegistry()
+        registry.register('index', lambda data: order.append('index') or f"index({data})",
+                          depends_on=('data',))
+        registry.register('data', lambda: order.append('data') or 'corpus')
+
+        assert registry.get('index') == 'index(corpus)'
+        assert order == ['data', 'index']
+        assert registry.build_order(['index']) == ['data', 'index']
+
+    def test_circular_dependency_detected(self):
+        registry = ServiceRegistry()
+        registry.register('a', lambda b: b, depends_on=('b',))
+        registry.register('b', lambda a: a, depends_on=('a',))
+
+        with pytest.raises(RuntimeError):
+            registry.get('a')
+
+    def test_failed_build_is_reported_and_retried(self):
+        """A failed build shows up in status and is retried on next use."""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise IOError("database unavailable")
+            return 'ok'
+
+        registry = ServiceRegistry()
+        registry.register('flaky', flaky)
+
+        with pytest.raises(IOError):
+            registry.get('flaky')
+        assert registry.status()['flaky']['state'] == FAILED
+        assert registry.get('flaky') == 'ok'
+        assert registry.status()['flaky']['state'] == READY
+
+    def test_background_build_and_readiness(self):
+        """Background services build on a thread; readiness waits for them."""
+        release = threading.Event()
+        registry = ServiceRegistry()
+        registry.register('index', lambda: release.wait(5) and 'built', background=True)
+        registry.register('other', lambda: 'unused')
+
+        assert registry.start_background()
+        assert not registry.is_ready()
+        release.set()
+
+        assert registry.wait_ready(timeout=5)
+        assert registry.status()['index']['state'] == READY
+        assert registry.status()['other']['state'] == PENDING
+        assert not registry.start_background()
+
+    def test_concurrent_get_builds_once(self):
+        """Callers racing the builder wait for it instead of building again."""
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'index'
+
+        registry = ServiceRegistry()
+        registry.register('index', slow)
+        results = []
+        first = threading.Thread(target=lambda: results.append(registry.get('index')))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=lambda: results.append(registry.get('index')))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert results == ['index', 'index']
+        assert len(calls) == 1
+
+    def test_lazy_service_proxy(self):
+        """Proxies forward attribute access to the built service."""
+        registry = ServiceRegistry()
+        registry.register('data', lambda: {'kanda': 1})
+        proxy = registry.proxy('data')
+
+        assert isinstance(proxy, LazyService)
+        assert registry.status()['data']['state'] == PENDING
+        assert proxy.get('kanda') == 1
+        assert registry.status()['data']['state'] == READY
+
+
+@pytest.mark.api
+class TestReadinessEndpoint:
+    """Test cases for the /ready endpoint."""
+
+    def test_ready_reports_service_state(self, client):
+        response = client.get('/ready')
+
+        assert response.status_code in (200, 503)
+        data = json.loads(response.data)
+        assert data['status'] in ('ready', 'starting')
+        assert data['services']['fuzzy_search']['depends_on'] == ['ramayanam_data']
+
+    def test_not_ready_while_indices_build(self, client):
+        """Readiness is 503 while a background service is unbuilt."""
+        registry = ServiceRegistry()
+        registry.register('fuzzy_search', lambda: None, background=True)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr('api.app.get_service_registry', lambda: registry)
+            response = client.get('/ready')
+
+        assert response.status_code == 503
+        assert json.loads(response.data)['status'] == 'starting'
+
+    def test_health_does_not_wait_for_indices(self, client):
+        response = client.get('/health')
+
+        assert response.status_code == 200
@@ -9,7 +9,8 @@ import shutil
 from unittest.mock import patch, MagicMock, mock_open
 from api.services.sloka_reader import SlokaReader
 from api.services.fuzzy_search_service import FuzzySearchService
-from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService
+from api.services.optimized_fuzzy_search_service import OptimizedFuzzySearchService, resolve_result_fields
+from api.services.search_index import TextColumn, build_search_indices
 from api.exceptions import SearchError
 
 
@@ -221,6 +222,86 @@ class TestOptimizedFuzzySearchService:
         assert mock_rapidfuzz("test", "test query") == 85
 
 
+@pytest.mark.service
+class TestSearchResultProjection:
+    """Test cases for the fields= projection of search results."""
+    
+    def test_resolve_result_fields_defaults_to_full_payload(self):
+        """No fields and no compact flag means the full payload."""
+        assert resolve_result_fields() is None
+        assert resolve_result_fields("") is None
+    
+    def test_resolve_result_fields_compact(self):
+        """Compact mode returns only ids and scores."""
+        assert resolve_result_fields(compact=True) == ('sloka_number', 'ratio')
+    
+    def test_resolve_result_fields_keeps_ids_and_scores(self):
+        """Requested fields are ordered and always include ids and scores."""
+        assert resolve_result_fields("meaning, sloka") == ('sloka_number', 'sloka', 'meaning', 'ratio')
+    
+    def test_resolve_result_fields_unknown_field(self):
+        """Unknown field names are rejected."""
+        with pytest.raises(ValueError):
+            resolve_result_fields("sloka,bogus")
+    
+    def test_translation_search_projection(self, mock_ramayanam_data):
+        """Projected results carry only the requested fields."""
+        service = OptimizedFuzzySearchService(mock_ramayanam_data)
+        
+        full = service.search_translation_fuzzy("dharma")
+        compact = service.search_translation_fuzzy("dharma", fields=resolve_result_fields(compact=True))
+        
+        assert len(full) == len(compact) > 0
+        assert {'sloka', 'translation', 'meaning'} <= set(full[0])
+        assert set(compact[0]) == {'sloka_number', 'ratio'}
+        assert compact[0]['sloka_number'] == full[0]['sloka_number']
+    
+    def test_stream_search_projection(self, mock_ramayanam_data):
+        """Streamed batches honour the projection."""
+        service = OptimizedFuzzySearchService(mock_ramayanam_data)
+        fields = resolve_result_fields("translation")
+        
+        batches = list(service.search_stream("dharma", 'translation', 50, 5, fields=fields))
+        
+        assert batches
+        for result in batches[0]:
+            assert set(result) == {'sloka_number', 'translation', 'ratio'}
+
+
+@pytest.mark.service
+class TestSearchIndex:
+    """Test cases for the compact columnar search index."""
+    
+    def test_text_column_rows(self):
+        """Rows round-trip through the joined column."""
+        column = TextColumn(["rama goes", "", None, "sita"])
+        
+        assert len(column) == 4
+        assert [column.get(i) for i in range(4)] == ["rama goes", "", "", "sita"]
+        assert list(column.iter_range(1, 10)) == ["", "", "sita"]
+    
+    def test_rows_containing(self):
+        """Substring lookups return each matching row once, in order."""
+        column = TextColumn(["rama and rama", "lakshmana", "ramayana", "sita"])
+        
+        assert column.rows_containing("rama") == [0, 2]
+        assert column.rows_containing("ana") == [1, 2]
+        # Matches never span two rows
+        assert column.rows_containing("amasita") == []
+    
+    def test_build_search_indices(self, large_mock_dataset):
+        """Indices keep corpus order, kanda ranges and the old row layout."""
+        translation_index, sanskrit_index = build_search_indices(large_mock_dataset)
+        
+        assert len(translation_index) == 150
+        assert translation_index.kanda_range(2) == (50, 100)
+        assert translation_index.kanda_range(9) == (0, 0)
+        row = translation_index.row(50)
+        assert row['sloka_id'] == "2.1.1"
+        assert row['translation'] == "translation 2.1.1"
+        assert (row['kanda'], row['sarga'], row['sloka_num']) == (2, 1, 1)
+
+
 @pytest.mark.service
 class TestServiceExceptions:
     """Test exception handling in services."""